@@ -0,0 +1 @@
+# Bu paket, uygulamanın sıcak noktaları için kıyaslama (benchmark) araçlarını içerir.
@@ -0,0 +1,119 @@
+# benchmarks/herd_generator.py
+
+"""
+Kıyaslama ve testler için deterministik sentetik sürü üreticisi.
+
+Aynı `seed` ile her çalıştırmada birebir aynı sürü üretilir. Kayıtlar
+`data/animal_records` ile aynı biçimdedir (tarihler ISO metni olarak):
+gerçekçi ırk dağılımı, 0-12 yaş arası doğum tarihleri ve düvelik
+döneminden itibaren 21 günlük kızgınlık döngüleri ile yaklaşık yıllık
+buzağılama aralıklarına uyan tohumlama geçmişleri içerir.
+"""
+
+import html
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Iterator
+
+BREEDS = (
+    ('Holstein', 55),
+    ('Simental', 15),
+    ('Montofon', 10),
+    ('Jersey', 8),
+    ('Yerli Kara', 7),
+    ('Angus', 5),
+)
+DEFAULT_REFERENCE_DATE = datetime(2025, 1, 1)
+
+_BREED_NAMES = [name for name, _ in BREEDS]
+_BREED_WEIGHTS = [weight for _, weight in BREEDS]
+
+
+def _insemination_history(rng: random.Random, birth: datetime, reference_date: datetime) -> List[Dict[str, Any]]:
+    """Düve olarak ilk tohumlamadan başlayıp her laktasyonda 1-4 tohumlama üretir."""
+    inseminations = []
+    service_date = birth + timedelta(days=rng.randint(420, 540)) # ~14-18 aylık
+    while service_date < reference_date:
+        attempts = rng.choices((1, 2, 3, 4), weights=(50, 30, 15, 5))[0]
+        for attempt in range(attempts):
+            if service_date >= reference_date:
+                break
+            inseminations.append({'tohumlama_tarihi': service_date.isoformat()})
+            if attempt < attempts - 1:
+                service_date += timedelta(days=rng.randint(18, 24)) # Kızgınlık tekrarı
+        # Gebelik (~285 gün) + doğum sonrası bekleme (~60-100 gün)
+        service_date += timedelta(days=285 + rng.randint(60, 100))
+    return inseminations
+
+
+def generate_animal(rng: random.Random, index: int, user_id: str, reference_date: datetime) -> Dict[str, Any]:
+    """Tek bir sentetik hayvan kaydı üretir."""
+    age_days = int(rng.triangular(30, 12 * 365, 3 * 365))
+    birth = (reference_date - timedelta(days=age_days)).replace(hour=0, minute=0, second=0, microsecond=0)
+    last_modified = reference_date - timedelta(seconds=rng.randint(0, 2 * 365 * 24 * 3600))
+    return {
+        'uuid': str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        'user_id': user_id,
+        'isletme_kupesi': f"K{index:07d}",
+        'devlet_kupesi': f"TR{rng.randrange(10 ** 9, 10 ** 10)}",
+        'tasma_no': str(rng.randint(1, 9999)),
+        'irk': rng.choices(_BREED_NAMES, weights=_BREED_WEIGHTS)[0],
+        'dogum_tarihi': birth.isoformat(),
+        'tohumlamalar': _insemination_history(rng, birth, reference_date),
+        'last_modified': last_modified.isoformat(),
+        'sync_status': 'synced',
+    }
+
+
+def iter_herd(size: int, seed: int = 42, user_id: str = 'benchmark-user',
+              reference_date: datetime = DEFAULT_REFERENCE_DATE) -> Iterator[Dict[str, Any]]:
+    """`size` adet hayvanı tek tek üretir; çok büyük sürülerde belleği korur."""
+    rng = random.Random(seed)
+    for index in range(size):
+        yield generate_animal(rng, index, user_id, reference_date)
+
+
+def generate_herd(size: int, seed: int = 42, user_id: str = 'benchmark-user',
+                  reference_date: datetime = DEFAULT_REFERENCE_DATE) -> List[Dict[str, Any]]:
+    """`size` adet hayvandan oluşan deterministik bir sürü listesi döndürür."""
+    return list(iter_herd(size, seed=seed, user_id=user_id, reference_date=reference_date))
+
+
+# vethek tohumlama tablosunun sütunları (bkz. config/settings.py COLUMN_HEADERS)
+VETHEK_COLUMNS = ('id', 'Sperma_Belgeno', 'belgeno_dummy', 'kupeno', 'irki', 'Not', 'tarih', 'Gebe_mi')
+
+
+def iter_vethek_rows(herd: List[Dict[str, Any]], seed: int = 42) -> Iterator[Dict[str, str]]:
+    """Sürüyü vethek sayfasındaki gibi tohumlama başına bir tablo satırına açar."""
+    rng = random.Random(seed)
+    row_id = 0
+    for animal in herd:
+        for insemination in animal['tohumlamalar']:
+            row_id += 1
+            belgeno = str(rng.randrange(10 ** 7, 10 ** 8))
+            service = datetime.fromisoformat(insemination['tohumlama_tarihi'])
+            yield {
+                'id': str(row_id),
+                'Sperma_Belgeno': f"{rng.choice(('Holstein', 'Simental', 'Montofon'))}-{rng.randint(100, 999)} | {belgeno}",
+                'belgeno_dummy': belgeno,
+                'kupeno': animal['devlet_kupesi'],
+                'irki': animal['irk'],
+                'Not': '',
+                'tarih': service.strftime('%d.%m.%Y'),
+                'Gebe_mi': rng.choice(('Evet', 'Hayır', '')),
+            }
+
+
+def iter_vethek_html(rows: Iterator[Dict[str, str]], rows_per_chunk: int = 500) -> Iterator[str]:
+    """Satırları vethek sayfası biçiminde HTML olarak, parça parça üretir (indirilen sayfa gibi)."""
+    yield '<html><head><meta charset="utf-8"></head><body><table><tr>'
+    yield ''.join(f'<th>{column}</th>' for column in VETHEK_COLUMNS) + '</tr>'
+    buffer = []
+    for row in rows:
+        buffer.append('<tr>' + ''.join(f'<td>{html.escape(row[column])}</td>' for column in VETHEK_COLUMNS) + '</tr>')
+        if len(buffer) >= rows_per_chunk:
+            yield '\n'.join(buffer)
+            buffer = []
+    buffer.append('</table></body></html>')
+    yield '\n'.join(buffer)
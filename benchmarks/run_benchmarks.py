@@ -0,0 +1,290 @@
+# benchmarks/run_benchmarks.py
+
+"""
+Sıcak noktalar için kıyaslama paketi.
+
+Her kıyaslama, sentetik sürünün farklı boyutlarında çalıştırılır; süre
+(en iyi ve ortanca) ve tracemalloc ile ölçülen tepe bellek kullanımı
+JSON olarak yazdırılır. Kivy veya Supabase gerektirmez.
+
+Kullanım:
+    python -m benchmarks.run_benchmarks --sizes 1000,10000,100000 --output bench.json
+    python -m benchmarks.run_benchmarks --only merge,filter_animals --sizes 1000000
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics as pystats
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Any, Optional, Tuple
+from unittest.mock import patch
+
+os.environ.setdefault('MPLBACKEND', 'Agg') # Grafik modülleri ekran olmadan da içe aktarılabilsin
+
+from benchmarks.herd_generator import generate_herd, iter_vethek_html, iter_vethek_rows
+from src import persistence
+from src.batch_processor import process_animal_records_batch
+from src.data_processor import process_animal_records, filter_animals
+from src.derived_cache import DerivedFieldCache
+from src.herd_aggregates import HerdAggregates
+from src.local_store import SQLiteAnimalStore
+from src.models import Animal
+from src.normalizer import normalize_scraped_rows
+from src.scraper import iter_table_rows_from_chunks
+from src.statistics import calculate_statistics, calculate_births_per_month
+from src.sync_merge import merge_remote_animals
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+
+class HerdContext:
+    """Bir sürü boyutu için kıyaslamalar arasında paylaşılan, tembel hazırlanan veriler."""
+
+    def __init__(self, size: int, seed: int):
+        self.size = size
+        self.herd = generate_herd(size, seed=seed)
+        self._herd_json = json.dumps(self.herd)
+        self._tmp_dir: Optional[str] = None
+        self._store: Optional[SQLiteAnimalStore] = None
+        self._processed: Optional[List[Animal]] = None
+        self._derived_cache: Optional[DerivedFieldCache] = None
+
+    def fresh_herd(self) -> List[Dict[str, Any]]:
+        """İşlem sırasında değiştirilebilecek, sürünün bağımsız bir kopyası."""
+        return json.loads(self._herd_json)
+
+    def store(self) -> SQLiteAnimalStore:
+        if self._store is None:
+            self._tmp_dir = tempfile.mkdtemp(prefix='herd-bench-')
+            self._store = SQLiteAnimalStore(os.path.join(self._tmp_dir, 'animals.db'))
+            self._store.upsert_many(self.fresh_herd())
+        return self._store
+
+    def derived_cache(self) -> DerivedFieldCache:
+        """Sürünün tamamı için önceden doldurulmuş türetilmiş alan önbelleği."""
+        if self._derived_cache is None:
+            self.store() # Geçici dizini oluşturur
+            self._derived_cache = DerivedFieldCache(os.path.join(self._tmp_dir, 'derived.db'))
+            self._derived_cache.process(self.fresh_herd())
+        return self._derived_cache
+
+    def processed(self) -> List[Animal]:
+        """Uygulamadaki gibi depodan gelen `Animal` nesneleri üzerinde işlenmiş sürü."""
+        if self._processed is None:
+            self._processed = process_animal_records([Animal.from_dict(animal) for animal in self.fresh_herd()])
+        return self._processed
+
+    def close(self):
+        if self._derived_cache is not None:
+            self._derived_cache.close()
+        if self._store is not None:
+            self._store.close()
+        if self._tmp_dir is not None:
+            shutil.rmtree(self._tmp_dir, ignore_errors=True)
+
+
+# Kıyaslama adı -> (bağlam) -> (hazırlık fonksiyonu, ölçülecek fonksiyon)
+BENCHMARKS: Dict[str, Callable[[HerdContext], Tuple[Callable[[], Any], Callable[[Any], Any]]]] = {}
+
+
+def benchmark(name: str):
+    def register(factory):
+        BENCHMARKS[name] = factory
+        return factory
+    return register
+
+
+@benchmark('load_animals')
+def _load_animals(ctx: HerdContext):
+    store = ctx.store()
+
+    def run(_):
+        with patch.object(persistence, '_store', store):
+            return persistence.load_animals()
+    return (lambda: None), run
+
+
+@benchmark('process_animal_records')
+def _process_animal_records(ctx: HerdContext):
+    return ctx.fresh_herd, process_animal_records
+
+
+@benchmark('process_animal_records_batch')
+def _process_animal_records_batch(ctx: HerdContext):
+    return ctx.fresh_herd, process_animal_records_batch
+
+
+@benchmark('process_animal_records_models')
+def _process_animal_records_models(ctx: HerdContext):
+    # Uygulamadaki gibi tarihleri zaten çözülmüş `Animal` nesneleri üzerinde
+    return (lambda: [Animal.from_dict(animal) for animal in ctx.fresh_herd()]), process_animal_records
+
+
+@benchmark('process_animal_records_batch_models')
+def _process_animal_records_batch_models(ctx: HerdContext):
+    return (lambda: [Animal.from_dict(animal) for animal in ctx.fresh_herd()]), process_animal_records_batch
+
+
+@benchmark('derived_cache_warm')
+def _derived_cache_warm(ctx: HerdContext):
+    # Hiçbir kayıt değişmeden ikinci kez açılan ana ekran
+    cache = ctx.derived_cache()
+    return (lambda: [Animal.from_dict(animal) for animal in ctx.fresh_herd()]), cache.process
+
+
+@benchmark('merge')
+def _merge(ctx: HerdContext):
+    def setup():
+        local = {animal['uuid']: animal for animal in ctx.fresh_herd()}
+        remote = ctx.fresh_herd()
+        # Uzak kayıtların %10'u daha yeni, %1'i lokalde hiç yok
+        for index, animal in enumerate(remote):
+            if index % 10 == 0:
+                animal['last_modified'] = (datetime.fromisoformat(animal['last_modified']) + timedelta(hours=1)).isoformat()
+            if index % 100 == 0:
+                local.pop(animal['uuid'], None)
+        return local, remote
+    return setup, lambda args: merge_remote_animals(*args)
+
+
+@benchmark('parse_vethek_table')
+def _parse_vethek_table(ctx: HerdContext):
+    # Sayfa parça parça (indirilir gibi) ayrıştırılır; satırlar tüketilip atılır, tepe bellek sabit kalmalı
+    def setup():
+        return [chunk.encode('utf-8') for chunk in iter_vethek_html(iter_vethek_rows(ctx.herd))]
+
+    def run(chunks):
+        return sum(1 for _ in iter_table_rows_from_chunks(chunks))
+    return setup, run
+
+
+@benchmark('normalize_vethek_rows')
+def _normalize_vethek_rows(ctx: HerdContext):
+    # Kazınan tohumlama satırlarından hayvan kayıtlarına (gruplama, sperma/belgeno ayırma, tarih çözme)
+    return (lambda: list(iter_vethek_rows(ctx.herd))), lambda rows: sum(1 for _ in normalize_scraped_rows(rows))
+
+
+@benchmark('calculate_statistics')
+def _calculate_statistics(ctx: HerdContext):
+    return ctx.processed, calculate_statistics
+
+
+@benchmark('calculate_births_per_month')
+def _calculate_births_per_month(ctx: HerdContext):
+    return ctx.processed, calculate_births_per_month
+
+
+@benchmark('herd_aggregates_read')
+def _herd_aggregates_read(ctx: HerdContext):
+    def setup():
+        aggregates = HerdAggregates()
+        aggregates.rebuild(ctx.processed())
+        return aggregates
+    # What the statistics screen costs on entry: independent of the herd size
+    return setup, lambda aggregates: (aggregates.statistics(), aggregates.breed_distribution(),
+                                      aggregates.births_per_month())
+
+
+@benchmark('herd_aggregates_update')
+def _herd_aggregates_update(ctx: HerdContext):
+    def setup():
+        aggregates = HerdAggregates()
+        aggregates.rebuild(ctx.processed())
+        edited = Animal.from_dict(ctx.fresh_herd()[0])
+        edited.irk = 'Jersey'
+        return aggregates, edited
+    # Cost added to each create/update/merge write
+    return setup, lambda args: args[0].update(args[1])
+
+
+@benchmark('filter_animals')
+def _filter_animals(ctx: HerdContext):
+    return ctx.processed, lambda animals: filter_animals(animals, 'k00012')
+
+
+def measure(setup: Callable[[], Any], run: Callable[[Any], Any], repeat: int) -> Dict[str, Any]:
+    """Fonksiyonu `repeat` kez zamanlar, ardından ayrı bir çalıştırmada tepe belleği ölçer."""
+    timings = []
+    for _ in range(repeat):
+        argument = setup()
+        start = time.perf_counter()
+        run(argument)
+        timings.append(time.perf_counter() - start)
+
+    argument = setup()
+    tracemalloc.start()
+    try:
+        run(argument)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'repeat': repeat,
+        'min_s': min(timings),
+        'median_s': pystats.median(timings),
+        'peak_bytes': peak,
+    }
+
+
+def run_benchmarks(sizes, names=None, repeat: int = 3, seed: int = 42, log=None) -> Dict[str, Any]:
+    """Seçilen kıyaslamaları her boyut için çalıştırır ve makine tarafından okunabilir sonucu döndürür."""
+    names = list(names or BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise ValueError(f"Bilinmeyen kıyaslama: {', '.join(unknown)}")
+
+    results = []
+    for size in sizes:
+        ctx = HerdContext(size, seed)
+        try:
+            for name in names:
+                setup, run = BENCHMARKS[name](ctx)
+                result = {'benchmark': name, 'size': size}
+                result.update(measure(setup, run, repeat))
+                results.append(result)
+                if log:
+                    log(f"{name:<28} n={size:<8} min={result['min_s'] * 1000:10.2f} ms "
+                        f"peak={result['peak_bytes'] / 1024 / 1024:8.2f} MiB")
+        finally:
+            ctx.close()
+    return {
+        'generated_at': datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'seed': seed,
+        'results': results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sürü işleme sıcak noktaları için kıyaslama paketi.")
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help="Virgülle ayrılmış sürü boyutları (ör. 1000,10000,1000000).")
+    parser.add_argument('--only', default=None,
+                        help=f"Yalnızca bu kıyaslamalar: {', '.join(BENCHMARKS)}")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default=None, help="Sonuçların yazılacağı JSON dosyası (varsayılan: stdout).")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    names = args.only.split(',') if args.only else None
+    report = run_benchmarks(sizes, names=names, repeat=args.repeat, seed=args.seed,
+                            log=lambda line: print(line, file=sys.stderr))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
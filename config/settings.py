@@ -4,8 +4,47 @@ load_dotenv() # .env dosyasındaki değişkenleri yükler
 # config/settings.py
 
 DATA_SOURCE_URL = 'http://vethek.org/t_2_7867_NDcyNQ.htm'
-LOCAL_DATA_FILE = 'data/animal_records.json'
-SYNC_QUEUE_FILE = 'data/sync_queue.json' # New: File to store pending sync actions
+SCRAPER_CHUNK_SIZE = 64 * 1024 # Bytes read from the response per step; the page is parsed while it downloads
+SCRAPE_CACHE_FILE = 'data/scrape_cache.db' # ETag/Last-Modified, content hash and parsed rows per scraped URL; safe to delete
+SCRAPER_SPOOL_MAX_BYTES = 8 * 1024 * 1024 # Pages are held in memory up to this size while hashed, then spooled to a temp file
+SCRAPER_MAX_WORKERS = 8 # Herd pages fetched at the same time by the crawler (all hosts)
+SCRAPER_PER_HOST_CONCURRENCY = 2 # Open requests per host; also the pooled connections kept per host
+SCRAPER_MIN_REQUEST_INTERVAL = 0.5 # Minimum seconds between request starts to the same host
+SCRAPER_MAX_RETRIES = 3 # Connection errors and 429/5xx responses are retried this many times...
+SCRAPER_BACKOFF_SECONDS = 1.0 # ...after this delay, doubled per attempt (Retry-After wins when sent)
+SCRAPER_ROW_BUFFER = 1000 # Parsed rows waiting for the consumer; fetching pauses when it is full
+IMPORT_CHUNK_SIZE = 2000 # Rows read, validated and written per batch when importing a CSV/XLSX file
+IMPORT_CACHE_DIR = 'data/import_cache' # Columnar .npz snapshots of imported files keyed by content hash; safe to delete
+IMPORT_CACHE_MAX_FILES = 20 # Least recently used snapshots beyond this count are deleted
+LOCAL_DATA_FILE = 'data/animal_records.json' # Legacy JSON store, migrated once into LOCAL_DB_FILE
+LOCAL_DB_FILE = 'data/animal_records.db' # SQLite (WAL) store for animal records
+DERIVED_CACHE_FILE = 'data/derived_cache.db' # Cached sinif/display_name/dates keyed by uuid + last_modified; safe to delete
+SYNC_QUEUE_FILE = 'data/sync_queue.json' # Legacy JSON queue, migrated once into SYNC_JOURNAL_FILE
+SYNC_JOURNAL_FILE = 'data/sync_queue.jsonl' # Append-only journal of pending sync actions
+SYNC_JOURNAL_GROUP_COMMIT_SIZE = 32 # fsync after this many appends...
+SYNC_JOURNAL_GROUP_COMMIT_INTERVAL = 0.5 # ...or at most this many seconds after the first unsynced append
+SYNC_JOURNAL_COMPACT_RATIO = 0.5 # Compact once acknowledged entries exceed this share of the journal
+SUPABASE_MAX_CONCURRENCY = 4 # Network calls run off the UI loop in a pool of this many threads (also the HTTP connection limit)
+SUPABASE_KEEPALIVE_SECONDS = 30.0 # Idle pooled connections are kept open this long
+SUPABASE_TIMEOUT_SECONDS = 30.0
+SYNC_MAX_ATTEMPTS = 5 # Queued actions rejected by the server this many times move to the dead-letter list (<journal>.dead)
+SYNC_WATERMARK_OVERLAP_SECONDS = 300 # Delta pulls re-read this many seconds before the stored watermark
+SYNC_UPSERT_BATCH_SIZE = 200 # Initial number of queued rows sent per bulk upsert request
+SYNC_UPSERT_MIN_BATCH_SIZE = 10
+SYNC_UPSERT_MAX_BATCH_SIZE = 1000
+SYNC_UPSERT_TARGET_SECONDS = 2.0 # Chunks shrink when a request takes longer than this, grow when well under it
+SYNC_DEBOUNCE_SECONDS = 2.0 # Sync requests (screen enter, local edit) within this window are coalesced
+SYNC_BACKOFF_INITIAL_SECONDS = 5.0 # Retry delay after the first failed background sync, doubled per failure...
+SYNC_BACKOFF_MAX_SECONDS = 300.0 # ...up to this limit
+SYNC_RECONCILE_MAX_BUCKET_ROWS = 64 # Differing digest buckets are split further until they hold at most this many records...
+SYNC_RECONCILE_MAX_PREFIX_LENGTH = 4 # ...or their uuid prefix reaches this length; then the bucket is downloaded
+REALTIME_SYNC_ENABLED = os.getenv('REALTIME_SYNC') == '1' # Optional live subscription to other devices' edits
+REALTIME_HEARTBEAT_SECONDS = 25.0 # Phoenix heartbeat; the server drops sockets silent for ~60 s
+REALTIME_RECONNECT_INITIAL_SECONDS = 1.0 # Reconnect delay after a dropped socket, doubled per failure...
+REALTIME_RECONNECT_MAX_SECONDS = 60.0 # ...up to this limit
+REALTIME_NOTIFY_DELAY_SECONDS = 0.5 # Changes arriving within this window refresh the screens once
+SYNC_METRICS_HISTORY = 50 # Number of sync runs kept in memory for diagnostics
+SYNC_METRICS_FILE = os.getenv('SYNC_METRICS_FILE') # Optional JSONL file for sync run metrics (e.g. data/sync_metrics.jsonl)
 GESTATION_PERIOD_DAYS = 285
 
 # Sütun başlıkları ve indeksleri (scrape edilen tablonun yapısına göre ayarlandı)
@@ -1,66 +1,104 @@
+# Must run before any other import so that STARTUP_PROFILE=1 can time every module
+from src.startup_profile import startup_profiler
+startup_profiler.start_if_enabled()
+
 import asyncio
-from kivy.lang import Builder
+from kivy.clock import Clock
 from kivymd.app import MDApp
-from kivy.uix.screenmanager import ScreenManager
 from kivy.properties import ObjectProperty
 from src.auth_manager import AuthManager
-from src.sync_manager import SyncManager
-from src.permissions_manager import PermissionsManager
+from src.repository import get_animal_repository
 from ui.utils.dialogs import show_error # Import the centralized dialog utility
 
-# Import screens
-from ui.screens.login_screen import LoginScreen
-from ui.screens.home_screen import HomeScreen
-from ui.screens.animal_details import AnimalDetailsScreen
-from ui.screens.add_animal import AddAnimalScreen
-from ui.screens.statistics_screen import StatisticsScreen
+# Screens (and their KV files) are imported on first navigation, see ui/utils/lazy_screens.py
+from ui.utils.lazy_screens import LazyScreenManager
 
-class WindowManager(ScreenManager):
+class WindowManager(LazyScreenManager):
     pass
 
 class AnimalTrackerApp(MDApp):
     user = ObjectProperty(None, allownone=True)
     auth_manager = ObjectProperty(None)
     sync_manager = ObjectProperty(None)
+    sync_scheduler = ObjectProperty(None, allownone=True) # Background sync worker, see src/sync_scheduler.py
+    realtime_subscription = ObjectProperty(None, allownone=True) # Live updates (REALTIME_SYNC=1), see src/realtime_sync.py
     permissions_manager = ObjectProperty(None)
+    repository = ObjectProperty(None) # Shared in-memory herd, used by sync and all screens
 
     def build(self):
         self.theme_cls.primary_palette = "Teal"
         self.theme_cls.theme_style = "Dark"
 
-        # Initialize AuthManager with callbacks for success/error
-        self.auth_manager = AuthManager(
-            on_success=self.post_login_setup,
-            on_error=show_error # Use centralized dialog utility
-        )
+        with startup_profiler.phase('repository'):
+            self.repository = get_animal_repository()
 
-        # Load KV files for all screens
-        Builder.load_file('ui/screens/home_screen.kv')
-        Builder.load_file('ui/screens/animal_details.kv')
-        Builder.load_file('ui/screens/add_animal.kv')
-        Builder.load_file('ui/screens/statistics_screen.kv')
-        Builder.load_file('ui/screens/login_screen.kv') # Load the new login screen KV
+        # Initialize AuthManager with callbacks for success/error
+        with startup_profiler.phase('auth_manager'):
+            self.auth_manager = AuthManager(
+                on_success=self.post_login_setup,
+                on_error=show_error # Use centralized dialog utility
+            )
 
+        # Only the login screen is built up front; the others (and their KV files)
+        # are loaded by the WindowManager the first time they are navigated to.
         sm = WindowManager()
-        sm.add_widget(LoginScreen(name='login'))
-        sm.add_widget(HomeScreen(name='home'))
-        sm.add_widget(AnimalDetailsScreen(name='animal_details'))
-        sm.add_widget(AddAnimalScreen(name='add_animal'))
-        sm.add_widget(StatisticsScreen(name='statistics'))
+        sm.get_screen('login')
 
         return sm
 
     def on_start(self):
         # Check for an existing session on app start
         asyncio.create_task(self.auth_manager.check_session())
+        # Report startup timings once the first frame has been drawn (STARTUP_PROFILE=1)
+        Clock.schedule_once(lambda dt: startup_profiler.finish(), 0)
+
+    def on_resume(self):
+        # The network may have changed while the app was in the background
+        if self.sync_scheduler:
+            self.sync_scheduler.connectivity_restored()
+        return True
+
+    def request_sync(self, reason='manual'):
+        """Asks the background scheduler for a sync; screens never await the network themselves."""
+        if self.sync_scheduler:
+            self.sync_scheduler.request(reason)
+
+    def start_realtime(self):
+        """Subscribes to the user's animal changes so edits from other devices appear without a sync."""
+        from config.settings import REALTIME_SYNC_ENABLED
+        if not REALTIME_SYNC_ENABLED:
+            return
+        from config.secrets import SUPABASE_URL, SUPABASE_KEY
+        from src.realtime_sync import RealtimeSubscription, realtime_url
+        self.stop_realtime()
+        self.realtime_subscription = RealtimeSubscription(
+            self.sync_manager,
+            realtime_url(SUPABASE_URL, SUPABASE_KEY),
+            access_token=self.auth_manager.access_token,
+            on_change=self.sync_scheduler.notify, # Screens listening for syncs refresh the same way
+        )
+        self.realtime_subscription.start()
+
+    def stop_realtime(self):
+        if self.realtime_subscription:
+            asyncio.create_task(self.realtime_subscription.stop())
+        self.realtime_subscription = None
 
     def post_login_setup(self, user):
         """Called after a successful login or session recovery."""
         self.user = user
         if self.user:
+            # Imported here so the sync stack is not loaded before the first frame
+            from src.sync_manager import SyncManager
+            from src.sync_scheduler import SyncScheduler
+            from src.permissions_manager import PermissionsManager
             # Initialize other managers with the user's ID
             # Pass the supabase client from auth_manager to permissions_manager
-            self.sync_manager = SyncManager(user_id=self.user.id)
+            self.sync_manager = SyncManager(user_id=self.user.id, repository=self.repository)
+            if self.sync_scheduler:
+                self.sync_scheduler.stop()
+            self.sync_scheduler = SyncScheduler(self.sync_manager)
+            self.start_realtime()
             self.permissions_manager = PermissionsManager(
                 supabase_client=self.auth_manager.supabase, # Use the existing supabase client
                 user_id=self.user.id
@@ -70,6 +108,10 @@ class AnimalTrackerApp(MDApp):
             if self.root.get_screen('home'):
                 self.root.get_screen('home').load_animal_data()
         else: # This happens on sign_out or if no session
+            self.stop_realtime()
+            if self.sync_scheduler:
+                self.sync_scheduler.stop()
+            self.sync_scheduler = None
             self.sync_manager = None
             self.permissions_manager = None
             self.root.current = 'login'
@@ -7,8 +7,8 @@ Kullanıcı kimlik doğrulama işlemlerini (kayıt, giriş, çıkış) yönetir.
 Supabase GoTrue servisi ile etkileşime girer.
 """
 
-from supabase import create_client, Client
-from config.secrets import SUPABASE_URL, SUPABASE_KEY
+from supabase import Client
+from src.supabase_client import get_supabase_client, run_blocking
 
 class AuthManagerError(Exception):
     """Kimlik doğrulama sırasında oluşan hatalar için özel istisna sınıfı."""
@@ -16,10 +16,11 @@ class AuthManagerError(Exception):
 
 class AuthManager:
     def __init__(self, on_success=None, on_error=None):
+        self._on_success_callback = on_success
+        self._on_error_callback = on_error
         try:
-            self.supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-            self._on_success_callback = on_success
-            self._on_error_callback = on_error
+            # Uygulama genelinde tek istemci; SyncManager ve PermissionsManager aynı oturumu kullanır
+            self.supabase: Client = get_supabase_client()
         except Exception as e:
             if self._on_error_callback:
                 self._on_error_callback(f"Supabase istemcisi başlatılamadı: {e}")
@@ -27,7 +28,7 @@ class AuthManager:
 
     async def sign_up(self, email, password):
         try:
-            res = self.supabase.auth.sign_up({"email": email, "password": password})
+            res = await run_blocking(self.supabase.auth.sign_up, {"email": email, "password": password})
             if res.user:
                 if self._on_success_callback:
                     self._on_success_callback(res.user)
@@ -45,7 +46,7 @@ class AuthManager:
 
     async def sign_in(self, email, password):
         try:
-            res = self.supabase.auth.sign_in_with_password({"email": email, "password": password})
+            res = await run_blocking(self.supabase.auth.sign_in_with_password, {"email": email, "password": password})
             if res.user:
                 if self._on_success_callback:
                     self._on_success_callback(res.user)
@@ -63,7 +64,7 @@ class AuthManager:
 
     async def sign_out(self):
         try:
-            self.supabase.auth.sign_out()
+            await run_blocking(self.supabase.auth.sign_out)
             if self._on_success_callback:
                 self._on_success_callback(None) # Notify that user is logged out
         except Exception as e:
@@ -74,7 +75,7 @@ class AuthManager:
 
     async def check_session(self):
         try:
-            user = self.supabase.auth.get_user().user
+            user = (await run_blocking(self.supabase.auth.get_user)).user
             if user:
                 if self._on_success_callback:
                     self._on_success_callback(user)
@@ -88,3 +89,11 @@ class AuthManager:
             if self._on_success_callback:
                 self._on_success_callback(None)
             return None
+
+    async def access_token(self):
+        """Geçerli oturumun erişim belirteci; süresi dolmuşsa istemci yeniler. Oturum yoksa None."""
+        try:
+            session = await run_blocking(self.supabase.auth.get_session)
+            return session.access_token if session else None
+        except Exception:
+            return None
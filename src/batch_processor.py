@@ -0,0 +1,240 @@
+# src/batch_processor.py
+
+"""
+Sürünün tamamı için vektörel kayıt işleme motoru.
+
+`process_animal_records` her hayvanın tohumlama tarihlerini ayrı ayrı çözer,
+sıralar ve sınıflandırır. Burada ise tüm sürünün tohumlamaları tek bir
+geçişte iki NumPy dizisine düzleştirilir (hayvan indeksi, `datetime64[us]`
+tarih); sıralama, tohumlama sayısı, son tohumlama, tohumlamalar arası
+aralıklar ve `sinif` tüm sürü için vektörel olarak hesaplanır.
+
+Sonuçlar `process_animal_records` ile birebir aynıdır; o fonksiyon referans
+uygulama olarak korunur. Vektörel yolun desteklemediği kayıtlar (saat dilimli
+veya çözülemeyen tarihler, eksik tarihli tohumlamalar, beklenmeyen tipler)
+referans uygulamaya devredilir; böylece hata günlüğü ve kayıt atlama
+davranışı da aynı kalır.
+"""
+
+import sys
+import warnings
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Iterable, Optional, Sequence
+
+from src.data_processor import process_animal_records, get_display_name, derived_copy
+from src.lazy_import import lazy_module
+from src.models import Animal
+
+np = lazy_module('numpy') # Imported on the first batch, not at startup
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_MICROSECONDS_PER_DAY = 86400 * 1000000
+COW_GAP_DAYS = 180 # Bu sayıdan uzun aralık bir önceki gebeliğin (buzağılamanın) işaretidir
+
+# `Animal` modeli kategorik metinleri paylaştığı için etiketler de paylaşılır
+CLASS_UNKNOWN = sys.intern("Bilinmiyor")
+CLASS_HEIFER = sys.intern("Düve")
+CLASS_COW = sys.intern("İnek")
+
+
+class InseminationFeatures:
+    """
+    Sürü genelindeki tohumlama özellikleri; her dizi hayvanların giriş sırasına göredir.
+
+    Attributes:
+        counts: Hayvan başına tarihli tohumlama sayısı.
+        last: Son tohumlama tarihi (`datetime64[us]`, tohumlaması yoksa NaT).
+        is_cow: 180 günden uzun bir tohumlama aralığı olan hayvanlar.
+        gap_owner, gap_days: Ardışık tohumlamalar arasındaki aralıklar (gün) ve ait oldukları hayvan.
+        unsupported: Vektörel yolda işlenemeyen, referans uygulamaya bırakılan hayvan indeksleri.
+    """
+
+    def __init__(self, counts, last, is_cow, gap_owner, gap_days, unsupported: List[int]):
+        self.counts = counts
+        self.last = last
+        self.is_cow = is_cow
+        self.gap_owner = gap_owner
+        self.gap_days = gap_days
+        self.unsupported = unsupported
+
+    def classes(self) -> List[str]:
+        """`classify_animal` ile aynı kurallarla hayvan başına `sinif` değerleri."""
+        codes = np.where(self.counts == 0, 0, np.where(self.is_cow, 2, 1))
+        labels = (CLASS_UNKNOWN, CLASS_HEIFER, CLASS_COW)
+        return [labels[code] for code in codes.tolist()]
+
+    def gaps_for(self, index: int):
+        """Bir hayvanın sıralı tohumlamaları arasındaki aralıklar (gün)."""
+        return self.gap_days[self.gap_owner == index]
+
+
+def _dated_values(animal: Any) -> Optional[list]:
+    """
+    Hayvanın tohumlama tarihlerini döndürür. Kayıt referans uygulamanın
+    özel durumlarından birine giriyorsa None döner.
+    """
+    if type(animal) is Animal:
+        # Model nesnelerinde tarihler zaten çözülmüştür; sözlük arayüzü atlanır
+        inseminations = animal.tohumlamalar
+        if not inseminations:
+            return []
+        values = [insemination.tohumlama_tarihi for insemination in inseminations]
+    else:
+        try:
+            values = [insemination.get('tohumlama_tarihi') for insemination in animal.get('tohumlamalar', [])]
+        except Exception:
+            return None
+    if not all(values):
+        # Hiç tarih yoksa sınıf "Bilinmiyor" olur; yalnızca bazılarında tarih varsa
+        # referans uygulama son tohumlamayı ararken hata verip kaydı atlar.
+        return [] if not any(values) else None
+    return values
+
+
+def _parse_strings(strings: List[str], owners: List[int], unsupported: set):
+    """ISO metinlerini tek seferde `datetime64[us]` dizisine çevirir."""
+    try:
+        with warnings.catch_warnings():
+            # NumPy saat dilimli metinleri UTC'ye çevirip uyarı verir; referans ise saat dilimini korur
+            warnings.simplefilter('error')
+            parsed = np.array(strings, dtype='datetime64[us]')
+    except (ValueError, TypeError, Warning):
+        parsed = np.empty(len(strings), dtype='datetime64[us]')
+        for position, value in enumerate(strings):
+            try:
+                parsed_value = datetime.fromisoformat(value)
+            except ValueError:
+                parsed_value = None
+            if parsed_value is None or parsed_value.tzinfo is not None:
+                unsupported.add(owners[position])
+                parsed[position] = np.datetime64('NaT')
+            else:
+                parsed[position] = np.datetime64(parsed_value, 'us')
+    invalid = np.isnat(parsed)
+    if invalid.any():
+        unsupported.update(owners[position] for position in np.flatnonzero(invalid).tolist())
+    return parsed
+
+
+def _to_datetime64(values: list, owners: List[int], unsupported: set):
+    """Tarihleri (datetime veya ISO metni) `datetime64[us]` dizisine çevirir."""
+    if values and type(values[0]) is str and all(type(value) is str for value in values):
+        return _parse_strings(values, owners, unsupported) # JSON/SQLite'tan gelen ham sözlükler
+    try:
+        # Yaygın durum: hepsi saat dilimsiz datetime. Nesne dizisi üzerinden dönüştürmekten belirgin şekilde hızlı.
+        ticks = np.fromiter(((value - _EPOCH) // _MICROSECOND for value in values), dtype=np.int64, count=len(values))
+        return ticks.view('datetime64[us]')
+    except TypeError:
+        pass # Metin, saat dilimli veya beklenmeyen tipte değerler var
+
+    dates = np.full(len(values), np.datetime64('NaT'), dtype='datetime64[us]')
+    string_positions = []
+    for position, value in enumerate(values):
+        if type(value) is str:
+            string_positions.append(position)
+        elif isinstance(value, datetime) and value.tzinfo is None:
+            dates[position] = np.datetime64(value, 'us')
+        else:
+            unsupported.add(owners[position])
+    if string_positions:
+        dates[string_positions] = _parse_strings(
+            [values[position] for position in string_positions],
+            [owners[position] for position in string_positions],
+            unsupported,
+        )
+    return dates
+
+
+def compute_insemination_features(animals: Sequence[Any]) -> InseminationFeatures:
+    """Tüm sürünün tohumlama tarihlerini düzleştirip özellikleri vektörel olarak hesaplar."""
+    count = len(animals)
+    unsupported = set()
+    owner_list, values = [], []
+
+    for index, animal in enumerate(animals):
+        dated = _dated_values(animal)
+        if dated is None:
+            unsupported.add(index)
+        elif dated:
+            owner_list.extend([index] * len(dated))
+            values.extend(dated)
+
+    dates = _to_datetime64(values, owner_list, unsupported)
+    owners = np.array(owner_list, dtype=np.intp)
+    if unsupported:
+        keep = ~np.isin(owners, np.fromiter(unsupported, dtype=np.intp, count=len(unsupported)))
+        owners, dates = owners[keep], dates[keep]
+
+    # Hayvana, sonra tarihe göre sırala
+    ticks = dates.view(np.int64)
+    order = np.lexsort((ticks, owners))
+    owners, ticks = owners[order], ticks[order]
+
+    counts = np.bincount(owners, minlength=count)
+    last = np.full(count, np.datetime64('NaT'), dtype='datetime64[us]')
+    has_dates = counts > 0
+    last[has_dates] = ticks[np.cumsum(counts)[has_dates] - 1].view('datetime64[us]')
+
+    same_animal = owners[1:] == owners[:-1]
+    gap_owner = owners[1:][same_animal]
+    gap_days = np.diff(ticks)[same_animal] // _MICROSECONDS_PER_DAY # `timedelta.days` gibi aşağı yuvarlar
+
+    is_cow = np.zeros(count, dtype=bool)
+    is_cow[gap_owner[gap_days > COW_GAP_DAYS]] = True
+
+    return InseminationFeatures(counts, last, is_cow, gap_owner, gap_days, sorted(unsupported))
+
+
+def _parse_birth_date(value: str) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def write_derived_fields(animal: Any, sinif: str, son_tohumlama: Optional[datetime],
+                         display_name: Optional[str] = None):
+    """
+    Türetilmiş alanları `process_animal_records` ile aynı şekilde kayda yazar
+    (`dogum_tarihi` metinse datetime'a çevrilir). `display_name` verilmezse kayıttan hesaplanır.
+    """
+    if type(animal) is Animal:
+        # Değerler zaten modelin tuttuğu biçimde; yuvalara doğrudan yazılır
+        animal.sinif = sinif
+        animal.display_name = display_name or animal.label
+        animal.son_tohumlama = son_tohumlama
+        if isinstance(animal.dogum_tarihi, str):
+            animal.dogum_tarihi = _parse_birth_date(animal.dogum_tarihi)
+    else:
+        animal['sinif'] = sinif
+        animal['display_name'] = display_name or get_display_name(animal)
+        if isinstance(animal.get('dogum_tarihi'), str):
+            animal['dogum_tarihi'] = _parse_birth_date(animal['dogum_tarihi'])
+        animal['son_tohumlama'] = son_tohumlama
+
+
+def process_animal_records_batch(all_animals_from_db: Iterable[Dict[str, Any]],
+                                in_place: bool = False) -> List[Dict[str, Any]]:
+    """
+    `process_animal_records` ile aynı sonucu üreten, sürünün tamamı için vektörel sürüm.
+    Kayıtların kopyaları (`in_place=True` ise kayıtların kendisi) işlenir ve aynı sırayla döndürülür.
+    """
+    records = list(all_animals_from_db)
+    if not in_place:
+        records = [derived_copy(animal) for animal in records]
+    if not records:
+        return []
+    features = compute_insemination_features(records)
+    classes = features.classes()
+    last = features.last.tolist() # NaT -> None
+    unsupported = set(features.unsupported)
+
+    processed_list = []
+    for index, animal in enumerate(records):
+        if index in unsupported:
+            processed_list.extend(process_animal_records([animal], in_place=True))
+            continue
+        write_derived_fields(animal, classes[index], last[index])
+        processed_list.append(animal)
+    return processed_list
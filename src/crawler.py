@@ -0,0 +1,266 @@
+# src/crawler.py
+
+"""
+Aynı vethek biçimindeki birden çok sürü sayfasını eşzamanlı olarak kazır.
+
+Sayfalar bağlantı havuzlu tek bir `requests.Session` üzerinden, sınırlı bir
+iş parçacığı havuzunda çekilir. Her sunucu (host) için:
+
+- Aynı anda en fazla `per_host` istek yapılır; kalan sayfalar sırada bekler
+  ve iş parçacıklarını başka sunuculara bırakır.
+- İstek başlangıçları arasında en az `min_interval` saniye bırakılır (hız sınırı).
+- Bağlantı hataları ile 429/5xx yanıtları üstel artan beklemeyle yeniden denenir;
+  sunucu `Retry-After` gönderirse o süre beklenir.
+
+Satırlar sayfalar tamamlanmayı beklemeden, ayrıştırıldıkça `(url, satır)`
+olarak üretilir. Ara kuyruk sınırlı olduğu için tüketici yavaşsa indirme de
+yavaşlar; bellek kullanımı sayfa sayısından bağımsızdır. İstenirse sayfalardaki
+`rel="next"` bağlantıları izlenir (sayfalama).
+
+Bir sayfa tüm denemelere rağmen çekilemezse diğerleri devam eder; hata
+`TableCrawler.errors` sözlüğüne yazılır. Satırları üretilmeye başlamış bir
+sayfa, satırlar tekrarlanmasın diye yeniden denenmez.
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config.settings import (
+    SCRAPER_CHUNK_SIZE, SCRAPER_MAX_WORKERS, SCRAPER_PER_HOST_CONCURRENCY, SCRAPER_MIN_REQUEST_INTERVAL,
+    SCRAPER_MAX_RETRIES, SCRAPER_BACKOFF_SECONDS, SCRAPER_ROW_BUFFER,
+)
+from src.scraper import ScraperError, iter_table_rows_from_chunks, scraper_errors
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+_RETRY_AFTER_MAX_SECONDS = 300.0
+
+
+class _Retry(ScraperError):
+    """Sayfanın yeniden denenmesi gerektiğini bildirir (içeride kullanılır)."""
+
+    def __init__(self, reason: str, delay: Optional[float] = None):
+        super().__init__(reason)
+        self.delay = delay
+
+
+class _HostRateLimiter:
+    """Bir sunucuya yapılan istek başlangıçlarını en az `interval` saniye aralıkla dağıtır."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self, stop: threading.Event):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            stop.wait(slot - now)
+
+
+def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """`Retry-After` başlığı (saniye veya HTTP tarihi) -> beklenecek süre."""
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(0.0, seconds), _RETRY_AFTER_MAX_SECONDS)
+
+
+def create_session(max_workers: int = SCRAPER_MAX_WORKERS,
+                   per_host: int = SCRAPER_PER_HOST_CONCURRENCY) -> requests.Session:
+    """Sunucu başına `per_host` açık bağlantıyı yeniden kullanan bir oturum."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=per_host)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class TableCrawler:
+    """
+    Birden çok sayfanın tablolarını eşzamanlı olarak kazıyan tarayıcı.
+
+    Args:
+        session: Kullanılacak oturum; verilmezse bağlantı havuzlu yeni bir oturum açılır.
+        max_workers: Aynı anda çekilen en fazla sayfa sayısı (tüm sunucular).
+        per_host: Bir sunucuya aynı anda yapılan en fazla istek.
+        min_interval: Aynı sunucuya yapılan iki istek başlangıcı arasındaki en kısa süre.
+        max_retries: Bir sayfa için en fazla yeniden deneme sayısı.
+        backoff: İlk yeniden denemeden önceki bekleme; her denemede iki katına çıkar.
+        follow_next: True ise sayfalardaki `rel="next"` bağlantıları da kazınır.
+        max_pages: Kazınacak en fazla sayfa sayısı (izlenen bağlantılar dahil).
+
+    Attributes:
+        errors: Çekilemeyen sayfalar ve hata mesajları.
+        pages_fetched, retries: Tamamlanan sayfa ve yapılan yeniden deneme sayıları.
+    """
+
+    def __init__(self, session: Optional[requests.Session] = None, max_workers: int = SCRAPER_MAX_WORKERS,
+                 per_host: int = SCRAPER_PER_HOST_CONCURRENCY, min_interval: float = SCRAPER_MIN_REQUEST_INTERVAL,
+                 max_retries: int = SCRAPER_MAX_RETRIES, backoff: float = SCRAPER_BACKOFF_SECONDS,
+                 follow_next: bool = False, max_pages: Optional[int] = None,
+                 chunk_size: int = SCRAPER_CHUNK_SIZE, row_buffer: int = SCRAPER_ROW_BUFFER):
+        self.session = session if session is not None else create_session(max_workers, per_host)
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.min_interval = min_interval
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.follow_next = follow_next
+        self.max_pages = max_pages
+        self.chunk_size = chunk_size
+        self.row_buffer = row_buffer
+        self.errors: Dict[str, str] = {}
+        self.pages_fetched = 0
+        self.retries = 0
+        self._limiters: Dict[str, _HostRateLimiter] = defaultdict(lambda: _HostRateLimiter(self.min_interval))
+        self._limiters_lock = threading.Lock()
+        self._counter_lock = threading.Lock()
+
+    def crawl(self, urls: Iterable[str]) -> Iterator[Tuple[str, Dict[str, str]]]:
+        """
+        Sayfaları kazır ve satırları `(sayfa url'si, satır)` olarak, ayrıştırıldıkça üretir.
+        Farklı sayfaların satırları iç içe gelebilir; bir sayfanın satırları kendi içinde sıralıdır.
+        Tüketici erken durursa bekleyen sayfalar iptal edilir.
+        """
+        results: queue.Queue = queue.Queue(maxsize=self.row_buffer)
+        stop = threading.Event()
+        pending: Dict[str, deque] = defaultdict(deque)
+        in_flight: Dict[str, int] = defaultdict(int)
+        seen = set()
+        futures: List[Future] = []
+        active = 0
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='crawler')
+
+        def enqueue(url: str):
+            if url in seen or (self.max_pages is not None and len(seen) >= self.max_pages):
+                return
+            seen.add(url)
+            pending[urlsplit(url).netloc].append(url)
+
+        def dispatch():
+            nonlocal active
+            for host, waiting in pending.items():
+                while waiting and in_flight[host] < self.per_host:
+                    url = waiting.popleft()
+                    in_flight[host] += 1
+                    active += 1
+                    futures.append(executor.submit(self._fetch_page, url, results, stop))
+
+        for url in urls:
+            enqueue(url)
+        try:
+            dispatch()
+            while active:
+                kind, url, value = results.get()
+                if kind == 'row':
+                    yield url, value
+                    continue
+                active -= 1
+                in_flight[urlsplit(url).netloc] -= 1
+                if kind == 'done':
+                    self.pages_fetched += 1
+                    for link in value:
+                        enqueue(link)
+                else:
+                    self.errors[url] = value
+                    logger.warning(f"Sayfa kazınamadı ({url}): {value}")
+                dispatch()
+        finally:
+            stop.set()
+            # Henüz başlamamış sayfalar iptal edilir (`shutdown(cancel_futures=True)` Python 3.9 gerektirir)
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    # --- İş parçacıklarında çalışan kısım ---------------------------------
+
+    def _limiter(self, host: str) -> _HostRateLimiter:
+        with self._limiters_lock:
+            return self._limiters[host]
+
+    def _put(self, results: queue.Queue, item, stop: threading.Event) -> bool:
+        """Sonucu kuyruğa ekler; kuyruk doluysa yer açılmasını bekler. Tarama durdurulduysa False."""
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _fetch_page(self, url: str, results: queue.Queue, stop: threading.Event):
+        attempt = 0
+        while not stop.is_set():
+            self._limiter(urlsplit(url).netloc).wait(stop)
+            if stop.is_set():
+                return
+            try:
+                self._stream_page(url, results, stop, can_retry=attempt < self.max_retries)
+                return
+            except _Retry as retry:
+                attempt += 1
+                with self._counter_lock:
+                    self.retries += 1
+                delay = retry.delay if retry.delay is not None else self.backoff * 2 ** (attempt - 1)
+                logger.info(f"Sayfa yeniden denenecek ({url}, {attempt}. deneme, {delay:.1f} sn sonra): {retry}")
+                stop.wait(delay)
+            except ScraperError as e:
+                self._put(results, ('error', url, str(e)), stop)
+                return
+            except Exception as e:
+                # Tarama iş parçacığı hiçbir hatayla sessizce sonlanmamalı; aksi halde tüketici sonsuza kadar bekler
+                self._put(results, ('error', url, f"Beklenmeyen hata: {e}"), stop)
+                return
+
+    def _stream_page(self, url: str, results: queue.Queue, stop: threading.Event, can_retry: bool):
+        emitted = 0
+        try:
+            with scraper_errors():
+                with self.session.get(url, timeout=15, stream=True) as response:
+                    if response.status_code in RETRY_STATUSES and can_retry:
+                        raise _Retry(f"HTTP {response.status_code}",
+                                     _retry_after_seconds(response.headers.get('Retry-After')))
+                    response.raise_for_status()
+                    links: Optional[List[str]] = [] if self.follow_next else None
+                    for row in iter_table_rows_from_chunks(response.iter_content(chunk_size=self.chunk_size),
+                                                           response.headers.get('Content-Type'), links):
+                        if not self._put(results, ('row', url, row), stop):
+                            return
+                        emitted += 1
+                    next_urls = [urljoin(response.url or url, link) for link in links or []]
+        except _Retry:
+            raise
+        except ScraperError as e:
+            # Ağ kaynaklı hatalar, sayfanın hiçbir satırı henüz üretilmediyse yeniden denenir
+            network_error = isinstance(e.__cause__ or e.__context__, (requests.ConnectionError, requests.Timeout,
+                                                                      requests.exceptions.ChunkedEncodingError))
+            if network_error and can_retry and not emitted:
+                raise _Retry(str(e))
+            raise
+        self._put(results, ('done', url, next_urls), stop)
+
+
+def crawl_tables(urls: Iterable[str], **options) -> Iterator[Tuple[str, Dict[str, str]]]:
+    """`TableCrawler(**options).crawl(urls)` kısayolu."""
+    return TableCrawler(**options).crawl(urls)
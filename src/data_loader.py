@@ -1,17 +1,56 @@
 import logging
 import os
-import pandas as pd
-from typing import List, Dict, Any
+import zipfile
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from config.settings import IMPORT_CHUNK_SIZE
+from src.import_cache import ImportCache, ImportCacheError, get_import_cache
+from src.lazy_import import lazy_module
+
+pd = lazy_module('pandas') # Imported on the first file load, not at startup
+openpyxl = lazy_module('openpyxl')
+
+EXCEL_EXTENSIONS = ('.xlsx', '.xlsm')
 
 # Configure logging
 logging.basicConfig(filename='animal_tracker.log', level=logging.INFO,
                     format='%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s')
 
+_FULL_READER = 'full' # load_data_from_file: pandas types each column over the whole file
+
+def _chunked_reader(chunk_size: int) -> str:
+    """iter_file_chunks types columns per chunk, so the chunk size is part of the reader."""
+    return f"chunked{chunk_size}"
+
+def _cache_key(cache: ImportCache, file_path: str, reader: str) -> Optional[str]:
+    """Dosyanın önbellek anahtarı; dosya okunamıyorsa None (hata, ayrıştırma sırasında raporlanır)."""
+    try:
+        return cache.key(file_path, reader)
+    except OSError as e:
+        logging.warning(f"Could not hash {file_path} for the import cache: {e}")
+        return None
+
+def _frame_records(frame) -> List[Dict[str, Any]]:
+    """DataFrame satırlarını sözlüklere çevirir; boş hücreler (NaN) None olur."""
+    columns = [str(column) for column in frame.columns]
+    frame = frame.astype(object).where(frame.notna(), None)
+    return [dict(zip(columns, values)) for values in frame.itertuples(index=False, name=None)]
+
 def load_data_from_file(file_path: str) -> List[Dict[str, Any]]:
     try:
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
 
+        # The same content was parsed before: load its columnar snapshot instead of parsing again
+        cache = get_import_cache()
+        key = _cache_key(cache, file_path, _FULL_READER)
+        if key is not None and cache.contains(key):
+            try:
+                data = [record for records, _ in cache.iter_chunks(key, IMPORT_CHUNK_SIZE) for record in records]
+                logging.info(f"Data loaded from the import cache for {file_path}")
+                return data
+            except ImportCacheError as e:
+                logging.warning(f"Ignoring unreadable import cache entry: {e}")
+
         # Load data using pandas, assuming it's a CSV file. Adapt as needed.
         df = pd.read_csv(file_path)
 
@@ -19,8 +58,10 @@ def load_data_from_file(file_path: str) -> List[Dict[str, Any]]:
         if df.empty:
             raise ValueError("The uploaded CSV file is empty.")
 
-        # Convert the pandas DataFrame to a list of dictionaries
-        data = df.to_dict(orient='records')
+        # Convert the pandas DataFrame to a list of dictionaries (empty cells become None)
+        data = _frame_records(df)
+        if key is not None:
+            _store_snapshot(cache, key, [data])
 
         logging.info(f"Data loaded successfully from {file_path}")
         return data
@@ -37,3 +78,129 @@ def load_data_from_file(file_path: str) -> List[Dict[str, Any]]:
         logging.exception(f"An error occurred while loading data from {file_path}: {e}")
         raise
 
+def _store_snapshot(cache: ImportCache, key: str, chunks: List[List[Dict[str, Any]]]):
+    """Satırları önbelleğe yazar; önbellek hatası içe aktarmayı durdurmaz."""
+    try:
+        writer = cache.writer(key)
+        try:
+            for records in chunks:
+                writer.add(records)
+        except BaseException:
+            writer.discard()
+            raise
+        writer.commit()
+        cache.prune()
+    except ImportCacheError as e:
+        logging.warning(f"Could not write the import cache: {e}")
+
+def _csv_chunks(file_path: str, chunk_size: int) -> Iterator[Tuple[List[Dict[str, Any]], Optional[float]]]:
+    total = os.path.getsize(file_path)
+    with open(file_path, 'rb') as handle:
+        reader = pd.read_csv(handle, chunksize=chunk_size)
+        for frame in reader:
+            # Satırlar parçanın DataFrame'inden tek tek okunur; dosyanın ikinci bir tam kopyası oluşmaz
+            yield _frame_records(frame), (handle.tell() / total if total else None)
+
+
+def _xlsx_chunks(file_path: str, chunk_size: int) -> Iterator[Tuple[List[Dict[str, Any]], Optional[float]]]:
+    # read_only kipinde sayfa satır satır akıtılır; çalışma kitabı belleğe tamamen alınmaz
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.active
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            raise ValueError("The uploaded Excel file is empty.")
+        columns = [str(column) if column is not None else f"column_{i}" for i, column in enumerate(header)]
+        total_rows = (sheet.max_row or 0) - 1 # Boyut bilgisi olmayan dosyalarda bilinmez
+        read = 0
+        records: List[Dict[str, Any]] = []
+        for values in rows:
+            if all(value is None for value in values):
+                continue
+            records.append(dict(zip(columns, values)))
+            read += 1
+            if len(records) >= chunk_size:
+                yield records, (min(1.0, read / total_rows) if total_rows > 0 else None)
+                records = []
+        if records:
+            yield records, 1.0
+    finally:
+        workbook.close()
+
+
+def iter_file_chunks(file_path: str, chunk_size: int = IMPORT_CHUNK_SIZE,
+                     use_cache: bool = True) -> Iterator[Tuple[List[Dict[str, Any]], Optional[float]]]:
+    """
+    CSV veya XLSX dosyasını en fazla `chunk_size` satırlık parçalar halinde okur.
+
+    Dosya hiçbir zaman tamamen belleğe alınmaz: CSV, pandas'ın parça parça
+    okumasıyla, XLSX ise openpyxl'in salt okunur (akış) kipiyle okunur.
+    `use_cache` True ise aynı içerik daha önce okunduysa satırlar sütunlu
+    anlık görüntüden yüklenir (bkz. `src/import_cache.py`); okunmadıysa
+    okunurken anlık görüntüye yazılır.
+
+    Yields:
+        (satırlar, ilerleme) çiftleri. Satırlar sütun adı -> değer sözlükleridir;
+        boş hücreler None'dır. İlerleme, okunan bölümün oranıdır (0-1); bilinmiyorsa None.
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+    cache = get_import_cache() if use_cache else None
+    key = _cache_key(cache, file_path, _chunked_reader(chunk_size)) if cache is not None else None
+    if key is not None and cache.contains(key):
+        emitted = False
+        try:
+            for chunk in cache.iter_chunks(key, chunk_size):
+                emitted = True
+                yield chunk
+            return
+        except ImportCacheError as e:
+            cache.invalidate(key)
+            if emitted:
+                raise ValueError(f"The import cache entry for {file_path} is damaged; please import the file again.") from e
+            # Bozuk anlık görüntü: henüz satır üretilmediği için dosyadan okunur
+            logging.warning(f"Ignoring unreadable import cache entry: {e}")
+
+    writer = None
+    if key is not None:
+        try:
+            writer = cache.writer(key)
+        except ImportCacheError as e:
+            logging.warning(f"Could not write the import cache: {e}")
+    try:
+        for records, fraction in _read_file_chunks(file_path, chunk_size):
+            if writer is not None:
+                try:
+                    writer.add(records)
+                except ImportCacheError as e:
+                    logging.warning(f"Could not write the import cache: {e}")
+                    writer.discard()
+                    writer = None
+            yield records, fraction
+        if writer is not None:
+            try:
+                writer.commit()
+                cache.prune()
+            except ImportCacheError as e:
+                logging.warning(f"Could not write the import cache: {e}")
+            writer = None
+    finally:
+        if writer is not None:
+            writer.discard() # Okuma yarıda kaldı veya tüketici erken durdu
+
+def _read_file_chunks(file_path: str, chunk_size: int) -> Iterator[Tuple[List[Dict[str, Any]], Optional[float]]]:
+    try:
+        if file_path.lower().endswith(EXCEL_EXTENSIONS):
+            yield from _xlsx_chunks(file_path, chunk_size)
+        else:
+            yield from _csv_chunks(file_path, chunk_size)
+    except pd.errors.EmptyDataError as e:
+        logging.error(f"CSV file is empty: {e}")
+        raise ValueError("The uploaded CSV file is empty.")
+    except pd.errors.ParserError as e:
+        logging.error(f"Error parsing CSV file: {e}")
+        raise ValueError("Error parsing the uploaded CSV file. Please check its format.")
+    except (openpyxl.utils.exceptions.InvalidFileException, zipfile.BadZipFile) as e:
+        logging.error(f"Error reading Excel file: {e}")
+        raise ValueError("Error reading the uploaded Excel file. Please check its format.")
@@ -2,6 +2,7 @@
 from datetime import datetime
 from typing import List, Dict, Any
 import logging
+from src.models import Animal, iter_animals
 
 logging.basicConfig(filename='animal_tracker.log', level=logging.INFO,
                     format='%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s')
@@ -19,13 +20,36 @@ def classify_animal(insemination_dates: List[datetime]) -> str:
     return "Düve"
 
 
-def process_animal_records(all_animals_from_db: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Veritabanından gelen ham veriyi işler, zenginleştirir ve arayüze hazırlar."""
+def _as_datetime(value: Any) -> datetime:
+    """ISO formatındaki metni veya zaten datetime olan değeri datetime olarak döndürür."""
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+def derived_copy(animal: Any) -> Any:
+    """
+    Türetilmiş alanların yazılacağı kopya: `Animal` için sığ model kopyası, sözlük için sığ sözlük kopyası.
+    Tohumlamalar paylaşılır; işleme adımı bunları değiştirmez.
+    """
+    if isinstance(animal, Animal):
+        return animal.shallow_copy()
+    return dict(animal)
+
+
+def process_animal_records(all_animals_from_db: List[Dict[str, Any]], in_place: bool = False) -> List[Dict[str, Any]]:
+    """
+    Veritabanından gelen ham veriyi işler, zenginleştirir ve arayüze hazırlar.
+    Türetilmiş alanlar kayıtların kopyalarına yazılır (depodaki kayıtlar değişmez);
+    `in_place=True` ise çağıranın kendi kayıtları yerinde güncellenir.
+    """
     processed_list = []
     for animal in all_animals_from_db:
+        if not in_place:
+            animal = derived_copy(animal)
         try:
             inseminations = animal.get('tohumlamalar', [])
-            insemination_dates = [datetime.fromisoformat(i['tohumlama_tarihi']) for i in inseminations if
+            insemination_dates = [_as_datetime(i['tohumlama_tarihi']) for i in inseminations if
                                   i.get('tohumlama_tarihi')]
 
             animal['sinif'] = classify_animal(insemination_dates)
@@ -43,8 +67,8 @@ def process_animal_records(all_animals_from_db: List[Dict[str, Any]]) -> List[Di
 
             if insemination_dates:
                 # Find the latest insemination dictionary, then get its date as datetime object
-                latest_insemination_dict = sorted(inseminations, key=lambda x: datetime.fromisoformat(x['tohumlama_tarihi']), reverse=True)[0]
-                animal['son_tohumlama'] = datetime.fromisoformat(latest_insemination_dict['tohumlama_tarihi'])
+                latest_insemination_dict = sorted(inseminations, key=lambda x: _as_datetime(x['tohumlama_tarihi']), reverse=True)[0]
+                animal['son_tohumlama'] = _as_datetime(latest_insemination_dict['tohumlama_tarihi'])
             else:
                 animal['son_tohumlama'] = None
 
@@ -58,5 +82,23 @@ def process_animal_records(all_animals_from_db: List[Dict[str, Any]]) -> List[Di
 
 def get_display_name(animal: Dict[str, Any]) -> str:
     """Önem sırasına göre hayvanın görünen adını döndürür."""
+    if isinstance(animal, Animal):
+        return animal.label
     return animal.get("isletme_kupesi") or animal.get("devlet_kupesi") or animal.get("tasma_no") or "Bilinmeyen Hayvan"
 
+
+
+def filter_animals(animals: List[Any], search_text: str) -> List[Any]:
+    """
+    Görünen ad, işletme küpesi veya devlet küpesinde arama metnini içeren
+    hayvanları döndürür (büyük/küçük harf duyarsız). Arama metni boşsa liste aynen döner.
+    """
+    search_text = search_text.lower()
+    if not search_text:
+        return animals
+    return [
+        animal for animal in iter_animals(animals)
+        if search_text in animal.label.lower() or \
+           search_text in (animal.isletme_kupesi or '').lower() or \
+           search_text in (animal.devlet_kupesi or '').lower()
+    ]
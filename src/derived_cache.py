@@ -0,0 +1,209 @@
+# src/derived_cache.py
+
+"""
+Türetilmiş alanlar için kalıcı önbellek.
+
+`sinif`, `display_name`, `son_tohumlama` ve beklenen doğum tarihi yalnızca
+kaydın kendisinden hesaplanır; kayıt değişmedikçe (aynı `uuid` ve
+`last_modified`) tekrar hesaplanmalarına gerek yoktur. Değerler lokal
+veritabanının yanında ayrı bir SQLite dosyasında tutulur; böylece hem
+senkronizasyondan sonra hem de uygulama yeniden başlatıldığında yalnızca
+değişen kayıtlar yeniden işlenir.
+
+Önbellek ayrı bir dosyada olduğu için hayvan veritabanının değiştirilme
+zamanını etkilemez (bkz. `AnimalRepository`) ve silinmesi güvenlidir; bir
+sonraki işlemede yeniden oluşturulur. Hesaplama kuralları değiştiğinde
+`DERIVED_VERSION` artırılmalıdır.
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+
+from config.settings import DERIVED_CACHE_FILE, GESTATION_PERIOD_DAYS
+from src.batch_processor import process_animal_records_batch, write_derived_fields
+from src.data_processor import derived_copy
+
+DERIVED_VERSION = 1
+# Gebelik süresi beklenen doğum tarihini değiştirdiği için sürüm anahtarına dahildir
+_VERSION_KEY = f"{DERIVED_VERSION}:{GESTATION_PERIOD_DAYS}"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS derived (
+    uuid TEXT PRIMARY KEY,
+    last_modified TEXT NOT NULL,
+    version TEXT NOT NULL,
+    sinif TEXT,
+    display_name TEXT,
+    son_tohumlama TEXT,
+    beklenen_dogum_tarihi TEXT
+)
+"""
+
+_UPSERT_SQL = """
+INSERT INTO derived (uuid, last_modified, version, sinif, display_name, son_tohumlama, beklenen_dogum_tarihi)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(uuid) DO UPDATE SET
+    last_modified = excluded.last_modified,
+    version = excluded.version,
+    sinif = excluded.sinif,
+    display_name = excluded.display_name,
+    son_tohumlama = excluded.son_tohumlama,
+    beklenen_dogum_tarihi = excluded.beklenen_dogum_tarihi
+"""
+
+# (last_modified, sinif, display_name, son_tohumlama, beklenen_dogum_tarihi)
+_Entry = Tuple[str, str, str, Optional[datetime], Optional[datetime]]
+
+
+class DerivedCacheError(Exception):
+    """Türetilmiş alan önbelleği işlemleri sırasında oluşan hatalar için özel istisna sınıfı."""
+    pass
+
+
+def expected_calving_date(son_tohumlama: Optional[datetime]) -> Optional[datetime]:
+    """Son tohumlamadan gebelik süresi kadar sonrası; tohumlama yoksa None."""
+    if son_tohumlama is None:
+        return None
+    return son_tohumlama + timedelta(days=GESTATION_PERIOD_DAYS)
+
+
+def _to_text(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def _from_text(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value is not None else None
+
+
+class DerivedFieldCache:
+    """
+    `uuid` + `last_modified` anahtarlı türetilmiş alan önbelleği.
+
+    Args:
+        db_path: Önbellek veritabanının yolu.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        self._entries: Optional[Dict[str, _Entry]] = None
+        self.hits = 0
+        self.misses = 0
+        try:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.execute(_SCHEMA)
+        except (OSError, sqlite3.Error) as e:
+            raise DerivedCacheError(f"Türetilmiş alan önbelleği açılamadı ({db_path}): {e}") from e
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _ensure_loaded(self) -> Dict[str, _Entry]:
+        if self._entries is None:
+            try:
+                rows = self._conn.execute(
+                    'SELECT uuid, last_modified, sinif, display_name, son_tohumlama, beklenen_dogum_tarihi '
+                    'FROM derived WHERE version = ?', (_VERSION_KEY,)
+                ).fetchall()
+            except sqlite3.Error as e:
+                raise DerivedCacheError(f"Türetilmiş alan önbelleği okunamadı: {e}") from e
+            self._entries = {
+                row[0]: (row[1], row[2], row[3], _from_text(row[4]), _from_text(row[5])) for row in rows
+            }
+        return self._entries
+
+    def _save(self, rows: List[tuple]):
+        try:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._conn.executemany(_UPSERT_SQL, rows)
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._conn.execute('COMMIT')
+        except sqlite3.Error as e:
+            raise DerivedCacheError(f"Türetilmiş alan önbelleğine yazılamadı: {e}") from e
+
+    def process(self, animals: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        `process_animal_records` ile aynı işi yapar ve ek olarak `beklenen_dogum_tarihi`
+        alanını doldurur. Önbellekte güncel karşılığı olan kayıtlara değerler
+        doğrudan yazılır; yalnızca yeni veya değişmiş kayıtlar işlenip önbelleğe eklenir.
+        Değerler kayıtların kopyalarına yazılır ve kopyalar aynı sırayla döndürülür;
+        verilen kayıtlar (ör. `AnimalRepository.all()`) değişmez.
+        """
+        records = [derived_copy(animal) for animal in animals]
+        with self._lock:
+            entries = self._ensure_loaded()
+            stale = []
+            for animal in records:
+                last_modified = animal.get('last_modified')
+                entry = entries.get(animal.get('uuid')) if last_modified else None
+                if entry is not None and entry[0] == last_modified:
+                    _, sinif, display_name, son_tohumlama, beklenen = entry
+                    write_derived_fields(animal, sinif, son_tohumlama, display_name)
+                    animal['beklenen_dogum_tarihi'] = beklenen
+                else:
+                    stale.append(animal)
+            self.hits += len(records) - len(stale)
+            self.misses += len(stale)
+            if not stale:
+                return records
+
+            processed_ids = set()
+            rows = []
+            for animal in process_animal_records_batch(stale, in_place=True):
+                processed_ids.add(id(animal))
+                son_tohumlama = animal.get('son_tohumlama')
+                beklenen = expected_calving_date(son_tohumlama)
+                animal['beklenen_dogum_tarihi'] = beklenen
+                last_modified = animal.get('last_modified')
+                if not animal.get('uuid') or not isinstance(last_modified, str):
+                    continue # Sürüm bilgisi olmayan kayıt önbelleğe alınamaz
+                entry = (last_modified, animal.get('sinif'), animal.get('display_name'), son_tohumlama, beklenen)
+                entries[animal['uuid']] = entry
+                rows.append((animal['uuid'], last_modified, _VERSION_KEY, entry[1], entry[2],
+                             _to_text(son_tohumlama), _to_text(beklenen)))
+            if rows:
+                self._save(rows)
+
+        # İşleme sırasında hata veren (atlanan) kayıtlar sonuçta yer almaz
+        stale_ids = {id(animal) for animal in stale}
+        return [animal for animal in records if id(animal) not in stale_ids or id(animal) in processed_ids]
+
+    def invalidate(self, animal_uuids: Optional[Iterable[str]] = None):
+        """Verilen kayıtları (verilmezse tümünü) önbellekten siler."""
+        with self._lock:
+            try:
+                if animal_uuids is None:
+                    self._conn.execute('DELETE FROM derived')
+                    self._entries = {}
+                    return
+                animal_uuids = list(animal_uuids)
+                self._conn.executemany('DELETE FROM derived WHERE uuid = ?', [(uuid,) for uuid in animal_uuids])
+            except sqlite3.Error as e:
+                raise DerivedCacheError(f"Türetilmiş alan önbelleği temizlenemedi: {e}") from e
+            if self._entries is not None:
+                for animal_uuid in animal_uuids:
+                    self._entries.pop(animal_uuid, None)
+
+
+_cache: Optional[DerivedFieldCache] = None
+_cache_lock = threading.Lock()
+
+def get_derived_cache() -> DerivedFieldCache:
+    """Uygulama genelinde paylaşılan türetilmiş alan önbelleğini döndürür."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = DerivedFieldCache(DERIVED_CACHE_FILE)
+        return _cache
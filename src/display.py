@@ -1,6 +1,6 @@
 # src/display.py
 from tabulate import tabulate
-from src.data_processor import get_display_name
+from src.models import iter_animals
 
 def display_animal_summary(processed_animals: list):
     """İşlenmiş hayvan verisinin özetini konsolda gösterir."""
@@ -11,13 +11,13 @@ def display_animal_summary(processed_animals: list):
     headers = ["Görünür Ad", "Sınıf", "İşletme Küpesi", "Devlet Küpesi", "Tohumlama Sayısı"]
     table_data = []
     
-    for animal in processed_animals:
+    for animal in iter_animals(processed_animals):
         row = [
-            get_display_name(animal),
-            animal.get('sinif', 'N/A'),
-            animal.get('isletme_kupesi', 'N/A'),
-            animal.get('devlet_kupesi', 'N/A'),
-            len(animal.get('tohumlamalar', []))
+            animal.label,
+            animal.sinif or 'N/A',
+            animal.isletme_kupesi or 'N/A',
+            animal.devlet_kupesi or 'N/A',
+            animal.insemination_count
         ]
         table_data.append(row)
         
@@ -0,0 +1,188 @@
+# src/file_importer.py
+
+"""
+CSV/XLSX dosyalarındaki hayvan kayıtlarını lokal depoya ve senkronizasyon
+kuyruğuna aktarır.
+
+Dosya `iter_file_chunks` ile parça parça okunur (okuma, arayüz döngüsünü
+bloklamasın diye iş parçacığı havuzunda yapılır). Her parçanın satırları
+doğrulanır, mevcut hayvanlarla eşleştirilir ve `SyncManager.upsert_animals`
+ile tek veritabanı işlemiyle yazılır. Bellekte aynı anda yalnızca bir parça
+tutulur; dosyanın boyutu bellek kullanımını etkilemez.
+
+Satırlar şu sırayla eşleştirilir: `uuid`, `isletme_kupesi`, `devlet_kupesi`.
+Eşleşen hayvanlarda yalnızca değişen alanlar kuyruğa gider; dosyada olmayan
+veya boş bırakılan alanlar lokal kayıtta olduğu gibi kalır.
+"""
+
+import logging
+import uuid
+from datetime import date, datetime
+from typing import List, Dict, Any, Callable, Optional
+
+from config.settings import IMPORT_CHUNK_SIZE
+from src.data_loader import iter_file_chunks
+from src.models import Animal
+from src.supabase_client import run_blocking
+from src.sync_merge import DERIVED_FIELDS
+from src.utils import parse_flexible_date_string
+
+logger = logging.getLogger(__name__)
+
+# Dosyadan alınan alanlar; türetilmiş, sürüm ve senkronizasyon alanları sunucuya/yerel kayda dosyadan yazılmaz
+IMPORTABLE_FIELDS = frozenset(Animal._FIELDS) - DERIVED_FIELDS - frozenset(
+    ('user_id', 'last_modified', 'sync_status', 'tohumlamalar'))
+_TEXT_FIELDS = ('isletme_kupesi', 'devlet_kupesi', 'tasma_no', 'irk', 'gebelik_durumu_metin')
+_DATE_FIELDS = ('dogum_tarihi',)
+_MAX_REPORTED_ERRORS = 20
+
+
+class FileImportError(Exception):
+    """Dosyadan içe aktarma sırasında oluşan hatalar için özel istisna sınıfı."""
+    pass
+
+
+class ImportProgress:
+    """Bir içe aktarmanın ilerlemesi ve sayaçları; her parçadan sonra güncellenir."""
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.rows = 0
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.invalid = 0
+        self.fraction = 0.0 # Okunan bölümün oranı (0-1)
+        self.done = False
+        self.errors: List[str] = [] # İlk geçersiz satırların açıklamaları
+
+    def add_error(self, message: str):
+        if len(self.errors) < _MAX_REPORTED_ERRORS:
+            self.errors.append(message)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(vars(self))
+
+
+def _text(value: Any) -> str:
+    """Hücre değerini metne çevirir; sayı olarak okunan küpe numaraları ondalıksız yazılır."""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def validate_record(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Dosya satırını hayvan kaydına çevirir. Sütun adları büyük/küçük harf ve
+    boşluk farkı gözetmeden eşleşir; bilinmeyen sütunlar ve boş hücreler atlanır.
+
+    Raises:
+        FileImportError: Satırda küpe numarası yoksa veya tarih çözülemezse.
+    """
+    record: Dict[str, Any] = {}
+    for column, value in raw.items():
+        key = str(column).strip().lower()
+        if key not in IMPORTABLE_FIELDS or value is None or (isinstance(value, str) and not value.strip()):
+            continue
+        if key in _DATE_FIELDS:
+            if isinstance(value, (datetime, date)):
+                parsed = value if isinstance(value, datetime) else datetime(value.year, value.month, value.day)
+            else:
+                parsed = parse_flexible_date_string(_text(value))
+            if parsed is None:
+                raise FileImportError(f"'{key}' tarihi çözülemedi: {value!r}")
+            record[key] = parsed.isoformat()
+        elif key in _TEXT_FIELDS or key == 'uuid':
+            record[key] = _text(value)
+        else:
+            record[key] = value
+    if not record.get('isletme_kupesi') and not record.get('devlet_kupesi'):
+        raise FileImportError("İşletme küpesi veya devlet küpesi gerekli.")
+    return record
+
+
+class _AnimalIndex:
+    """Dosya satırlarını mevcut hayvanlarla eşleştirmek için kimlik dizini (içe aktarma başında bir kez kurulur)."""
+
+    def __init__(self, animals):
+        self.uuids = set()
+        self.by_farm_tag: Dict[str, str] = {}
+        self.by_state_tag: Dict[str, str] = {}
+        for animal in animals:
+            self.add(animal.get('uuid'), animal)
+
+    def add(self, animal_uuid: str, record):
+        self.uuids.add(animal_uuid)
+        if record.get('isletme_kupesi'):
+            self.by_farm_tag.setdefault(record['isletme_kupesi'], animal_uuid)
+        if record.get('devlet_kupesi'):
+            self.by_state_tag.setdefault(record['devlet_kupesi'], animal_uuid)
+
+    def resolve(self, record: Dict[str, Any]) -> str:
+        """Kaydın hayvanının `uuid`'si; eşleşme yoksa yeni bir `uuid` atanır ve dizine eklenir."""
+        animal_uuid = record.get('uuid')
+        if not animal_uuid or animal_uuid not in self.uuids:
+            animal_uuid = (self.by_farm_tag.get(record.get('isletme_kupesi'))
+                           or self.by_state_tag.get(record.get('devlet_kupesi'))
+                           or animal_uuid or str(uuid.uuid4()))
+        self.add(animal_uuid, record)
+        return animal_uuid
+
+
+async def import_file(file_path: str, sync_manager, chunk_size: int = IMPORT_CHUNK_SIZE,
+                      on_progress: Optional[Callable[[ImportProgress], None]] = None) -> ImportProgress:
+    """
+    Dosyayı parça parça okuyup lokal depoya ve senkronizasyon kuyruğuna aktarır.
+
+    Args:
+        file_path: CSV veya XLSX dosyası.
+        sync_manager: Yazmaların yapılacağı `SyncManager`.
+        chunk_size: Bir parçada okunup tek işlemle yazılan satır sayısı.
+        on_progress: Her parçadan sonra (ve bitişte) güncel `ImportProgress` ile çağrılır.
+
+    Raises:
+        FileNotFoundError, ValueError: Dosya bulunamaz, boşsa veya okunamazsa (bkz. `iter_file_chunks`).
+    """
+    progress = ImportProgress(file_path)
+    index = _AnimalIndex(sync_manager.repository)
+    chunks = iter_file_chunks(file_path, chunk_size)
+    try:
+        while True:
+            chunk = await run_blocking(next, chunks, None)
+            if chunk is None:
+                break
+            rows, fraction = chunk
+            batch: Dict[str, Dict[str, Any]] = {}
+            for raw in rows:
+                progress.rows += 1
+                try:
+                    record = validate_record(raw)
+                except FileImportError as e:
+                    progress.invalid += 1
+                    progress.add_error(f"Satır {progress.rows}: {e}")
+                    continue
+                record['uuid'] = index.resolve(record)
+                if record['uuid'] in batch:
+                    batch[record['uuid']].update(record) # Aynı hayvan parçada birden çok kez geçiyorsa son değerler geçerli
+                else:
+                    batch[record['uuid']] = record
+            counts = await sync_manager.upsert_animals(list(batch.values()))
+            progress.created += counts['created']
+            progress.updated += counts['updated']
+            progress.unchanged += counts['unchanged']
+            if fraction is not None:
+                progress.fraction = fraction
+            if on_progress is not None:
+                on_progress(progress)
+    finally:
+        chunks.close()
+
+    if progress.rows == 0:
+        raise ValueError("The uploaded file is empty.")
+    progress.fraction = 1.0
+    progress.done = True
+    if on_progress is not None:
+        on_progress(progress)
+    logger.info(f"Dosya içe aktarıldı ({file_path}): {progress.rows} satır, {progress.created} yeni, "
+                f"{progress.updated} güncellenen, {progress.invalid} geçersiz.")
+    return progress
@@ -0,0 +1,143 @@
+# src/herd_aggregates.py
+
+"""
+İstatistik ekranı için artımlı güncellenen sürü özetleri.
+
+`calculate_statistics`, `calculate_breed_distribution` ve
+`calculate_births_per_month` her çağrıda sürünün tamamını dolaşır. Burada
+aynı sonuçlar için gereken sayaçlar (inek/düve sayıları, tohumlama toplamı,
+doğum tarihi toplamı, ırk sayıları, aylık doğumlar) tutulur ve her kayıt
+yazıldığında yalnızca o kaydın payı çıkarılıp yeniden eklenir. Özetleri
+okumak sürü büyüklüğünden bağımsızdır.
+
+Depo (`AnimalRepository`) her `put`, `put_many`, `delete` ve yeniden yükleme
+sırasında özetleri günceller; oluşturma, düzenleme, senkronizasyon birleştirmesi
+ve canlı değişiklikler bu yazmalardan geçer.
+
+`sinif`, kayıttaki türetilmiş alandan değil tohumlama tarihlerinden
+`classify_animal` ile hesaplanır; türetilmiş alanlar depodaki kayıtlarda
+tutulmaz (işleme adımı kopyalara yazar). Yaş
+ortalaması doğum tarihlerinin gün sırası toplamından, okunduğu gün için
+hesaplanır.
+"""
+
+import threading
+from collections import Counter
+from datetime import date, datetime
+from typing import Dict, Any, Iterable, Optional, Tuple
+
+from src.data_processor import classify_animal
+from src.models import Animal
+
+UNKNOWN_BREED = 'Bilinmiyor'
+
+# Bir kaydın özetlere katkısı: (sinif, tohumlama sayısı, doğum günü sırası, doğum ayı, ırk)
+_Contribution = Tuple[str, int, Optional[int], Optional[str], str]
+
+
+def _contribution(animal: Animal) -> _Contribution:
+    inseminations = animal.tohumlamalar or ()
+    dates = [i.tohumlama_tarihi for i in inseminations if isinstance(i.tohumlama_tarihi, datetime)]
+    try:
+        sinif = classify_animal(dates)
+    except TypeError: # Saat dilimli ve dilimsiz tarihler karşılaştırılamaz
+        sinif = classify_animal([])
+    birth = animal.dogum_tarihi if isinstance(animal.dogum_tarihi, datetime) else None
+    return (
+        sinif,
+        len(inseminations),
+        birth.toordinal() if birth is not None else None,
+        birth.strftime('%Y-%m') if birth is not None else None,
+        animal.irk if animal.irk is not None else UNKNOWN_BREED,
+    )
+
+
+class HerdAggregates:
+    """Sürünün kayıt başına katkılarla güncellenen özetleri; okuma işlemleri O(1)'dir (aylık dağılım ay sayısıyla orantılı)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._contributions: Dict[str, _Contribution] = {}
+        self._reset()
+
+    def _reset(self):
+        self._classes: Counter = Counter()
+        self._breeds: Counter = Counter()
+        self._births: Counter = Counter() # 'YYYY-MM' -> doğum sayısı
+        self._inseminations = 0
+        self._birth_ordinal_sum = 0
+        self._birth_count = 0
+
+    def _apply(self, contribution: _Contribution, sign: int):
+        sinif, inseminations, birth_ordinal, birth_month, breed = contribution
+        self._classes[sinif] += sign
+        self._breeds[breed] += sign
+        self._inseminations += sign * inseminations
+        if birth_ordinal is not None:
+            self._birth_ordinal_sum += sign * birth_ordinal
+            self._birth_count += sign
+            self._births[birth_month] += sign
+        if sign < 0:
+            # Sıfıra düşen anahtarlar dağılımlarda görünmemeli
+            for counter, key in ((self._classes, sinif), (self._breeds, breed), (self._births, birth_month)):
+                if counter.get(key) == 0:
+                    del counter[key]
+
+    def update(self, animal: Animal):
+        """Kaydın eski katkısını (varsa) çıkarır, yenisini ekler."""
+        contribution = _contribution(animal)
+        with self._lock:
+            previous = self._contributions.get(animal.uuid)
+            if previous == contribution:
+                return
+            if previous is not None:
+                self._apply(previous, -1)
+            self._contributions[animal.uuid] = contribution
+            self._apply(contribution, 1)
+
+    def remove(self, animal_uuid: str):
+        with self._lock:
+            previous = self._contributions.pop(animal_uuid, None)
+            if previous is not None:
+                self._apply(previous, -1)
+
+    def rebuild(self, animals: Iterable[Animal]):
+        """Özetleri baştan hesaplar (ör. veritabanı yeniden yüklendiğinde)."""
+        contributions = {animal.uuid: _contribution(animal) for animal in animals}
+        with self._lock:
+            self._reset()
+            self._contributions = contributions
+            for contribution in contributions.values():
+                self._apply(contribution, 1)
+
+    def __len__(self) -> int:
+        return len(self._contributions)
+
+    def statistics(self, today: Optional[date] = None) -> Dict[str, Any]:
+        """`calculate_statistics` ile aynı anahtarlarla genel istatistikler; sürü boşsa boş sözlük."""
+        today = today or date.today()
+        with self._lock:
+            total = len(self._contributions)
+            if not total:
+                return {}
+            average_inseminations = self._inseminations / total
+            average_age_days = (today.toordinal() - self._birth_ordinal_sum / self._birth_count
+                                if self._birth_count else 0)
+            return {
+                "toplam_hayvan_sayisi": total,
+                "inek_sayisi": self._classes.get('İnek', 0),
+                "duve_sayisi": self._classes.get('Düve', 0),
+                "ortalama_tohumlama_sayisi": round(average_inseminations, 1),
+                "ortalama_yas_gun": round(average_age_days, 1),
+                "ortalama_yas_yil": round(average_age_days / 365.25, 1),
+            }
+
+    def breed_distribution(self) -> Dict[str, int]:
+        """`calculate_breed_distribution` ile aynı biçimde ırk başına hayvan sayısı."""
+        with self._lock:
+            return dict(self._breeds)
+
+    def births_per_month(self) -> Dict[str, int]:
+        """`calculate_births_per_month` ile aynı biçimde, aya göre sıralı doğum sayıları."""
+        with self._lock:
+            return dict(sorted(self._births.items()))
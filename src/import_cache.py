@@ -0,0 +1,286 @@
+# src/import_cache.py
+
+"""
+İçe aktarılan dosyalar için içerik adresli, sütunlu önbellek.
+
+Aynı kayıt dosyaları tekrar tekrar içe aktarılır. Okunan her dosyanın
+satırları, dosya içeriğinin SHA-256 özeti ve `IMPORT_PARSER_VERSION` ile
+adlandırılan bir NumPy `.npz` anlık görüntüsüne yazılır. Aynı içerik tekrar
+içe aktarıldığında (dosya adı veya konumu farklı olsa da) CSV/XLSX yeniden
+ayrıştırılmaz; sütunlar doğrudan diziler olarak yüklenir.
+
+Anlık görüntü ham satırları (doğrulama öncesi) tutar; doğrulama kuralları
+değiştiğinde önbellek geçerliliğini korur. Değerler türleriyle birlikte
+saklanır; karışık türlü sütunlarda her hücrenin türü ayrıca tutulur ve
+saklanamayan bir değer içeren dosya önbelleğe alınmaz. Okuyucu türleri
+çıkardığı için anahtar okuyucuyu da içerir. Dosya okuma kuralları
+değiştiğinde `IMPORT_PARSER_VERSION` artırılmalıdır.
+
+Satırlar okunurken parça parça yazılır (her parçanın her sütunu ayrı bir
+`.npy` girdisidir), bu yüzden önbelleğe yazmak da okumak da dosyanın tamamını
+belleğe almaz. Yarıda kalan yazmalar geçici dosyada kalır ve silinir.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import zipfile
+from datetime import datetime
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+import numpy as np
+
+from config.settings import IMPORT_CACHE_DIR, IMPORT_CACHE_MAX_FILES
+
+logger = logging.getLogger(__name__)
+
+IMPORT_PARSER_VERSION = 2
+_META_ENTRY = 'meta.json'
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+
+class ImportCacheError(Exception):
+    """İçe aktarma önbelleği işlemleri sırasında oluşan hatalar için özel istisna sınıfı."""
+    pass
+
+
+def file_content_hash(file_path: str) -> str:
+    """Dosya içeriğinin SHA-256 özeti (dosya bloklar halinde okunur)."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+_SCALAR_KINDS = {bool: 'bool', int: 'int', float: 'float', str: 'str', datetime: 'datetime'}
+_MIXED_KINDS = ('bool', 'int', 'float', 'str', 'datetime') # Karışık sütunlarda hücre türü kodları 1..n (0: boş)
+_FILL_VALUES = {'bool': False, 'int': 0, 'float': np.nan, 'str': '', 'datetime': datetime(1970, 1, 1)}
+
+
+def _value_kind(value: Any) -> str:
+    kind = _SCALAR_KINDS.get(type(value))
+    if kind is None or (kind == 'datetime' and value.tzinfo is not None):
+        raise TypeError(f"desteklenmeyen değer türü: {type(value).__name__}")
+    return kind
+
+
+def _encode_values(kind: str, values: List[Any]) -> np.ndarray:
+    if kind == 'bool':
+        return np.array(values, dtype=bool)
+    if kind == 'int':
+        return np.array(values, dtype=np.int64) # int64'e sığmayan sayılar OverflowError verir
+    if kind == 'float':
+        return np.array(values, dtype=np.float64)
+    if kind == 'datetime':
+        return np.array(values, dtype='datetime64[us]')
+    return np.array(values, dtype=str)
+
+
+def _encode_column(values: List[Any]) -> Tuple[str, Dict[str, np.ndarray]]:
+    """
+    Sütun değerlerini (tür, {girdi soneki: dizi}) olarak kodlar; değerler okunduğunda türleriyle birlikte aynen döner.
+    Tek türlü sütunlar tek dizi ve boş hücre maskesi olarak, karışık sütunlar hücre türü kodları ve
+    tür başına birer dizi olarak saklanır.
+
+    Raises:
+        TypeError, OverflowError: Sütunda saklanamayan bir değer varsa (ör. saat dilimli tarih, int64'e sığmayan sayı).
+    """
+    kinds = [None if value is None else _value_kind(value) for value in values]
+    present = set(kinds) - {None}
+    if len(present) > 1:
+        arrays = {'': np.array([0 if kind is None else _MIXED_KINDS.index(kind) + 1 for kind in kinds], dtype=np.uint8)}
+        for kind in present:
+            arrays[f'.{kind}'] = _encode_values(kind, [value for value, k in zip(values, kinds) if k == kind])
+        return 'mixed', arrays
+    kind = present.pop() if present else 'bool'
+    fill = _FILL_VALUES[kind]
+    arrays = {'': _encode_values(kind, [fill if value is None else value for value in values])}
+    if None in kinds:
+        arrays['.mask'] = np.array([k is None for k in kinds], dtype=bool)
+    return kind, arrays
+
+
+def _decode_column(kind: str, arrays: Dict[str, np.ndarray]) -> List[Any]:
+    if kind == 'mixed':
+        parts = {k: iter(arrays[f'.{k}'].tolist()) for k in _MIXED_KINDS if f'.{k}' in arrays}
+        codes = (None,) + _MIXED_KINDS
+        return [None if code == 0 else next(parts[codes[code]]) for code in arrays[''].tolist()]
+    values = arrays[''].tolist()
+    mask = arrays.get('.mask')
+    if mask is not None:
+        for i in np.flatnonzero(mask).tolist():
+            values[i] = None
+    return values
+
+
+class SnapshotWriter:
+    """Bir dosyanın satırlarını parça parça anlık görüntüye yazar; `commit` edilene kadar görünmez."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        self._chunks: List[Dict[str, Any]] = []
+        self._rows = 0
+        try:
+            self._zip = zipfile.ZipFile(self._tmp_path, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=1)
+        except OSError as e:
+            raise ImportCacheError(f"İçe aktarma önbelleği yazılamadı ({path}): {e}") from e
+
+    def _write_array(self, name: str, array: np.ndarray):
+        with self._zip.open(f"{name}.npy", 'w', force_zip64=True) as entry:
+            np.lib.format.write_array(entry, array, allow_pickle=False)
+
+    def add(self, records: List[Dict[str, Any]]):
+        if not records:
+            return
+        index = len(self._chunks)
+        columns = list(records[0])
+        kinds, entries = [], []
+        try:
+            for j, column in enumerate(columns):
+                try:
+                    kind, arrays = _encode_column([record.get(column) for record in records])
+                except (TypeError, OverflowError) as e:
+                    raise ImportCacheError(f"'{column}' sütunu önbelleğe alınamaz: {e}") from e
+                for suffix, array in arrays.items():
+                    self._write_array(f"{index}/{j}{suffix}", array)
+                kinds.append(kind)
+                entries.append(list(arrays))
+        except (OSError, ValueError) as e:
+            raise ImportCacheError(f"İçe aktarma önbelleği yazılamadı ({self.path}): {e}") from e
+        self._chunks.append({'rows': len(records), 'columns': columns, 'kinds': kinds, 'entries': entries})
+        self._rows += len(records)
+
+    def commit(self):
+        meta = {'version': IMPORT_PARSER_VERSION, 'rows': self._rows, 'chunks': self._chunks}
+        try:
+            self._zip.writestr(_META_ENTRY, json.dumps(meta, ensure_ascii=False))
+            self._zip.close()
+            os.replace(self._tmp_path, self.path)
+        except OSError as e:
+            self.discard()
+            raise ImportCacheError(f"İçe aktarma önbelleği yazılamadı ({self.path}): {e}") from e
+
+    def discard(self):
+        try:
+            self._zip.close()
+        except (OSError, ValueError):
+            pass
+        try:
+            os.remove(self._tmp_path)
+        except FileNotFoundError:
+            pass
+
+
+class ImportCache:
+    """
+    İçerik özeti anahtarlı `.npz` anlık görüntüleri.
+
+    Args:
+        directory: Anlık görüntülerin klasörü.
+        max_files: Tutulacak en fazla anlık görüntü; fazlası en eski kullanılandan başlayarak silinir.
+    """
+
+    def __init__(self, directory: str, max_files: int = IMPORT_CACHE_MAX_FILES):
+        self.directory = directory
+        self.max_files = max_files
+
+    def key(self, file_path: str, reader: str) -> str:
+        """
+        Dosyanın önbellek anahtarı: içerik özeti, okuyucu ve okuyucu sürümü.
+        Aynı dosyayı farklı okuyan yollar (ör. tamamını bir kerede veya parça parça
+        okuyup türleri parça başına çıkaran) farklı `reader` adı vermelidir.
+        """
+        return f"{file_content_hash(file_path)}-{reader}-v{IMPORT_PARSER_VERSION}"
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def contains(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+
+    def writer(self, key: str) -> SnapshotWriter:
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+        except OSError as e:
+            raise ImportCacheError(f"İçe aktarma önbelleği klasörü oluşturulamadı ({self.directory}): {e}") from e
+        return SnapshotWriter(self.path(key))
+
+    def iter_chunks(self, key: str, chunk_size: int) -> Iterator[Tuple[List[Dict[str, Any]], float]]:
+        """
+        Anlık görüntüdeki satırları en fazla `chunk_size` satırlık parçalar halinde üretir.
+
+        Yields:
+            (satırlar, ilerleme) çiftleri; `iter_file_chunks` ile aynı biçimde.
+        """
+        path = self.path(key)
+        try:
+            os.utime(path) # En son kullanılanlar budamada korunur
+            with zipfile.ZipFile(path) as archive:
+                meta = json.loads(archive.read(_META_ENTRY))
+                if meta.get('version') != IMPORT_PARSER_VERSION:
+                    raise ImportCacheError(f"Anlık görüntü sürümü uyumsuz: {path}")
+                total = meta['rows'] or 1
+                done = 0
+                pending: List[Dict[str, Any]] = []
+                for index, chunk in enumerate(meta['chunks']):
+                    columns = []
+                    for j, (kind, suffixes) in enumerate(zip(chunk['kinds'], chunk['entries'])):
+                        arrays = {suffix: self._read_array(archive, f"{index}/{j}{suffix}") for suffix in suffixes}
+                        columns.append(_decode_column(kind, arrays))
+                    pending.extend(dict(zip(chunk['columns'], values)) for values in zip(*columns))
+                    while len(pending) >= chunk_size:
+                        records, pending = pending[:chunk_size], pending[chunk_size:]
+                        done += len(records)
+                        yield records, done / total
+                if pending:
+                    yield pending, 1.0
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile) as e:
+            raise ImportCacheError(f"İçe aktarma önbelleği okunamadı ({path}): {e}") from e
+
+    @staticmethod
+    def _read_array(archive: zipfile.ZipFile, name: str) -> np.ndarray:
+        with archive.open(f"{name}.npy") as entry:
+            return np.lib.format.read_array(entry, allow_pickle=False)
+
+    def invalidate(self, key: Optional[str] = None):
+        """Verilen anlık görüntüyü (verilmezse tümünü) siler."""
+        names = [f"{key}.npz"] if key else self._snapshots()
+        for name in names:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+
+    def _snapshots(self) -> List[str]:
+        try:
+            return [name for name in os.listdir(self.directory) if name.endswith('.npz')]
+        except FileNotFoundError:
+            return []
+
+    def prune(self):
+        """En fazla `max_files` anlık görüntü bırakır; en uzun süredir kullanılmayanlar silinir."""
+        paths = [os.path.join(self.directory, name) for name in self._snapshots()]
+        if len(paths) <= self.max_files:
+            return
+        paths.sort(key=lambda path: os.path.getmtime(path), reverse=True)
+        for path in paths[self.max_files:]:
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.warning(f"Eski anlık görüntü silinemedi ({path}): {e}")
+
+
+_cache: Optional[ImportCache] = None
+_cache_lock = threading.Lock()
+
+def get_import_cache() -> ImportCache:
+    """Uygulama genelinde paylaşılan içe aktarma önbelleğini döndürür."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ImportCache(IMPORT_CACHE_DIR)
+        return _cache
@@ -0,0 +1,62 @@
+# src/lazy_import.py
+
+"""
+Ağır bağımlılıkları (pandas, matplotlib) ilk kullanıma kadar ertelemek için yardımcı.
+
+    pd = lazy_module('pandas')
+    df = pd.read_csv(path) # pandas burada, ilk öznitelik erişiminde içe aktarılır
+
+Vekil nesne öznitelik okuma, yazma ve silme işlemlerini gerçek modüle
+iletir; böylece `patch('src.data_loader.pd.read_csv')` gibi testler
+değişmeden çalışır.
+"""
+
+import importlib
+import threading
+from types import ModuleType
+from typing import Optional
+
+
+class LazyModule(ModuleType):
+    """İlk öznitelik erişiminde gerçek modülü içe aktaran vekil."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        object.__setattr__(self, '_lazy_module', None)
+        object.__setattr__(self, '_lazy_lock', threading.Lock())
+
+    def _load(self) -> ModuleType:
+        module: Optional[ModuleType] = object.__getattribute__(self, '_lazy_module')
+        if module is None:
+            with object.__getattribute__(self, '_lazy_lock'):
+                module = object.__getattribute__(self, '_lazy_module')
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    object.__setattr__(self, '_lazy_module', module)
+        return module
+
+    @property
+    def is_loaded(self) -> bool:
+        return object.__getattribute__(self, '_lazy_module') is not None
+
+    def __getattr__(self, name: str):
+        # Yalnızca vekilin kendisinde bulunmayan öznitelikler için çağrılır
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name: str, value):
+        setattr(self._load(), name, value)
+
+    def __delattr__(self, name: str):
+        delattr(self._load(), name)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self.is_loaded else 'not loaded'
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_module(name: str) -> LazyModule:
+    """`name` modülünü ilk kullanıldığında içe aktaracak bir vekil döndürür."""
+    return LazyModule(name)
@@ -0,0 +1,224 @@
+# src/local_store.py
+
+"""
+Hayvan kayıtlarını gömülü bir SQLite veritabanında (WAL modunda) saklar.
+Her kayıt `uuid` anahtarıyla satır bazında güncellenir (upsert); böylece tek
+bir hayvanın değişmesi tüm sürünün yeniden yazılmasını gerektirmez.
+Eski JSON veri dosyasından tek seferlik taşıma da bu modülde yapılır.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from typing import List, Dict, Any, Optional, Iterable
+
+
+class LocalStoreError(Exception):
+    """Lokal veritabanı işlemleri sırasında oluşan hatalar için özel istisna sınıfı."""
+    pass
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS animals (
+    uuid TEXT PRIMARY KEY,
+    isletme_kupesi TEXT,
+    devlet_kupesi TEXT,
+    last_modified TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_animals_isletme_kupesi ON animals(isletme_kupesi);
+CREATE INDEX IF NOT EXISTS idx_animals_devlet_kupesi ON animals(devlet_kupesi);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_UPSERT_SQL = """
+INSERT INTO animals (uuid, isletme_kupesi, devlet_kupesi, last_modified, data)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(uuid) DO UPDATE SET
+    isletme_kupesi = excluded.isletme_kupesi,
+    devlet_kupesi = excluded.devlet_kupesi,
+    last_modified = excluded.last_modified,
+    data = excluded.data
+"""
+
+_SET_META_SQL = 'INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value'
+
+_JSON_MIGRATED_KEY = 'json_migrated'
+
+
+def _serialize(obj):
+    """JSON'a doğrudan çevrilemeyen nesneler (datetime, model kayıtları) için yardımcı."""
+    if hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict() # src.models kayıtları
+    raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
+
+
+class SQLiteAnimalStore:
+    """
+    Hayvan kayıtları için SQLite tabanlı depolama.
+
+    Kayıtların tamamı `data` sütununda JSON olarak tutulur; arama yapılan
+    alanlar (`isletme_kupesi`, `devlet_kupesi`) ayrıca indeksli sütunlara yazılır.
+    Bağlantı iş parçacıkları arasında paylaşılabilir, erişim bir kilitle korunur.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        try:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            # WAL modunda NORMAL, her commit'te fsync yapmadan güvenli kalır.
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript(_SCHEMA)
+        except (OSError, sqlite3.Error) as e:
+            raise LocalStoreError(f"Lokal veritabanı açılamadı ({db_path}): {e}") from e
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _row_params(animal: Dict[str, Any]) -> tuple:
+        if not animal.get('uuid'):
+            # Eski kayıtlarda uuid olmayabilir; create_animal ile aynı şekilde üretilir.
+            animal['uuid'] = str(uuid.uuid4())
+        try:
+            data = json.dumps(animal, ensure_ascii=False, default=_serialize)
+        except TypeError as e:
+            raise LocalStoreError(f"Kayıt JSON'a çevrilemedi (UUID: {animal.get('uuid')}): {e}") from e
+        last_modified = animal.get('last_modified')
+        if last_modified is not None and not isinstance(last_modified, str):
+            last_modified = _serialize(last_modified)
+        return (
+            animal['uuid'],
+            animal.get('isletme_kupesi'),
+            animal.get('devlet_kupesi'),
+            last_modified,
+            data,
+        )
+
+    def _execute_write(self, statements: Iterable[tuple]):
+        """Verilen (sql, params) ifadelerini tek bir işlem (transaction) içinde çalıştırır."""
+        with self._lock:
+            try:
+                self._conn.execute('BEGIN IMMEDIATE')
+                try:
+                    for sql, params in statements:
+                        if isinstance(params, list):
+                            self._conn.executemany(sql, params)
+                        else:
+                            self._conn.execute(sql, params)
+                except BaseException:
+                    self._conn.execute('ROLLBACK')
+                    raise
+                self._conn.execute('COMMIT')
+            except sqlite3.Error as e:
+                raise LocalStoreError(f"Lokal veritabanına yazılırken hata oluştu: {e}") from e
+
+    def upsert(self, animal: Dict[str, Any]):
+        """Tek bir hayvan kaydını `uuid` anahtarına göre ekler veya günceller."""
+        self._execute_write([(_UPSERT_SQL, self._row_params(animal))])
+
+    def upsert_many(self, animals: Iterable[Dict[str, Any]]):
+        """Birden çok kaydı tek bir işlem içinde ekler veya günceller."""
+        rows = [self._row_params(animal) for animal in animals]
+        if rows:
+            self._execute_write([(_UPSERT_SQL, rows)])
+
+    def delete(self, animal_uuid: str):
+        self._execute_write([('DELETE FROM animals WHERE uuid = ?', (animal_uuid,))])
+
+    def delete_many(self, animal_uuids: Iterable[str]):
+        """Birden çok kaydı tek bir işlem içinde siler."""
+        rows = [(animal_uuid,) for animal_uuid in animal_uuids]
+        if rows:
+            self._execute_write([('DELETE FROM animals WHERE uuid = ?', rows)])
+
+    def replace_all(self, animals: Iterable[Dict[str, Any]]):
+        """Tüm kayıtları verilen liste ile değiştirir (eski `save_animals` anlamı)."""
+        rows = [self._row_params(animal) for animal in animals]
+        self._execute_write([('DELETE FROM animals', ()), (_UPSERT_SQL, rows)])
+
+    def _query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self._lock:
+            try:
+                return self._conn.execute(sql, params).fetchall()
+            except sqlite3.Error as e:
+                raise LocalStoreError(f"Lokal veritabanı okunurken hata oluştu: {e}") from e
+
+    def _decode(self, rows: List[tuple]) -> List[Dict[str, Any]]:
+        try:
+            return [json.loads(row[0]) for row in rows]
+        except json.JSONDecodeError as e:
+            raise LocalStoreError(f"Lokal veritabanındaki kayıt bozuk: {e}") from e
+
+    def get(self, animal_uuid: str) -> Optional[Dict[str, Any]]:
+        records = self._decode(self._query('SELECT data FROM animals WHERE uuid = ?', (animal_uuid,)))
+        return records[0] if records else None
+
+    def find_by_isletme_kupesi(self, kupe: str) -> List[Dict[str, Any]]:
+        return self._decode(self._query('SELECT data FROM animals WHERE isletme_kupesi = ?', (kupe,)))
+
+    def find_by_devlet_kupesi(self, kupe: str) -> List[Dict[str, Any]]:
+        return self._decode(self._query('SELECT data FROM animals WHERE devlet_kupesi = ?', (kupe,)))
+
+    def load_all(self) -> List[Dict[str, Any]]:
+        return self._decode(self._query('SELECT data FROM animals ORDER BY rowid'))
+
+    def count(self) -> int:
+        return self._query('SELECT COUNT(*) FROM animals')[0][0]
+
+    def get_meta(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        rows = self._query('SELECT value FROM meta WHERE key = ?', (key,))
+        return rows[0][0] if rows else default
+
+    def set_meta(self, key: str, value: Optional[str]):
+        self._execute_write([(_SET_META_SQL, (key, value))])
+
+    def migrate_from_json(self, json_path: str) -> int:
+        """
+        Eski JSON veri dosyasındaki kayıtları bir kereliğine veritabanına aktarır.
+
+        Args:
+            json_path: Eski `LOCAL_DATA_FILE` yolu.
+
+        Returns:
+            Aktarılan kayıt sayısı (taşıma daha önce yapıldıysa 0).
+
+        Raises:
+            LocalStoreError: JSON dosyası okunamıyorsa veya bozuksa.
+        """
+        if self.get_meta(_JSON_MIGRATED_KEY):
+            return 0
+        animals = []
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            if content.strip():
+                animals = json.loads(content)
+        except FileNotFoundError:
+            pass
+        except json.JSONDecodeError as e:
+            raise LocalStoreError(f"Taşınacak JSON veri dosyası bozuk: {e}") from e
+        except IOError as e:
+            raise LocalStoreError(f"Taşınacak JSON veri dosyası okunamadı: {e}") from e
+
+        rows = [self._row_params(animal) for animal in animals]
+        self._execute_write([
+            (_UPSERT_SQL, rows),
+            (_SET_META_SQL, (_JSON_MIGRATED_KEY, json_path)),
+        ])
+        if rows:
+            print(f"{len(rows)} kayıt {json_path} dosyasından lokal veritabanına taşındı.")
+        return len(rows)
@@ -1,41 +1,32 @@
 import asyncio
-from src.sync_manager import SyncManager
-from src.data_processor import process_animal_records, get_display_name # Import get_display_name
-from src.persistence import load_animals # Import load_animals for offline-first
+from src.data_processor import get_display_name # Import get_display_name
+from src.derived_cache import get_derived_cache # Only new or changed records are reprocessed
 from kivymd.app import MDApp # Import MDApp to get sync_manager from app instance
 
+def process_synced_data(animals):
+    """Records handed to sync listeners, with derived fields filled in for display."""
+    return get_derived_cache().process(animals)
+
 async def get_all_animal_data():
     """
-    Fetches all animal data asynchronously, prioritizing local cache and
-    then triggering background synchronization.
+    Returns the local animal data immediately and asks the background sync
+    scheduler for a sync. Screens that want the synced data register a
+    listener on `app.sync_scheduler` (see HomeScreen).
     """
     app = MDApp.get_running_app()
     
-    # 1. First, try to load from local cache for immediate UI responsiveness
-    local_data = load_animals()
+    # 1. Read the app's in-memory repository for immediate UI responsiveness
+    local_data = app.repository.all()
     if local_data:
-        processed_local_data = process_animal_records(local_data)
+        processed_local_data = get_derived_cache().process(local_data)
         print("Hayvan verileri lokal önbellekten yüklendi.")
-        # We also need to populate _all_animals if this is the first load
-        # This will be handled by HomeScreen.populate_list directly now.
     else:
         processed_local_data = []
         print("Lokal hayvan verisi bulunamadı.")
 
-    # 2. Trigger background synchronization from the remote server
-    if app.sync_manager and app.user:
-        print("Arka planda senkronizasyon başlatılıyor...")
-        try:
-            # Pass remote_only=False to ensure queue is processed before fetching remote
-            synced_data = await app.sync_manager.synchronize(remote_only=False)
-            processed_synced_data = process_animal_records(synced_data)
-            print("Senkronizasyon tamamlandı.")
-            return processed_synced_data # Return the updated, synced data
-        except Exception as e:
-            print(f"Arka plan senkronizasyonu sırasında hata oluştu: {e}. Lokal veri gösteriliyor.")
-            # If sync fails, return the locally loaded data
-            return processed_local_data
+    # 2. Request a background sync; repeated requests (e.g. quick navigation) are coalesced
+    if app.sync_scheduler and app.user:
+        app.request_sync('screen_enter')
     else:
         print("Senkronizasyon yöneticisi veya kullanıcı oturumu mevcut değil. Sadece lokal veri yüklenecek.")
-        return processed_local_data # If no sync_manager/user, just return local
-
+    return processed_local_data
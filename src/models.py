@@ -0,0 +1,233 @@
+# src/models.py
+
+"""
+Hayvan ve tohumlama kayıtları için `__slots__` kullanan, bellek dostu veri modeli.
+
+Büyük sürülerde her kaydı ayrı bir sözlük olarak tutmak çok bellek harcar.
+`Animal` ve `Insemination` sınıfları bilinen alanları sabit yuvalarda (slot)
+saklar, tekrar eden kategorik metinleri (`irk`, `sinif` vb.) `sys.intern` ile
+paylaşır ve tarih alanlarını kayıt oluşturulurken bir kez çözer.
+
+Geçiş döneminde mevcut kodun bozulmaması için iki sınıf da sözlük arayüzünü
+(`get`, `[]`, `items`, `copy` ...) destekler. Bilinen alanlar için değeri
+`None` olan alan "yok" sayılır; bilinmeyen alanlar ayrı bir sözlükte korunur.
+Yeni kod alanlara doğrudan öznitelik olarak erişmelidir (`animal.sinif`).
+"""
+
+import sys
+from collections.abc import MutableMapping
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+
+def _parse_datetime(value: Any) -> Any:
+    """ISO formatındaki metni datetime'a çevirir; çevrilemezse değeri olduğu gibi bırakır."""
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if type(value) is str else value
+
+
+class _SlotRecord(MutableMapping):
+    """`__slots__` tabanlı kayıtlara sözlük arayüzü kazandıran temel sınıf."""
+
+    __slots__ = ('_extra',)
+
+    _FIELDS: tuple = ()
+    _FIELD_SET: frozenset = frozenset()
+    _INTERNED: frozenset = frozenset()
+    _DATETIMES: frozenset = frozenset()
+
+    def __init__(self, **fields):
+        for name in self._FIELDS:
+            setattr(self, name, None)
+        self._extra: Optional[Dict[str, Any]] = None
+        for key, value in fields.items():
+            self[key] = value
+
+    def _decode(self, key: str, value: Any) -> Any:
+        if key in self._INTERNED:
+            return _intern(value)
+        if key in self._DATETIMES:
+            return _parse_datetime(value)
+        return value
+
+    # --- Sözlük arayüzü ----------------------------------------------------
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._FIELD_SET:
+            value = getattr(self, key)
+            if value is None:
+                raise KeyError(key)
+            return value
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self._FIELD_SET:
+            value = getattr(self, key)
+            return default if value is None else value
+        if self._extra is None:
+            return default
+        return self._extra.get(key, default)
+
+    def __setitem__(self, key: str, value: Any):
+        if key in self._FIELD_SET:
+            setattr(self, key, self._decode(key, value))
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key: str):
+        if key in self._FIELD_SET:
+            if getattr(self, key) is None:
+                raise KeyError(key)
+            setattr(self, key, None)
+        else:
+            if self._extra is None:
+                raise KeyError(key)
+            del self._extra[key]
+
+    def __contains__(self, key: object) -> bool:
+        if key in self._FIELD_SET:
+            return getattr(self, key) is not None
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self) -> Iterator[str]:
+        for name in self._FIELDS:
+            if getattr(self, name) is not None:
+                yield name
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        count = sum(1 for name in self._FIELDS if getattr(self, name) is not None)
+        return count + (len(self._extra) if self._extra else 0)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Kaydı düz bir sözlüğe çevirir (iç içe kayıtlar da sözlüğe çevrilir)."""
+        result = {}
+        for name in self._FIELDS:
+            value = getattr(self, name)
+            if value is not None:
+                result[name] = value
+        if self._extra:
+            result.update(self._extra)
+        return result
+
+    def copy(self) -> Dict[str, Any]:
+        """`dict.copy` ile uyumlu olarak düzenlenebilir bir sözlük döndürür."""
+        return self.to_dict()
+
+    def shallow_copy(self):
+        """Aynı türde sığ kopya; yuvalar yeniden çözülmeden kopyalanır, iç içe kayıtlar (tohumlamalar) paylaşılır."""
+        clone = self.__class__.__new__(self.__class__)
+        for name in self._FIELDS:
+            setattr(clone, name, getattr(self, name))
+        clone._extra = dict(self._extra) if self._extra else None
+        return clone
+
+
+class Insemination(_SlotRecord):
+    """
+    Tek bir tohumlama kaydı.
+
+    Vethek dönüştürücüsünün ürettiği alanların tümü yuvalarda tutulur; `not`
+    Python'da anahtar kelime olduğu için yalnızca sözlük arayüzüyle
+    (`insemination['not']`) okunabilir.
+    """
+
+    __slots__ = ('tohumlama_tarihi', 'sperma', 'belgeno', 'gebe_mi', 'not', 'kayit_no', 'satir_anahtari')
+
+    _FIELDS = __slots__
+    _FIELD_SET = frozenset(_FIELDS)
+    _INTERNED = frozenset(('sperma', 'belgeno', 'gebe_mi'))
+    _DATETIMES = frozenset(('tohumlama_tarihi',))
+
+    @classmethod
+    def from_dict(cls, data: Any) -> 'Insemination':
+        if isinstance(data, Insemination):
+            return data
+        record = cls()
+        for key, value in data.items():
+            record[key] = value
+        return record
+
+
+class Animal(_SlotRecord):
+    """
+    Tek bir hayvan kaydı.
+
+    Türetilmiş alanlar (`sinif`, `display_name`, `son_tohumlama`, ...) de
+    yuvalarda tutulur; böylece işleme adımı yeni sözlük anahtarları eklemez.
+    """
+
+    __slots__ = (
+        'uuid', 'user_id', 'isletme_kupesi', 'devlet_kupesi', 'tasma_no', 'irk',
+        'dogum_tarihi', 'tohumlamalar', 'sinif', 'display_name', 'son_tohumlama',
+        'gebelik_durumu_metin', 'beklenen_dogum_tarihi', 'last_modified', 'sync_status',
+    )
+
+    _FIELDS = __slots__
+    _FIELD_SET = frozenset(_FIELDS)
+    _INTERNED = frozenset(('user_id', 'irk', 'sinif', 'gebelik_durumu_metin', 'sync_status'))
+    _DATETIMES = frozenset(('dogum_tarihi', 'son_tohumlama', 'beklenen_dogum_tarihi'))
+
+    def _decode(self, key: str, value: Any) -> Any:
+        if key == 'tohumlamalar' and value is not None:
+            return [Insemination.from_dict(item) for item in value]
+        return super()._decode(key, value)
+
+    @classmethod
+    def from_dict(cls, data: Any) -> 'Animal':
+        """
+        JSON'dan veya Supabase satırından gelen sözlüğü tek geçişte modele çevirir.
+        Zaten `Animal` olan nesneler olduğu gibi döndürülür.
+        """
+        if isinstance(data, Animal):
+            return data
+        animal = cls()
+        for key, value in data.items():
+            animal[key] = value
+        return animal
+
+    # Supabase satırları JSON kayıtlarıyla aynı anahtarları kullanır.
+    from_row = from_dict
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = super().to_dict()
+        if self.tohumlamalar is not None:
+            result['tohumlamalar'] = [insemination.to_dict() for insemination in self.tohumlamalar]
+        return result
+
+    @property
+    def insemination_count(self) -> int:
+        return len(self.tohumlamalar) if self.tohumlamalar else 0
+
+    @property
+    def label(self) -> str:
+        """Önem sırasına göre hayvanın görünen adı (bkz. `get_display_name`)."""
+        return self.isletme_kupesi or self.devlet_kupesi or self.tasma_no or "Bilinmeyen Hayvan"
+
+
+def as_animal(record: Any) -> Animal:
+    """Sözlük veya `Animal` alır, her durumda `Animal` döndürür."""
+    return record if isinstance(record, Animal) else Animal.from_dict(record)
+
+
+def iter_animals(records: Iterable[Any]) -> Iterator[Animal]:
+    """Sözlük ve `Animal` karışık olabilen bir koleksiyonu `Animal` nesneleri olarak dolaşır."""
+    for record in records:
+        yield record if isinstance(record, Animal) else Animal.from_dict(record)
+
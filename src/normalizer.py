@@ -0,0 +1,157 @@
+# src/normalizer.py
+
+"""
+Kazınan vethek tablo satırlarını `animals` kayıtlarına dönüştürür.
+
+vethek tablosunda her satır bir tohumlamadır; aynı hayvanın (`kupeno`)
+tohumlamaları farklı satırlardadır. Satırlar tek geçişte küpe numarasına
+göre gruplanır ve her hayvan için `tohumlamalar` listesi oluşturulur.
+
+Sütunlar konumlarına göre okunur (bkz. `COLUMN_HEADERS`); birleşik
+"Sperma | Belgeno" sütunu sperma adı ve belge numarasına ayrılır. Tarihler
+`parse_flexible_date_string` ile çözülür; aynı tarih metinleri tabloda çok
+tekrarlandığı için çözümlemeler önbelleğe alınır ve göreli tarihler
+("X gun once") tüm tablo için tek bir referans ana göre hesaplanır.
+
+Dönüştürücü bir generator'dır; kazıyıcının çıktısını doğrudan tüketebilir
+ve kayıtları lokal depoya aktarılmak üzere tek tek üretir. Satırlar küpe
+numarasına göre sıralı geliyorsa (`grouped=True`) her hayvan, grubu biter
+bitmez üretilir ve bellekte yalnızca tek hayvan tutulur; aksi halde hayvanlar
+girdi bitince, ilk görüldükleri sırayla üretilir.
+"""
+
+import logging
+from datetime import datetime
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+
+from config.settings import COLUMN_HEADERS
+from src.utils import parse_flexible_date_string
+
+logger = logging.getLogger(__name__)
+
+_ID, _SPERM_DOCUMENT, _DOCUMENT, _EAR_TAG, _BREED, _NOTE, _DATE, _PREGNANT = (
+    COLUMN_HEADERS.index(name)
+    for name in ('id', 'Sperma_Belgeno', 'belgeno_dummy', 'kupeno', 'irki', 'Not', 'tarih', 'Gebe_mi')
+)
+_COLUMN_COUNT = len(COLUMN_HEADERS)
+
+
+class NormalizationStats:
+    """Bir dönüştürme çalıştırmasının sayaçları."""
+
+    def __init__(self):
+        self.rows = 0
+        self.animals = 0
+        self.inseminations = 0
+        self.skipped_rows = 0 # Küpe numarası olmayan satırlar
+        self.unparsed_dates = 0 # Tarihi çözülemeyen (atlanan) tohumlamalar
+
+    def to_dict(self) -> Dict[str, int]:
+        return dict(vars(self))
+
+
+def split_sperm_document(value: str, fallback_document: str = '') -> Tuple[str, str]:
+    """
+    Birleşik "Sperma | Belgeno" hücresini (sperma, belgeno) olarak ayırır.
+    Hücrede belge numarası yoksa ayrı belge numarası sütunu kullanılır.
+    """
+    sperm, separator, document = value.partition('|')
+    sperm = sperm.strip()
+    document = document.strip() if separator else ''
+    return sperm, document or fallback_document.strip()
+
+
+def row_cells(row: Any) -> List[str]:
+    """Satırın hücreleri, `COLUMN_HEADERS` sırasında ve uzunluğunda."""
+    values = list(row.values()) if isinstance(row, dict) else list(row)
+    if len(values) < _COLUMN_COUNT:
+        values.extend([''] * (_COLUMN_COUNT - len(values)))
+    return [value.strip() if isinstance(value, str) else ('' if value is None else str(value)) for value in values]
+
+
+def _finish(animal: Dict[str, Any], stats: NormalizationStats) -> Dict[str, Any]:
+    """Tohumlamaları tarihe göre sıralar ve tarihleri ISO metnine çevirir."""
+    inseminations = animal['tohumlamalar']
+    inseminations.sort(key=lambda insemination: insemination['tohumlama_tarihi'])
+    for insemination in inseminations:
+        insemination['tohumlama_tarihi'] = insemination['tohumlama_tarihi'].isoformat()
+    if inseminations and inseminations[-1].get('gebe_mi'):
+        animal['gebelik_durumu_metin'] = inseminations[-1]['gebe_mi'] # Son tohumlamanın gebelik durumu
+    stats.animals += 1
+    return animal
+
+
+def normalize_scraped_rows(rows: Iterable[Any], grouped: bool = False, now: Optional[datetime] = None,
+                           stats: Optional[NormalizationStats] = None,
+                           row_keys: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    vethek satırlarını (sözlük veya hücre listesi) küpe numarasına göre hayvan kayıtlarına dönüştürür.
+
+    Args:
+        rows: Kazınan satırlar; ör. `iter_table_rows` veya `TableCrawler.crawl` çıktısının satırları.
+        grouped: Satırlar küpe numarasına göre ardışık geliyorsa True; hayvanlar grup biter bitmez üretilir.
+        now: Göreli tarihlerin ("X gun once") referans anı; verilmezse dönüştürme başlangıcı.
+        stats: Verilirse sayaçlar bu nesneye yazılır.
+        row_keys: Verilirse satırlarla aynı sırada satır anahtarları (bkz. `src/scrape_diff.py`);
+            her satırın tohumlamasına `satir_anahtari` olarak yazılır.
+
+    Yields:
+        `devlet_kupesi`, `irk`, `tohumlamalar` (tarihe göre sıralı; `tohumlama_tarihi`,
+        `sperma`, `belgeno`, `gebe_mi`, `not`, `kayit_no`) ve varsa `gebelik_durumu_metin`
+        alanlarını içeren kayıtlar. `uuid`, `user_id` ve `last_modified` lokal depoya
+        aktarım sırasında atanır.
+    """
+    stats = stats if stats is not None else NormalizationStats()
+    now = now or datetime.now()
+    animals: Dict[str, Dict[str, Any]] = {}
+    current: Optional[Dict[str, Any]] = None # grouped=True iken açık grup
+
+    keys = iter(row_keys) if row_keys is not None else None
+    for row in rows:
+        row_key = next(keys) if keys is not None else None
+        stats.rows += 1
+        cells = row_cells(row)
+        ear_tag = cells[_EAR_TAG]
+        if not ear_tag:
+            stats.skipped_rows += 1
+            continue
+
+        if grouped:
+            if current is not None and current['devlet_kupesi'] != ear_tag:
+                yield _finish(current, stats)
+                current = None
+            animal = current
+        else:
+            animal = animals.get(ear_tag)
+        if animal is None:
+            animal = {'devlet_kupesi': ear_tag, 'irk': cells[_BREED] or None, 'tohumlamalar': []}
+            if grouped:
+                current = animal
+            else:
+                animals[ear_tag] = animal
+        elif not animal['irk'] and cells[_BREED]:
+            animal['irk'] = cells[_BREED]
+
+        service_date = parse_flexible_date_string(cells[_DATE], now)
+        if service_date is None:
+            stats.unparsed_dates += 1
+            logger.warning(f"Tohumlama tarihi çözülemedi (küpe {ear_tag}, kayıt {cells[_ID]}): {cells[_DATE]!r}")
+            continue
+        sperm, document = split_sperm_document(cells[_SPERM_DOCUMENT], cells[_DOCUMENT])
+        insemination = {
+            'tohumlama_tarihi': service_date,
+            'sperma': sperm,
+            'belgeno': document,
+            'gebe_mi': cells[_PREGNANT],
+            'not': cells[_NOTE],
+            'kayit_no': cells[_ID],
+        }
+        if row_key is not None:
+            insemination['satir_anahtari'] = row_key
+        animal['tohumlamalar'].append(insemination)
+        stats.inseminations += 1
+
+    if current is not None:
+        yield _finish(current, stats)
+    for animal in animals.values():
+        yield _finish(animal, stats)
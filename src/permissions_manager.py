@@ -4,6 +4,7 @@ Kullanıcıların yetkilerini kontrol eder ve denetim kayıtları oluşturur.
 """
 from supabase import Client
 from typing import Dict, Any
+from src.supabase_client import run_detached
 
 class PermissionsManager:
     def __init__(self, supabase_client: Client, user_id: str):
@@ -11,7 +12,13 @@ class PermissionsManager:
         self.user_id = user_id
 
     def _log_action(self, action: str, details: Dict[str, Any]):
-        """Yapılan her işlemi audit_log tablosuna kaydeder."""
+        """
+        Yapılan her işlemi audit_log tablosuna kaydeder. Yetki kontrolü kaydın
+        yazılmasını beklemez; istek arayüz döngüsü dışında gönderilir.
+        """
+        run_detached(self._insert_audit_log, action, details)
+
+    def _insert_audit_log(self, action: str, details: Dict[str, Any]):
         try:
             self.db.table('audit_log').insert({
                 "user_id": self.user_id,
@@ -1,120 +1,258 @@
 # src/persistence.py
 
 """
-Bu modül, işlenmiş verilerin kalıcı olarak saklanması (JSON dosyasına yazma)
-ve geri yüklenmesi (JSON dosyasından okuma) işlemlerini yönetir.
+Bu modül, işlenmiş verilerin kalıcı olarak saklanması ve geri yüklenmesi
+işlemlerini yönetir. Hayvan kayıtları lokal SQLite veritabanında
+(bkz. `src/local_store.py`) satır bazında tutulur; senkronizasyon kuyruğu
+yalnızca-ekleme günlüğünde saklanır (bkz. `src/sync_journal.py`).
 Dosya işlemleri sırasında oluşabilecek hatalara karşı sağlamlaştırılmıştır.
 """
 
 import json
+import os
+import threading
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 
-from config.settings import LOCAL_DATA_FILE, SYNC_QUEUE_FILE
+from config.settings import LOCAL_DATA_FILE, LOCAL_DB_FILE, SYNC_QUEUE_FILE, SYNC_JOURNAL_FILE, \
+                            SYNC_JOURNAL_GROUP_COMMIT_SIZE, SYNC_JOURNAL_GROUP_COMMIT_INTERVAL, \
+                            SYNC_JOURNAL_COMPACT_RATIO, SYNC_MAX_ATTEMPTS
+from src.local_store import SQLiteAnimalStore, LocalStoreError
+from src.sync_journal import SyncJournal, SyncJournalError
 
 class PersistenceError(Exception):
     """Dosya okuma/yazma işlemleri sırasında oluşan hatalar için özel istisna sınıfı."""
     pass
 
+_store: Optional[SQLiteAnimalStore] = None
+_store_lock = threading.Lock()
+
+def get_local_store() -> SQLiteAnimalStore:
+    """
+    Uygulama genelinde paylaşılan lokal veritabanını döndürür.
+    İlk çağrıda veritabanı açılır ve eski JSON dosyası varsa bir kereliğine taşınır.
+
+    Raises:
+        PersistenceError: Veritabanı açılamazsa veya taşıma başarısız olursa.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            try:
+                store = SQLiteAnimalStore(LOCAL_DB_FILE)
+                store.migrate_from_json(LOCAL_DATA_FILE)
+            except LocalStoreError as e:
+                raise PersistenceError(f"Lokal veritabanı hazırlanamadı: {e}") from e
+            _store = store
+        return _store
+
 def default_serializer(obj):
     """JSON serializer for objects not serializable by default json code"""
     if isinstance(obj, datetime):
         return obj.isoformat()
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict() # src.models kayıtları
     raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
 
+def _restore_datetimes(animal: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON'dan okunan tarih alanlarını tekrar datetime objesine çevirir."""
+    # Assuming 'tohumlamalar' might contain date strings
+    if 'tohumlamalar' in animal and isinstance(animal['tohumlamalar'], list):
+        for insemination in animal['tohumlamalar']:
+            if 'tohumlama_tarihi' in insemination and isinstance(insemination['tohumlama_tarihi'], str):
+                try:
+                    insemination['tohumlama_tarihi'] = datetime.fromisoformat(insemination['tohumlama_tarihi'])
+                except ValueError:
+                    pass # Keep as string if not valid isoformat
+
+    # General date fields (if any, like 'dogum_tarihi')
+    for key, value in animal.items():
+        if key.endswith('_dt') or key == 'beklenen_dogum_tarihi':
+            if isinstance(value, str):
+                try:
+                    animal[key] = datetime.fromisoformat(value)
+                except (ValueError, TypeError):
+                    animal[key] = None # Set to None if conversion fails
+    return animal
+
 def save_animals(animals: List[Dict[str, Any]]):
     """
-    Hayvan verilerini bir JSON dosyasına kaydeder.
+    Hayvan verilerinin tamamını lokal veritabanına kaydeder.
+    Listede olmayan kayıtlar silinir; tek kayıt değişiklikleri için
+    `upsert_animal` tercih edilmelidir.
 
     Args:
         animals: Kaydedilecek hayvan verilerinin listesi.
     
     Raises:
-        PersistenceError: Dosyaya yazma sırasında bir hata oluşursa.
+        PersistenceError: Veritabanına yazma sırasında bir hata oluşursa.
     """
     try:
-        with open(LOCAL_DATA_FILE, 'w', encoding='utf-8') as f:
-            json.dump(animals, f, ensure_ascii=False, indent=4, default=default_serializer)
-        print(f"Veriler başarıyla {LOCAL_DATA_FILE} dosyasına kaydedildi.")
-    except (IOError, TypeError) as e:
-        # IOError: Yazma izni yoksa, disk doluysa vb.
-        # TypeError: Veri içinde JSON'a çevrilemeyen bir tip varsa.
+        get_local_store().replace_all(animals)
+        print(f"Veriler başarıyla {LOCAL_DB_FILE} veritabanına kaydedildi.")
+    except LocalStoreError as e:
         raise PersistenceError(f"Veriler kaydedilirken bir hata oluştu: {e}") from e
 
+def upsert_animal(animal: Dict[str, Any]):
+    """
+    Tek bir hayvan kaydını `uuid` anahtarına göre ekler veya günceller.
+    Diğer kayıtlara dokunmaz.
+
+    Raises:
+        PersistenceError: Veritabanına yazma sırasında bir hata oluşursa.
+    """
+    try:
+        get_local_store().upsert(animal)
+    except LocalStoreError as e:
+        raise PersistenceError(f"Hayvan kaydı kaydedilirken bir hata oluştu: {e}") from e
+
+def load_animal(animal_uuid: str) -> Optional[Dict[str, Any]]:
+    """
+    Tek bir hayvan kaydını `uuid` ile yükler.
+
+    Returns:
+        Hayvan kaydı veya bulunamazsa None.
+    """
+    try:
+        animal = get_local_store().get(animal_uuid)
+    except LocalStoreError as e:
+        raise PersistenceError(f"Hayvan kaydı okunurken bir hata oluştu: {e}") from e
+    return _restore_datetimes(animal) if animal else None
+
 def load_animals() -> Optional[List[Dict[str, Any]]]:
     """
-    Hayvan verilerini bir JSON dosyasından yükler.
+    Hayvan verilerini lokal veritabanından yükler.
 
     Returns:
-        Yüklenen hayvan verilerinin listesi veya dosya yoksa/boşsa None.
+        Yüklenen hayvan verilerinin listesi veya hiç kayıt yoksa None.
     
     Raises:
-        PersistenceError: Dosya okunamıyorsa veya bozuk JSON içeriyorsa.
+        PersistenceError: Veritabanı okunamıyorsa veya bozuk kayıt içeriyorsa.
     """
     try:
-        with open(LOCAL_DATA_FILE, 'r', encoding='utf-8') as f:
-            content = f.read()
-            if not content:
-                print("Veri dosyası boş, yeni bir dosya oluşturulacak.")
-                return None
-            data = json.loads(content)
-            
-            # Tarih alanlarını tekrar datetime objesine çevir
-            for animal in data:
-                # Assuming 'tohumlamalar' might contain date strings
-                if 'tohumlamalar' in animal and isinstance(animal['tohumlamalar'], list):
-                    for insemination in animal['tohumlamalar']:
-                        if 'tohumlama_tarihi' in insemination and isinstance(insemination['tohumlama_tarihi'], str):
-                            try:
-                                # Ensure we don't convert to datetime if it's already a datetime object (unlikely from JSON)
-                                if not isinstance(insemination['tohumlama_tarihi'], datetime):
-                                    insemination['tohumlama_tarihi'] = datetime.fromisoformat(insemination['tohumlama_tarihi'])
-                            except ValueError:
-                                pass # Keep as string if not valid isoformat
-                
-                # General date fields (if any, like 'dogum_tarihi')
-                for key, value in animal.items():
-                    if key.endswith('_dt') or key == 'beklenen_dogum_tarihi':
-                        if isinstance(value, str):
-                            try:
-                                animal[key] = datetime.fromisoformat(value)
-                            except (ValueError, TypeError):
-                                animal[key] = None # Set to None if conversion fails
-            return data
+        data = get_local_store().load_all()
+    except LocalStoreError as e:
+        raise PersistenceError(f"Lokal veriler okunurken bir hata oluştu: {e}") from e
+    if not data:
+        print("Lokal veritabanında kayıt yok, ilk senkronizasyonda doldurulacak.")
+        return None
+    for animal in data:
+        _restore_datetimes(animal)
+    return data
+
+
+_journal: Optional[SyncJournal] = None
+_journal_lock = threading.Lock()
 
+def _migrate_legacy_sync_queue(journal: SyncJournal):
+    """Eski JSON kuyruk dosyasındaki eylemleri günlüğe bir kereliğine aktarır."""
+    try:
+        with open(SYNC_QUEUE_FILE, 'r', encoding='utf-8') as f:
+            content = f.read()
     except FileNotFoundError:
-        print(f"{LOCAL_DATA_FILE} bulunamadı. İlk çalıştırmada oluşturulacak.")
-        return None
-    except json.JSONDecodeError as e:
-        raise PersistenceError(f"Veri dosyası bozuk veya geçersiz JSON formatında: {e}") from e
+        return
     except IOError as e:
-        raise PersistenceError(f"Veri dosyası okunurken bir G/Ç hatası oluştu: {e}") from e
+        raise PersistenceError(f"Eski senkronizasyon kuyruk dosyası okunamadı: {e}") from e
+    try:
+        legacy_queue = json.loads(content) if content.strip() else []
+    except json.JSONDecodeError as e:
+        raise PersistenceError(f"Eski senkronizasyon kuyruk dosyası bozuk: {e}") from e
+    if legacy_queue:
+        journal.append_many(legacy_queue)
+        journal.flush()
+        print(f"{len(legacy_queue)} bekleyen eylem {SYNC_JOURNAL_FILE} günlüğüne taşındı.")
+    os.replace(SYNC_QUEUE_FILE, SYNC_QUEUE_FILE + '.migrated')
 
+def get_sync_journal() -> SyncJournal:
+    """
+    Uygulama genelinde paylaşılan senkronizasyon günlüğünü döndürür.
+
+    Raises:
+        PersistenceError: Günlük açılamazsa.
+    """
+    global _journal
+    with _journal_lock:
+        if _journal is None:
+            try:
+                journal = SyncJournal(
+                    SYNC_JOURNAL_FILE,
+                    group_commit_size=SYNC_JOURNAL_GROUP_COMMIT_SIZE,
+                    group_commit_interval=SYNC_JOURNAL_GROUP_COMMIT_INTERVAL,
+                    compact_ratio=SYNC_JOURNAL_COMPACT_RATIO,
+                    max_attempts=SYNC_MAX_ATTEMPTS,
+                )
+                _migrate_legacy_sync_queue(journal)
+            except SyncJournalError as e:
+                raise PersistenceError(f"Senkronizasyon günlüğü hazırlanamadı: {e}") from e
+            _journal = journal
+        return _journal
 
-def save_sync_queue(queue: List[Dict[str, Any]]):
+def append_to_sync_queue(entry: Dict[str, Any]) -> int:
     """
-    Senkronizasyon kuyruğunu bir JSON dosyasına kaydeder.
+    Senkronizasyon kuyruğuna tek bir eylem ekler. Dosya yeniden yazılmaz.
+
+    Returns:
+        Eyleme atanan sıra numarası (`seq`).
     """
     try:
-        with open(SYNC_QUEUE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(queue, f, ensure_ascii=False, indent=4, default=default_serializer)
-        print(f"Senkronizasyon kuyruğu başarıyla {SYNC_QUEUE_FILE} dosyasına kaydedildi.")
-    except (IOError, TypeError) as e:
-        raise PersistenceError(f"Senkronizasyon kuyruğu kaydedilirken bir hata oluştu: {e}") from e
+        return get_sync_journal().append(entry)
+    except SyncJournalError as e:
+        raise PersistenceError(f"Senkronizasyon kuyruğuna eklenirken bir hata oluştu: {e}") from e
 
-def load_sync_queue() -> Optional[List[Dict[str, Any]]]:
+def append_many_to_sync_queue(entries: List[Dict[str, Any]]) -> List[int]:
     """
-    Senkronizasyon kuyruğunu bir JSON dosyasından yükler.
+    Senkronizasyon kuyruğuna birden çok eylemi tek bir yazma işlemiyle ekler (ör. içe aktarılan bir parça).
+
+    Returns:
+        Eylemlere atanan sıra numaraları (`seq`), eylemlerin sırasıyla.
     """
     try:
-        with open(SYNC_QUEUE_FILE, 'r', encoding='utf-8') as f:
-            content = f.read()
-            if not content:
-                return [] # Empty file means empty queue
-            return json.loads(content)
-    except FileNotFoundError:
-        return [] # No queue file means empty queue
-    except json.JSONDecodeError as e:
-        raise PersistenceError(f"Senkronizasyon kuyruk dosyası bozuk veya geçersiz JSON formatında: {e}") from e
-    except IOError as e:
-        raise PersistenceError(f"Senkronizasyon kuyruk dosyası okunurken bir G/Ç hatası oluştu: {e}") from e
+        return get_sync_journal().append_many(entries)
+    except SyncJournalError as e:
+        raise PersistenceError(f"Senkronizasyon kuyruğuna eklenirken bir hata oluştu: {e}") from e
+
+def load_sync_queue() -> List[Dict[str, Any]]:
+    """
+    Henüz onaylanmamış senkronizasyon eylemlerini eklenme sırasıyla yükler.
+    Her eylem, onay için kullanılan bir `seq` alanı içerir.
+    """
+    try:
+        return get_sync_journal().pending()
+    except SyncJournalError as e:
+        raise PersistenceError(f"Senkronizasyon kuyruğu okunurken bir hata oluştu: {e}") from e
+
+def acknowledge_sync_queue(up_to_seq: int):
+    """
+    Sıra numarası `up_to_seq` dahil olmak üzere önceki tüm eylemleri
+    sunucuya iletilmiş olarak işaretler.
+    """
+    try:
+        get_sync_journal().acknowledge(up_to_seq)
+    except SyncJournalError as e:
+        raise PersistenceError(f"Senkronizasyon kuyruğu onaylanırken bir hata oluştu: {e}") from e
+
+def acknowledge_sync_items(seqs: List[int]):
+    """Verilen eylemleri (sıra numaralarıyla) tek tek sunucuya iletilmiş olarak işaretler."""
+    try:
+        get_sync_journal().acknowledge_items(seqs)
+    except SyncJournalError as e:
+        raise PersistenceError(f"Senkronizasyon kuyruğu onaylanırken bir hata oluştu: {e}") from e
+
+def record_sync_failures(seqs: List[int], error: str) -> List[Dict[str, Any]]:
+    """
+    Sunucunun reddettiği eylemlerin deneme sayısını artırır.
+
+    Returns:
+        Deneme sınırına ulaşıp ölü mektup listesine taşınan eylemler.
+    """
+    try:
+        return get_sync_journal().record_failures(seqs, error)
+    except SyncJournalError as e:
+        raise PersistenceError(f"Senkronizasyon hatası kaydedilirken bir hata oluştu: {e}") from e
+
+def load_dead_letters() -> List[Dict[str, Any]]:
+    """Sürekli reddedildiği için kuyruktan çıkarılan eylemleri yükler."""
+    try:
+        return get_sync_journal().dead_letters()
+    except SyncJournalError as e:
+        raise PersistenceError(f"Ölü mektup listesi okunurken bir hata oluştu: {e}") from e
@@ -0,0 +1,252 @@
+# src/realtime_sync.py
+
+"""
+`animals` tablosundaki değişikliklere Supabase Realtime ile abone olur.
+
+Başka bir cihazda yapılan eklemeler, güncellemeler ve silmeler bir sonraki
+`synchronize` çağrısını beklemeden, tek tek lokal depoya uygulanır. Abonelik
+yalnızca giriş yapan kullanıcının satırlarını alır (`user_id=eq.<id>` filtresi).
+Ekranlar tüm sürüyü yeniden işlediği için `on_change` her olayda değil, kısa
+bir bekleme süresi içinde gelen olayların tamamı için bir kez çağrılır; başka
+bir cihazın gönderdiği 1000 satır ekranı bir kez yeniler.
+
+Bağlantı koparsa artan aralıklarla yeniden bağlanılır. Her bağlantıda önce
+kanala katılınır, sonra artımlı çekme işaretinden (watermark) itibaren bir
+yakalama çekmesi yapılır (`synchronize(remote_only=True)`); böylece bağlantı
+yokken kaçırılan değişiklikler de alınır. Katılımdan sonraki değişiklikler
+kesintisiz geldiği için işaret gelen olaylarla birlikte ilerletilir.
+
+Protokol: Phoenix kanalları (JSON, `vsn=1.0.0`) üzerinden Realtime
+`postgres_changes` olayları. Ayrı bir istemci kütüphanesi yerine doğrudan
+`websockets` kullanılır (supabase-py'nin bağımlılığıdır); yeniden bağlanma
+ve yakalama çekmesi bu modülün kontrolündedir.
+"""
+
+import asyncio
+import json
+import logging
+import random
+from typing import List, Dict, Any, Awaitable, Callable, Optional
+from urllib.parse import urlencode
+
+from websockets.asyncio.client import connect as websocket_connect
+from websockets.exceptions import WebSocketException
+
+from config.settings import (
+    REALTIME_HEARTBEAT_SECONDS, REALTIME_NOTIFY_DELAY_SECONDS, REALTIME_RECONNECT_INITIAL_SECONDS,
+    REALTIME_RECONNECT_MAX_SECONDS,
+)
+from src.sync_merge import merge_remote_animals, split_tombstones, pending_patches
+
+logger = logging.getLogger(__name__)
+
+PHOENIX_VSN = '1.0.0'
+
+
+class RealtimeError(Exception):
+    """Realtime aboneliği sırasında oluşan hatalar için özel istisna sınıfı."""
+    pass
+
+
+def realtime_url(supabase_url: str, api_key: str) -> str:
+    """Supabase proje adresinden Realtime websocket adresini üretir."""
+    base = supabase_url.rstrip('/').replace('https://', 'wss://', 1).replace('http://', 'ws://', 1)
+    return f"{base}/realtime/v1/websocket?{urlencode({'apikey': api_key, 'vsn': PHOENIX_VSN})}"
+
+
+class RealtimeSubscription:
+    """
+    Kullanıcının `animals` satırlarındaki değişiklikleri lokal depoya uygulayan abonelik.
+
+    Args:
+        sync_manager: Depo, kuyruk ve artımlı çekme işareti için kullanılan `SyncManager`.
+        url: Realtime websocket adresi (bkz. `realtime_url`).
+        access_token: Oturumun geçerli erişim belirtecini döndüren eşzamansız fonksiyon;
+            belirteç yenilendiğinde sunucuya iletilir.
+        on_change: Değişiklikler lokale uygulandıktan sonra güncel kayıtlarla çağrılır.
+        notify_delay: İlk değişiklikten sonra `on_change` çağrılmadan önce beklenen süre;
+            bu sürede gelen değişiklikler aynı çağrıyla bildirilir.
+        connect: Websocket bağlantısı kuran fonksiyon (testlerde değiştirilebilir).
+    """
+
+    def __init__(self, sync_manager, url: str, access_token: Callable[[], Awaitable[Optional[str]]],
+                 on_change: Optional[Callable[[List[Dict[str, Any]]], Any]] = None,
+                 heartbeat_seconds: float = REALTIME_HEARTBEAT_SECONDS,
+                 notify_delay: float = REALTIME_NOTIFY_DELAY_SECONDS,
+                 reconnect_initial: float = REALTIME_RECONNECT_INITIAL_SECONDS,
+                 reconnect_max: float = REALTIME_RECONNECT_MAX_SECONDS,
+                 connect=websocket_connect):
+        self.sync_manager = sync_manager
+        self.url = url
+        self.access_token = access_token
+        self.on_change = on_change
+        self.heartbeat_seconds = heartbeat_seconds
+        self.notify_delay = notify_delay
+        self.reconnect_initial = reconnect_initial
+        self.reconnect_max = reconnect_max
+        self._connect = connect
+        self.topic = f"realtime:animals:{sync_manager.user_id}"
+        self.connected = asyncio.Event()
+        self.connections = 0
+        self.events_applied = 0
+        self.notifications = 0 # Ertelenen `on_change` çağrıları
+        self._ref = 0
+        self._token: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._notify_handle: Optional[asyncio.TimerHandle] = None
+
+    # --- Yaşam döngüsü ----------------------------------------------------
+
+    def start(self):
+        """Aboneliği arka planda başlatır; bağlantı hataları yeniden denenir."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run_forever())
+
+    async def stop(self):
+        self._cancel_notify()
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self.connected.clear()
+
+    async def _run_forever(self):
+        failures = 0
+        while True:
+            try:
+                async with self._connect(self.url) as websocket:
+                    await self._join(websocket)
+                    failures = 0
+                    await self._catch_up()
+                    self.connected.set()
+                    await self._listen(websocket)
+            except asyncio.CancelledError:
+                raise
+            except (OSError, WebSocketException, RealtimeError, asyncio.TimeoutError) as e:
+                logger.warning(f"Realtime bağlantısı kesildi: {e}")
+            except Exception as e:
+                # Uygulama hatası (ör. lokal depoya yazılamadı); abonelik yine de sürmeli
+                logger.error(f"Realtime aboneliğinde beklenmeyen hata: {e}")
+            self.connected.clear()
+            failures += 1
+            delay = min(self.reconnect_max, self.reconnect_initial * 2 ** (failures - 1))
+            await asyncio.sleep(delay * (1 + random.uniform(0, 0.1)))
+
+    # --- Protokol -----------------------------------------------------------
+
+    def _next_ref(self) -> str:
+        self._ref += 1
+        return str(self._ref)
+
+    async def _send(self, websocket, topic: str, event: str, payload: Dict[str, Any]) -> str:
+        ref = self._next_ref()
+        await websocket.send(json.dumps({'topic': topic, 'event': event, 'payload': payload, 'ref': ref}))
+        return ref
+
+    async def _join(self, websocket):
+        """Kanala katılır ve sunucunun aboneliği onaylamasını bekler."""
+        self._token = await self.access_token()
+        payload = {
+            'config': {
+                'broadcast': {'ack': False, 'self': False},
+                'presence': {'key': ''},
+                'postgres_changes': [{
+                    'event': '*', 'schema': 'public', 'table': 'animals',
+                    'filter': f"user_id=eq.{self.sync_manager.user_id}",
+                }],
+                'private': False,
+            },
+            'access_token': self._token,
+        }
+        ref = await self._send(websocket, self.topic, 'phx_join', payload)
+        while True:
+            message = json.loads(await asyncio.wait_for(websocket.recv(), timeout=self.heartbeat_seconds))
+            if message.get('event') == 'phx_reply' and message.get('ref') == ref:
+                status = message.get('payload', {}).get('status')
+                if status != 'ok':
+                    raise RealtimeError(f"Kanala katılınamadı: {message.get('payload')}")
+                self.connections += 1
+                return
+
+    async def _catch_up(self):
+        """Bağlantı yokken kaçırılan değişiklikleri işaretten itibaren çeker."""
+        animals = await self.sync_manager.synchronize(remote_only=True)
+        if self.on_change is not None:
+            self._cancel_notify() # Bekleyen bildirimin kayıtları bu listede zaten var
+            self.on_change(animals)
+
+    async def _listen(self, websocket):
+        heartbeat = asyncio.create_task(self._heartbeat(websocket))
+        try:
+            async for raw in websocket:
+                message = json.loads(raw)
+                if message.get('topic') != self.topic:
+                    continue
+                event = message.get('event')
+                if event == 'postgres_changes':
+                    self._apply_change(message.get('payload', {}).get('data', {}))
+                elif event in ('phx_error', 'phx_close'):
+                    raise RealtimeError(f"Kanal kapandı: {event}")
+                elif event == 'system' and message.get('payload', {}).get('status') == 'error':
+                    raise RealtimeError(f"Realtime hatası: {message['payload'].get('message')}")
+        finally:
+            heartbeat.cancel()
+
+    async def _heartbeat(self, websocket):
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            await self._send(websocket, 'phoenix', 'heartbeat', {})
+            token = await self.access_token()
+            if token and token != self._token:
+                # Oturum yenilendi; süresi dolan belirteçle kanal sunucu tarafından kapatılır
+                self._token = token
+                await self._send(websocket, self.topic, 'access_token', {'access_token': token})
+
+    # --- Değişikliklerin uygulanması -------------------------------------
+
+    def _apply_change(self, change: Dict[str, Any]):
+        """Tek bir INSERT/UPDATE/DELETE olayını lokal depoya `synchronize` ile aynı kurallarla uygular."""
+        repository = self.sync_manager.repository
+        change_type = change.get('type')
+        if change_type == 'DELETE':
+            animal_uuid = (change.get('old_record') or {}).get('uuid')
+            if not animal_uuid or repository.get(animal_uuid) is None:
+                return
+            repository.delete_many([animal_uuid])
+        elif change_type in ('INSERT', 'UPDATE'):
+            record = change.get('record') or {}
+            merged = merge_remote_animals(repository, [record],
+                                          lambda: pending_patches(self.sync_manager._get_sync_queue()))
+            changed, deleted = split_tombstones(merged)
+            if not changed and not deleted:
+                return # Lokal sürüm daha yeni veya aynı (ör. kendi gönderdiğimiz değişiklik)
+            repository.put_many(changed)
+            repository.delete_many(deleted)
+            self.sync_manager._advance_watermark([record])
+        else:
+            return
+        self.events_applied += 1
+        self._schedule_notify()
+
+    def _schedule_notify(self):
+        """`on_change` çağrısını `notify_delay` sonrasına erteler; bu arada gelen değişiklikler aynı çağrıya katılır."""
+        if self.on_change is None or self._notify_handle is not None:
+            return
+        self._notify_handle = asyncio.get_running_loop().call_later(self.notify_delay, self._notify)
+
+    def _cancel_notify(self):
+        handle, self._notify_handle = self._notify_handle, None
+        if handle is not None:
+            handle.cancel()
+
+    def _notify(self):
+        self._notify_handle = None
+        self.notifications += 1
+        try:
+            self.on_change(self.sync_manager.repository.all())
+        except Exception as e:
+            # Zamanlayıcıdan çağrıldığı için hata aboneliği durdurmaz, yalnızca kaydedilir
+            logger.error(f"Realtime değişiklik bildirimi hata verdi: {e}")
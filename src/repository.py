@@ -0,0 +1,172 @@
+# src/repository.py
+
+"""
+Sürüyü bellekte `uuid` anahtarıyla tutan, uygulama genelinde paylaşılan depo.
+
+Kayıtlar lokal veritabanından bir kez okunur; sonraki okumalar bellekten
+yapılır. Yazmalar veritabanına anında iletilir (write-through). Veritabanı
+dosyaları başka bir bağlantı tarafından değiştirilirse (dosyanın değiştirilme
+zamanı veya boyutu farklılaşırsa) önbellek geçersiz sayılıp yeniden yüklenir.
+
+Kayıtlar bellekte `src.models.Animal` nesneleri olarak tutulur; depoya verilen
+sözlükler yazılırken modele çevrilir. Okumalar depodaki nesnelerin kendisini
+döndürür; bu nesneler yalnızca `put`/`put_many` ile değiştirilmelidir
+(türetilmiş alanları yazan işleme adımları kopyalar üzerinde çalışır).
+"""
+
+import os
+import threading
+from typing import List, Dict, Any, Optional, Iterable, Iterator
+
+from src.herd_aggregates import HerdAggregates
+from src.local_store import SQLiteAnimalStore, LocalStoreError
+from src.models import Animal, as_animal
+from src.persistence import PersistenceError, get_local_store
+
+
+class AnimalRepository:
+    """
+    Hayvan kayıtları için O(1) erişimli bellek içi depo.
+
+    Args:
+        store: Kayıtların kalıcı olarak yazıldığı lokal veritabanı.
+    """
+
+    def __init__(self, store: SQLiteAnimalStore):
+        self.store = store
+        self._lock = threading.RLock()
+        self._animals: Optional[Dict[str, Animal]] = None
+        self._signature: Optional[tuple] = None
+        self._aggregates = HerdAggregates() # Her yazmada güncellenen istatistik özetleri
+
+    def _file_signature(self) -> tuple:
+        """Veritabanı ve WAL dosyasının (değiştirilme zamanı, boyut) bilgisi."""
+        signature = []
+        for path in (self.store.db_path, self.store.db_path + '-wal'):
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def _ensure_loaded(self) -> Dict[str, Animal]:
+        signature = self._file_signature()
+        if self._animals is None or signature != self._signature:
+            try:
+                records = self.store.load_all()
+            except LocalStoreError as e:
+                raise PersistenceError(f"Lokal veriler okunurken bir hata oluştu: {e}") from e
+            self._animals = {animal['uuid']: Animal.from_dict(animal) for animal in records}
+            self._signature = signature
+            self._aggregates.rebuild(self._animals.values())
+        return self._animals
+
+    def _write(self, operation, *args):
+        """Veritabanına yazar ve kendi yazmamızın önbelleği geçersiz kılmaması için imzayı günceller."""
+        try:
+            operation(*args)
+        except LocalStoreError as e:
+            raise PersistenceError(f"Lokal veriler kaydedilirken bir hata oluştu: {e}") from e
+        self._signature = self._file_signature()
+
+    def invalidate(self):
+        """Bir sonraki erişimde kayıtların veritabanından yeniden okunmasını sağlar."""
+        with self._lock:
+            self._animals = None
+
+    def get(self, animal_uuid: str) -> Optional[Animal]:
+        with self._lock:
+            return self._ensure_loaded().get(animal_uuid)
+
+    def put(self, animal: Dict[str, Any]):
+        """Kaydı ekler veya günceller; yalnızca bu satır veritabanına yazılır."""
+        animal = as_animal(animal)
+        with self._lock:
+            animals = self._ensure_loaded()
+            self._write(self.store.upsert, animal)
+            animals[animal.uuid] = animal
+            self._aggregates.update(animal)
+
+    def put_many(self, animals: Iterable[Dict[str, Any]]):
+        """Birden çok kaydı tek bir veritabanı işlemiyle ekler veya günceller."""
+        animals = [as_animal(animal) for animal in animals]
+        if not animals:
+            return
+        with self._lock:
+            cache = self._ensure_loaded()
+            self._write(self.store.upsert_many, animals)
+            for animal in animals:
+                cache[animal.uuid] = animal
+                self._aggregates.update(animal)
+
+    def delete(self, animal_uuid: str):
+        with self._lock:
+            animals = self._ensure_loaded()
+            self._write(self.store.delete, animal_uuid)
+            animals.pop(animal_uuid, None)
+            self._aggregates.remove(animal_uuid)
+
+    def delete_many(self, animal_uuids: Iterable[str]):
+        """Birden çok kaydı tek bir veritabanı işlemiyle siler (ör. uzaktan gelen silme işaretleri)."""
+        animal_uuids = list(animal_uuids)
+        if not animal_uuids:
+            return
+        with self._lock:
+            animals = self._ensure_loaded()
+            self._write(self.store.delete_many, animal_uuids)
+            for animal_uuid in animal_uuids:
+                animals.pop(animal_uuid, None)
+                self._aggregates.remove(animal_uuid)
+
+    def get_meta(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        try:
+            return self.store.get_meta(key, default)
+        except LocalStoreError as e:
+            raise PersistenceError(f"Lokal veriler okunurken bir hata oluştu: {e}") from e
+
+    def set_meta(self, key: str, value: Optional[str]):
+        """Meta veriyi yazar; önbellek kendi yazmamız yüzünden geçersiz sayılmaz."""
+        with self._lock:
+            self._write(self.store.set_meta, key, value)
+
+    def replace_all(self, animals: Iterable[Dict[str, Any]]):
+        animals = [as_animal(animal) for animal in animals]
+        with self._lock:
+            self._write(self.store.replace_all, animals)
+            self._animals = {animal.uuid: animal for animal in animals}
+            self._aggregates.rebuild(self._animals.values())
+
+    def aggregates(self) -> HerdAggregates:
+        """Sürünün güncel istatistik özetleri (bkz. `src/herd_aggregates.py`)."""
+        with self._lock:
+            self._ensure_loaded()
+            return self._aggregates
+
+    def all(self) -> List[Animal]:
+        """Tüm kayıtların anlık bir listesini döndürür."""
+        with self._lock:
+            return list(self._ensure_loaded().values())
+
+    def __iter__(self) -> Iterator[Animal]:
+        return iter(self.all())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._ensure_loaded())
+
+    def __contains__(self, animal_uuid: object) -> bool:
+        with self._lock:
+            return animal_uuid in self._ensure_loaded()
+
+
+_repository: Optional[AnimalRepository] = None
+_repository_lock = threading.Lock()
+
+def get_animal_repository() -> AnimalRepository:
+    """Paylaşılan lokal veritabanı üzerinde uygulama genelindeki depoyu döndürür."""
+    global _repository
+    with _repository_lock:
+        if _repository is None:
+            _repository = AnimalRepository(get_local_store())
+        return _repository
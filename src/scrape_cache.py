@@ -0,0 +1,223 @@
+# src/scrape_cache.py
+
+"""
+Kazınan sayfalar için kalıcı önbellek.
+
+Her URL için sunucunun doğrulayıcıları (`ETag`, `Last-Modified`), sayfa
+içeriğinin SHA-256 özeti ve ayrıştırılmış satırlar saklanır. Bir sonraki
+çekmede koşullu istek gönderilir; sunucu 304 dönerse veya içerik özeti
+değişmemişse sayfa yeniden ayrıştırılmaz, saklanan satırlar döndürülür.
+
+Satırlar sıkıştırılmış JSON olarak ayrı bir SQLite dosyasında tutulur;
+dosyanın silinmesi güvenlidir, bir sonraki çekme tam olur. Ayrıştırma
+kuralları değiştiğinde `PARSER_VERSION` artırılmalıdır; eski sürümle
+saklanan satırlar kullanılmaz.
+
+Aynı dosyada, ardışık kazımaları karşılaştırmak için kaynak başına satır
+özetleri de tutulur (bkz. `src/scrape_diff.py`).
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import List, Dict, Iterable, Optional, Tuple
+
+from config.settings import SCRAPE_CACHE_FILE
+
+PARSER_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    content_hash TEXT NOT NULL,
+    row_count INTEGER NOT NULL,
+    rows BLOB NOT NULL,
+    fetched_at REAL NOT NULL
+)
+"""
+
+# Önceki kazımanın satır özetleri (bkz. src/scrape_diff.py); kaynak başına satır anahtarı -> özet
+_ROW_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS row_hashes (
+    source TEXT NOT NULL,
+    row_key TEXT NOT NULL,
+    kupeno TEXT NOT NULL,
+    row_hash INTEGER NOT NULL,
+    PRIMARY KEY (source, row_key)
+)
+"""
+
+
+class ScrapeCacheError(Exception):
+    """Kazıma önbelleği işlemleri sırasında oluşan hatalar için özel istisna sınıfı."""
+    pass
+
+
+class CachedPage:
+    """Bir URL için saklanan doğrulayıcılar ve içerik özeti (satırlar `ScrapeCache.rows` ile yüklenir)."""
+
+    __slots__ = ('url', 'etag', 'last_modified', 'content_hash', 'row_count', 'fetched_at')
+
+    def __init__(self, url: str, etag: Optional[str], last_modified: Optional[str], content_hash: str,
+                 row_count: int, fetched_at: float):
+        self.url = url
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content_hash = content_hash
+        self.row_count = row_count
+        self.fetched_at = fetched_at
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Koşullu istek başlıkları; sunucu sayfa değişmediyse 304 ile boş yanıt döner."""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ScrapeCache:
+    """
+    URL anahtarlı sayfa önbelleği.
+
+    Args:
+        db_path: Önbellek veritabanının yolu.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        try:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.execute(_SCHEMA)
+            self._conn.execute(_ROW_INDEX_SCHEMA)
+        except (OSError, sqlite3.Error) as e:
+            raise ScrapeCacheError(f"Kazıma önbelleği açılamadı ({db_path}): {e}") from e
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        """URL için geçerli (güncel ayrıştırıcı sürümüyle saklanmış) kaydı döndürür."""
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    'SELECT etag, last_modified, content_hash, row_count, fetched_at FROM pages '
+                    'WHERE url = ? AND version = ?', (url, PARSER_VERSION)
+                ).fetchone()
+            except sqlite3.Error as e:
+                raise ScrapeCacheError(f"Kazıma önbelleği okunamadı: {e}") from e
+        return CachedPage(url, *row) if row else None
+
+    def rows(self, url: str) -> List[Dict[str, str]]:
+        """URL için saklanan ayrıştırılmış satırlar."""
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    'SELECT rows FROM pages WHERE url = ? AND version = ?', (url, PARSER_VERSION)
+                ).fetchone()
+            except sqlite3.Error as e:
+                raise ScrapeCacheError(f"Kazıma önbelleği okunamadı: {e}") from e
+        if row is None:
+            raise ScrapeCacheError(f"Önbellekte kayıt yok: {url}")
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, url: str, etag: Optional[str], last_modified: Optional[str], content_hash: str,
+            rows: List[Dict[str, str]]):
+        """Sayfanın doğrulayıcılarını, özetini ve satırlarını saklar (öncekinin yerine)."""
+        blob = zlib.compress(json.dumps(rows, ensure_ascii=False, separators=(',', ':')).encode('utf-8'), 1)
+        with self._lock:
+            try:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO pages (url, version, etag, last_modified, content_hash, row_count, rows, fetched_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    (url, PARSER_VERSION, etag, last_modified, content_hash, len(rows), blob, time.time())
+                )
+            except sqlite3.Error as e:
+                raise ScrapeCacheError(f"Kazıma önbelleğine yazılamadı: {e}") from e
+
+    def touch(self, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """
+        Sayfanın değişmediği doğrulandığında çekme zamanını ve (sunucu yenilerini
+        gönderdiyse) doğrulayıcıları günceller.
+        """
+        with self._lock:
+            try:
+                self._conn.execute(
+                    'UPDATE pages SET etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified), '
+                    'fetched_at = ? WHERE url = ?', (etag, last_modified, time.time(), url)
+                )
+            except sqlite3.Error as e:
+                raise ScrapeCacheError(f"Kazıma önbelleğine yazılamadı: {e}") from e
+
+    def load_row_index(self, source: str) -> Dict[str, Dict[str, int]]:
+        """Kaynağın son kazımasındaki satır özetleri: küpe numarası -> {satır anahtarı: özet}."""
+        index: Dict[str, Dict[str, int]] = {}
+        with self._lock:
+            try:
+                for row_key, kupeno, row_hash in self._conn.execute(
+                        'SELECT row_key, kupeno, row_hash FROM row_hashes WHERE source = ?', (source,)):
+                    index.setdefault(kupeno, {})[row_key] = row_hash
+            except sqlite3.Error as e:
+                raise ScrapeCacheError(f"Satır özetleri okunamadı: {e}") from e
+        return index
+
+    def update_row_index(self, source: str, upserts: Iterable[Tuple[str, str, int]], removed: Iterable[str]):
+        """
+        Satır özetlerini tek işlemde günceller: önce `removed` anahtarları silinir,
+        sonra `upserts` (satır anahtarı, küpe numarası, özet) yazılır.
+        """
+        with self._lock:
+            try:
+                self._conn.execute('BEGIN IMMEDIATE')
+                try:
+                    self._conn.executemany('DELETE FROM row_hashes WHERE source = ? AND row_key = ?',
+                                           [(source, row_key) for row_key in removed])
+                    self._conn.executemany(
+                        'INSERT OR REPLACE INTO row_hashes (source, row_key, kupeno, row_hash) VALUES (?, ?, ?, ?)',
+                        [(source, row_key, kupeno, row_hash) for row_key, kupeno, row_hash in upserts]
+                    )
+                except BaseException:
+                    self._conn.execute('ROLLBACK')
+                    raise
+                self._conn.execute('COMMIT')
+            except sqlite3.Error as e:
+                raise ScrapeCacheError(f"Satır özetleri yazılamadı: {e}") from e
+
+    def invalidate(self, url: Optional[str] = None):
+        """Verilen URL'nin (verilmezse tümünün) kaydını ve satır özetlerini siler; bir sonraki çekme ve fark tam olur."""
+        with self._lock:
+            try:
+                if url is None:
+                    self._conn.execute('DELETE FROM pages')
+                    self._conn.execute('DELETE FROM row_hashes')
+                else:
+                    self._conn.execute('DELETE FROM pages WHERE url = ?', (url,))
+                    self._conn.execute('DELETE FROM row_hashes WHERE source = ?', (url,))
+            except sqlite3.Error as e:
+                raise ScrapeCacheError(f"Kazıma önbelleği temizlenemedi: {e}") from e
+
+
+_cache: Optional[ScrapeCache] = None
+_cache_lock = threading.Lock()
+
+def get_scrape_cache() -> ScrapeCache:
+    """Uygulama genelinde paylaşılan kazıma önbelleğini döndürür."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ScrapeCache(SCRAPE_CACHE_FILE)
+        return _cache
@@ -0,0 +1,209 @@
+# src/scrape_diff.py
+
+"""
+Ardışık vethek kazımalarını satır özetleriyle karşılaştırır.
+
+Bir önceki kazımadaki her satırın kısa bir özeti (8 baytlık BLAKE2b) küpe
+numarasına göre gruplanarak kazıma önbelleğinde saklanır. Yeni kazıma tek
+geçişte bu dizinle karşılaştırılır ve yalnızca eklenen, değişen ve silinen
+satırlar ayrılır. Lokal depoya ve senkronizasyon kuyruğuna yalnızca bu
+satırların ait olduğu hayvanlar yazılır; 30 bin satırlık bir sayfada 10 satır
+değiştiyse yaklaşık 10 yazma yapılır.
+
+Satır anahtarı tablodaki kayıt numarasıdır (`id`). Kayıt numarası olmayan
+satırlar ve aynı hayvanda tekrar eden kayıt numaraları içerikleriyle
+tanımlanır; böyle bir satırın değişmesi eski satırın silinmesi ve yenisinin
+eklenmesi olarak görülür. Her tohumlama kendi satırının anahtarını
+(`satir_anahtari`) taşır; silinen ve değişen satırların tohumlamaları bu
+anahtarla bulunur. Dizin, değişiklikler lokal depoya uygulandıktan sonra
+güncellenir; uygulama yarıda kalırsa bir sonraki kazıma aynı farkı yeniden üretir.
+"""
+
+import logging
+from datetime import datetime
+from hashlib import blake2b
+from typing import List, Dict, Any, Iterable, Optional, Set, Tuple
+
+from config.settings import COLUMN_HEADERS, DATA_SOURCE_URL
+from src.normalizer import normalize_scraped_rows, row_cells
+from src.scrape_cache import ScrapeCache, get_scrape_cache
+from src.sync_merge import comparable
+
+logger = logging.getLogger(__name__)
+
+_ID = COLUMN_HEADERS.index('id')
+_EAR_TAG = COLUMN_HEADERS.index('kupeno')
+_CELL_SEPARATOR = '\x1f'
+_CONTENT_KEY_PREFIX = 'h:' # Kayıt numarası olmayan satırların anahtarı
+_DUPLICATE_SEPARATOR = '#' # Aynı kayıt numarasının tekrarları
+
+
+def row_hash(cells: List[str]) -> int:
+    """Satır hücrelerinin 64 bitlik (işaretli, SQLite INTEGER'a sığan) özeti."""
+    digest = blake2b(_CELL_SEPARATOR.join(cells).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+class RowDiff:
+    """
+    İki kazıma arasındaki fark.
+
+    Attributes:
+        added, changed: Yeni ve içeriği değişen satırlar (hücre listeleri, `COLUMN_HEADERS` sırasında).
+        updated: Eklenen ve değişen satırlar, satır anahtarlarıyla.
+        removed: Silinen satırların (küpe numarası, satır anahtarı) çiftleri.
+        unchanged: Değişmeyen satır sayısı.
+        skipped_rows: Küpe numarası olmayan (yok sayılan) satır sayısı.
+    """
+
+    def __init__(self):
+        self.added: List[List[str]] = []
+        self.changed: List[List[str]] = []
+        self.updated: List[Tuple[str, List[str]]] = [] # Girdi sırasıyla (satır anahtarı, hücreler)
+        self.removed: List[Tuple[str, str]] = []
+        self.unchanged = 0
+        self.skipped_rows = 0
+        self.index_updates: List[Tuple[str, str, int]] = [] # Dizine yazılacak (satır anahtarı, küpe numarası, özet)
+
+    @property
+    def empty(self) -> bool:
+        return not (self.added or self.changed or self.removed)
+
+    def ear_tags(self) -> Set[str]:
+        """Farktan etkilenen hayvanların küpe numaraları."""
+        tags = {cells[_EAR_TAG] for cells in self.added}
+        tags.update(cells[_EAR_TAG] for cells in self.changed)
+        tags.update(ear_tag for ear_tag, _ in self.removed)
+        return tags
+
+    def to_dict(self) -> Dict[str, int]:
+        return {'added': len(self.added), 'changed': len(self.changed), 'removed': len(self.removed),
+                'unchanged': self.unchanged, 'skipped_rows': self.skipped_rows}
+
+
+def diff_rows(rows: Iterable[Any], index: Dict[str, Dict[str, int]]) -> RowDiff:
+    """
+    Kazınan satırları önceki kazımanın dizini (küpe numarası -> {satır anahtarı: özet}) ile tek geçişte karşılaştırır.
+    Dizin değiştirilmez; güncelleme `ScrapeCache.update_row_index` ile, fark uygulandıktan sonra yapılır.
+    """
+    diff = RowDiff()
+    seen: Set[Tuple[str, str]] = set()
+    for row in rows:
+        cells = row_cells(row)
+        ear_tag = cells[_EAR_TAG]
+        if not ear_tag:
+            diff.skipped_rows += 1
+            continue
+        digest = row_hash(cells)
+        record_id = cells[_ID]
+        if not record_id:
+            row_key = f"{_CONTENT_KEY_PREFIX}{digest & 0xFFFFFFFFFFFFFFFF:016x}"
+        elif (ear_tag, record_id) in seen:
+            row_key = f"{record_id}{_DUPLICATE_SEPARATOR}{digest & 0xFFFFFFFFFFFFFFFF:016x}"
+        else:
+            row_key = record_id
+        if (ear_tag, row_key) in seen:
+            diff.unchanged += 1 # Birebir aynı satırın tekrarı
+            continue
+        seen.add((ear_tag, row_key))
+
+        previous = index.get(ear_tag, {}).get(row_key)
+        if previous == digest:
+            diff.unchanged += 1
+            continue
+        (diff.added if previous is None else diff.changed).append(cells)
+        diff.updated.append((row_key, cells))
+        diff.index_updates.append((row_key, ear_tag, digest))
+
+    for ear_tag, hashes in index.items():
+        for row_key in hashes:
+            if (ear_tag, row_key) not in seen:
+                diff.removed.append((ear_tag, row_key))
+    return diff
+
+
+def _row_key(insemination: Dict[str, Any]) -> Optional[str]:
+    """
+    Tohumlamanın kazımadaki satır anahtarı. Anahtardan önce aktarılmış kayıtlarda
+    kayıt numarasıdır; bu kayıtlar satırları yeniden aktarıldığında anahtarlarını alır.
+    """
+    return insemination.get('satir_anahtari') or insemination.get('kayit_no') or None
+
+
+def _merge_inseminations(stored: List[Dict[str, Any]], incoming: List[Dict[str, Any]],
+                         removed_keys: Set[str]) -> List[Dict[str, Any]]:
+    """
+    Lokal tohumlamalara gelenleri satır anahtarı üzerinden uygular: aynı anahtarlı kayıt
+    değiştirilir, yenisi eklenir, silinen satırların kayıtları çıkarılır. Kazımadan
+    gelmeyen (anahtarsız) tohumlamalara dokunulmaz.
+    """
+    replaced = removed_keys | {key for key in map(_row_key, incoming) if key}
+    merged = [insemination for insemination in stored if _row_key(insemination) not in replaced]
+    merged.extend(incoming)
+    merged.sort(key=lambda insemination: insemination.get('tohumlama_tarihi') or '')
+    return merged
+
+
+async def apply_row_diff(diff: RowDiff, sync_manager, now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Farkı lokal depoya ve senkronizasyon kuyruğuna uygular; yalnızca etkilenen hayvanlar yazılır.
+
+    Returns:
+        `created` ve `updated` hayvan sayıları.
+    """
+    counts = {'created': 0, 'updated': 0}
+    ear_tags = diff.ear_tags()
+    if not ear_tags:
+        return counts
+
+    rows = normalize_scraped_rows([cells for _, cells in diff.updated], now=now,
+                                  row_keys=[row_key for row_key, _ in diff.updated])
+    incoming = {animal['devlet_kupesi']: animal for animal in rows}
+    removed_keys: Dict[str, Set[str]] = {}
+    for ear_tag, row_key in diff.removed:
+        removed_keys.setdefault(ear_tag, set()).add(row_key)
+    stored = {animal.get('devlet_kupesi'): animal for animal in sync_manager.repository
+              if animal.get('devlet_kupesi') in ear_tags}
+
+    for ear_tag in sorted(ear_tags):
+        partial = incoming.get(ear_tag)
+        animal = stored.get(ear_tag)
+        if animal is None:
+            if partial is not None and partial['tohumlamalar']:
+                await sync_manager.create_animal(partial)
+                counts['created'] += 1
+            continue
+
+        inseminations = _merge_inseminations(comparable(animal.get('tohumlamalar') or []),
+                                             partial['tohumlamalar'] if partial is not None else [],
+                                             removed_keys.get(ear_tag, set()))
+        update: Dict[str, Any] = {'tohumlamalar': inseminations}
+        if partial is not None and partial.get('irk') and not animal.get('irk'):
+            update['irk'] = partial['irk']
+        if inseminations and inseminations[-1].get('gebe_mi'):
+            update['gebelik_durumu_metin'] = inseminations[-1]['gebe_mi']
+        if await sync_manager.update_animal(animal['uuid'], update):
+            counts['updated'] += 1
+    return counts
+
+
+async def import_scraped_rows(rows: Iterable[Any], sync_manager, source: str = DATA_SOURCE_URL,
+                              cache: Optional[ScrapeCache] = None, now: Optional[datetime] = None) -> RowDiff:
+    """
+    Kazınan satırları önceki kazımayla karşılaştırır ve yalnızca farkı lokal depoya ve
+    senkronizasyon kuyruğuna aktarır. Değişiklikler uygulandıktan sonra satır dizini güncellenir.
+
+    Args:
+        rows: Kazınan satırların tamamı (ör. `fetch_table_cached(...).rows`).
+        sync_manager: Yazmaların yapılacağı `SyncManager`.
+        source: Dizinin anahtarı; genellikle sayfanın URL'si.
+    """
+    cache = cache if cache is not None else get_scrape_cache()
+    diff = diff_rows(rows, cache.load_row_index(source))
+    if diff.empty:
+        logger.info(f"Kazımada değişiklik yok ({source}): {diff.unchanged} satır aynı.")
+        return diff
+    counts = await apply_row_diff(diff, sync_manager, now)
+    cache.update_row_index(source, diff.index_updates, [row_key for _, row_key in diff.removed])
+    logger.info(f"Kazıma farkı uygulandı ({source}): {diff.to_dict()}, {counts}")
+    return diff
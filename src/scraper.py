@@ -4,11 +4,28 @@
 Bu modül, belirtilen bir web sayfasından hayvan kayıtlarını çekmek,
 HTML tablosunu ayrıştırmak ve veriyi yapılandırılmış bir formatta döndürmekle
 sorumludur. Hata yönetimi ve sağlamlık ön planda tutulmuştur.
+
+Sayfa bir bütün olarak belleğe alınmaz: yanıt parça parça okunur ve
+`html.parser.HTMLParser` ile akış halinde ayrıştırılır; her satır tamamlanır
+tamamlanmaz üretilir (generator). Bellek kullanımı sayfanın boyutundan
+bağımsızdır ve ilk tablo bittiğinde sayfanın geri kalanı indirilmez.
+
+Sık yoklanan sayfalar için `fetch_table_cached` koşullu istek gönderir ve
+değişmeyen sayfaları yeniden ayrıştırmaz (bkz. `src/scrape_cache.py`).
 """
 
+import codecs
+import hashlib
+import re
+import tempfile
+from contextlib import contextmanager
+from html.parser import HTMLParser
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Union
+
 import requests
-from bs4 import BeautifulSoup
-from typing import List, Dict, Any
+
+from config.settings import DATA_SOURCE_URL, SCRAPER_CHUNK_SIZE, SCRAPER_SPOOL_MAX_BYTES
+from src.scrape_cache import ScrapeCache, get_scrape_cache
 
 # Kendi özel hata sınıfımızı tanımlıyoruz. Bu, projenin diğer
 # kısımlarının scraper kaynaklı hataları kolayca yakalamasını sağlar.
@@ -16,65 +33,313 @@ class ScraperError(Exception):
     """Web kazıma işlemleri sırasında oluşan hatalar için özel istisna sınıfı."""
     pass
 
-def fetch_and_parse_table(url: str) -> List[Dict[str, Any]]:
+_CHARSET_PATTERN = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?([\w-]+)', re.IGNORECASE)
+_HEADER_CHARSET_PATTERN = re.compile(r'charset\s*=\s*["\']?([\w-]+)', re.IGNORECASE)
+_SNIFF_BYTES = 1024 # `<meta charset>` etiketi sayfanın bu kadar başında aranır
+
+
+class _TableRowParser(HTMLParser):
     """
-    Belirtilen URL'den HTML tablosunu çeker ve verileri bir sözlük listesi olarak döndürür.
+    Sayfadaki ilk `<table>` etiketinin satırlarını akış halinde toplar.
 
-    Args:
-        url: Verinin çekileceği web sayfasının URL'si.
+    Başlıklar tablodaki `<th>` hücrelerinden alınır; ilk satır (başlık satırı)
+    ve `<td>` içermeyen satırlar atlanır. İç içe tabloların metni bulundukları
+    hücreye eklenir. Kapatılmamış `<td>`/`<tr>` etiketleri (HTML'de geçerlidir)
+    bir sonraki hücre veya satır başladığında kapatılır.
+    """
 
-    Returns:
-        Her biri bir hayvan kaydını temsil eden sözlüklerden oluşan bir liste.
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.headers: List[str] = []
+        self.rows: List[Dict[str, str]] = [] # Son `feed` ile tamamlanan, henüz alınmamış satırlar
+        self.found_table = False
+        self.finished = False
+        self._depth = 0 # İç içe tablo derinliği; yalnızca 1. seviye işlenir
+        self._rows_seen = 0
+        self._cells: Optional[List[str]] = None # Açık satırın `<td>` metinleri
+        self._text: Optional[List[str]] = None # Açık hücrenin metin parçaları
+        self._cell_tag: Optional[str] = None
+        self.next_links: Optional[List[str]] = None # Liste verilirse `rel="next"` bağlantıları toplanır
+
+    def handle_starttag(self, tag, attrs):
+        if self.next_links is not None and tag in ('a', 'link'):
+            attributes = dict(attrs)
+            if 'next' in (attributes.get('rel') or '').lower().split() and attributes.get('href'):
+                self.next_links.append(attributes['href'])
+        if self.finished:
+            return
+        if tag == 'table':
+            self.found_table = True
+            self._depth += 1
+            return
+        if self._depth != 1:
+            return
+        if tag == 'tr':
+            self._end_row()
+            self._cells = []
+        elif tag in ('td', 'th'):
+            self._end_cell()
+            if self._cells is None:
+                self._cells = [] # `<tr>` olmadan başlayan hücre
+            self._cell_tag = tag
+            self._text = []
+
+    def handle_endtag(self, tag):
+        if self.finished or self._depth == 0:
+            return
+        if tag == 'table':
+            self._depth -= 1
+            if self._depth == 0:
+                self._end_row()
+                self.finished = True
+        elif self._depth == 1:
+            if tag in ('td', 'th'):
+                self._end_cell()
+            elif tag == 'tr':
+                self._end_row()
+
+    def handle_data(self, data):
+        if self._text is not None and not self.finished:
+            self._text.append(data)
+
+    def _end_cell(self):
+        if self._text is None:
+            return
+        text = ''.join(self._text).strip()
+        if self._cell_tag == 'th':
+            self.headers.append(text)
+        else:
+            self._cells.append(text)
+        self._text = None
+        self._cell_tag = None
+
+    def _end_row(self):
+        self._end_cell()
+        if self._cells is None:
+            return
+        cells, self._cells = self._cells, None
+        self._rows_seen += 1
+        if self._rows_seen == 1 or not cells:
+            return # Başlık satırı veya hücresiz satır
+        # Eksik hücreler boş değer alır, fazlası atılır
+        self.rows.append({header: cells[i] if i < len(cells) else "" for i, header in enumerate(self.headers)})
+
+
+def _decode_chunks(chunks: Iterable[Union[bytes, str]], content_type: Optional[str]) -> Iterator[str]:
+    """
+    Bayt parçalarını metne çevirir. Karakter kodlaması Content-Type başlığından,
+    yoksa sayfanın başındaki `<meta charset>` etiketinden alınır; ikisi de yoksa UTF-8.
+    Parça sınırına denk gelen çok baytlı karakterler artımlı çözücü ile korunur.
+    """
+    match = _HEADER_CHARSET_PATTERN.search(content_type or '')
+    encoding = match.group(1) if match else None
+    decoder = None
+    head = b'' # `<meta>` aranırken biriktirilen sayfa başı
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            yield chunk
+            continue
+        if decoder is None:
+            head += chunk
+            if encoding is None and len(head) < _SNIFF_BYTES:
+                continue
+            decoder = _make_decoder(encoding, head)
+            chunk, head = head, b''
+        yield decoder.decode(chunk)
+    if decoder is None:
+        decoder = _make_decoder(encoding, head)
+        yield decoder.decode(head, final=True)
+    else:
+        yield decoder.decode(b'', final=True)
+
+
+def _make_decoder(encoding: Optional[str], head: bytes):
+    if encoding is None:
+        match = _CHARSET_PATTERN.search(head)
+        encoding = match.group(1).decode('ascii') if match else 'utf-8'
+    try:
+        return codecs.getincrementaldecoder(encoding)(errors='replace')
+    except LookupError:
+        return codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+
+def iter_table_rows_from_chunks(chunks: Iterable[Union[bytes, str]], content_type: Optional[str] = None,
+                                next_links: Optional[List[str]] = None) -> Iterator[Dict[str, str]]:
+    """
+    HTML parçalarındaki ilk tablonun satırlarını, parçalar geldikçe üretir.
+
+    Args:
+        chunks: Sayfanın ardışık parçaları (bayt veya metin).
+        content_type: Yanıtın Content-Type başlığı; karakter kodlamasını belirlemek için.
+        next_links: Verilirse sayfadaki `rel="next"` bağlantıları (sayfalama) bu listeye
+            eklenir; bağlantı tablodan sonra da olabileceği için sayfanın tamamı okunur.
 
     Raises:
-        ScraperError: Ağ hatası, siteye ulaşılamaması veya beklenen
-                      tablonun bulunamaması durumunda fırlatılır.
+        ScraperError: Sayfada `<table>` etiketi yoksa.
     """
-    print("Veri çekme işlemi başlatılıyor...")
+    parser = _TableRowParser()
+    parser.next_links = next_links
+    for text in _decode_chunks(chunks, content_type):
+        if not text:
+            continue
+        parser.feed(text)
+        yield from parser.rows
+        parser.rows.clear()
+        if parser.finished and next_links is None:
+            return # Tablonun geri kalanı gerekmez
+    parser.close()
+    if not parser.found_table:
+        raise ScraperError("HTML içeriğinde beklenen '<table>' etiketi bulunamadı.")
+    parser._end_row() # Kapatılmamış tablo
+    yield from parser.rows
+
+
+@contextmanager
+def scraper_errors():
+    """Ağ ve ayrıştırma hatalarını `ScraperError` olarak iletir."""
     try:
-        # Timeout eklemek, sitenin yanıt vermemesi durumunda sonsuza kadar beklemeyi önler.
-        response = requests.get(url, timeout=15)
-        # HTTP hata kodları için (404, 500 vb.) otomatik olarak hata fırlat.
-        response.raise_for_status()
-
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Tabloyu bulmaya çalışıyoruz. Eğer bulunamazsa 'None' döner.
-        table = soup.find('table')
-        if not table:
-            raise ScraperError("HTML içeriğinde beklenen '<table>' etiketi bulunamadı.")
-
-        headers = [header.text.strip() for header in table.find_all('th')]
-        # Eğer başlıklar boşsa veya yoksa, jenerik başlıklar kullanabiliriz.
-        # Ancak şimdilik bu yapının var olduğunu varsayıyoruz.
-
-        data = []
-        rows = table.find_all('tr')
-        for row in rows[1:]:  # Başlık satırını atla
-            cells = row.find_all('td')
-            if not cells:
-                continue
+        yield
 
-            # Hücre sayısına göre kırılgan normalizasyon yerine daha esnek bir yapı
-            record = {}
-            for i, header in enumerate(headers):
-                if i < len(cells):
-                    record[header] = cells[i].text.strip()
-                else:
-                    record[header] = "" # Eksik hücreler için boş değer ata
-            data.append(record)
-        
-        print(f"Başarıyla {len(data)} kayıt çekildi.")
-        return data
+    except ScraperError:
+        raise
 
     except requests.exceptions.Timeout as e:
         raise ScraperError(f"Web sitesine bağlanırken zaman aşımı yaşandı: {e}")
-    
+
     except requests.exceptions.RequestException as e:
         # Bu, DNS hatası, bağlantı reddi gibi tüm ağ sorunlarını yakalar.
         raise ScraperError(f"Web sitesine bağlanırken bir ağ hatası oluştu: {e}")
 
     except Exception as e:
-        # BeautifulSoup'tan gelebilecek beklenmedik hatalar veya diğer sorunlar için.
+        # Ayrıştırıcıdan gelebilecek beklenmedik hatalar veya diğer sorunlar için.
         # Bu, bizim son kalemiz olmalı ve hatayı gizlememeli.
         raise ScraperError(f"Veri ayrıştırılırken beklenmedik bir hata oluştu: {e}")
+
+
+def iter_table_rows(url: str, chunk_size: int = SCRAPER_CHUNK_SIZE) -> Iterator[Dict[str, str]]:
+    """
+    Belirtilen URL'deki HTML tablosunun satırlarını indirme sürerken tek tek üretir.
+
+    Args:
+        url: Verinin çekileceği web sayfasının URL'si.
+        chunk_size: Yanıttan her adımda okunacak bayt sayısı.
+
+    Yields:
+        Her biri bir hayvan kaydını temsil eden sözlükler.
+
+    Raises:
+        ScraperError: Ağ hatası, siteye ulaşılamaması veya beklenen
+                      tablonun bulunamaması durumunda fırlatılır.
+    """
+    response = None
+    try:
+        with scraper_errors():
+            # Timeout eklemek, sitenin yanıt vermemesi durumunda sonsuza kadar beklemeyi önler.
+            response = requests.get(url, timeout=15, stream=True)
+            # HTTP hata kodları için (404, 500 vb.) otomatik olarak hata fırlat.
+            response.raise_for_status()
+            yield from iter_table_rows_from_chunks(response.iter_content(chunk_size=chunk_size),
+                                                   response.headers.get('Content-Type'))
+    finally:
+        # Tüketici erken durursa (ör. ilk N satır) bağlantı havuza geri verilir
+        if response is not None:
+            response.close()
+
+
+class ScrapeResult:
+    """
+    `fetch_table_cached` sonucu.
+
+    Attributes:
+        rows: Tablonun satırları.
+        status: `NOT_MODIFIED` (sunucu 304 döndü), `UNCHANGED` (içerik özeti aynı)
+            veya `CHANGED` (sayfa yeniden ayrıştırıldı).
+    """
+
+    NOT_MODIFIED = 'not_modified'
+    UNCHANGED = 'unchanged'
+    CHANGED = 'changed'
+
+    def __init__(self, rows: List[Dict[str, str]], status: str):
+        self.rows = rows
+        self.status = status
+
+    @property
+    def changed(self) -> bool:
+        return self.status == self.CHANGED
+
+
+def fetch_table_cached(url: str = DATA_SOURCE_URL, cache: Optional[ScrapeCache] = None,
+                       chunk_size: int = SCRAPER_CHUNK_SIZE) -> ScrapeResult:
+    """
+    Tabloyu koşullu istekle çeker; sayfa değişmediyse önceki satırları ayrıştırmadan döndürür.
+
+    Önbellekte kayıt varsa `If-None-Match`/`If-Modified-Since` gönderilir. Sunucu
+    304 dönerse gövde hiç indirilmez. 200 yanıtında gövde indirilirken özeti
+    hesaplanır (bellekte en fazla `SCRAPER_SPOOL_MAX_BYTES`, fazlası geçici
+    dosyada); özet öncekiyle aynıysa (ör. doğrulayıcı göndermeyen sunucular)
+    ayrıştırma atlanır. Aksi halde sayfa ayrıştırılır ve önbelleğe yazılır.
+
+    Raises:
+        ScraperError: Ağ hatası, siteye ulaşılamaması veya beklenen
+                      tablonun bulunamaması durumunda fırlatılır.
+    """
+    cache = cache if cache is not None else get_scrape_cache()
+    cached = cache.get(url)
+    response = None
+    try:
+        with scraper_errors():
+            headers = cached.conditional_headers() if cached is not None else {}
+            response = requests.get(url, timeout=15, stream=True, headers=headers)
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            if response.status_code == 304 and cached is not None:
+                cache.touch(url, etag, last_modified)
+                return ScrapeResult(cache.rows(url), ScrapeResult.NOT_MODIFIED)
+            response.raise_for_status()
+
+            with tempfile.SpooledTemporaryFile(max_size=SCRAPER_SPOOL_MAX_BYTES) as body:
+                digest = hashlib.sha256()
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    digest.update(chunk)
+                    body.write(chunk)
+                content_hash = digest.hexdigest()
+                if cached is not None and cached.content_hash == content_hash:
+                    cache.touch(url, etag, last_modified)
+                    return ScrapeResult(cache.rows(url), ScrapeResult.UNCHANGED)
+
+                body.seek(0)
+                rows = list(iter_table_rows_from_chunks(iter(lambda: body.read(chunk_size), b''),
+                                                        response.headers.get('Content-Type')))
+            cache.put(url, etag, last_modified, content_hash, rows)
+            return ScrapeResult(rows, ScrapeResult.CHANGED)
+    finally:
+        if response is not None:
+            response.close()
+
+
+def fetch_and_parse_table(url: str, cache: Optional[ScrapeCache] = None) -> List[Dict[str, Any]]:
+    """
+    Belirtilen URL'den HTML tablosunu çeker ve verileri bir sözlük listesi olarak döndürür.
+    İstek `fetch_table_cached` ile koşullu gönderilir; sayfa değişmediyse önceki
+    satırlar yeniden ayrıştırılmadan döndürülür.
+    Büyük sayfalar için satırları tek tek işleyen `iter_table_rows` tercih edilmelidir.
+
+    Args:
+        url: Verinin çekileceği web sayfasının URL'si.
+        cache: Kullanılacak kazıma önbelleği; verilmezse uygulama geneli önbellek.
+
+    Returns:
+        Her biri bir hayvan kaydını temsil eden sözlüklerden oluşan bir liste.
+
+    Raises:
+        ScraperError: Ağ hatası, siteye ulaşılamaması veya beklenen
+                      tablonun bulunamaması durumunda fırlatılır.
+    """
+    print("Veri çekme işlemi başlatılıyor...")
+    result = fetch_table_cached(url, cache)
+    if result.changed:
+        print(f"Başarıyla {len(result.rows)} kayıt çekildi.")
+    else:
+        print(f"Sayfa değişmemiş; önbellekteki {len(result.rows)} kayıt kullanıldı.")
+    return result.rows
@@ -0,0 +1,133 @@
+# src/startup_profile.py
+
+"""
+Açılış süresi ölçüm modu.
+
+`STARTUP_PROFILE=1` ortam değişkeni ile uygulama başlatıldığında her modülün
+içe aktarma süresi (kendi süresi ve alt modüllerle birlikte toplam süre) ve
+`build` aşamalarının (KV yükleme, ekran oluşturma) süreleri kaydedilir. İlk
+kare çizildikten sonra rapor stderr'e ve günlüğe yazılır. Sonradan, ilk
+gezinmede yüklenen ekranlar ayrı satırlar olarak raporlanır.
+
+Ölçümün eksiksiz olması için `main.py` bu modülü diğer tüm içe
+aktarmalardan önce yüklemelidir.
+"""
+
+import builtins
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Iterator
+
+ENV_FLAG = 'STARTUP_PROFILE'
+
+logger = logging.getLogger(__name__)
+
+
+class StartupProfiler:
+    """İçe aktarma ve açılış aşaması sürelerini toplayan ölçücü."""
+
+    def __init__(self):
+        self.enabled = False
+        self.reported = False
+        self.imports: Dict[str, Dict[str, float]] = {}
+        self.phases: Dict[str, float] = {}
+        self._started: Optional[float] = None
+        self._original_import = None
+        self._hook = None
+        self._local = threading.local()
+
+    def start(self):
+        """İçe aktarma süre ölçümünü başlatır (`builtins.__import__` sarmalanır)."""
+        if self.enabled:
+            return
+        self.enabled = True
+        self._started = time.perf_counter()
+        self._original_import = builtins.__import__
+        self._hook = self._timed_import # Aynı bağlı metot nesnesi; `stop` kimlik karşılaştırması yapar
+        builtins.__import__ = self._hook
+
+    def start_if_enabled(self):
+        if os.getenv(ENV_FLAG) == '1':
+            self.start()
+
+    def stop(self):
+        if self._original_import is not None and builtins.__import__ is self._hook:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        # Yalnızca ilk kez yüklenen mutlak içe aktarmalar ölçülür
+        if level or name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        frame = [name, 0.0] # [modül, alt içe aktarmaların süresi]
+        stack.append(frame)
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            if stack:
+                stack[-1][1] += elapsed
+            self.imports[name] = {'cumulative_s': elapsed, 'self_s': elapsed - frame[1]}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Bir açılış aşamasını ölçer; ölçüm modu kapalıysa hiçbir şey yapmaz."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.phases[name] = self.phases.get(name, 0.0) + elapsed
+            if self.reported:
+                # Açılıştan sonra (ör. ilk gezinmede) yüklenen ekranlar
+                self._emit(f"[startup] {name}: {elapsed * 1000:.1f} ms")
+
+    def report(self, limit: int = 25) -> Dict[str, Any]:
+        slowest: List[Dict[str, Any]] = sorted(
+            ({'module': name, **timing} for name, timing in self.imports.items()),
+            key=lambda item: item['cumulative_s'], reverse=True,
+        )
+        return {
+            'total_s': time.perf_counter() - self._started if self._started is not None else 0.0,
+            'phases': dict(self.phases),
+            'imports': slowest[:limit],
+        }
+
+    def format_report(self, limit: int = 25) -> str:
+        report = self.report(limit)
+        lines = [f"[startup] ilk kareye kadar: {report['total_s'] * 1000:.1f} ms"]
+        for name, seconds in report['phases'].items():
+            lines.append(f"[startup] aşama {name:<28} {seconds * 1000:9.1f} ms")
+        lines.append(f"[startup] {'modül':<40} {'toplam':>10} {'kendi':>10}")
+        for item in report['imports']:
+            lines.append(f"[startup] {item['module']:<40} {item['cumulative_s'] * 1000:8.1f}ms "
+                         f"{item['self_s'] * 1000:8.1f}ms")
+        return '\n'.join(lines)
+
+    def finish(self, limit: int = 25):
+        """İlk kare çizildiğinde çağrılır: içe aktarma ölçümünü durdurur ve raporu yazar."""
+        if not self.enabled or self.reported:
+            return
+        self.stop()
+        self._emit(self.format_report(limit))
+        self.reported = True
+
+    def _emit(self, text: str):
+        print(text, file=sys.stderr)
+        logger.info(text)
+
+
+startup_profiler = StartupProfiler()
@@ -2,28 +2,35 @@
 from collections import defaultdict
 from typing import List, Dict, Any, Optional
 from datetime import datetime, date
-import matplotlib.pyplot as plt
 import io
 import base64
 import logging
+from src.lazy_import import lazy_module
+from src.models import as_animal, iter_animals
+
+plt = lazy_module('matplotlib.pyplot') # Imported on the first chart, not at startup
 
 def calculate_statistics(processed_animals: List[Dict[str, Any]]) -> Dict[str, Any]:
     """Calculates various statistics about the animals."""
     if not processed_animals:
         return {}
 
-    total_animals = len(processed_animals)
-    cow_count = sum(1 for animal in processed_animals if animal.get('sinif') == 'İnek')
-    heifer_count = sum(1 for animal in processed_animals if animal.get('sinif') == 'Düve')
-    
-    total_inseminations = sum(len(animal.get('tohumlamalar', [])) for animal in processed_animals)
+    # Single pass over the herd; the statistics screen reads HerdAggregates instead (see src/herd_aggregates.py)
+    total_animals = cow_count = heifer_count = total_inseminations = 0
+    valid_ages_days = []
+    today = date.today()
+    for animal in iter_animals(processed_animals):
+        total_animals += 1
+        if animal.sinif == 'İnek':
+            cow_count += 1
+        elif animal.sinif == 'Düve':
+            heifer_count += 1
+        total_inseminations += animal.insemination_count
+        # Calculate the age of the animal (assuming 'dogum_tarihi' exists and is datetime)
+        if isinstance(animal.dogum_tarihi, datetime):
+            valid_ages_days.append((today - animal.dogum_tarihi.date()).days) # Convert datetime to date
     average_inseminations = total_inseminations / total_animals if total_animals else 0
 
-    # Calculate the average age of animals (assuming 'dogum_tarihi' exists and is datetime)
-    valid_ages_days = [(date.today() - animal['dogum_tarihi'].date()).days # Convert datetime to date
-                       for animal in processed_animals 
-                       if animal.get('dogum_tarihi') and isinstance(animal['dogum_tarihi'], datetime)]
-    
     average_age_days = sum(valid_ages_days) / len(valid_ages_days) if valid_ages_days else 0
     average_age_years = round(average_age_days / 365.25, 1) # Account for leap years
 
@@ -39,8 +46,8 @@ def calculate_statistics(processed_animals: List[Dict[str, Any]]) -> Dict[str, A
 def calculate_breed_distribution(animals: List[Dict[str, Any]]) -> Dict[str, int]:
     """Calculates the count of animals per breed (irk)."""
     breed_counts = defaultdict(int)
-    for animal in animals:
-        breed = animal.get('irk', 'Bilinmiyor')
+    for animal in iter_animals(animals):
+        breed = animal.irk if animal.irk is not None else 'Bilinmiyor'
         breed_counts[breed] += 1
     return dict(breed_counts)
 
@@ -67,8 +74,8 @@ def generate_pie_chart_base64(data: Dict[str, int], title: str) -> Optional[str]
 def calculate_births_per_month(animals: List[Dict[str, Any]]) -> Dict[str, int]:
     """Calculates the number of births per month from animal birth dates."""
     births_per_month = defaultdict(int)
-    for animal in animals:
-        birth_date = animal.get('dogum_tarihi')
+    for animal in iter_animals(animals):
+        birth_date = animal.dogum_tarihi
         if isinstance(birth_date, datetime):
             month_year_key = birth_date.strftime('%Y-%m') # e.g., '2023-01'
             births_per_month[month_year_key] += 1
@@ -100,27 +107,34 @@ def generate_bar_chart_base64(data: Dict[str, int], title: str, xlabel: str, yla
     buf.seek(0)
     return base64.b64encode(buf.read()).decode('utf-8')
 
-def get_animal_specific_stats(animal_uuid: str, all_processed_data: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """Returns specific statistics for a given animal."""
-    animal_record = next((animal for animal in all_processed_data if animal.get('uuid') == animal_uuid), None)
+def get_animal_specific_stats(animal_uuid: str, all_processed_data) -> Dict[str, Any]:
+    """
+    Returns specific statistics for a given animal.
+    `all_processed_data` may be a list of records, or anything keyed by uuid with a
+    `get` method (an AnimalRepository or a dict) for an O(1) lookup.
+    """
+    if hasattr(all_processed_data, 'get'):
+        animal_record = all_processed_data.get(animal_uuid)
+    else:
+        animal_record = next((animal for animal in all_processed_data if animal.get('uuid') == animal_uuid), None)
 
     if not animal_record:
         return {"hata": "Hayvan bulunamadı."}
+    animal_record = as_animal(animal_record)
 
-    total_inseminations = len(animal_record.get('tohumlamalar', []))
-    last_insemination = animal_record.get('son_tohumlama') # Assuming this is already a datetime object from data_processor
+    total_inseminations = animal_record.insemination_count
+    last_insemination = animal_record.son_tohumlama # Assuming this is already a datetime object from data_processor
     
     # Placeholder for pregnancy success rate if data becomes available
     # For now, it's just a general note based on the overall animal status.
-    pregnancy_status = animal_record.get('gebelik_durumu_metin', 'Bilinmiyor')
+    pregnancy_status = animal_record.gebelik_durumu_metin or 'Bilinmiyor'
 
 
     animal_stats = {
         "toplam_tohumlama_sayisi": total_inseminations,
-        "sinif_tahmini": animal_record.get('sinif', 'Bilgi Yok'),
+        "sinif_tahmini": animal_record.sinif or 'Bilgi Yok',
         "son_tohumlama": last_insemination,
         "mevcut_gebelik_durumu": pregnancy_status, # Add current pregnancy status
-        "dogum_tarihi": animal_record.get('dogum_tarihi').strftime('%Y-%m-%d') if isinstance(animal_record.get('dogum_tarihi'), datetime) else "Bilgi Yok"
+        "dogum_tarihi": animal_record.dogum_tarihi.strftime('%Y-%m-%d') if isinstance(animal_record.dogum_tarihi, datetime) else "Bilgi Yok"
     }
     return animal_stats
-
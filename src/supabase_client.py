@@ -0,0 +1,80 @@
+# src/supabase_client.py
+
+"""
+Uygulama genelinde paylaşılan Supabase istemcisi ve ağ çağrıları için iş parçacığı havuzu.
+
+Tek bir istemci kullanılır; altındaki httpx istemcisi bağlantıları açık
+tutar (keep-alive), böylece her istek için yeniden TCP/TLS el sıkışması
+yapılmaz. Oturum (giriş yapan kullanıcının belirteci) da bu istemcide
+tutulduğu için kimlik doğrulama, senkronizasyon ve yetki kontrolleri aynı
+oturumu paylaşır.
+
+Supabase istemcisinin `.execute()` ve `auth` çağrıları bloklayıcıdır.
+Arayüz döngüsünü dondurmamak için `run_blocking` ile sınırlı bir iş parçacığı
+havuzunda çalıştırılırlar; aynı anda en fazla `SUPABASE_MAX_CONCURRENCY`
+istek yapılır.
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+import httpx
+from supabase import create_client, Client, ClientOptions
+
+from config.secrets import SUPABASE_URL, SUPABASE_KEY
+from config.settings import SUPABASE_MAX_CONCURRENCY, SUPABASE_KEEPALIVE_SECONDS, SUPABASE_TIMEOUT_SECONDS
+
+_client: Optional[Client] = None
+_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def get_supabase_client() -> Client:
+    """Paylaşılan Supabase istemcisini döndürür; ilk çağrıda oluşturulur."""
+    global _client
+    with _lock:
+        if _client is None:
+            http_client = httpx.Client(
+                timeout=SUPABASE_TIMEOUT_SECONDS,
+                limits=httpx.Limits(
+                    max_connections=SUPABASE_MAX_CONCURRENCY,
+                    max_keepalive_connections=SUPABASE_MAX_CONCURRENCY,
+                    keepalive_expiry=SUPABASE_KEEPALIVE_SECONDS,
+                ),
+            )
+            _client = create_client(SUPABASE_URL, SUPABASE_KEY, options=ClientOptions(httpx_client=http_client))
+        return _client
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=SUPABASE_MAX_CONCURRENCY, thread_name_prefix='supabase')
+        return _executor
+
+
+async def run_blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Bloklayıcı bir çağrıyı (ör. `query.execute`) iş parçacığı havuzunda çalıştırır
+    ve sonucunu bekler. Hatalar çağırana olduğu gibi iletilir.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(func, *args, **kwargs))
+
+
+def run_detached(func: Callable[..., Any], *args, **kwargs):
+    """
+    Sonucu beklenmeyen bir çağrıyı (ör. denetim kaydı) havuza bırakır. Çalışan bir
+    asyncio döngüsü yoksa (ör. betiklerde) çağrı hemen, bu iş parçacığında yapılır.
+    `func` kendi hatalarını ele almalıdır.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        func(*args, **kwargs)
+        return
+    _get_executor().submit(func, *args, **kwargs)
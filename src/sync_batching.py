@@ -0,0 +1,97 @@
+# src/sync_batching.py
+
+"""
+Senkronizasyon kuyruğunun sunucuya toplu gönderimi için yardımcılar.
+
+- `collapse_queue`: Aynı hayvan için kuyruğa eklenmiş birden çok eylemi tek
+  bir satırda birleştirir (ör. çevrimdışı oluşturulup üç kez düzenlenen bir
+  hayvan sunucuya tek satır olarak gider). `collapse_queue_items` ayrıca her
+  satırın hangi eylemlerden (`seq`) oluştuğunu döndürür; satır gönderildiğinde
+  bu eylemler onaylanır.
+- `uniform_chunks`: Satırları aynı sütun kümesine sahip gruplara ve bunları
+  parçalara (chunk) böler. PostgREST toplu upsert'te sütunları ilk satırdan
+  alır ve diğer satırlarda eksik olan sütunlara NULL yazar; sütun kümesine
+  göre gruplamak, gönderilmeyen alanların sunucuda silinmesini önler.
+- `AdaptiveChunkSizer`: Parça boyutunu ölçülen gidiş-dönüş süresine göre
+  ayarlar; hızlı bağlantıda büyür, yavaş veya hatalı bağlantıda küçülür.
+"""
+
+from typing import List, Dict, Any, Iterable, Iterator, Tuple
+
+
+def collapse_queue_items(queue: Iterable[Dict[str, Any]], key: str = 'uuid') -> List[Tuple[Dict[str, Any], List[int]]]:
+    """
+    Kuyruktaki eylemleri `uuid` başına tek bir satırda birleştirir. Sonraki
+    eylemlerin alanları öncekilerin üzerine yazılır; satırlar her hayvanın
+    kuyruktaki ilk eylemi sırasıyla, birleştirilen eylemlerin `seq` listesiyle döndürülür.
+    """
+    rows: Dict[Any, Tuple[Dict[str, Any], List[int]]] = {}
+    for item in queue:
+        data = item.get('data') or {}
+        row_key = data.get(key)
+        if row_key is None:
+            continue
+        if row_key in rows:
+            rows[row_key][0].update(data)
+        else:
+            rows[row_key] = (dict(data), [])
+        if 'seq' in item:
+            rows[row_key][1].append(item['seq'])
+    return list(rows.values())
+
+
+def collapse_queue(queue: Iterable[Dict[str, Any]], key: str = 'uuid') -> List[Dict[str, Any]]:
+    """`collapse_queue_items` gibi, yalnızca satırları döndürür."""
+    return [row for row, _ in collapse_queue_items(queue, key)]
+
+
+def group_by_columns(rows: Iterable[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """Satırları sütun kümelerine göre gruplar (grupların sırası ilk görülme sırasıdır)."""
+    groups: Dict[frozenset, List[Dict[str, Any]]] = {}
+    for row in rows:
+        groups.setdefault(frozenset(row), []).append(row)
+    return list(groups.values())
+
+
+class AdaptiveChunkSizer:
+    """
+    Gidiş-dönüş süresine göre parça boyutunu ayarlar.
+
+    Bir parça hedef sürenin yarısından kısa sürede gönderilirse boyut iki
+    katına çıkar, hedef süreyi aşarsa veya hata alınırsa yarıya iner.
+
+    Args:
+        initial: Başlangıç parça boyutu.
+        minimum, maximum: Parça boyutunun sınırları.
+        target_seconds: Bir isteğin sürmesi hedeflenen en uzun süre.
+    """
+
+    def __init__(self, initial: int, minimum: int, maximum: int, target_seconds: float):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.target_seconds = target_seconds
+        self.size = min(max(initial, self.minimum), self.maximum)
+
+    def record(self, rows: int, elapsed: float):
+        """Başarılı bir isteğin süresini bildirir."""
+        if elapsed > self.target_seconds:
+            self.size = max(self.minimum, self.size // 2)
+        elif elapsed < self.target_seconds / 2 and rows >= self.size:
+            # Yalnızca tam dolu parçalar büyümeyi hak eder; küçük son parçalar ölçüt değildir
+            self.size = min(self.maximum, self.size * 2)
+
+    def record_failure(self):
+        self.size = max(self.minimum, self.size // 2)
+
+
+def uniform_chunks(rows: Iterable[Dict[str, Any]], sizer: AdaptiveChunkSizer) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Aynı sütun kümesine sahip satırlardan oluşan parçalar üretir. Parça boyutu
+    her parça için `sizer`'dan yeniden okunur; böylece gönderim sırasında uyarlanır.
+    """
+    for group in group_by_columns(rows):
+        position = 0
+        while position < len(group):
+            chunk = group[position:position + sizer.size]
+            position += len(chunk)
+            yield chunk
@@ -0,0 +1,426 @@
+# src/sync_journal.py
+
+"""
+Çevrimdışı senkronizasyon kuyruğu için yalnızca-ekleme (append-only) günlüğü.
+
+Her eylem dosyaya tek satırlık bir JSON kaydı olarak eklenir; kuyruk hiçbir
+zaman baştan yazılmaz. Sunucuya iletilen kayıtlar, ayrı bir "onay" dosyasında
+tutulan sıra numarası ve bayt konumu ile işaretlenir. Onaylanmış kayıtlar
+dosyanın büyük kısmını oluşturduğunda günlük arka planda sıkıştırılır.
+
+Eylemler tek tek de onaylanabilir: sıra dışı onaylanan eylemler onay
+dosyasında `done` kümesinde tutulur ve önlerindeki tüm eylemler
+onaylandığında işaretçi ilerletilir. Sunucunun reddettiği eylemlerin deneme
+sayısı (`attempts`) tutulur; `max_attempts` denemeden sonra eylem ölü mektup
+dosyasına (`<günlük>.dead`) taşınır ve kuyruktan çıkarılır.
+
+Dosya biçimi:
+    {"journal": "<dosya kimliği>"}            <- başlık satırı
+    {"seq": 1, "action": "create", "data": {...}}
+    {"seq": 2, "action": "update", "data": {...}}
+
+Onay dosyası (`<günlük>.ack`):
+    {"journal": "<dosya kimliği>", "seq": 1, "offset": 123, "done": [3], "attempts": {"2": 1}}
+"""
+
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+from typing import List, Dict, Any, Iterable, Optional
+
+
+class SyncJournalError(Exception):
+    """Senkronizasyon günlüğü işlemleri sırasında oluşan hatalar için özel istisna sınıfı."""
+    pass
+
+
+def _serialize(obj):
+    """JSON'a doğrudan çevrilemeyen nesneler (datetime, model kayıtları) için yardımcı."""
+    if hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict() # src.models kayıtları
+    raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
+
+
+def _fsync_directory(path: str):
+    """os.replace sonrasında dizin girdisinin de diske yazılmasını sağlar (POSIX)."""
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return # Windows/Android bazı dosya sistemlerinde desteklenmez
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class SyncJournal:
+    """
+    JSON-lines tabanlı, grup halinde fsync yapan kalıcı kuyruk.
+
+    Args:
+        path: Günlük dosyasının yolu.
+        group_commit_size: Bu kadar eklemede bir fsync yapılır.
+        group_commit_interval: Bekleyen eklemeler en geç bu kadar saniye sonra fsync edilir.
+        compact_ratio: Onaylanmış baytların dosyaya oranı bu değeri aşınca sıkıştırma yapılır.
+        compact_min_bytes: Bu boyutun altındaki günlükler sıkıştırılmaz.
+        max_attempts: Sunucunun bu kadar kez reddettiği eylem ölü mektup dosyasına taşınır.
+    """
+
+    def __init__(self, path: str, group_commit_size: int = 32, group_commit_interval: float = 0.5,
+                 compact_ratio: float = 0.5, compact_min_bytes: int = 64 * 1024, max_attempts: int = 5):
+        self.path = path
+        self.ack_path = path + '.ack'
+        self.dead_letter_path = path + '.dead'
+        self.max_attempts = max_attempts
+        self.group_commit_size = group_commit_size
+        self.group_commit_interval = group_commit_interval
+        self.compact_ratio = compact_ratio
+        self.compact_min_bytes = compact_min_bytes
+
+        self._lock = threading.RLock()
+        self._unsynced = 0
+        self._fsync_timer: Optional[threading.Timer] = None
+        self._compaction_thread: Optional[threading.Thread] = None
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._open()
+        except OSError as e:
+            raise SyncJournalError(f"Senkronizasyon günlüğü açılamadı ({path}): {e}") from e
+
+    # --- Dosya yönetimi -------------------------------------------------
+
+    def _open(self):
+        if os.path.exists(self.path):
+            self._recover_torn_tail()
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            self._write_new_file(self.path, str(uuid.uuid4()), [])
+        with open(self.path, 'rb') as f:
+            header = f.readline()
+            self._header_size = len(header)
+        try:
+            self._journal_id = json.loads(header)['journal']
+        except (ValueError, KeyError, TypeError) as e:
+            raise SyncJournalError(f"Senkronizasyon günlüğünün başlığı bozuk: {e}") from e
+        self._acked_seq, self._acked_offset, self._done, self._attempts = self._read_ack()
+        pending = self._scan_pending()
+        self._next_seq = (pending[-1][0]['seq'] if pending else self._acked_seq) + 1
+        self._fh = open(self.path, 'ab')
+
+    def _write_new_file(self, path: str, journal_id: str, lines: List[bytes]):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(json.dumps({'journal': journal_id}).encode('utf-8') + b'\n')
+            for line in lines:
+                f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        _fsync_directory(path)
+
+    def _recover_torn_tail(self):
+        """Yazma sırasında çökme olduysa dosya sonundaki yarım satırı atar."""
+        with open(self.path, 'rb+') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b'\n':
+                return
+            # Son tam satırın sonunu bul
+            block = 4096
+            position = size
+            while position > 0:
+                start = max(0, position - block)
+                f.seek(start)
+                chunk = f.read(position - start)
+                index = chunk.rfind(b'\n')
+                if index != -1:
+                    f.truncate(start + index + 1)
+                    return
+                position = start
+            f.truncate(0)
+
+    def _read_ack(self) -> tuple:
+        """(sıra numarası, bayt konumu, sıra dışı onaylananlar, deneme sayıları)"""
+        try:
+            with open(self.ack_path, 'r', encoding='utf-8') as f:
+                ack = json.load(f)
+            seq = int(ack.get('seq', 0))
+            offset = int(ack.get('offset', 0))
+            done = {int(item) for item in ack.get('done', [])}
+            attempts = {int(key): int(value) for key, value in ack.get('attempts', {}).items()}
+            if ack.get('journal') != self._journal_id:
+                offset = 0 # Sıkıştırma sırasında çökme: konum geçersiz, sıra numarası yeterli
+            return seq, offset, done, attempts
+        except FileNotFoundError:
+            return 0, 0, set(), {}
+        except (ValueError, TypeError, AttributeError):
+            # Bozuk onay dosyası: hiçbir kaydı kaybetmemek için baştan oku.
+            return 0, 0, set(), {}
+
+    def _write_ack(self, seq: int, offset: int):
+        # İşaretçinin gerisinde kalan tekil onaylar ve deneme sayıları artık gereksizdir
+        self._done = {item for item in self._done if item > seq}
+        self._attempts = {key: value for key, value in self._attempts.items() if key > seq and key not in self._done}
+        tmp_path = self.ack_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'journal': self._journal_id, 'seq': seq, 'offset': offset,
+                'done': sorted(self._done), 'attempts': {str(key): value for key, value in self._attempts.items()},
+            }, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.ack_path)
+        self._acked_seq, self._acked_offset = seq, offset
+
+    def _scan_pending(self) -> List[tuple]:
+        """Onaylanmamış kayıtları (kayıt, satır sonu konumu) çiftleri olarak döndürür."""
+        results = []
+        with open(self.path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            start = self._acked_offset
+            if start < self._header_size or start > size:
+                start = self._header_size
+            else:
+                f.seek(start - 1)
+                if f.read(1) != b'\n':
+                    start = self._header_size # Satır başına denk gelmeyen konum: baştan tara
+            f.seek(start)
+            offset = start
+            for line in f:
+                offset += len(line)
+                if not line.endswith(b'\n'):
+                    break # Henüz tamamlanmamış satır
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry.get('seq', 0) > self._acked_seq:
+                    results.append((entry, offset))
+        return results
+
+    # --- Ekleme ve grup fsync --------------------------------------------
+
+    def append(self, entry: Dict[str, Any]) -> int:
+        """Kuyruğa tek bir eylem ekler ve atanan sıra numarasını döndürür."""
+        return self.append_many([entry])[-1]
+
+    def append_many(self, entries: List[Dict[str, Any]]) -> List[int]:
+        """Birden çok eylemi tek bir yazma işlemiyle ekler."""
+        with self._lock:
+            seqs = []
+            payload = []
+            for entry in entries:
+                record = dict(entry)
+                record['seq'] = self._next_seq
+                try:
+                    payload.append(json.dumps(record, ensure_ascii=False, default=_serialize).encode('utf-8') + b'\n')
+                except TypeError as e:
+                    raise SyncJournalError(f"Kuyruk kaydı JSON'a çevrilemedi: {e}") from e
+                seqs.append(self._next_seq)
+                self._next_seq += 1
+            try:
+                self._fh.write(b''.join(payload))
+                self._fh.flush() # İşletim sistemine ilet; süreç çökse bile kayıt korunur
+            except OSError as e:
+                raise SyncJournalError(f"Senkronizasyon günlüğüne yazılamadı: {e}") from e
+            self._unsynced += len(entries)
+            if self._unsynced >= self.group_commit_size:
+                self._sync_locked()
+            elif self._fsync_timer is None:
+                self._fsync_timer = threading.Timer(self.group_commit_interval, self.flush)
+                self._fsync_timer.daemon = True
+                self._fsync_timer.start()
+            return seqs
+
+    def _sync_locked(self):
+        if self._fsync_timer is not None:
+            self._fsync_timer.cancel()
+            self._fsync_timer = None
+        if self._unsynced:
+            os.fsync(self._fh.fileno())
+            self._unsynced = 0
+
+    def flush(self):
+        """Bekleyen tüm eklemeleri diske yazar (fsync)."""
+        with self._lock:
+            try:
+                self._fh.flush()
+                self._sync_locked()
+            except (OSError, ValueError) as e:
+                raise SyncJournalError(f"Senkronizasyon günlüğü diske yazılamadı: {e}") from e
+
+    # --- Okuma ve onay ----------------------------------------------------
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """Henüz onaylanmamış eylemleri eklenme sırasıyla döndürür."""
+        with self._lock:
+            try:
+                self._fh.flush()
+                return [entry for entry, _ in self._scan_pending() if entry['seq'] not in self._done]
+            except OSError as e:
+                raise SyncJournalError(f"Senkronizasyon günlüğü okunamadı: {e}") from e
+
+    def acknowledge(self, up_to_seq: int):
+        """
+        Sıra numarası `up_to_seq` ve öncesindeki tüm eylemleri işlenmiş olarak işaretler.
+        Dosya yeniden yazılmaz; yalnızca onay işaretçisi ilerletilir.
+        """
+        with self._lock:
+            if up_to_seq <= self._acked_seq:
+                return
+            try:
+                self._fh.flush()
+                offset = self._acked_offset
+                for entry, end_offset in self._scan_pending():
+                    if entry['seq'] > up_to_seq:
+                        break
+                    offset = end_offset
+                self._write_ack(up_to_seq, offset)
+                if self._done:
+                    self._advance_locked() # Ardından gelen, tek tek onaylanmış eylemler
+            except OSError as e:
+                raise SyncJournalError(f"Senkronizasyon günlüğü onayı yazılamadı: {e}") from e
+            self._maybe_schedule_compaction()
+
+    def acknowledge_items(self, seqs: Iterable[int]):
+        """
+        Verilen eylemleri tek tek onaylar. Önlerinde onaylanmamış eylem kalmayan
+        onaylar işaretçiye katılır; diğerleri onay dosyasında ayrıca tutulur.
+        """
+        with self._lock:
+            new = {seq for seq in seqs if seq > self._acked_seq} - self._done
+            if not new:
+                return
+            self._done.update(new)
+            try:
+                self._fh.flush()
+                self._advance_locked()
+            except OSError as e:
+                raise SyncJournalError(f"Senkronizasyon günlüğü onayı yazılamadı: {e}") from e
+            self._maybe_schedule_compaction()
+
+    def _advance_locked(self):
+        """İşaretçiyi ardışık onaylanmış eylemlerin sonuna ilerletir ve onay dosyasını yazar."""
+        seq, offset = self._acked_seq, self._acked_offset
+        for entry, end_offset in self._scan_pending():
+            if entry['seq'] not in self._done:
+                break
+            seq, offset = entry['seq'], end_offset
+        self._write_ack(seq, offset)
+
+    def record_failures(self, seqs: Iterable[int], error: str) -> List[Dict[str, Any]]:
+        """
+        Sunucunun reddettiği eylemlerin deneme sayısını artırır. `max_attempts`
+        sayısına ulaşan eylemler ölü mektup dosyasına eklenip onaylanır.
+
+        Returns:
+            Ölü mektup dosyasına taşınan eylemler.
+        """
+        with self._lock:
+            seqs = {seq for seq in seqs if seq > self._acked_seq and seq not in self._done}
+            if not seqs:
+                return []
+            for seq in seqs:
+                self._attempts[seq] = self._attempts.get(seq, 0) + 1
+            exhausted = {seq for seq in seqs if self._attempts[seq] >= self.max_attempts}
+            dead = []
+            try:
+                self._fh.flush()
+                if exhausted:
+                    failed_at = datetime.now().isoformat()
+                    dead = [entry for entry, _ in self._scan_pending() if entry['seq'] in exhausted]
+                    with open(self.dead_letter_path, 'ab') as f:
+                        for entry in dead:
+                            record = {'entry': entry, 'error': error, 'attempts': self._attempts[entry['seq']],
+                                      'failed_at': failed_at}
+                            f.write(json.dumps(record, ensure_ascii=False, default=_serialize).encode('utf-8') + b'\n')
+                        f.flush()
+                        os.fsync(f.fileno())
+                    self._done.update(exhausted)
+                self._advance_locked()
+            except OSError as e:
+                raise SyncJournalError(f"Senkronizasyon günlüğüne hata kaydı yazılamadı: {e}") from e
+            return dead
+
+    def attempts(self, seq: int) -> int:
+        """Eylemin sunucu tarafından kaç kez reddedildiği."""
+        with self._lock:
+            return self._attempts.get(seq, 0)
+
+    def dead_letters(self) -> List[Dict[str, Any]]:
+        """Kuyruktan çıkarılmış, sürekli reddedilen eylemler (eskiden yeniye)."""
+        with self._lock:
+            try:
+                with open(self.dead_letter_path, 'rb') as f:
+                    return [json.loads(line) for line in f if line.endswith(b'\n')]
+            except FileNotFoundError:
+                return []
+            except (OSError, ValueError) as e:
+                raise SyncJournalError(f"Ölü mektup dosyası okunamadı: {e}") from e
+
+    # --- Sıkıştırma ---------------------------------------------------------
+
+    def _needs_compaction(self) -> bool:
+        size = self._fh.tell()
+        acked_bytes = self._acked_offset - self._header_size
+        return size >= self.compact_min_bytes and acked_bytes >= size * self.compact_ratio
+
+    def _maybe_schedule_compaction(self):
+        if not self._needs_compaction():
+            return
+        if self._compaction_thread is not None and self._compaction_thread.is_alive():
+            return
+        self._compaction_thread = threading.Thread(target=self._compact_in_background, daemon=True)
+        self._compaction_thread.start()
+
+    def _compact_in_background(self):
+        try:
+            self.compact()
+        except SyncJournalError as e:
+            print(f"UYARI: Senkronizasyon günlüğü sıkıştırılamadı: {e}")
+
+    def compact(self):
+        """Onaylanmış kayıtları atarak günlüğü yalnızca bekleyen kayıtlarla yeniden yazar."""
+        with self._lock:
+            try:
+                self._fh.flush()
+                with open(self.path, 'rb') as f:
+                    f.seek(max(self._acked_offset, self._header_size))
+                    lines = [line for line in f if line.endswith(b'\n')]
+                self._fh.close()
+                new_id = str(uuid.uuid4())
+                self._write_new_file(self.path, new_id, lines)
+                self._journal_id = new_id
+                with open(self.path, 'rb') as f:
+                    self._header_size = len(f.readline())
+                self._write_ack(self._acked_seq, self._header_size)
+                self._fh = open(self.path, 'ab')
+                self._unsynced = 0
+            except OSError as e:
+                raise SyncJournalError(f"Senkronizasyon günlüğü sıkıştırılırken hata oluştu: {e}") from e
+
+    def wait_for_compaction(self, timeout: Optional[float] = None):
+        thread = self._compaction_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def close(self):
+        with self._lock:
+            if self._fh.closed:
+                return
+            try:
+                self.flush()
+            finally:
+                self._fh.close()
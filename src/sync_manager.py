@@ -5,183 +5,504 @@ Lokal veri ile Supabase veritabanı arasındaki senkronizasyonu yönetir.
 Çevrimdışı çalışmayı destekler ve bağlantı kurulduğunda verileri birleştirir.
 """
 
-from datetime import datetime
-from supabase import create_client, Client
-from config.secrets import SUPABASE_URL, SUPABASE_KEY
-from src.persistence import load_animals, save_animals, load_sync_queue, save_sync_queue # Import new queue functions
-from typing import List, Dict, Any
+import logging
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from postgrest.exceptions import APIError
+from supabase import Client
+from config.settings import (
+    SYNC_WATERMARK_OVERLAP_SECONDS, SYNC_UPSERT_BATCH_SIZE, SYNC_UPSERT_MIN_BATCH_SIZE,
+    SYNC_UPSERT_MAX_BATCH_SIZE, SYNC_UPSERT_TARGET_SECONDS, SYNC_RECONCILE_MAX_BUCKET_ROWS,
+    SYNC_RECONCILE_MAX_PREFIX_LENGTH,
+)
+from src.persistence import (
+    load_sync_queue, append_to_sync_queue, append_many_to_sync_queue, acknowledge_sync_items, record_sync_failures,
+)
+from src.repository import AnimalRepository, get_animal_repository
+from src.supabase_client import get_supabase_client, run_blocking
+from src.sync_batching import AdaptiveChunkSizer, collapse_queue_items, uniform_chunks
+from src.sync_merge import (
+    merge_remote_animals, parse_timestamp, split_tombstones, latest_timestamp,
+    comparable, diff_fields, pending_patches, utc_timestamp,
+)
+from src.sync_reconcile import (
+    BUCKET_DIGESTS_RPC, Digests, ReconcileReport, bucket_digests, bucket_bounds, differing_buckets,
+)
+from src.sync_metrics import SyncMetrics, SyncRun, get_sync_metrics, payload_size
+from typing import List, Dict, Any, Optional
 import uuid # For generating UUIDs for new animals if not already present
 
+WATERMARK_META_PREFIX = 'remote_watermark:' # Kullanıcı başına artımlı çekme işareti (lokal veritabanı meta tablosunda)
+# İstemciler `last_modified` değerini kendi saatleriyle yazdığı için sunucu saatinden biraz ileride olabilir
+WATERMARK_MAX_FUTURE = timedelta(days=1)
+
 class SyncManagerError(Exception):
     """Veri senkronizasyonu sırasında oluşan hatalar için özel istisna sınıfı."""
     pass
 
 class SyncManager:
-    def __init__(self, user_id: str):
+    def __init__(self, user_id: str, repository: Optional[AnimalRepository] = None,
+                 metrics: Optional[SyncMetrics] = None, supabase_client: Optional[Client] = None):
         if not user_id:
             raise SyncManagerError("Senkronizasyon için kullanıcı ID'si gereklidir.")
-        self.supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+        # Oturum ve bağlantı havuzu AuthManager ile paylaşılır (bkz. src/supabase_client.py)
+        self.supabase: Client = supabase_client if supabase_client is not None else get_supabase_client()
         self.user_id = user_id
+        self.repository = repository if repository is not None else get_animal_repository()
+        self.metrics = metrics if metrics is not None else get_sync_metrics()
+        # Parça boyutu senkronizasyonlar arasında korunur; bağlantı hızına göre öğrenilir
+        self.chunk_sizer = AdaptiveChunkSizer(SYNC_UPSERT_BATCH_SIZE, SYNC_UPSERT_MIN_BATCH_SIZE,
+                                              SYNC_UPSERT_MAX_BATCH_SIZE, SYNC_UPSERT_TARGET_SECONDS)
 
-    async def _get_remote_animals(self) -> List[Dict[str, Any]]:
-        """Supabase'den hayvanları çeker."""
+    async def _get_remote_animals(self, since: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Supabase'den hayvanları çeker. `since` verilirse yalnızca `last_modified`
+        değeri bu andan sonra (dahil) olan kayıtlar, silme işaretliler de dahil, çekilir.
+        """
         try:
-            response = self.supabase.table('animals').select('*').eq('user_id', self.user_id).execute()
+            query = self.supabase.table('animals').select('*').eq('user_id', self.user_id)
+            if since is not None:
+                query = query.gte('last_modified', since)
+            response = await run_blocking(query.execute) # Arayüz döngüsünü bloklamaz
             return response.data
         except Exception as e:
             raise SyncManagerError(f"Uzak veriler çekilirken hata oluştu: {e}")
 
-    def _add_to_sync_queue(self, action: str, data: Dict[str, Any]):
-        """Senkronizasyon kuyruğuna bir eylem ekler."""
-        queue = load_sync_queue()
-        queue.append({"action": action, "data": data})
-        save_sync_queue(queue)
+    def _watermark_key(self) -> str:
+        return f"{WATERMARK_META_PREFIX}{self.user_id}"
+
+    def _pull_since(self) -> Optional[str]:
+        """
+        Artımlı çekmenin alt sınırını döndürür. İlk senkronizasyonda, lokal veri
+        boşsa veya kayıtlı işaret geçersizse None döner ve tam çekme yapılır.
+        Farklı cihazların saat farkları nedeniyle kaçırılan kayıt olmaması için
+        sınır, işaretten `SYNC_WATERMARK_OVERLAP_SECONDS` kadar geriye çekilir;
+        tekrar gelen kayıtları birleştirme adımı zaten atlar.
+        """
+        watermark = self.repository.get_meta(self._watermark_key())
+        if not watermark or len(self.repository) == 0:
+            return None
+        try:
+            parsed = parse_timestamp(watermark)
+        except (TypeError, ValueError):
+            return None
+        now = datetime.now(timezone.utc)
+        if parsed > now + WATERMARK_MAX_FUTURE:
+            return None # Bozuk veya ileri tarihli işaret; güvenli taraf tam çekmedir
+        return (parsed - timedelta(seconds=SYNC_WATERMARK_OVERLAP_SECONDS)).isoformat()
+
+    def _advance_watermark(self, remote_animals: List[Dict[str, Any]]):
+        """Çekilen en yeni `last_modified` değerini bir sonraki artımlı çekme için saklar."""
+        latest = latest_timestamp(remote_animals)
+        if latest is None:
+            return
+        current = self.repository.get_meta(self._watermark_key())
+        try:
+            if current and parse_timestamp(current) >= parse_timestamp(latest):
+                return
+        except (TypeError, ValueError):
+            pass # Geçersiz işaretin üzerine yazılır
+        self.repository.set_meta(self._watermark_key(), latest)
+
+    def reset_watermark(self):
+        """Bir sonraki senkronizasyonun tam çekme yapmasını sağlar."""
+        self.repository.set_meta(self._watermark_key(), None)
+
+    def _queue_entry(self, action: str, data: Dict[str, Any], base: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Senkronizasyon günlüğüne yazılacak eylemi oluşturur. `base`, güncellenen
+        alanların düzenlemeden önceki değerleridir; sunucuya gönderilmez, yalnızca
+        alan bazlı çakışma çözümünde kullanılır.
+        """
+        # Her eylemin kalıcı bir kimliği vardır; günlükte, hata kayıtlarında ve ölü mektup listesinde eylemi tanımlar.
+        # Sunucu tarafında tekrar güvenliğini `uuid` üzerinden upsert sağlar.
+        entry = {"action": action, "op_id": str(uuid.uuid4()), "data": data}
+        if base is not None:
+            entry["base"] = base
+        return entry
+
+    def _add_to_sync_queue(self, action: str, data: Dict[str, Any], base: Optional[Dict[str, Any]] = None):
+        """Senkronizasyon günlüğünün sonuna bir eylem ekler (bkz. `_queue_entry`)."""
+        append_to_sync_queue(self._queue_entry(action, data, base))
+
+    def _add_many_to_sync_queue(self, entries: List[Dict[str, Any]]):
+        """Toplu yazmanın eylemlerini günlüğe tek bir yazma işlemiyle ekler."""
+        if entries:
+            append_many_to_sync_queue(entries)
 
     def _get_sync_queue(self) -> List[Dict[str, Any]]:
-        """Senkronizasyon kuyruğunu yükler."""
+        """Onaylanmamış senkronizasyon eylemlerini yükler."""
         return load_sync_queue()
 
-    def _clear_sync_queue(self):
-        """Senkronizasyon kuyruğunu temizler."""
-        save_sync_queue([])
+    def _acknowledge_sync_items(self, seqs: List[int]):
+        """
+        Sunucuya iletilen eylemleri tek tek onaylar. Günlük yeniden yazılmaz;
+        bir gönderim yarıda kalırsa yalnızca iletilemeyen eylemler yeniden gönderilir.
+        """
+        if seqs:
+            acknowledge_sync_items(seqs)
 
-    async def create_animal(self, animal_data: Dict[str, Any]):
-        """Offline-first create. Saves locally immediately, then queues for sync."""
+    def _prepare_create(self, animal_data: Dict[str, Any], last_modified: str) -> Dict[str, Any]:
         if 'uuid' not in animal_data or not animal_data['uuid']:
             animal_data['uuid'] = str(uuid.uuid4()) # Ensure UUID exists for new records
 
         animal_data['user_id'] = self.user_id
         animal_data['sync_status'] = 'pending_create'
-        animal_data['last_modified'] = datetime.now().isoformat()
+        animal_data['last_modified'] = last_modified
+        return animal_data
 
-        local_animals = load_animals() or []
-        local_animals.append(animal_data)
-        save_animals(local_animals)
+    def _prepare_update(self, stored, animal_uuid: str, animal_data: Dict[str, Any], last_modified: str):
+        """
+        Düzenlemenin lokal kaydını, kuyruk yamasını ve yamanın tabanını hazırlar.
+        Değişiklik yoksa None döner.
+        """
+        # Lokalde yoksa (ör. ilk lokal düzenleme) karşılaştırılacak sürüm yoktur; tüm alanlar gönderilir
+        changes = diff_fields(stored if stored is not None else {}, animal_data)
+        if not changes:
+            return None
+        record = stored.to_dict() if stored is not None else dict(animal_data)
+        record.update(changes)
+        base = {key: comparable(stored.get(key)) for key in changes} if stored is not None else None
+
+        record.update(uuid=animal_uuid, user_id=self.user_id, sync_status='pending_update', last_modified=last_modified)
+        patch = {'uuid': animal_uuid, 'user_id': self.user_id, 'last_modified': last_modified} # Upsert is keyed by uuid
+        patch.update(changes)
+        return record, patch, base, changes
+
+    async def create_animal(self, animal_data: Dict[str, Any]):
+        """Offline-first create. Saves locally immediately, then queues for sync."""
+        self._prepare_create(animal_data, utc_timestamp())
+
+        self.repository.put(animal_data) # Sadece bu kayıt yazılır, sürünün geri kalanı okunmaz
 
         self._add_to_sync_queue('create', animal_data)
 
-    async def update_animal(self, animal_uuid: str, animal_data: Dict[str, Any]):
-        """Offline-first update. Updates locally immediately, then queues for sync."""
-        animal_data['user_id'] = self.user_id # Ensure user_id is always present
-        animal_data['sync_status'] = 'pending_update'
-        animal_data['last_modified'] = datetime.now().isoformat()
+    async def update_animal(self, animal_uuid: str, animal_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Offline-first update. Updates locally immediately, then queues for sync.
 
-        local_animals = load_animals() or []
-        found = False
-        for i, animal in enumerate(local_animals):
-            if animal.get('uuid') == animal_uuid:
-                local_animals[i] = animal_data # Replace old record with updated one
-                found = True
-                break
-        if not found: # Should not happen if uuid is correctly managed
-            local_animals.append(animal_data) # Add if somehow not found (e.g., first local edit)
+        Düzenlenen kayıt lokaldeki sürümle karşılaştırılır; kuyruğa ve sunucuya
+        yalnızca değişen alanlar (ve `uuid`, `user_id`, `last_modified`) gider.
+        Türetilmiş alanlar (`sinif`, `display_name`, ...) gönderilmez.
 
-        save_animals(local_animals)
+        Returns:
+            Değişen alanlar. Değişiklik yoksa boş sözlük döner ve hiçbir şey yazılmaz.
+        """
+        prepared = self._prepare_update(self.repository.get(animal_uuid), animal_uuid, animal_data,
+                                        utc_timestamp())
+        if prepared is None:
+            return {}
+        record, patch, base, changes = prepared
+        # Kayıt varsa yerinde güncellenir, yoksa eklenir (ör. ilk lokal düzenleme)
+        self.repository.put(record)
 
-        self._add_to_sync_queue('update', animal_data)
+        self._add_to_sync_queue('update', patch, base)
+        return changes
 
-    async def process_sync_queue(self):
+    async def upsert_animals(self, animals: List[Dict[str, Any]]) -> Dict[str, int]:
         """
-        Processes pending local changes and sends them to Supabase.
+        Toplu offline-first kayıt (ör. dosyadan içe aktarma). `uuid`'si lokalde bulunan
+        kayıtlar `update_animal` gibi yalnızca değişen alanlarıyla, diğerleri
+        `create_animal` gibi eklenir. Tüm kayıtlar tek veritabanı işlemiyle, kuyruk
+        eylemleri de kayıtlar yazıldıktan hemen sonra tek bir günlük yazmasıyla eklenir.
+
+        Returns:
+            `created`, `updated` ve `unchanged` kayıt sayıları.
         """
-        queue = self._get_sync_queue()
-        if not queue:
-            print("Senkronizasyon kuyruğu boş, işlenecek öğe yok.")
-            return
+        counts = {'created': 0, 'updated': 0, 'unchanged': 0}
+        last_modified = utc_timestamp()
+        records, entries = [], []
+        for animal_data in animals:
+            stored = self.repository.get(animal_data['uuid']) if animal_data.get('uuid') else None
+            if stored is None:
+                record = self._prepare_create(animal_data, last_modified)
+                records.append(record)
+                entries.append(self._queue_entry('create', record))
+                counts['created'] += 1
+                continue
+            prepared = self._prepare_update(stored, stored.uuid, animal_data, last_modified)
+            if prepared is None:
+                counts['unchanged'] += 1
+                continue
+            record, patch, base, _ = prepared
+            records.append(record)
+            entries.append(self._queue_entry('update', patch, base))
+            counts['updated'] += 1
 
-        pending_creates = []
-        pending_updates = []
+        self.repository.put_many(records)
+        self._add_many_to_sync_queue(entries)
+        return counts
 
-        for item in queue:
-            if item['action'] == 'create':
-                pending_creates.append(item['data'])
-            elif item['action'] == 'update':
-                pending_updates.append(item['data'])
+    @contextmanager
+    def _metrics_run(self, kind: str, run: Optional[SyncRun]):
+        """Verilen çalıştırmayı kullanır; yoksa yeni bir ölçüm çalıştırması başlatır."""
+        if run is not None:
+            yield run
+        else:
+            with self.metrics.run(kind) as run:
+                yield run
+
+    async def process_sync_queue(self, run: Optional[SyncRun] = None):
+        """
+        Processes pending local changes and sends them to Supabase.
+        Süreler ve sayaçlar `run` çalıştırmasına (verilmezse yeni bir çalıştırmaya) yazılır.
+
+        Her parça gönderildiğinde içindeki eylemler hemen onaylanır. Bağlantı hatasında
+        gönderim durur ve kalan eylemler bir sonraki senkronizasyonda denenir. Sunucunun
+        reddettiği parça ikiye bölünerek reddedilen satırlar ayıklanır; bu satırların
+        eylemleri deneme sınırına (`SYNC_MAX_ATTEMPTS`) ulaşınca ölü mektup listesine taşınır.
+        """
+        with self._metrics_run('process_sync_queue', run) as run:
+            queue = self._get_sync_queue()
+            run.gauge('queue_depth', len(queue))
+            if not queue:
+                run.event('queue_empty')
+                return
+
+            # Aynı hayvan için birden çok eylem tek satırda birleştirilir; oluşturma ve
+            # güncellemeler `uuid` üzerinden upsert edildiği için ayrım gerekmez.
+            # Upsert ayrıca yarıda kalan bir gönderimin tekrarını güvenli kılar.
+            items = collapse_queue_items(item for item in queue if item['action'] in ('create', 'update'))
             # Add 'delete' logic here if implementing deletion
+            rows = [row for row, _ in items]
+            sources = {id(row): seqs for row, seqs in items}
+            run.count('queue_items_collapsed', len(queue) - len(rows))
+
+            # Gönderilecek satırı olmayan eylemler (ör. bilinmeyen eylem, uuid'siz kayıt) yalnızca onaylanır
+            covered = {seq for _, seqs in items for seq in seqs}
+            self._acknowledge_sync_items([item['seq'] for item in queue if 'seq' in item and item['seq'] not in covered])
+
+            pushed, rejected = 0, []
+            try:
+                with run.phase('push'):
+                    for chunk in uniform_chunks(rows, self.chunk_sizer):
+                        chunk_pushed, chunk_rejected = await self._push_chunk(chunk, sources, run)
+                        pushed += chunk_pushed
+                        rejected.extend(chunk_rejected)
+                    run.gauge('chunk_size', self.chunk_sizer.size)
+            except Exception as e:
+                # Onaylanmamış eylemler kuyrukta kalır, bir sonraki senkronizasyonda yalnızca onlar denenir
+                run.count('records_pushed', pushed)
+                run.count('retries', len(rows) - pushed)
+                run.event('queue_failed', logging.ERROR, error=str(e), records=len(rows) - pushed)
+                raise SyncManagerError(f"Senkronizasyon kuyruğu işlenirken hata oluştu: {e}")
+
+            run.count('records_pushed', pushed)
+            if rejected:
+                self._record_rejections(rejected, sources, run)
+                raise SyncManagerError(f"{len(rejected)} kayıt sunucu tarafından reddedildi: {rejected[0][1]}")
+            run.event('queue_acknowledged', records=len(queue), rows=len(rows))
 
+    async def _push_chunk(self, chunk: List[Dict[str, Any]], sources: Dict[int, List[int]], run: SyncRun):
+        """
+        Parçayı gönderir ve eylemlerini onaylar. Sunucu parçayı reddederse ikiye
+        bölüp yeniden dener; böylece yalnızca hatalı satırlar ayrılır.
+
+        Satırların `last_modified` değeri gönderim anıyla yenilenir. Çevrimdışı
+        yapılıp saatler sonra gönderilen bir düzenleme, düzenleme anıyla gitseydi
+        diğer cihazların artımlı çekme işaretinin gerisinde kalır ve onlara hiç
+        ulaşmazdı. Lokal kayıt yeni değeri aynı senkronizasyonun çekme adımında alır.
+
+        Returns:
+            (gönderilen satır sayısı, [(reddedilen satır, hata), ...])
+        """
+        pushed_at = utc_timestamp()
+        for row in chunk:
+            row['last_modified'] = pushed_at
         try:
-            if pending_creates:
-                print(f"Kuyruktan {len(pending_creates)} yeni hayvan oluşturuluyor...")
-                response = self.supabase.table('animals').insert(pending_creates).execute()
-                if response.data:
-                    print(f"Oluşturulan hayvanlar Supabase'e gönderildi: {len(response.data)} kayıt.")
-                else:
-                    print("Yeni hayvanlar gönderilirken Supabase'den yanıt alınamadı.")
-
-            if pending_updates:
-                print(f"Kuyruktan {len(pending_updates)} hayvan güncelleniyor...")
-                # Supabase upsert requires unique constraint, assuming 'uuid' is it.
-                # If not, will need to iterate and update individually by uuid.
-                for animal_data in pending_updates:
-                    response = self.supabase.table('animals').update(animal_data).eq('uuid', animal_data['uuid']).execute()
-                    if response.data:
-                        print(f"Hayvan güncellendi (UUID: {animal_data['uuid']})")
-                    else:
-                        print(f"Hayvan güncellenirken Supabase'den yanıt alınamadı (UUID: {animal_data['uuid']})")
-
-            self._clear_sync_queue()
-            print("Senkronizasyon kuyruğu başarıyla işlendi ve temizlendi.")
+            await self._upsert_chunk(chunk, run)
+        except APIError as e:
+            if len(chunk) == 1:
+                return 0, [(chunk[0], str(e))]
+            run.count('chunk_bisections')
+            middle = len(chunk) // 2
+            left_pushed, left_rejected = await self._push_chunk(chunk[:middle], sources, run)
+            right_pushed, right_rejected = await self._push_chunk(chunk[middle:], sources, run)
+            return left_pushed + right_pushed, left_rejected + right_rejected
+        self._acknowledge_sync_items([seq for row in chunk for seq in sources.get(id(row), [])])
+        return len(chunk), []
 
-        except Exception as e:
-            # Don't clear queue if an error occurs, will retry on next sync
-            raise SyncManagerError(f"Senkronizasyon kuyruğu işlenirken hata oluştu: {e}")
+    def _record_rejections(self, rejected: List[tuple], sources: Dict[int, List[int]], run: SyncRun):
+        """Reddedilen satırların eylemlerinin deneme sayısını artırır; sınırı aşanlar ölü mektup listesine gider."""
+        run.count('records_rejected', len(rejected))
+        for row, error in rejected:
+            dead = record_sync_failures(sources.get(id(row), []), error)
+            if dead:
+                run.count('records_dead_lettered')
+                run.event('record_dead_lettered', logging.ERROR, uuid=row.get('uuid'), error=error,
+                          op_ids=[entry.get('op_id') for entry in dead])
+            else:
+                run.event('record_rejected', logging.WARNING, uuid=row.get('uuid'), error=error)
+
+    async def _upsert_chunk(self, chunk: List[Dict[str, Any]], run: SyncRun):
+        """Bir parçayı tek istekle gönderir ve süresine göre parça boyutunu uyarlar."""
+        run.count('bytes_pushed', payload_size(chunk))
+        start = time.perf_counter()
+        try:
+            response = await run_blocking(self.supabase.table('animals').upsert(chunk, on_conflict='uuid').execute)
+        except APIError:
+            raise # Sunucu isteği yanıtladı; reddetmesi bağlantının yavaş olduğunu göstermez
+        except Exception:
+            self.chunk_sizer.record_failure()
+            raise
+        self.chunk_sizer.record(len(chunk), time.perf_counter() - start)
+        run.count('chunks')
+        if not response.data:
+            run.event('upsert_no_response', logging.WARNING, records=len(chunk))
 
     async def synchronize(self, remote_only: bool = False) -> List[Dict[str, Any]]:
         """
         Lokal ve uzak verileri senkronize eder.
         remote_only True ise sadece uzak veriyi çeker ve lokali güncellemez (queue işlemez).
+        Her çalıştırmanın aşama süreleri ve sayaçları `self.metrics` geçmişine eklenir.
         """
-        print("Senkronizasyon başlatılıyor...")
-        
-        # 1. Önce bekleyen lokal değişiklikleri sunucuya gönder
-        if not remote_only:
+        with self.metrics.run('synchronize') as run:
+            run.event('sync_started', remote_only=remote_only)
+
+            # 1. Önce bekleyen lokal değişiklikleri sunucuya gönder
+            if not remote_only:
+                try:
+                    await self.process_sync_queue(run)
+                except SyncManagerError:
+                    # Hata olsa bile uzak veriyi çekmeye çalış; kuyrukta kalanlar sonra denenecek
+                    pass
+
+            # 2. Uzak veriyi çek: işaret varsa yalnızca o andan sonra değişenler, yoksa tümü
+            since = self._pull_since()
+            run.event('pull_started', mode='full' if since is None else 'delta', since=since)
+            remote_animals = []
+            pulled = False
             try:
-                await self.process_sync_queue()
-            except SyncManagerError as e:
-                print(f"Kuyruk işlenirken hata: {e}. Senkronizasyon devam edecek, kuyrukta kalanlar sonra denenecek.")
-                # Hata olsa bile uzak veriyi çekmeye çalış
+                with run.phase('pull'):
+                    remote_animals = await self._get_remote_animals(since)
+                pulled = True
+                run.count('records_pulled', len(remote_animals))
+                run.count('bytes_pulled', payload_size(remote_animals))
+            except Exception as e:
+                # Bağlantı sorunları olabilir; bu durumda sadece lokal veriyle devam edeceğiz.
+                run.event('pull_failed', logging.WARNING, error=str(e))
+
+            # 3. Verileri birleştir
+            # Basit birleştirme: UUID'ye göre birleştir, 'last_modified' ile çakışma çözümü (bkz. src/sync_merge.py)
+            # Lokal kayıtlar bellek içi depodan uuid ile bulunur; yalnızca uzaktan gelen
+            # ve lokali geçersiz kılan kayıtlar lokale yazılır, silme işaretliler lokalden silinir.
+            # Bu, `process_sync_queue` çalıştıktan sonra uzaktaki verinin en güncel olduğunu varsayar.
+            # Gönderilemeyen yamalar varsa, yaması olan kayıtlarda çakışma alan alan çözülür;
+            # kuyruk yalnızca ilk çakışmada okunur
+            with run.phase('merge'):
+                merged = merge_remote_animals(self.repository, remote_animals,
+                                              lambda: pending_patches(self._get_sync_queue()))
+                changed_animals, deleted_uuids = split_tombstones(merged)
+            run.count('records_merged', len(changed_animals))
+            run.count('records_deleted', len(deleted_uuids))
+
+            # 4. Değişen kayıtları lokale kaydet
+            saved = True
+            if changed_animals or deleted_uuids:
+                try:
+                    with run.phase('save'):
+                        self.repository.put_many(changed_animals)
+                        self.repository.delete_many(deleted_uuids)
+                except Exception as e:
+                    saved = False
+                    run.event('save_failed', logging.WARNING, error=str(e), records=len(changed_animals))
 
-        # 2. Uzak veriyi çek
-        remote_animals = []
+            # 5. Çekilenler lokale yazıldıysa işareti ilerlet
+            if pulled and saved:
+                try:
+                    self._advance_watermark(remote_animals)
+                except Exception as e:
+                    run.event('watermark_failed', logging.WARNING, error=str(e))
+
+            run.event('sync_finished')
+            return self.repository.all()
+
+    async def _get_remote_digests(self, prefix_length: int, prefixes: Optional[List[str]], run: SyncRun) -> Digests:
+        """Sunucudaki kova özetlerini `animal_bucket_digests` RPC'si ile çeker."""
+        params = {'p_user_id': self.user_id, 'p_prefix_length': prefix_length, 'p_prefixes': prefixes}
         try:
-            remote_animals = await self._get_remote_animals()
-            print("Uzak veriler başarıyla çekildi.")
+            response = await run_blocking(self.supabase.rpc(BUCKET_DIGESTS_RPC, params).execute)
         except Exception as e:
-            print(f"UYARI: Uzak veriler çekilemedi. Bağlantı sorunları olabilir. Hata: {e}")
-            # Bu durumda sadece lokal veriyle devam edeceğiz.
-
-        # 3. Lokal veriyi yükle
-        local_animals = load_animals() or []
-
-        # 4. Verileri birleştir
-        # Basit birleştirme: UUID'ye göre birleştir, 'last_modified' ile çakışma çözümü
-        # Eğer uzaktan veri çekildiyse, uzak veri lokali geçersiz kılar, aksi takdirde lokal kullan.
-        # Bu, `process_sync_queue` çalıştıktan sonra uzaktaki verinin en güncel olduğunu varsayar.
-        
-        merged_data_dict = {animal.get('uuid'): animal for animal in local_animals}
-        
-        for remote_animal in remote_animals:
-            remote_uuid = remote_animal.get('uuid')
-            if remote_uuid:
-                if remote_uuid in merged_data_dict:
-                    # Çakışma varsa daha yeni olanı seç (basit timestamp karşılaştırması)
-                    local_last_mod = datetime.fromisoformat(merged_data_dict[remote_uuid].get('last_modified', '1970-01-01T00:00:00'))
-                    remote_last_mod = datetime.fromisoformat(remote_animal.get('last_modified', '1970-01-01T00:00:00'))
-                    
-                    if remote_last_mod > local_last_mod:
-                        merged_data_dict[remote_uuid] = remote_animal
-                else:
-                    merged_data_dict[remote_uuid] = remote_animal
-
-        final_animals = list(merged_data_dict.values())
-        
-        # 5. Birleştirilmiş veriyi lokale kaydet
-        if final_animals:
-            try:
-                save_animals(final_animals)
-                print("Birleştirilmiş veriler lokale kaydedildi.")
-            except Exception as e:
-                print(f"UYARI: Birleştirilmiş veriler lokale kaydedilirken hata oluştu: {e}")
+            raise SyncManagerError(
+                f"Kova özetleri alınamadı ({BUCKET_DIGESTS_RPC} sunucuda kurulu mu? bkz. src/sync_reconcile.py): {e}")
+        run.count('bytes_pulled', payload_size(response.data))
+        return {row['bucket']: (int(row['row_count']), row['digest']) for row in response.data or []}
+
+    async def _get_bucket_animals(self, bucket: str) -> List[Dict[str, Any]]:
+        """Bir kovadaki tüm uzak kayıtları (silme işaretliler dahil) çeker."""
+        lower, upper = bucket_bounds(bucket)
+        try:
+            query = self.supabase.table('animals').select('*').eq('user_id', self.user_id).gte('uuid', lower)
+            if upper is not None:
+                query = query.lt('uuid', upper)
+            response = await run_blocking(query.execute)
+            return response.data
+        except Exception as e:
+            raise SyncManagerError(f"Kova kayıtları çekilirken hata oluştu ({bucket}): {e}")
+
+    async def reconcile(self, max_bucket_rows: int = SYNC_RECONCILE_MAX_BUCKET_ROWS,
+                        max_prefix_length: int = SYNC_RECONCILE_MAX_PREFIX_LENGTH) -> ReconcileReport:
+        """
+        Lokal ve uzak sürünün aynı olduğunu kova özetleriyle doğrular; yalnızca
+        farklı çıkan kovaların kayıtlarını indirip `synchronize` ile aynı kurallarla
+        birleştirir. Zaman damgası işaretine dayanmadığı için artımlı çekmenin
+        kaçırabileceği kayıtları (ör. saat farkı, elle düzeltilen satırlar) da bulur.
+        """
+        report = ReconcileReport()
+        with self.metrics.run('reconcile') as run:
+            local_animals = self.repository.all()
+            prefix_length, prefixes = 1, None
+            to_download: List[str] = []
+            with run.phase('digests'):
+                while True:
+                    report.levels += 1
+                    remote = await self._get_remote_digests(prefix_length, prefixes, run)
+                    local = bucket_digests(local_animals, prefix_length, prefixes)
+                    report.buckets_compared += len(set(local) | set(remote))
+                    differing = differing_buckets(local, remote)
+                    split = []
+                    for bucket in differing:
+                        size = max(local.get(bucket, (0, ''))[0], remote.get(bucket, (0, ''))[0])
+                        if size <= max_bucket_rows or prefix_length >= max_prefix_length:
+                            to_download.append(bucket)
+                        else:
+                            split.append(bucket)
+                    if not split:
+                        break
+                    prefix_length, prefixes = prefix_length + 1, split
+            run.count('buckets_compared', report.buckets_compared)
+            run.count('buckets_differing', len(to_download))
+            report.downloaded_buckets = to_download
+            if not to_download:
+                run.event('reconcile_consistent', levels=report.levels)
+                return report
+
+            remote_animals = []
+            with run.phase('pull'):
+                for bucket in to_download:
+                    remote_animals.extend(await self._get_bucket_animals(bucket))
+            report.records_pulled = len(remote_animals)
+            run.count('records_pulled', len(remote_animals))
+            run.count('bytes_pulled', payload_size(remote_animals))
 
-        print("Senkronizasyon işlemi tamamlandı.")
-        return final_animals
+            with run.phase('merge'):
+                merged = merge_remote_animals(self.repository, remote_animals,
+                                              lambda: pending_patches(self._get_sync_queue()))
+                changed_animals, deleted_uuids = split_tombstones(merged)
+                remote_uuids = {str(animal.get('uuid')).lower() for animal in remote_animals}
+                downloaded = tuple(to_download)
+                report.local_only = sorted(
+                    animal.uuid for animal in local_animals
+                    if str(animal.uuid).lower().startswith(downloaded) and str(animal.uuid).lower() not in remote_uuids
+                )
+            with run.phase('save'):
+                self.repository.put_many(changed_animals)
+                self.repository.delete_many(deleted_uuids)
+            report.records_updated = len(changed_animals)
+            report.records_deleted = len(deleted_uuids)
+            run.count('records_merged', len(changed_animals))
+            run.count('records_deleted', len(deleted_uuids))
+            run.event('reconcile_repaired', buckets=to_download, updated=len(changed_animals),
+                      deleted=len(deleted_uuids), local_only=len(report.local_only))
+            return report
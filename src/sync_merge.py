@@ -0,0 +1,214 @@
+# src/sync_merge.py
+
+"""
+Lokal ve uzak hayvan kayıtlarını birleştirme kuralları.
+
+Sunucuda silinen kayıtlar satır olarak kalır ve `is_deleted` ile işaretlenir
+(tombstone); böylece artımlı çekmede silmeler de diğer değişiklikler gibi
+`last_modified` sırasıyla gelir.
+
+Düzenlemeler sunucuya tüm kayıt yerine yalnızca değişen alanlar (yama) olarak
+gönderilir. Henüz gönderilemeyen bir yamanın olduğu kayıtta uzak sürüm daha
+yeniyse çakışma alan alan çözülür (bkz. `merge_remote_animals`).
+
+Supabase istemcisine bağımlı olmadığı için senkronizasyon dışında
+(ör. kıyaslama testlerinde) da kullanılabilir.
+"""
+
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Callable, Iterable, Optional, Tuple
+
+_EPOCH = '1970-01-01T00:00:00+00:00'
+TOMBSTONE_FIELD = 'is_deleted' # Sunucuda silinen kayıtlar satır silinmeden bu alanla işaretlenir
+
+# Kayıttan hesaplanan alanlar; düzenleme sayılmaz ve sunucuya gönderilmez
+DERIVED_FIELDS = frozenset(('sinif', 'display_name', 'son_tohumlama', 'beklenen_dogum_tarihi'))
+# Her yamada bulunan kimlik ve sürüm alanları; kendileri değişiklik sayılmaz
+PATCH_KEY_FIELDS = ('uuid', 'user_id', 'last_modified')
+_NON_EDITABLE_FIELDS = DERIVED_FIELDS | frozenset(PATCH_KEY_FIELDS) | frozenset(('sync_status',))
+
+
+def utc_timestamp(now: Optional[datetime] = None) -> str:
+    """
+    Yeni bir `last_modified` değeri: saat dilimi bilgisiyle UTC (ör. '2024-01-01T09:00:00+00:00').
+    Cihazların yerel saat dilimi farklı olsa da değerler birbiriyle ve sunucuyla karşılaştırılabilir.
+    """
+    return (now or datetime.now(timezone.utc)).astimezone(timezone.utc).isoformat()
+
+
+def parse_timestamp(value: Any) -> datetime:
+    """
+    `last_modified` değerini karşılaştırılabilir, saat dilimli (UTC) bir datetime'a çevirir.
+
+    Supabase (timestamptz) ve `utc_timestamp` saat dilimli değer üretir. Eski
+    sürümler lokal düzenlemeleri saat dilimi bilgisi olmadan, cihazın yerel
+    saatiyle (`datetime.now()`) yazıyordu; bu değerler yazıldıkları cihazın
+    yerel saati kabul edilip UTC'ye çevrilir.
+    """
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        parsed = datetime.fromisoformat(value or _EPOCH)
+    if parsed.tzinfo is None:
+        parsed = parsed.astimezone() # Eski lokal değer: cihazın yerel saati
+    return parsed.astimezone(timezone.utc)
+
+
+def comparable(value: Any) -> Any:
+    """
+    Değeri JSON'daki karşılığına çevirir (datetime -> ISO metni, model -> sözlük);
+    böylece lokal, kuyruktaki ve sunucudan gelen değerler karşılaştırılabilir.
+    """
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if hasattr(value, 'to_dict'):
+        value = value.to_dict()
+    if isinstance(value, dict):
+        return {key: comparable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [comparable(item) for item in value]
+    return value
+
+
+def _edit_matches(stored: Any, edited: Any) -> bool:
+    """Düzenlenen değer kayıttakiyle aynı mı? Metin kutularından gelen değerler `str` karşılığıyla da eşleşir."""
+    if comparable(stored) == comparable(edited):
+        return True
+    # Düzenleme ekranı değerleri `str(value)` olarak gösterip metin olarak geri verir
+    return isinstance(edited, str) and not isinstance(stored, str) and edited == str(stored)
+
+
+def diff_fields(stored: Any, edited: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Düzenlenmiş kayıtta, kayıtlı sürüme göre değişen alanları döndürür.
+    Türetilmiş alanlar ve kimlik/sürüm alanları yok sayılır; kayıtta olup
+    düzenlenmiş kayıtta olmayan alanlar değişmemiş sayılır.
+    """
+    changes = {}
+    for key, value in edited.items():
+        if key in _NON_EDITABLE_FIELDS:
+            continue
+        if not _edit_matches(stored.get(key), value):
+            changes[key] = value
+    return changes
+
+
+def pending_patches(queue: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Kuyrukta bekleyen güncelleme yamalarını `uuid` başına birleştirir.
+
+    Returns:
+        `uuid` -> {'fields': değişen alanlar, 'base': alanların düzenlemeden önceki
+        değerleri, 'last_modified': en son düzenlemenin zamanı}
+    """
+    patches: Dict[str, Dict[str, Any]] = {}
+    for item in queue:
+        if item.get('action') != 'update':
+            continue
+        data = item.get('data') or {}
+        animal_uuid = data.get('uuid')
+        if not animal_uuid:
+            continue
+        patch = patches.setdefault(animal_uuid, {'fields': {}, 'base': {}, 'last_modified': None})
+        base = item.get('base') or {}
+        for key, value in data.items():
+            if key in PATCH_KEY_FIELDS:
+                continue
+            patch['fields'][key] = value
+            if key in base:
+                patch['base'].setdefault(key, base[key]) # İlk düzenlemeden önceki değer
+        if data.get('last_modified'):
+            patch['last_modified'] = data['last_modified']
+    return patches
+
+
+def _merge_fields(remote_animal: Dict[str, Any], patch: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Uzak kaydı, henüz gönderilmemiş lokal yama ile alan alan birleştirir.
+
+    Yamadaki bir alan, sunucuda o alan değişmemişse (uzak değer düzenlemeden
+    önceki değerle aynıysa) veya lokal düzenleme daha yeniyse lokal değerini
+    korur; aksi halde uzak değer kazanır. Yamada olmayan alanlar uzaktan alınır.
+    """
+    merged = dict(remote_animal)
+    remote_last_mod = parse_timestamp(remote_animal.get('last_modified'))
+    local_newer = patch.get('last_modified') is not None and parse_timestamp(patch['last_modified']) >= remote_last_mod
+    kept = False
+    for key, value in patch['fields'].items():
+        unchanged_remotely = key in patch['base'] and comparable(remote_animal.get(key)) == comparable(patch['base'][key])
+        if unchanged_remotely or local_newer:
+            merged[key] = value
+            kept = True
+    if kept:
+        merged['sync_status'] = 'pending_update' # Korunan alanlar bir sonraki gönderimde sunucuya gider
+    return merged
+
+
+def merge_remote_animals(local_animals, remote_animals: Iterable[Dict[str, Any]],
+                         load_pending: Optional[Callable[[], Dict[str, Dict[str, Any]]]] = None) -> List[Dict[str, Any]]:
+    """
+    Uzak kayıtları lokal kayıtlarla `uuid` üzerinden karşılaştırır.
+
+    Args:
+        local_animals: `uuid` ile `get` yapılabilen lokal kayıtlar (AnimalRepository veya sözlük).
+        remote_animals: Sunucudan gelen kayıtlar.
+        load_pending: Henüz gönderilmemiş yamaları (bkz. `pending_patches`) döndüren
+            fonksiyon. Verilirse yalnızca ilk çakışmada bir kez çağrılır ve yaması
+            olan kayıtlarda çakışma alan alan çözülür.
+
+    Returns:
+        Lokalde olmayan veya lokaldekinden daha yeni olan, yani lokale
+        yazılması gereken uzak kayıtlar.
+    """
+    changed_animals = []
+    pending = None
+    for remote_animal in remote_animals:
+        remote_uuid = remote_animal.get('uuid')
+        if not remote_uuid:
+            continue
+        local_animal = local_animals.get(remote_uuid)
+        if local_animal is None:
+            changed_animals.append(remote_animal)
+            continue
+        # Çakışma varsa daha yeni olanı seç (basit timestamp karşılaştırması)
+        local_last_mod = parse_timestamp(local_animal.get('last_modified'))
+        remote_last_mod = parse_timestamp(remote_animal.get('last_modified'))
+        if remote_last_mod > local_last_mod:
+            if pending is None and load_pending is not None:
+                pending = load_pending()
+            patch = pending.get(remote_uuid) if pending else None
+            if patch is not None and not is_tombstone(remote_animal):
+                remote_animal = _merge_fields(remote_animal, patch)
+            changed_animals.append(remote_animal)
+    return changed_animals
+
+
+def is_tombstone(animal: Dict[str, Any]) -> bool:
+    """Sunucuda silinmiş olarak işaretlenmiş (soft delete) kayıt mı?"""
+    return bool(animal.get(TOMBSTONE_FIELD))
+
+
+def split_tombstones(animals: Iterable[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Kayıtları lokale yazılacaklar ve lokalden silinecek `uuid`'ler olarak ayırır."""
+    upserts, deleted = [], []
+    for animal in animals:
+        if is_tombstone(animal):
+            deleted.append(animal['uuid'])
+        else:
+            upserts.append(animal)
+    return upserts, deleted
+
+
+def latest_timestamp(animals: Iterable[Dict[str, Any]]) -> Optional[str]:
+    """Kayıtlar arasındaki en yeni `last_modified` değerini (sunucudaki biçimiyle) döndürür."""
+    latest, latest_parsed = None, None
+    for animal in animals:
+        value = animal.get('last_modified')
+        if not value:
+            continue
+        parsed = parse_timestamp(value)
+        if latest_parsed is None or parsed > latest_parsed:
+            latest, latest_parsed = value, parsed
+    if latest is not None and not isinstance(latest, str):
+        latest = latest.isoformat()
+    return latest
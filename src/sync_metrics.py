@@ -0,0 +1,179 @@
+# src/sync_metrics.py
+
+"""
+Senkronizasyon çalıştırmaları için ölçümler.
+
+Her `synchronize` (veya tek başına `process_sync_queue`) çağrısı bir
+`SyncRun` kaydı üretir: aşama süreleri (`push`, `pull`, `merge`, `save`),
+sayaçlar (gönderilen/çekilen/birleştirilen kayıt sayısı, bayt miktarları,
+kuyruk derinliği, yeniden denenecek eylemler) ve yapılandırılmış olaylar.
+Tamamlanan çalıştırmalar bellekte sınırlı bir geçmişte tutulur ve istenirse
+bir JSONL dosyasına satır satır eklenir.
+
+Örnek:
+    with metrics.run('synchronize') as run:
+        with run.phase('pull'):
+            remote = fetch()
+        run.count('records_pulled', len(remote))
+        run.event('pull_finished', records=len(remote))
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Iterator
+
+from config.settings import SYNC_METRICS_FILE, SYNC_METRICS_HISTORY
+
+logger = logging.getLogger(__name__)
+
+
+def payload_size(payload: Any) -> int:
+    """Yükün JSON olarak kodlandığındaki yaklaşık bayt boyutu."""
+    return len(json.dumps(payload, default=str, ensure_ascii=False).encode('utf-8'))
+
+
+class SyncRun:
+    """Tek bir senkronizasyon çalıştırmasının süre, sayaç ve olay kayıtları."""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.started_at = datetime.now().isoformat()
+        self.status: Optional[str] = None
+        self.error: Optional[str] = None
+        self.duration_s: Optional[float] = None
+        self.phases: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self.events: List[Dict[str, Any]] = []
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Bloğun süresini `name` aşamasına ekler (aynı aşama birden çok kez ölçülebilir)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def count(self, name: str, amount: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def gauge(self, name: str, value: int):
+        """Toplanmayan, anlık bir değeri kaydeder (ör. kuyruk derinliği)."""
+        self.counters[name] = value
+
+    def event(self, name: str, level: int = logging.INFO, **fields):
+        """Yapılandırılmış bir olay kaydeder ve günlüğe yazar."""
+        event = {'t': round(time.perf_counter() - self._started, 6), 'event': name}
+        event.update(fields)
+        self.events.append(event)
+        logger.log(level, "sync %s %s", name, fields)
+
+    def finish(self, status: str, error: Optional[BaseException] = None):
+        self.status = status
+        self.error = str(error) if error is not None else None
+        self.duration_s = time.perf_counter() - self._started
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'kind': self.kind,
+            'started_at': self.started_at,
+            'status': self.status,
+            'error': self.error,
+            'duration_s': self.duration_s,
+            'phases': dict(self.phases),
+            'counters': dict(self.counters),
+            'events': list(self.events),
+        }
+
+
+class SyncMetrics:
+    """
+    Tamamlanan senkronizasyon çalıştırmalarının bellek içi geçmişi.
+
+    Args:
+        history_size: Bellekte tutulacak en fazla çalıştırma sayısı.
+        metrics_file: Verilirse her çalıştırma bu JSONL dosyasına eklenir.
+    """
+
+    def __init__(self, history_size: int = 50, metrics_file: Optional[str] = None):
+        self.metrics_file = metrics_file
+        self._history: deque = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def run(self, kind: str) -> Iterator[SyncRun]:
+        """Bir çalıştırma başlatır; blok bitince (hata olsa bile) geçmişe kaydeder."""
+        run = SyncRun(kind)
+        try:
+            yield run
+        except BaseException as e:
+            run.finish('error', e)
+            self.record(run)
+            raise
+        run.finish('ok')
+        self.record(run)
+
+    def record(self, run: SyncRun):
+        entry = run.to_dict()
+        with self._lock:
+            self._history.append(entry)
+            if self.metrics_file:
+                self._write(entry)
+
+    def _write(self, entry: Dict[str, Any]):
+        try:
+            directory = os.path.dirname(self.metrics_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.metrics_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, default=str, ensure_ascii=False) + '\n')
+        except OSError as e:
+            # Ölçümler yazılamadı diye senkronizasyon başarısız sayılmamalı
+            logger.warning(f"Senkronizasyon ölçümleri yazılamadı: {e}")
+
+    def history(self) -> List[Dict[str, Any]]:
+        """Tamamlanan çalıştırmalar, eskiden yeniye."""
+        with self._lock:
+            return list(self._history)
+
+    def last_run(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._history[-1] if self._history else None
+
+    def summary(self) -> Dict[str, Any]:
+        """Geçmişteki çalıştırmalar için aşama başına ortalama süre ve toplam sayaçlar."""
+        history = self.history()
+        phase_totals: Dict[str, float] = {}
+        counter_totals: Dict[str, int] = {}
+        for entry in history:
+            for name, seconds in entry['phases'].items():
+                phase_totals[name] = phase_totals.get(name, 0.0) + seconds
+            for name, value in entry['counters'].items():
+                counter_totals[name] = counter_totals.get(name, 0) + value
+        runs = len(history)
+        return {
+            'runs': runs,
+            'errors': sum(1 for entry in history if entry['status'] != 'ok'),
+            'mean_duration_s': sum(entry['duration_s'] for entry in history) / runs if runs else 0.0,
+            'mean_phase_s': {name: total / runs for name, total in phase_totals.items()},
+            'counters': counter_totals,
+        }
+
+
+_metrics: Optional[SyncMetrics] = None
+_metrics_lock = threading.Lock()
+
+def get_sync_metrics() -> SyncMetrics:
+    """Uygulama genelinde paylaşılan ölçüm geçmişini döndürür."""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = SyncMetrics(SYNC_METRICS_HISTORY, SYNC_METRICS_FILE)
+        return _metrics
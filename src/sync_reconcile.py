@@ -0,0 +1,161 @@
+# src/sync_reconcile.py
+
+"""
+Lokal ve uzak sürünün tutarlılığını, kayıtların tamamını indirmeden doğrular.
+
+Kayıtlar `uuid` öneklerine göre kovalara (bucket) ayrılır. Her kova için
+kayıt sayısı ve sıralı (`uuid`, `last_modified`) çiftlerinin özeti (digest)
+hem lokalde hem de sunucuda (`animal_bucket_digests` RPC'si, bkz.
+`BUCKET_DIGESTS_SQL`) hesaplanır. Özetler önce 1 karakterlik öneklerle
+(16 kova) karşılaştırılır; farklı olan kovalar bir sonraki seviyede daha
+küçük kovalara bölünür. Kova yeterince küçüldüğünde yalnızca o kovanın
+kayıtları indirilir. Tutarlı bir sürü için maliyet tek bir 16 satırlık
+yanıttır; birkaç farklı kayıt için de birkaç kilobayt.
+
+Özet biçimi sunucudaki SQL ile birebir aynı olmalıdır:
+    satır  = "<uuid>|<last_modified, UTC, YYYY-MM-DDTHH:MM:SS.ffffff>"
+    özet   = md5(satırlar uuid'e göre sıralı, "\\n" ile birleştirilmiş)[:16]
+Sunucuda silme işaretli (tombstone) satırlar lokalde bulunmadığı için hesaba katılmaz.
+"""
+
+import hashlib
+from collections import defaultdict
+from typing import List, Dict, Any, Iterable, Optional, Sequence, Tuple
+
+from src.sync_merge import parse_timestamp, is_tombstone
+
+BUCKET_DIGESTS_RPC = 'animal_bucket_digests'
+DIGEST_LENGTH = 16
+_HEX_DIGITS = '0123456789abcdef'
+_TIMESTAMP_FORMAT = '%Y-%m-%dT%H:%M:%S.%f'
+
+# Sunucuda bir kez çalıştırılması gereken fonksiyon (Supabase SQL düzenleyicisi veya migration).
+# `security invoker` (varsayılan) olduğu için satır düzeyi güvenlik kuralları geçerlidir.
+BUCKET_DIGESTS_SQL = """
+create or replace function animal_bucket_digests(p_user_id text, p_prefix_length int, p_prefixes text[] default null)
+returns table (bucket text, row_count bigint, digest text)
+language sql stable as $$
+    select left(uuid::text, p_prefix_length) as bucket,
+           count(*) as row_count,
+           left(md5(string_agg(
+               uuid::text || '|' || coalesce(to_char(last_modified at time zone 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS.US'), ''),
+               E'\\n' order by uuid::text collate "C")), 16) as digest
+    from animals
+    where user_id::text = p_user_id
+      and not coalesce(is_deleted, false)
+      and (p_prefixes is null or left(uuid::text, p_prefix_length - 1) = any(p_prefixes))
+    group by 1
+$$;
+"""
+
+# Kova -> (kayıt sayısı, özet)
+Digests = Dict[str, Tuple[int, str]]
+
+
+def digest_line(uuid: str, last_modified: Any) -> str:
+    """Bir kaydın özete giren satırı; sunucudaki `to_char` biçimiyle aynıdır."""
+    if not last_modified:
+        return f"{uuid}|"
+    return f"{uuid}|{parse_timestamp(last_modified).strftime(_TIMESTAMP_FORMAT)}"
+
+
+def bucket_digests(records: Iterable[Dict[str, Any]], prefix_length: int,
+                   prefixes: Optional[Sequence[str]] = None) -> Digests:
+    """
+    Kayıtların kova özetlerini hesaplar. `prefixes` verilirse yalnızca bu
+    öneklerle (uzunluğu `prefix_length - 1`) başlayan kayıtlar hesaba katılır.
+    Silme işaretli kayıtlar atlanır.
+    """
+    allowed = set(prefixes) if prefixes is not None else None
+    lines: Dict[str, List[Tuple[str, str]]] = defaultdict(list)
+    for record in records:
+        uuid = str(record.get('uuid') or '').lower()
+        if not uuid or is_tombstone(record):
+            continue
+        if allowed is not None and uuid[:prefix_length - 1] not in allowed:
+            continue
+        lines[uuid[:prefix_length]].append((uuid, digest_line(uuid, record.get('last_modified'))))
+    digests = {}
+    for bucket, bucket_lines in lines.items():
+        bucket_lines.sort() # uuid'e göre, sunucudaki `order by uuid::text collate "C"` gibi
+        digest = hashlib.md5('\n'.join(line for _, line in bucket_lines).encode('utf-8')).hexdigest()[:DIGEST_LENGTH]
+        digests[bucket] = (len(bucket_lines), digest)
+    return digests
+
+
+def remote_bucket_digests(rows: Iterable[Dict[str, Any]], user_id: str, prefix_length: int,
+                          prefixes: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+    """
+    `animal_bucket_digests` RPC'sinin Python karşılığı; sunucu fonksiyonu
+    kurulmamış ortamlarda ve testlerde yerine kullanılır.
+    """
+    owned = [row for row in rows if str(row.get('user_id')) == str(user_id)]
+    return [
+        {'bucket': bucket, 'row_count': count, 'digest': digest}
+        for bucket, (count, digest) in sorted(bucket_digests(owned, prefix_length, prefixes).items())
+    ]
+
+
+def differing_buckets(local: Digests, remote: Digests) -> List[str]:
+    """Özeti veya kayıt sayısı farklı olan ya da yalnızca bir tarafta bulunan kovalar."""
+    return sorted(bucket for bucket in set(local) | set(remote) if local.get(bucket) != remote.get(bucket))
+
+
+def _to_uuid_shape(hex_digits: str) -> str:
+    hex_digits = hex_digits.ljust(32, '0')
+    return f"{hex_digits[:8]}-{hex_digits[8:12]}-{hex_digits[12:16]}-{hex_digits[16:20]}-{hex_digits[20:32]}"
+
+
+def bucket_bounds(bucket: str) -> Tuple[str, Optional[str]]:
+    """
+    Kovadaki `uuid`'leri kapsayan [alt, üst) aralığı. Aralık filtresi hem `uuid`
+    hem metin tipli sütunlarda çalışır (LIKE `uuid` tipinde desteklenmez).
+    Son kovanın (ör. "ff") üst sınırı yoktur.
+    """
+    digits = bucket.lower()
+    upper = None
+    # Öneki bir artır: "3f" -> "40", "ff" -> üst sınır yok
+    for position in range(len(digits) - 1, -1, -1):
+        index = _HEX_DIGITS.index(digits[position])
+        if index < len(_HEX_DIGITS) - 1:
+            upper = _to_uuid_shape(digits[:position] + _HEX_DIGITS[index + 1])
+            break
+    return _to_uuid_shape(digits), upper
+
+
+class ReconcileReport:
+    """
+    Bir tutarlılık kontrolünün sonucu.
+
+    Attributes:
+        levels: Sorgulanan özet seviyesi sayısı.
+        buckets_compared: Karşılaştırılan kova sayısı (tüm seviyeler).
+        downloaded_buckets: Kayıtları indirilen kovalar.
+        records_pulled, records_updated, records_deleted: İndirilen ve lokale uygulanan kayıtlar.
+        local_only: Sunucuda bulunmayan lokal kayıtlar (ör. henüz gönderilmemiş oluşturmalar).
+    """
+
+    def __init__(self):
+        self.levels = 0
+        self.buckets_compared = 0
+        self.downloaded_buckets: List[str] = []
+        self.records_pulled = 0
+        self.records_updated = 0
+        self.records_deleted = 0
+        self.local_only: List[str] = []
+
+    @property
+    def consistent(self) -> bool:
+        return not self.downloaded_buckets
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'consistent': self.consistent,
+            'levels': self.levels,
+            'buckets_compared': self.buckets_compared,
+            'downloaded_buckets': list(self.downloaded_buckets),
+            'records_pulled': self.records_pulled,
+            'records_updated': self.records_updated,
+            'records_deleted': self.records_deleted,
+            'local_only': list(self.local_only),
+        }
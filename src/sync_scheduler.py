@@ -0,0 +1,167 @@
+# src/sync_scheduler.py
+
+"""
+Uygulama boyunca çalışan arka plan senkronizasyon zamanlayıcısı.
+
+Ekranlar senkronizasyonu beklemez; lokal veriyi hemen gösterir ve
+`request` ile bir senkronizasyon ister. Zamanlayıcı:
+
+- Kısa süre içinde gelen istekleri birleştirir (debounce); ör. ekranlar
+  arasında hızlı gezinme veya art arda düzenlemeler tek bir senkronizasyon olur.
+- Aynı anda en fazla bir senkronizasyon çalıştırır; çalışırken gelen
+  istekler bittikten sonra tek bir ek çalıştırmaya dönüşür.
+- Başarısız çalıştırmalardan sonra üstel olarak artan bir süre bekleyip
+  yeniden dener. Bağlantının geri geldiği bildirilirse bekleme iptal edilir.
+- Her senkronizasyondan sonra dinleyicilere güncel kayıtları bildirir.
+
+Zamanlayıcı çalışan asyncio döngüsünde (Kivy'nin async döngüsü) çalışır;
+dinleyiciler de aynı iş parçacığında çağrıldığı için arayüzü doğrudan güncelleyebilir.
+"""
+
+import asyncio
+import logging
+import random
+from typing import List, Dict, Any, Callable, Optional
+
+from config.settings import SYNC_DEBOUNCE_SECONDS, SYNC_BACKOFF_INITIAL_SECONDS, SYNC_BACKOFF_MAX_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# `synchronize` bu hataları yutup lokal veriyle devam eder; zamanlayıcı için çalıştırma başarısızdır
+FAILURE_EVENTS = frozenset(('queue_failed', 'pull_failed', 'save_failed'))
+
+
+class SyncScheduler:
+    """
+    `SyncManager.synchronize` çağrılarını tek noktadan yöneten zamanlayıcı.
+
+    Args:
+        sync_manager: Senkronizasyonu yapan yönetici.
+        debounce_seconds: Son istekten sonra senkronizasyona başlamadan önce beklenecek süre.
+        backoff_initial, backoff_max: Başarısızlıktan sonra yeniden deneme bekleme süresinin sınırları.
+        jitter: Bekleme süresine eklenen rastgele pay (oran); cihazların aynı anda denemesini önler.
+    """
+
+    def __init__(self, sync_manager, debounce_seconds: float = SYNC_DEBOUNCE_SECONDS,
+                 backoff_initial: float = SYNC_BACKOFF_INITIAL_SECONDS,
+                 backoff_max: float = SYNC_BACKOFF_MAX_SECONDS, jitter: float = 0.1):
+        self.sync_manager = sync_manager
+        self.debounce_seconds = debounce_seconds
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.reasons: List[str] = [] # Bir sonraki çalıştırmayı tetikleyen istekler
+        self._listeners: List[Callable[[List[Dict[str, Any]]], Any]] = []
+        self._timer: Optional[asyncio.Task] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._pending = False
+        self._stopped = False
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    def add_listener(self, callback: Callable[[List[Dict[str, Any]]], Any]):
+        """Her senkronizasyondan sonra güncel kayıtlarla çağrılacak fonksiyonu ekler."""
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[List[Dict[str, Any]]], Any]):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def request(self, reason: str = 'manual', delay: Optional[float] = None):
+        """
+        Bir senkronizasyon ister. İstekler `delay` (verilmezse `debounce_seconds`)
+        süresi boyunca birleştirilir. Geri çekilme (backoff) beklemesi sürerken gelen
+        istekler beklemeyi kısaltmaz; bunun için `connectivity_restored` kullanılır.
+        """
+        if self._stopped:
+            return
+        self.reasons.append(reason)
+        if self.running:
+            self._pending = True # Çalışan senkronizasyon bitince bir kez daha
+            return
+        if self.failures and self._timer is not None and not self._timer.done():
+            return # Yeniden deneme zaten zamanlandı
+        self._schedule(self.debounce_seconds if delay is None else delay)
+
+    def connectivity_restored(self):
+        """Bağlantı geri geldiğinde çağrılır: geri çekilmeyi sıfırlar ve hemen senkronize eder."""
+        self.failures = 0
+        self._cancel_timer()
+        self.request('connectivity', delay=0)
+
+    def stop(self):
+        """Zamanlanmış ve çalışan senkronizasyonları iptal eder (ör. oturum kapatıldığında)."""
+        self._stopped = True
+        self._cancel_timer()
+        if self._worker is not None:
+            self._worker.cancel()
+        self._listeners.clear()
+
+    def backoff_delay(self) -> float:
+        """Art arda `failures` başarısızlıktan sonra yeniden denemeden önce beklenecek süre."""
+        delay = min(self.backoff_max, self.backoff_initial * 2 ** max(0, self.failures - 1))
+        return delay * (1 + random.uniform(0, self.jitter)) if self.jitter else delay
+
+    def _cancel_timer(self):
+        if self._timer is not None and not self._timer.done():
+            self._timer.cancel()
+        self._timer = None
+
+    def _schedule(self, delay: float):
+        self._cancel_timer()
+        self._timer = asyncio.create_task(self._start_after(delay))
+
+    async def _start_after(self, delay: float):
+        await asyncio.sleep(delay)
+        self._timer = None
+        if not self._stopped and not self.running:
+            self._worker = asyncio.create_task(self._run())
+
+    async def _run(self):
+        reasons, self.reasons = self.reasons, []
+        self._pending = False
+        animals = None
+        error = None
+        try:
+            animals = await self.sync_manager.synchronize()
+            last_run = self.sync_manager.metrics.last_run() or {}
+            failed = [event for event in last_run.get('events', []) if event['event'] in FAILURE_EVENTS]
+            if failed:
+                error = failed[0].get('error') or failed[0]['event']
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = str(e)
+
+        if error is None:
+            self.failures = 0
+            self.last_error = None
+        else:
+            self.failures += 1
+            self.last_error = error
+            logger.warning(f"Senkronizasyon başarısız ({self.failures}. deneme, tetikleyen: {reasons}): {error}")
+
+        if animals is not None:
+            # Çekme başarısız olsa bile gönderim veya kaydetme lokal veriyi değiştirmiş olabilir
+            self.notify(animals)
+
+        if self._stopped:
+            return
+        if error is not None:
+            self._schedule(self.backoff_delay())
+        elif self._pending:
+            self._schedule(self.debounce_seconds)
+
+    def notify(self, animals: List[Dict[str, Any]]):
+        """Dinleyicilere güncel kayıtları bildirir; senkronizasyon dışındaki kaynaklar (ör. Realtime) da kullanır."""
+        for callback in list(self._listeners):
+            try:
+                callback(animals)
+            except Exception as e:
+                # Bir ekranın hatası diğer dinleyicileri ve zamanlayıcıyı durdurmamalı
+                logger.error(f"Senkronizasyon dinleyicisi hata verdi: {e}")
@@ -2,38 +2,54 @@
 
 from datetime import datetime, timedelta
 import re
-from typing import Optional, Any, Dict, List
+from functools import lru_cache
+from typing import Optional, Any, Dict, List, Tuple
 
-def parse_flexible_date_string(date_str):
+_RELATIVE_DAYS_PATTERN = re.compile(r'\((\d+)\s*gun\s*once\)')
+_DMY_PATTERN = re.compile(r'([0-9]{1,2})\.([0-9]{1,2})\.([0-9]{4})$')
+_YMD_PATTERN = re.compile(r'([0-9]{4})-([0-9]{1,2})-([0-9]{1,2})$')
+
+@lru_cache(maxsize=4096)
+def _classify_date_string(date_str: str) -> Tuple[Optional[int], Optional[datetime]]:
+    """
+    Returns (days_ago, None) for "X gun once" strings and (None, datetime) for
+    absolute dates. Memoised: scraped tables repeat the same few thousand dates,
+    and relative dates are resolved by the caller so the cache never goes stale.
+    """
+    match = _RELATIVE_DAYS_PATTERN.search(date_str)
+    if match:
+        return int(match.group(1)), None
+    # DD.MM.YYYY (anything after the first space, e.g. a time, is ignored)
+    match = _DMY_PATTERN.match(date_str.split(' ')[0])
+    if match:
+        try:
+            return None, datetime(int(match.group(3)), int(match.group(2)), int(match.group(1)))
+        except ValueError:
+            pass
+    # YYYY-MM-DD (often found in 'Gebe mi?' column)
+    match = _YMD_PATTERN.match(date_str)
+    if match:
+        try:
+            return None, datetime(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+        except ValueError:
+            pass
+    return None, None
+
+def parse_flexible_date_string(date_str, now: Optional[datetime] = None):
     """
     Parses various date string formats, specifically handling "X gun once"
-    relative to the CURRENT time of parsing.
+    relative to the CURRENT time of parsing (or `now`, so a whole scrape can share one reference).
     Returns a datetime object or None if parsing fails.
     """
     date_str = date_str.strip()
     if not date_str:
         return None
 
-    # Handle "X gun once" format - IMPORTANT: this date is relative to NOW
-    match = re.search(r'\((\d+)\s*gun\s*once\)', date_str)
-    if match:
-        days_ago = int(match.group(1))
+    days_ago, parsed = _classify_date_string(date_str)
+    if days_ago is not None:
         # The date is calculated from TODAY - (X days ago)
-        return datetime.now() - timedelta(days=days_ago)
-    
-    # Handle standard DD.MM.YYYY format
-    try:
-        return datetime.strptime(date_str.split(' ')[0], '%d.%m.%Y')
-    except ValueError:
-        pass
-    
-    # Handle %Y-%m-%d format (often found in 'Gebe mi?' column)
-    try:
-        return datetime.strptime(date_str, '%Y-%m-%d')
-    except ValueError:
-        pass
-        
-    return None # Could not parse
+        return (now or datetime.now()) - timedelta(days=days_ago)
+    return parsed # None if it could not be parsed
 
 def safe_int(value, default=None):
     """Safely converts a value to int, returns default if conversion fails."""
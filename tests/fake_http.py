@@ -0,0 +1,108 @@
+"""
+Testler için `127.0.0.1` üzerinde çalışan basit bir HTTP sunucusu.
+
+Sayfalar `pages` sözlüğünden (yol -> `FakePage`) sunulur. `ETag` ve
+`Last-Modified` verilen sayfalar için koşullu istekler (`If-None-Match`,
+`If-Modified-Since`) 304 ile yanıtlanır. Gelen her istek `requests`
+listesine (yol, başlıklar) kaydedilir; `fail_next` ile bir yol için
+sıradaki yanıtların durum kodu belirlenebilir, `delay` ile yanıtlar
+geciktirilebilir.
+
+    with FakeHTTPServer({'/herd': FakePage('<table>...</table>', etag='"v1"')}) as server:
+        fetch_table_cached(server.url('/herd'), cache)
+"""
+
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Dict, Optional, Tuple
+
+
+class FakePage:
+
+    def __init__(self, body: str, etag: Optional[str] = None, last_modified: Optional[str] = None,
+                 content_type: str = 'text/html; charset=utf-8'):
+        self.body = body.encode('utf-8')
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content_type = content_type
+
+
+class FakeHTTPServer:
+
+    def __init__(self, pages: Optional[Dict[str, FakePage]] = None, delay: float = 0.0):
+        self.pages: Dict[str, FakePage] = dict(pages or {})
+        self.delay = delay
+        self.requests: List[Tuple[str, Dict[str, str]]] = []
+        self.active = 0
+        self.max_active = 0
+        self._failures: Dict[str, List[int]] = defaultdict(list)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}{path}"
+
+    def fail_next(self, path: str, status: int = 503, times: int = 1):
+        self._failures[path].extend([status] * times)
+
+    def __enter__(self) -> 'FakeHTTPServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests.append((self.path, dict(self.headers)))
+                    server.active += 1
+                    server.max_active = max(server.max_active, server.active)
+                    failure = server._failures[self.path].pop(0) if server._failures[self.path] else None
+                try:
+                    if server.delay:
+                        time.sleep(server.delay)
+                    self._respond(failure)
+                finally:
+                    with server._lock:
+                        server.active -= 1
+
+            def _respond(self, failure):
+                page = server.pages.get(self.path)
+                if failure is not None or page is None:
+                    self.send_response(failure or 404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                not_modified = (
+                    (page.etag and self.headers.get('If-None-Match') == page.etag)
+                    or (page.last_modified and not self.headers.get('If-None-Match')
+                        and self.headers.get('If-Modified-Since') == page.last_modified)
+                )
+                self.send_response(304 if not_modified else 200)
+                if page.etag:
+                    self.send_header('ETag', page.etag)
+                if page.last_modified:
+                    self.send_header('Last-Modified', page.last_modified)
+                if not_modified:
+                    self.end_headers()
+                    return
+                self.send_header('Content-Type', page.content_type)
+                self.send_header('Content-Length', str(len(page.body)))
+                self.end_headers()
+                self.wfile.write(page.body)
+
+        return Handler
@@ -0,0 +1,112 @@
+"""
+Testler için Supabase Realtime sunucusunun yerel karşılığı.
+
+`localhost` üzerinde gerçek bir websocket sunucusu açar ve Phoenix kanal
+protokolünün uygulamanın kullandığı kısmını konuşur: `phx_join` ve
+`heartbeat` mesajlarına `phx_reply` ile yanıt verir, `change` ile verilen
+değişikliği `FakeSupabase` tablosuna yazar ve filtresi eşleşen kanallara
+`postgres_changes` olayı olarak yayınlar. `drop_connections` ile bağlantılar
+koparılabilir, `pause` süresince yapılan değişiklikler yayınlanmaz (bağlantı
+yokken kaçırılan olaylar gibi).
+
+    async with FakeRealtimeServer(client) as server:
+        subscription = RealtimeSubscription(manager, server.url, token)
+"""
+
+import asyncio
+import copy
+import json
+from typing import List, Dict, Any, Optional
+
+from websockets.asyncio.server import serve
+
+
+class FakeRealtimeServer:
+
+    def __init__(self, client, table: str = 'animals'):
+        self.client = client
+        self.table = table
+        self.url: Optional[str] = None
+        self.joins: List[Dict[str, Any]] = [] # Katılım mesajlarının `payload` alanları
+        self.heartbeats = 0
+        self.paused = False
+        self._channels: Dict[Any, Dict[str, str]] = {} # websocket -> {topic: filter}
+        self._server = None
+
+    async def __aenter__(self) -> 'FakeRealtimeServer':
+        self._server = await serve(self._handle, 'localhost', 0)
+        port = next(iter(self._server.sockets)).getsockname()[1]
+        self.url = f"ws://localhost:{port}/realtime/v1/websocket?vsn=1.0.0"
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, websocket):
+        self._channels[websocket] = {}
+        try:
+            async for raw in websocket:
+                message = json.loads(raw)
+                if message['event'] == 'phx_join':
+                    self.joins.append(message['payload'])
+                    changes = message['payload']['config']['postgres_changes']
+                    self._channels[websocket][message['topic']] = changes[0].get('filter', '')
+                    response = {'postgres_changes': [dict(change, id=index) for index, change in enumerate(changes)]}
+                elif message['event'] == 'heartbeat':
+                    self.heartbeats += 1
+                    response = {}
+                else:
+                    continue
+                await websocket.send(json.dumps({
+                    'topic': message['topic'], 'event': 'phx_reply', 'ref': message['ref'],
+                    'payload': {'status': 'ok', 'response': response},
+                }))
+        finally:
+            self._channels.pop(websocket, None)
+
+    @property
+    def connections(self) -> int:
+        return sum(1 for channels in self._channels.values() if channels)
+
+    async def wait_for_joins(self, count: int, timeout: float = 2.0):
+        async def joined():
+            while len(self.joins) < count:
+                await asyncio.sleep(0.01)
+        await asyncio.wait_for(joined(), timeout)
+
+    async def change(self, change_type: str, record: Dict[str, Any]):
+        """Tabloya bir INSERT/UPDATE/DELETE uygular ve abonelere yayınlar."""
+        rows = self.client.tables[self.table]
+        old = next((row for row in rows if row['uuid'] == record['uuid']), None)
+        if old is not None:
+            rows.remove(old)
+        if change_type != 'DELETE':
+            rows.append(copy.deepcopy(record))
+        if self.paused:
+            return
+        data = {
+            'schema': 'public', 'table': self.table, 'type': change_type,
+            'commit_timestamp': record.get('last_modified'),
+            'record': record if change_type != 'DELETE' else {},
+            # Gerçek sunucuda REPLICA IDENTITY FULL değilse eski kayıtta yalnızca birincil anahtar bulunur
+            'old_record': {'uuid': record['uuid']} if change_type != 'INSERT' else {},
+        }
+        for websocket, channels in list(self._channels.items()):
+            for topic, row_filter in channels.items():
+                if self._matches(row_filter, old if change_type == 'DELETE' and old else record):
+                    await websocket.send(json.dumps({
+                        'topic': topic, 'event': 'postgres_changes', 'ref': None,
+                        'payload': {'ids': [0], 'data': data},
+                    }))
+
+    @staticmethod
+    def _matches(row_filter: str, record: Dict[str, Any]) -> bool:
+        if not row_filter:
+            return True
+        column, value = row_filter.split('=eq.', 1)
+        return str(record.get(column)) == value
+
+    async def drop_connections(self):
+        for websocket in list(self._channels):
+            await websocket.close()
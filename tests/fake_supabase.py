@@ -0,0 +1,263 @@
+"""
+Testler için PostgREST/supabase-py ile uyumlu, bellek içi sahte istemci.
+
+Yalnızca uygulamanın kullandığı sorgu zinciri desteklenir:
+    client.table('animals').select('*').eq('user_id', uid).gte('last_modified', t).execute()
+    client.table('animals').insert(rows).execute()
+    client.table('animals').update(values).eq('uuid', u).execute()
+    client.table('animals').upsert(rows, on_conflict='uuid').execute()
+    client.rpc('fonksiyon', params).execute()   <- `register_rpc` ile kaydedilen Python karşılığı çalışır
+
+Karşılaştırma filtreleri zaman damgalarını (ISO metinleri) PostgreSQL'deki
+gibi zaman olarak karşılaştırır. Gönderilen her istek `requests` listesine
+kaydedilir; `fail_next` ile bir sonraki isteğin hata vermesi sağlanabilir.
+"""
+
+import copy
+from collections import defaultdict
+from datetime import datetime
+from typing import List, Dict, Any, Callable, Optional
+
+from postgrest.exceptions import APIError
+
+from src.sync_merge import parse_timestamp
+
+
+class FakeAPIError(APIError):
+    """Sunucunun reddettiği istekler; gerçek istemci gibi `postgrest.exceptions.APIError` fırlatır."""
+
+    def __init__(self, message: str = 'rejected'):
+        super().__init__({'message': message, 'code': 'FAKE'})
+
+
+class FakeResponse:
+    def __init__(self, data: List[Dict[str, Any]]):
+        self.data = data
+        self.count = len(data)
+
+
+def _comparable(value):
+    if isinstance(value, str):
+        try:
+            datetime.fromisoformat(value)
+        except ValueError:
+            return value
+        return parse_timestamp(value)
+    if isinstance(value, datetime):
+        return parse_timestamp(value)
+    return value
+
+
+_OPERATORS = {
+    'eq': lambda a, b: a == b,
+    'neq': lambda a, b: a != b,
+    'gt': lambda a, b: a is not None and a > b,
+    'gte': lambda a, b: a is not None and a >= b,
+    'lt': lambda a, b: a is not None and a < b,
+    'lte': lambda a, b: a is not None and a <= b,
+}
+
+
+class _Query:
+    def __init__(self, client: 'FakeSupabase', table: str):
+        self.client = client
+        self.table = table
+        self.operation = 'select'
+        self.payload = None
+        self.on_conflict = None
+        self.filters = []
+        self.ordering = []
+        self.row_range = None
+
+    # --- İşlemler -------------------------------------------------------------
+
+    def select(self, *columns, **kwargs):
+        self.operation = 'select'
+        return self
+
+    def insert(self, rows, **kwargs):
+        self.operation, self.payload = 'insert', rows
+        return self
+
+    def update(self, values, **kwargs):
+        self.operation, self.payload = 'update', values
+        return self
+
+    def upsert(self, rows, on_conflict: str = 'uuid', **kwargs):
+        self.operation, self.payload, self.on_conflict = 'upsert', rows, on_conflict
+        return self
+
+    def delete(self, **kwargs):
+        self.operation = 'delete'
+        return self
+
+    # --- Filtreler --------------------------------------------------------------
+
+    def _filter(self, operator, column, value):
+        self.filters.append((operator, column, value))
+        return self
+
+    def eq(self, column, value):
+        return self._filter('eq', column, value)
+
+    def neq(self, column, value):
+        return self._filter('neq', column, value)
+
+    def gt(self, column, value):
+        return self._filter('gt', column, value)
+
+    def gte(self, column, value):
+        return self._filter('gte', column, value)
+
+    def lt(self, column, value):
+        return self._filter('lt', column, value)
+
+    def lte(self, column, value):
+        return self._filter('lte', column, value)
+
+    def in_(self, column, values):
+        self.filters.append(('in', column, list(values)))
+        return self
+
+    def order(self, column, desc: bool = False, **kwargs):
+        self.ordering.append((column, desc))
+        return self
+
+    def limit(self, count):
+        self.row_range = (0, count - 1)
+        return self
+
+    def range(self, start, end):
+        self.row_range = (start, end)
+        return self
+
+    # --- Çalıştırma -------------------------------------------------------------
+
+    def _matches(self, row) -> bool:
+        for operator, column, value in self.filters:
+            if operator == 'in':
+                if row.get(column) not in value:
+                    return False
+            elif not _OPERATORS[operator](_comparable(row.get(column)), _comparable(value)):
+                return False
+        return True
+
+    def execute(self) -> FakeResponse:
+        self.client.requests.append({
+            'table': self.table, 'operation': self.operation, 'filters': list(self.filters),
+            'payload': copy.deepcopy(self.payload),
+        })
+        if self.client._failures:
+            raise self.client._failures.pop(0)
+        rows = self.client.tables[self.table]
+        handler = getattr(self, f"_execute_{self.operation}")
+        data = handler(rows)
+        self.client.requests[-1]['rows'] = len(data)
+        return FakeResponse(copy.deepcopy(data))
+
+    def _execute_select(self, rows):
+        result = [row for row in rows if self._matches(row)]
+        for column, desc in reversed(self.ordering):
+            result.sort(key=lambda row: (row.get(column) is None, _comparable(row.get(column))), reverse=desc)
+        if self.row_range is not None:
+            start, end = self.row_range
+            result = result[start:end + 1]
+        return result
+
+    def _execute_insert(self, rows):
+        payload = self.payload if isinstance(self.payload, list) else [self.payload]
+        existing = {row.get('uuid') for row in rows}
+        for row in payload:
+            if row.get('uuid') in existing:
+                raise FakeAPIError(f"duplicate key value violates unique constraint (uuid={row.get('uuid')})")
+        inserted = [copy.deepcopy(row) for row in payload]
+        rows.extend(inserted)
+        return inserted
+
+    def _execute_update(self, rows):
+        updated = []
+        for row in rows:
+            if self._matches(row):
+                row.update(copy.deepcopy(self.payload))
+                updated.append(row)
+        return updated
+
+    def _execute_upsert(self, rows):
+        payload = self.payload if isinstance(self.payload, list) else [self.payload]
+        for row in payload:
+            self.client._check(row) # Tek bir hatalı satır tüm isteği geri alır, PostgreSQL'deki gibi
+        index = {row.get(self.on_conflict): row for row in rows}
+        result = []
+        for row in payload:
+            key = row.get(self.on_conflict)
+            if key in index:
+                index[key].update(copy.deepcopy(row)) # Gönderilmeyen sütunlar korunur
+                result.append(index[key])
+            else:
+                new_row = copy.deepcopy(row)
+                rows.append(new_row)
+                index[key] = new_row
+                result.append(new_row)
+        return result
+
+    def _execute_delete(self, rows):
+        deleted = [row for row in rows if self._matches(row)]
+        rows[:] = [row for row in rows if not self._matches(row)]
+        return deleted
+
+
+class _RPC:
+    def __init__(self, client: 'FakeSupabase', name: str, params: Dict[str, Any]):
+        self.client, self.name, self.params = client, name, params
+
+    def execute(self) -> FakeResponse:
+        self.client.requests.append({'table': None, 'operation': 'rpc', 'name': self.name,
+                                     'params': copy.deepcopy(self.params), 'payload': None})
+        if self.client._failures:
+            raise self.client._failures.pop(0)
+        if self.name not in self.client._rpcs:
+            raise FakeAPIError(f"Could not find the function public.{self.name}")
+        data = self.client._rpcs[self.name](self.client, self.params)
+        self.client.requests[-1]['rows'] = len(data)
+        return FakeResponse(copy.deepcopy(data))
+
+
+class FakeSupabase:
+    """`supabase.Client` yerine geçen bellek içi istemci."""
+
+    def __init__(self, tables: Optional[Dict[str, List[Dict[str, Any]]]] = None):
+        self.tables: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for name, rows in (tables or {}).items():
+            self.tables[name] = copy.deepcopy(rows)
+        self.requests: List[Dict[str, Any]] = []
+        self._failures: List[Exception] = []
+        self._constraints: List[Callable[[Dict[str, Any]], Optional[str]]] = []
+        self._rpcs: Dict[str, Callable[['FakeSupabase', Dict[str, Any]], Any]] = {}
+
+    def table(self, name: str) -> _Query:
+        return _Query(self, name)
+
+    def fail_next(self, error: Optional[Exception] = None, times: int = 1):
+        """Sonraki `times` isteğin hata vermesini sağlar."""
+        self._failures.extend([error or FakeAPIError("injected failure")] * times)
+
+    def register_rpc(self, name: str, function: Callable[['FakeSupabase', Dict[str, Any]], Any]):
+        """`rpc(name, params)` çağrılarının yanıtını üreten fonksiyonu kaydeder."""
+        self._rpcs[name] = function
+
+    def rpc(self, name: str, params: Optional[Dict[str, Any]] = None) -> '_RPC':
+        return _RPC(self, name, params or {})
+
+    def add_constraint(self, check: Callable[[Dict[str, Any]], Optional[str]]):
+        """Yazılan her satır için çağrılır; hata metni döndürürse istek reddedilir."""
+        self._constraints.append(check)
+
+    def _check(self, row: Dict[str, Any]):
+        for check in self._constraints:
+            error = check(row)
+            if error:
+                raise FakeAPIError(error)
+
+    def rows(self, table: str = 'animals') -> Dict[str, Dict[str, Any]]:
+        """Tablonun `uuid` anahtarlı anlık görüntüsü."""
+        return {row['uuid']: copy.deepcopy(row) for row in self.tables[table]}
@@ -0,0 +1,60 @@
+import copy
+import unittest
+from datetime import datetime, timezone
+from benchmarks.herd_generator import generate_herd
+from src.batch_processor import process_animal_records_batch, compute_insemination_features
+from src.data_processor import process_animal_records
+from src.models import Animal
+
+class TestBatchProcessor(unittest.TestCase):
+
+    def assert_equivalent(self, records):
+        expected = process_animal_records(copy.deepcopy(records))
+        actual = process_animal_records_batch(copy.deepcopy(records))
+        self.assertEqual([dict(animal) for animal in actual], [dict(animal) for animal in expected])
+
+    def test_matches_reference_on_generated_herd(self):
+        self.assert_equivalent(generate_herd(500, seed=3))
+
+    def test_matches_reference_on_models(self):
+        herd = generate_herd(200, seed=5)
+        expected = process_animal_records([Animal.from_dict(animal) for animal in herd])
+        actual = process_animal_records_batch([Animal.from_dict(animal) for animal in herd])
+        self.assertEqual([animal.to_dict() for animal in actual], [animal.to_dict() for animal in expected])
+
+    def test_matches_reference_on_edge_cases(self):
+        self.assert_equivalent([
+            {'uuid': 'none'},
+            {'uuid': 'empty', 'tohumlamalar': []},
+            {'uuid': 'single', 'tohumlamalar': [{'tohumlama_tarihi': '2023-01-01'}]},
+            {'uuid': 'gap-180', 'tohumlamalar': [{'tohumlama_tarihi': '2023-01-01'}, {'tohumlama_tarihi': '2023-06-30T12:00:00'}]},
+            {'uuid': 'gap-181', 'tohumlamalar': [{'tohumlama_tarihi': '2023-07-01'}, {'tohumlama_tarihi': '2023-01-01'}]},
+            {'uuid': 'mixed-types', 'tohumlamalar': [{'tohumlama_tarihi': datetime(2020, 1, 1)}, {'tohumlama_tarihi': '2021-01-01'}]},
+            {'uuid': 'aware', 'tohumlamalar': [{'tohumlama_tarihi': '2023-01-01T00:00:00+03:00'}]},
+            {'uuid': 'aware-obj', 'tohumlamalar': [{'tohumlama_tarihi': datetime(2023, 1, 1, tzinfo=timezone.utc)},
+                                                   {'tohumlama_tarihi': datetime(2024, 1, 1, tzinfo=timezone.utc)}]},
+            {'uuid': 'bad-date', 'tohumlamalar': [{'tohumlama_tarihi': 'dün'}]},
+            {'uuid': 'partly-dated', 'tohumlamalar': [{'tohumlama_tarihi': '2023-01-01'}, {'sperma': 'S1'}]},
+            {'uuid': 'undated', 'tohumlamalar': [{'sperma': 'S1'}]},
+            {'uuid': 'null-list', 'tohumlamalar': None},
+            {'uuid': 'birth', 'dogum_tarihi': 'not-a-date', 'isletme_kupesi': 'K1'},
+        ])
+
+    def test_features(self):
+        features = compute_insemination_features([
+            {'tohumlamalar': [{'tohumlama_tarihi': '2023-01-01'}, {'tohumlama_tarihi': '2022-01-01'},
+                              {'tohumlama_tarihi': '2022-01-22'}]},
+            {'tohumlamalar': []},
+        ])
+        self.assertEqual(features.counts.tolist(), [3, 0])
+        self.assertEqual(features.last.tolist(), [datetime(2023, 1, 1), None])
+        self.assertEqual(features.gaps_for(0).tolist(), [21, 344])
+        self.assertEqual(features.classes(), ['İnek', 'Bilinmiyor'])
+        self.assertEqual(features.unsupported, [])
+
+    def test_empty_input(self):
+        self.assertEqual(process_animal_records_batch([]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
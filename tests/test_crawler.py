@@ -0,0 +1,133 @@
+import time
+import unittest
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from src.crawler import TableCrawler, _retry_after_seconds
+from tests.fake_http import FakeHTTPServer, FakePage
+
+def page(prefix, count, next_href=None):
+    rows = ''.join(f'<tr><td>{prefix}-{i}</td></tr>' for i in range(count))
+    link = f'<a rel="next" href="{next_href}">Sonraki</a>' if next_href else ''
+    return FakePage(f'<html><body><table><tr><th>kupeno</th></tr>{rows}</table>{link}</body></html>')
+
+
+class Python38Executor(ThreadPoolExecutor):
+    """`shutdown` without `cancel_futures`, as on Python 3.8; records the submitted futures."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.futures = []
+
+    def submit(self, *args, **kwargs):
+        future = super().submit(*args, **kwargs)
+        self.futures.append(future)
+        return future
+
+    def shutdown(self, wait=True):
+        super().shutdown(wait)
+
+
+class TestTableCrawler(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeHTTPServer().__enter__()
+        self.addCleanup(self.server.__exit__, None, None, None)
+
+    def crawler(self, **options):
+        settings = dict(max_workers=8, per_host=2, min_interval=0, max_retries=2, backoff=0.01, chunk_size=64)
+        settings.update(options)
+        return TableCrawler(**settings)
+
+    def rows_by_page(self, crawler, paths):
+        rows = defaultdict(list)
+        for url, row in crawler.crawl([self.server.url(path) for path in paths]):
+            rows[url.rsplit('/', 1)[1]].append(row['kupeno'])
+        return rows
+
+    def test_pages_are_fetched_concurrently_within_the_host_limit(self):
+        self.server.delay = 0.05
+        paths = [f'/herd{i}' for i in range(6)]
+        for i, path in enumerate(paths):
+            self.server.pages[path] = page(f'p{i}', 50)
+        crawler = self.crawler()
+
+        rows = self.rows_by_page(crawler, paths)
+
+        self.assertEqual(rows['herd3'], [f'p3-{i}' for i in range(50)]) # In page order
+        self.assertEqual(sum(map(len, rows.values())), 300)
+        self.assertEqual(crawler.pages_fetched, 6)
+        self.assertEqual(self.server.max_active, 2)
+
+    def test_requests_to_a_host_are_rate_limited(self):
+        for i in range(4):
+            self.server.pages[f'/herd{i}'] = page(f'p{i}', 1)
+        started = time.monotonic()
+        self.rows_by_page(self.crawler(per_host=4, min_interval=0.05), [f'/herd{i}' for i in range(4)])
+        self.assertGreaterEqual(time.monotonic() - started, 0.15)
+
+    def test_server_errors_are_retried_with_backoff(self):
+        self.server.pages['/herd'] = page('a', 3)
+        self.server.fail_next('/herd', 503, times=2)
+        crawler = self.crawler()
+
+        rows = self.rows_by_page(crawler, ['/herd'])
+
+        self.assertEqual(rows['herd'], ['a-0', 'a-1', 'a-2'])
+        self.assertEqual((crawler.retries, len(self.server.requests)), (2, 3))
+        self.assertEqual(crawler.errors, {})
+
+    def test_failed_pages_do_not_stop_the_others(self):
+        self.server.pages['/ok'] = page('ok', 2)
+        self.server.pages['/down'] = page('down', 2)
+        self.server.fail_next('/down', 503, times=5)
+        crawler = self.crawler()
+
+        rows = self.rows_by_page(crawler, ['/ok', '/down', '/missing'])
+
+        self.assertEqual(list(rows), ['ok'])
+        self.assertEqual(set(crawler.errors), {self.server.url('/down'), self.server.url('/missing')})
+        # 404 is not retried, 503 is retried max_retries times
+        self.assertEqual(sum(1 for path, _ in self.server.requests if path == '/missing'), 1)
+        self.assertEqual(sum(1 for path, _ in self.server.requests if path == '/down'), 3)
+
+    def test_follows_pagination_links(self):
+        self.server.pages['/list?page=1'] = page('p1', 2, next_href='/list?page=2')
+        self.server.pages['/list?page=2'] = page('p2', 2, next_href='list?page=3')
+        self.server.pages['/list?page=3'] = page('p3', 2, next_href='/list?page=1') # Loops back
+
+        rows = self.rows_by_page(self.crawler(follow_next=True), ['/list?page=1'])
+        self.assertEqual(sorted(rows), ['list?page=1', 'list?page=2', 'list?page=3'])
+
+        limited = self.crawler(follow_next=True, max_pages=2)
+        self.assertEqual(len(self.rows_by_page(limited, ['/list?page=1'])), 2)
+
+    def test_consumer_can_stop_early(self):
+        for i in range(4):
+            self.server.pages[f'/herd{i}'] = page(f'p{i}', 500)
+        crawl = self.crawler(row_buffer=10).crawl([self.server.url(f'/herd{i}') for i in range(4)])
+        self.assertEqual(next(crawl)[1]['kupeno'].split('-')[1], '0')
+        crawl.close() # Workers blocked on the full buffer exit instead of hanging
+
+    def test_pages_not_yet_started_are_cancelled(self):
+        for i in range(4):
+            self.server.pages[f'/herd{i}'] = page(f'p{i}', 500)
+        executors = []
+        def executor(*args, **kwargs):
+            executors.append(Python38Executor(*args, **kwargs))
+            return executors[-1]
+        with patch('src.crawler.ThreadPoolExecutor', side_effect=executor):
+            crawl = self.crawler(max_workers=1, per_host=4, row_buffer=10).crawl(
+                [self.server.url(f'/herd{i}') for i in range(4)])
+            next(crawl)
+            crawl.close()
+        self.assertEqual([future.cancelled() for future in executors[0].futures], [False, True, True, True])
+
+    def test_retry_after_header(self):
+        self.assertEqual(_retry_after_seconds('3'), 3.0)
+        self.assertEqual(_retry_after_seconds('Mon, 01 Jan 2024 00:00:00 GMT'), 0.0) # In the past
+        self.assertIsNone(_retry_after_seconds('soon'))
+
+
+if __name__ == '__main__':
+    unittest.main()
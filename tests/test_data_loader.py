@@ -1,10 +1,21 @@
 import unittest
 import pandas as pd
+import tempfile
 from unittest.mock import patch
 from src.data_loader import load_data_from_file
+from src.import_cache import ImportCache
 import os
 
 class TestDataLoader(unittest.TestCase):
+    def setUp(self):
+        # Keep import cache snapshots out of the working tree
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+        self.cache = ImportCache(self.cache_dir.name)
+        patcher = patch('src.data_loader.get_import_cache', return_value=self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     def test_load_data_from_file_success(self):
         # Create a sample CSV file for testing
         sample_data = {'col1': [1, 2], 'col2': [3, 4]}
@@ -17,6 +28,11 @@ class TestDataLoader(unittest.TestCase):
             self.assertEqual(len(data), 2)
             self.assertEqual(data[0]['col1'], 1)
             self.assertEqual(data[1]['col2'], 4)
+
+            # The same content is loaded from its snapshot without parsing the CSV again
+            with patch('src.data_loader.pd.read_csv') as read_csv:
+                self.assertEqual(load_data_from_file(csv_path), data)
+            read_csv.assert_not_called()
         finally:
             os.remove(csv_path)  # Clean up the test file
 
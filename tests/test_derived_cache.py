@@ -0,0 +1,91 @@
+import copy
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from benchmarks.herd_generator import generate_herd
+from config.settings import GESTATION_PERIOD_DAYS
+from src.batch_processor import process_animal_records_batch
+from src.derived_cache import DerivedFieldCache
+from src.models import Animal
+
+class TestDerivedFieldCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'derived.db')
+        self.cache = DerivedFieldCache(self.path)
+        self.herd = generate_herd(50, seed=11)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_matches_batch_processing_and_adds_expected_calving_date(self):
+        expected = process_animal_records_batch(copy.deepcopy(self.herd))
+        actual = self.cache.process(copy.deepcopy(self.herd))
+        self.assertEqual(len(actual), len(expected))
+        for processed, reference in zip(actual, expected):
+            calving = processed.pop('beklenen_dogum_tarihi')
+            if reference['son_tohumlama'] is None:
+                self.assertIsNone(calving)
+            else:
+                self.assertEqual(calving, reference['son_tohumlama'] + timedelta(days=GESTATION_PERIOD_DAYS))
+            self.assertEqual(processed, reference)
+
+    def test_unchanged_records_are_not_reprocessed_after_restart(self):
+        first = self.cache.process(copy.deepcopy(self.herd))
+        self.cache.close()
+
+        self.cache = DerivedFieldCache(self.path)
+        with patch('src.derived_cache.process_animal_records_batch') as mock_batch:
+            second = self.cache.process(copy.deepcopy(self.herd))
+        mock_batch.assert_not_called()
+        self.assertEqual(second, first)
+        self.assertEqual(self.cache.hits, len(self.herd))
+
+    def test_only_changed_records_are_reprocessed(self):
+        animals = [Animal.from_dict(animal) for animal in self.herd]
+        self.cache.process(animals)
+
+        changed = animals[3]
+        changed.tohumlamalar = []
+        changed.last_modified = datetime(2030, 1, 1).isoformat()
+        with patch('src.derived_cache.process_animal_records_batch', wraps=process_animal_records_batch) as mock_batch:
+            result = self.cache.process(animals)
+        self.assertEqual([animal.uuid for animal in mock_batch.call_args[0][0]], [changed.uuid])
+        self.assertEqual(result[3].sinif, 'Bilinmiyor')
+        self.assertIsNone(result[3].son_tohumlama)
+        self.assertIsNone(result[3].beklenen_dogum_tarihi)
+
+    def test_given_records_are_not_modified(self):
+        animals = [Animal.from_dict(animal) for animal in self.herd]
+        result = self.cache.process(animals)
+        self.assertTrue(all(animal.sinif is None and animal.display_name is None for animal in animals))
+        self.assertTrue(all(processed is not animal for processed, animal in zip(result, animals)))
+
+    def test_records_without_version_are_always_processed(self):
+        record = {'uuid': 'u1', 'tohumlamalar': [{'tohumlama_tarihi': '2024-01-01T00:00:00'}]}
+        self.cache.process([dict(record)])
+        with patch('src.derived_cache.process_animal_records_batch', wraps=process_animal_records_batch) as mock_batch:
+            result = self.cache.process([dict(record)])
+        mock_batch.assert_called_once()
+        self.assertEqual(result[0]['sinif'], 'Düve')
+
+    def test_skipped_records_are_left_out(self):
+        records = [{'uuid': 'bad', 'last_modified': '2024-01-01', 'tohumlamalar': [{'tohumlama_tarihi': 'dün'}]},
+                   {'uuid': 'good', 'last_modified': '2024-01-01'}]
+        self.assertEqual([animal['uuid'] for animal in self.cache.process(records)], ['good'])
+
+    def test_invalidate(self):
+        self.cache.process(copy.deepcopy(self.herd))
+        self.cache.invalidate([self.herd[0]['uuid']])
+        with patch('src.derived_cache.process_animal_records_batch', wraps=process_animal_records_batch) as mock_batch:
+            self.cache.process(copy.deepcopy(self.herd))
+        self.assertEqual(len(mock_batch.call_args[0][0]), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+import csv
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from openpyxl import Workbook
+from src.data_loader import iter_file_chunks
+from src.file_importer import FileImportError, import_file, validate_record
+from src.import_cache import ImportCache
+from src.local_store import SQLiteAnimalStore
+from src.repository import AnimalRepository
+from src.sync_manager import SyncManager
+from src.sync_metrics import SyncMetrics
+from tests.fake_supabase import FakeSupabase
+
+USER = 'user-1'
+COLUMNS = ['isletme_kupesi', 'devlet_kupesi', 'irk', 'dogum_tarihi', 'sinif']
+
+def herd_rows(count):
+    return [[str(100 + i), f'TR{i:05d}', 'Holstein' if i % 2 else 'Jersey', f'{i % 28 + 1:02d}.03.2021', 'Inek']
+            for i in range(count)]
+
+
+class TestValidateRecord(unittest.TestCase):
+
+    def test_fields_are_cleaned(self):
+        record = validate_record({' Isletme_Kupesi ': 101.0, 'devlet_kupesi': None, 'dogum_tarihi': '2.3.2021',
+                                  'sinif': 'Inek', 'renk': 'siyah', 'tasma_no': '  '})
+        self.assertEqual(record, {'isletme_kupesi': '101', 'dogum_tarihi': '2021-03-02T00:00:00'})
+
+    def test_invalid_rows(self):
+        with self.assertRaises(FileImportError):
+            validate_record({'irk': 'Holstein'}) # No ear tag
+        with self.assertRaises(FileImportError):
+            validate_record({'isletme_kupesi': '1', 'dogum_tarihi': 'dün'})
+
+
+class TestImportFile(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = SQLiteAnimalStore(os.path.join(self.tmp_dir, 'animals.db'))
+        self.repository = AnimalRepository(self.store)
+        patchers = [
+            patch('src.sync_manager.get_supabase_client', return_value=FakeSupabase({'animals': []})),
+            patch('src.sync_manager.load_sync_queue', return_value=[]),
+            patch('src.sync_manager.append_many_to_sync_queue'),
+            patch('src.data_loader.get_import_cache', return_value=ImportCache(os.path.join(self.tmp_dir, 'cache'))),
+        ]
+        mocks = [patcher.start() for patcher in patchers]
+        for patcher in patchers:
+            self.addCleanup(patcher.stop)
+        self.append_many_to_sync_queue = mocks[2]
+        self.sync_manager = SyncManager(USER, repository=self.repository, metrics=SyncMetrics())
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def write_csv(self, rows, name='herd.csv'):
+        path = os.path.join(self.tmp_dir, name)
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(COLUMNS)
+            writer.writerows(rows)
+        return path
+
+    def write_xlsx(self, rows, name='herd.xlsx'):
+        path = os.path.join(self.tmp_dir, name)
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(COLUMNS)
+        for row in rows:
+            sheet.append(row)
+        workbook.save(path)
+        return path
+
+    def queued(self):
+        return [entry for call in self.append_many_to_sync_queue.call_args_list for entry in call.args[0]]
+
+    def queued_actions(self):
+        return [entry['action'] for entry in self.queued()]
+
+    async def test_csv_is_imported_in_batches(self):
+        path = self.write_csv(herd_rows(250))
+        reports = []
+        with patch.object(self.repository, 'put_many', wraps=self.repository.put_many) as put_many:
+            progress = await import_file(path, self.sync_manager, chunk_size=100,
+                                         on_progress=lambda p: reports.append((p.rows, p.fraction, p.done)))
+
+        self.assertEqual((progress.rows, progress.created, progress.invalid), (250, 250, 0))
+        self.assertEqual(put_many.call_count, 3) # One write per chunk
+        self.assertEqual(self.append_many_to_sync_queue.call_count, 3) # One journal append per chunk
+        self.assertEqual([rows for rows, _, _ in reports], [100, 200, 250, 250])
+        self.assertEqual(reports[-1][1:], (1.0, True))
+        self.assertEqual(len(self.repository), 250)
+        self.assertEqual(self.queued_actions(), ['create'] * 250)
+        animal = next(animal for animal in self.repository if animal['isletme_kupesi'] == '101')
+        self.assertEqual((animal['devlet_kupesi'], animal['user_id'], animal['sync_status']),
+                         ('TR00001', USER, 'pending_create'))
+        self.assertNotIn('sinif', self.queued()[0]['data']) # Derived fields are not imported
+
+    async def test_reimport_only_queues_changed_animals(self):
+        rows = herd_rows(50)
+        await import_file(self.write_csv(rows), self.sync_manager, chunk_size=20)
+        self.append_many_to_sync_queue.reset_mock()
+
+        rows[3][2] = 'Simental'
+        rows.append(['999', '', 'Angus', '', ''])
+        progress = await import_file(self.write_csv(rows, 'again.csv'), self.sync_manager, chunk_size=20)
+
+        self.assertEqual((progress.created, progress.updated, progress.unchanged), (1, 1, 50 - 1))
+        self.assertEqual(sorted(self.queued_actions()), ['create', 'update'])
+        update = next(entry for entry in self.queued() if entry['action'] == 'update')
+        self.assertEqual(set(update['data']) - {'uuid', 'user_id', 'last_modified'}, {'irk'})
+        self.assertEqual(len(self.repository), 51)
+
+    async def test_xlsx_is_streamed_and_invalid_rows_are_reported(self):
+        rows = herd_rows(30)
+        rows[5] = [None, None, 'Holstein', None, None]
+        rows[6][3] = 'yarın'
+        path = self.write_xlsx(rows)
+
+        progress = await import_file(path, self.sync_manager, chunk_size=8)
+
+        self.assertEqual((progress.rows, progress.created, progress.invalid), (30, 28, 2))
+        self.assertEqual(len(progress.errors), 2)
+        self.assertTrue(progress.errors[0].startswith('Satır 6:'))
+
+    async def test_duplicate_rows_in_a_file_update_one_animal(self):
+        path = self.write_csv([['1', 'TR1', 'Holstein', '', ''], ['1', '', 'Jersey', '', '']])
+        progress = await import_file(path, self.sync_manager)
+        self.assertEqual((progress.created, len(self.repository)), (1, 1))
+        self.assertEqual(next(iter(self.repository))['irk'], 'Jersey')
+
+    async def test_empty_file(self):
+        path = os.path.join(self.tmp_dir, 'empty.csv')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(','.join(COLUMNS) + '\n')
+        with self.assertRaises(ValueError):
+            await import_file(path, self.sync_manager)
+
+
+class TestIterFileChunks(unittest.TestCase):
+
+    def test_missing_cells_become_none(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'herd.csv')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('a,b\n1,\n2,x\n3,y\n')
+            chunks = list(iter_file_chunks(path, chunk_size=2, use_cache=False))
+        self.assertEqual([records for records, _ in chunks], [[{'a': 1, 'b': None}, {'a': 2, 'b': 'x'}], [{'a': 3, 'b': 'y'}]])
+        self.assertEqual(chunks[-1][1], 1.0)
+
+    def test_unreadable_excel_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'herd.xlsx')
+            with open(path, 'w') as f:
+                f.write('not a workbook')
+            with self.assertRaises(ValueError):
+                list(iter_file_chunks(path, use_cache=False))
+
+
+if __name__ == '__main__':
+    unittest.main()
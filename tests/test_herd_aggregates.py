@@ -0,0 +1,108 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import date, datetime
+from unittest.mock import patch
+from benchmarks.herd_generator import generate_herd
+from src.data_processor import process_animal_records
+from src.herd_aggregates import HerdAggregates
+from src.local_store import SQLiteAnimalStore
+from src.models import Animal
+from src.repository import AnimalRepository
+from src.statistics import calculate_statistics, calculate_breed_distribution, calculate_births_per_month
+from src.sync_manager import SyncManager
+from src.sync_metrics import SyncMetrics
+from tests.fake_supabase import FakeSupabase
+
+TODAY = date(2024, 7, 13)
+
+def full_recount(animals):
+    """What the statistics screen used to compute by walking the whole herd."""
+    processed = process_animal_records([Animal.from_dict(animal.to_dict()) for animal in animals])
+    with patch('src.statistics.date') as mock_date:
+        mock_date.today.return_value = TODAY
+        general = calculate_statistics(processed)
+    return general, calculate_breed_distribution(processed), calculate_births_per_month(processed)
+
+
+class TestHerdAggregates(unittest.TestCase):
+
+    def assert_matches(self, aggregates, animals):
+        self.assertEqual((aggregates.statistics(TODAY), aggregates.breed_distribution(), aggregates.births_per_month()),
+                         full_recount(animals))
+
+    def test_matches_a_full_recount(self):
+        herd = [Animal.from_dict(animal) for animal in generate_herd(300, seed=5)]
+        aggregates = HerdAggregates()
+        aggregates.rebuild(herd)
+        self.assert_matches(aggregates, herd)
+
+    def test_updates_and_removals(self):
+        herd = {animal.uuid: animal for animal in (Animal.from_dict(a) for a in generate_herd(50, seed=9))}
+        aggregates = HerdAggregates()
+        aggregates.rebuild(herd.values())
+
+        edited = Animal.from_dict(next(iter(herd.values())).to_dict())
+        edited.irk = 'Yeni Irk'
+        edited.dogum_tarihi = datetime(2019, 12, 31)
+        edited['tohumlamalar'] = [{'tohumlama_tarihi': '2021-01-01T00:00:00'}, {'tohumlama_tarihi': '2022-01-01T00:00:00'}]
+        herd[edited.uuid] = edited
+        aggregates.update(edited)
+        removed = list(herd)[1:4]
+        for animal_uuid in removed:
+            aggregates.remove(animal_uuid)
+            del herd[animal_uuid]
+        self.assert_matches(aggregates, herd.values())
+
+        for animal_uuid in list(herd):
+            aggregates.remove(animal_uuid)
+        self.assertEqual((aggregates.statistics(), aggregates.breed_distribution(), aggregates.births_per_month()), ({}, {}, {}))
+
+
+class TestRepositoryAggregates(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = SQLiteAnimalStore(os.path.join(self.tmp_dir, 'animals.db'))
+        self.repository = AnimalRepository(self.store)
+        patchers = [
+            patch('src.sync_manager.get_supabase_client', return_value=FakeSupabase({'animals': []})),
+            patch('src.sync_manager.load_sync_queue', return_value=[]),
+            patch('src.sync_manager.append_to_sync_queue'),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.sync_manager = SyncManager('user-1', repository=self.repository, metrics=SyncMetrics())
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.tmp_dir)
+
+    async def test_writes_keep_aggregates_current(self):
+        self.repository.put_many(generate_herd(40, seed=2))
+        await self.sync_manager.create_animal({'isletme_kupesi': 'X1', 'irk': 'Angus', 'dogum_tarihi': '2022-05-01T00:00:00'})
+        target = self.repository.all()[0]
+        await self.sync_manager.update_animal(target.uuid, {'irk': 'Simental'})
+        self.repository.delete(self.repository.all()[1].uuid)
+
+        aggregates = self.repository.aggregates()
+        self.assertEqual(aggregates.statistics(TODAY), full_recount(self.repository.all())[0])
+        self.assertEqual(aggregates.breed_distribution(), full_recount(self.repository.all())[1])
+        self.assertEqual(len(aggregates), 40)
+
+    def test_reload_after_an_external_write_rebuilds(self):
+        self.repository.put_many(generate_herd(10, seed=4))
+        self.assertEqual(len(self.repository.aggregates()), 10)
+
+        other = AnimalRepository(SQLiteAnimalStore(self.store.db_path)) # Another connection, e.g. a background job
+        other.delete_many([animal.uuid for animal in other.all()[:3]])
+        other.store.close()
+
+        self.assertEqual(len(self.repository.aggregates()), 7)
+        self.assertEqual(self.repository.aggregates().births_per_month(), full_recount(self.repository.all())[2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+from datetime import datetime, timezone
+from benchmarks.herd_generator import generate_herd, iter_herd
+from benchmarks.run_benchmarks import run_benchmarks, BENCHMARKS
+from src.data_processor import filter_animals
+from src.sync_merge import merge_remote_animals
+
+class TestHerdGenerator(unittest.TestCase):
+
+    def test_same_seed_gives_same_herd(self):
+        self.assertEqual(generate_herd(50, seed=7), generate_herd(50, seed=7))
+        self.assertNotEqual(generate_herd(50, seed=7), generate_herd(50, seed=8))
+
+    def test_records_are_realistic(self):
+        herd = generate_herd(200)
+        self.assertEqual(len(herd), 200)
+        self.assertEqual(len({animal['uuid'] for animal in herd}), 200)
+        for animal in herd:
+            birth = datetime.fromisoformat(animal['dogum_tarihi'])
+            dates = [datetime.fromisoformat(i['tohumlama_tarihi']) for i in animal['tohumlamalar']]
+            self.assertEqual(dates, sorted(dates))
+            self.assertTrue(all(date > birth for date in dates))
+        self.assertTrue(any(animal['tohumlamalar'] for animal in herd))
+
+    def test_iter_herd_is_lazy(self):
+        herd = iter_herd(10)
+        self.assertEqual(next(herd)['isletme_kupesi'], 'K0000000')
+
+
+class TestBenchmarkRunner(unittest.TestCase):
+
+    def test_runs_every_benchmark_headless(self):
+        report = run_benchmarks([20], repeat=1)
+        self.assertEqual({result['benchmark'] for result in report['results']}, set(BENCHMARKS))
+        for result in report['results']:
+            self.assertGreaterEqual(result['min_s'], 0)
+            self.assertGreater(result['peak_bytes'], 0)
+
+    def test_unknown_benchmark_is_rejected(self):
+        with self.assertRaises(ValueError):
+            run_benchmarks([10], names=['missing'])
+
+
+class TestExtractedHotPaths(unittest.TestCase):
+
+    def test_filter_animals(self):
+        herd = generate_herd(30)
+        found = [animal.isletme_kupesi for animal in filter_animals(herd, 'k000001')]
+        self.assertEqual(found, [f"K00000{index}" for index in range(10, 20)])
+        self.assertIs(filter_animals(herd, ''), herd)
+
+    def test_merge_compares_aware_and_naive_timestamps(self):
+        local = {'a': {'uuid': 'a', 'last_modified': '2024-01-01T12:00:00'}}
+        remote = [
+            {'uuid': 'a', 'last_modified': datetime(2024, 1, 1, 13, tzinfo=timezone.utc).isoformat()},
+            {'uuid': 'b', 'last_modified': '2024-01-01T00:00:00+00:00'},
+            {'last_modified': '2024-01-01T00:00:00'},
+        ]
+        self.assertEqual([animal['uuid'] for animal in merge_remote_animals(local, remote)], ['a', 'b'])
+        remote[0]['last_modified'] = '2024-01-01T11:00:00+00:00'
+        self.assertEqual([animal['uuid'] for animal in merge_remote_animals(local, remote)], ['b'])
+
+
+if __name__ == '__main__':
+    unittest.main()
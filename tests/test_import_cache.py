@@ -0,0 +1,130 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+from openpyxl import Workbook
+from src.data_loader import iter_file_chunks, load_data_from_file
+from src.import_cache import ImportCache, ImportCacheError
+
+
+class TestImportCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.cache = ImportCache(os.path.join(self.tmp_dir.name, 'cache'), max_files=2)
+        patcher = patch('src.data_loader.get_import_cache', return_value=self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def write(self, name, text):
+        path = os.path.join(self.tmp_dir.name, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return path
+
+    def snapshot(self, key, chunks):
+        writer = self.cache.writer(key)
+        for records in chunks:
+            writer.add(records)
+        writer.commit()
+
+    def test_column_types_round_trip(self):
+        records = [
+            {'n': 1, 'x': 1.5, 'ok': True, 'tag': 'TR1', 'when': datetime(2024, 1, 2, 3, 4, 5), 'mixed': 'a'},
+            {'n': None, 'x': 2, 'ok': None, 'tag': None, 'when': None, 'mixed': 7},
+            {'n': 3, 'x': None, 'ok': False, 'tag': 'Ğüş', 'when': datetime(2020, 2, 29), 'mixed': True},
+            {'n': 4, 'x': 0.5, 'ok': True, 'tag': '', 'when': None, 'mixed': None},
+        ]
+        self.snapshot('k', [records])
+        loaded = [record for chunk, _ in self.cache.iter_chunks('k', 10) for record in chunk]
+        self.assertEqual(loaded, records)
+        for column in ('x', 'mixed'): # Mixed columns keep the type of every cell
+            self.assertEqual([type(record[column]) for record in loaded], [type(record[column]) for record in records])
+
+    def test_values_that_cannot_be_stored_are_not_cached(self):
+        writer = self.cache.writer('k')
+        with self.assertRaises(ImportCacheError):
+            writer.add([{'n': 2 ** 70}]) # Too large for int64
+        writer.discard()
+        self.assertFalse(self.cache.contains('k'))
+
+    def test_cached_rows_match_a_fresh_read_for_mixed_columns(self):
+        path = os.path.join(self.tmp_dir.name, 'herd.xlsx')
+        workbook = Workbook()
+        workbook.active.append(['isletme_kupesi', 'kilo'])
+        for row in ([1, 1], [2, True], [3, None], [4, 'bilinmiyor'], [5, 2.5]):
+            workbook.active.append(row)
+        workbook.save(path)
+        fresh = list(iter_file_chunks(path, use_cache=False))
+        list(iter_file_chunks(path)) # Writes the snapshot
+        with patch('src.data_loader.openpyxl.load_workbook') as load_workbook:
+            cached = list(iter_file_chunks(path))
+        load_workbook.assert_not_called()
+        self.assertEqual(cached, fresh)
+        self.assertEqual([type(record['kilo']) for record in cached[0][0]], [int, bool, type(None), str, float])
+
+    def test_snapshots_are_keyed_by_reader(self):
+        path = self.write('herd.csv', 'isletme_kupesi,kilo\nA,1\nB,2\nC,\n')
+        self.assertEqual([record['kilo'] for record in load_data_from_file(path)], [1.0, 2.0, None])
+        fresh = list(iter_file_chunks(path, chunk_size=2, use_cache=False))
+        self.assertEqual(list(iter_file_chunks(path, chunk_size=2)), fresh) # Not the whole-file snapshot
+        self.assertEqual([record['kilo'] for records, _ in fresh for record in records], [1, 2, None])
+
+    def test_chunks_are_resized_on_load(self):
+        self.snapshot('k', [[{'i': i} for i in range(5)], [{'i': i} for i in range(5, 7)]])
+        chunks = list(self.cache.iter_chunks('k', 3))
+        self.assertEqual([[record['i'] for record in records] for records, _ in chunks], [[0, 1, 2], [3, 4, 5], [6]])
+        self.assertEqual([round(fraction, 2) for _, fraction in chunks], [0.43, 0.86, 1.0])
+
+    def test_repeat_import_skips_parsing(self):
+        path = self.write('herd.csv', 'isletme_kupesi,irk\n1,Holstein\n2,\n')
+        first = list(iter_file_chunks(path))
+        copy = self.write('copy.csv', 'isletme_kupesi,irk\n1,Holstein\n2,\n') # Keyed by content, not by name
+        with patch('src.data_loader.pd.read_csv') as read_csv:
+            self.assertEqual(list(iter_file_chunks(copy)), [(first[0][0], 1.0)])
+        read_csv.assert_not_called()
+
+        self.write('herd.csv', 'isletme_kupesi,irk\n1,Jersey\n')
+        self.assertEqual(list(iter_file_chunks(path))[0][0], [{'isletme_kupesi': 1, 'irk': 'Jersey'}])
+
+    def test_xlsx_snapshot(self):
+        path = os.path.join(self.tmp_dir.name, 'herd.xlsx')
+        workbook = Workbook()
+        workbook.active.append(['isletme_kupesi', 'dogum_tarihi'])
+        workbook.active.append([101, datetime(2021, 3, 2)])
+        workbook.save(path)
+        first = list(iter_file_chunks(path))
+        with patch('src.data_loader.openpyxl.load_workbook') as load_workbook:
+            self.assertEqual(list(iter_file_chunks(path)), first)
+        load_workbook.assert_not_called()
+
+    def test_interrupted_reads_leave_no_snapshot(self):
+        path = self.write('herd.csv', 'a\n' + ''.join(f'{i}\n' for i in range(10)))
+        chunks = iter_file_chunks(path, chunk_size=2)
+        next(chunks)
+        chunks.close()
+        self.assertEqual(os.listdir(self.cache.directory), [])
+
+    def test_damaged_snapshot_falls_back_to_the_file(self):
+        path = self.write('herd.csv', 'a\n1\n')
+        list(iter_file_chunks(path))
+        key = self.cache.key(path, 'chunked2000')
+        with open(self.cache.path(key), 'wb') as f:
+            f.write(b'broken')
+        with self.assertRaises(ImportCacheError):
+            list(self.cache.iter_chunks(key, 10))
+        self.assertEqual(list(iter_file_chunks(path)), [([{'a': 1}], 1.0)])
+
+    def test_least_recently_used_snapshots_are_pruned(self):
+        for i in range(3):
+            self.snapshot(f'k{i}', [[{'i': i}]])
+            os.utime(self.cache.path(f'k{i}'), (i, i))
+        list(self.cache.iter_chunks('k0', 10)) # Marks k0 as recently used
+        self.cache.prune()
+        self.assertEqual(sorted(os.listdir(self.cache.directory)), ['k0.npz', 'k2.npz'])
+
+
+if __name__ == '__main__':
+    unittest.main()
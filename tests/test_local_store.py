@@ -0,0 +1,79 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from src.local_store import SQLiteAnimalStore, LocalStoreError
+
+class TestSQLiteAnimalStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, 'data', 'animals.db')
+        self.store = SQLiteAnimalStore(self.db_path)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_wal_mode_enabled(self):
+        mode = self.store._query('PRAGMA journal_mode')[0][0]
+        self.assertEqual(mode.lower(), 'wal')
+
+    def test_upsert_inserts_then_updates_single_row(self):
+        self.store.upsert({'uuid': 'a1', 'isletme_kupesi': 'K1', 'last_modified': datetime(2024, 1, 1)})
+        self.store.upsert({'uuid': 'a2', 'isletme_kupesi': 'K2'})
+        self.store.upsert({'uuid': 'a1', 'isletme_kupesi': 'K1-new'})
+
+        self.assertEqual(self.store.count(), 2)
+        self.assertEqual(self.store.get('a1')['isletme_kupesi'], 'K1-new')
+        self.assertEqual(self.store.get('a2')['isletme_kupesi'], 'K2')
+        self.assertIsNone(self.store.get('missing'))
+
+    def test_find_by_secondary_indexes(self):
+        self.store.upsert_many([
+            {'uuid': 'a1', 'isletme_kupesi': 'K1', 'devlet_kupesi': 'TR1'},
+            {'uuid': 'a2', 'isletme_kupesi': 'K2', 'devlet_kupesi': 'TR2'},
+        ])
+        self.assertEqual([a['uuid'] for a in self.store.find_by_isletme_kupesi('K2')], ['a2'])
+        self.assertEqual([a['uuid'] for a in self.store.find_by_devlet_kupesi('TR1')], ['a1'])
+        plan = self.store._query("EXPLAIN QUERY PLAN SELECT data FROM animals WHERE devlet_kupesi = 'TR1'")
+        self.assertIn('idx_animals_devlet_kupesi', str(plan))
+
+    def test_replace_all_removes_missing_records(self):
+        self.store.upsert_many([{'uuid': 'a1'}, {'uuid': 'a2'}])
+        self.store.replace_all([{'uuid': 'a2'}, {'uuid': 'a3'}])
+        self.assertEqual(sorted(a['uuid'] for a in self.store.load_all()), ['a2', 'a3'])
+
+    def test_upsert_assigns_uuid_when_missing(self):
+        animal = {'isletme_kupesi': 'K9'}
+        self.store.upsert(animal)
+        self.assertTrue(animal['uuid'])
+        self.assertEqual(self.store.get(animal['uuid'])['isletme_kupesi'], 'K9')
+
+    def test_migrate_from_json_runs_once(self):
+        json_path = os.path.join(self.tmp_dir, 'animal_records.json')
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump([{'uuid': 'j1', 'isletme_kupesi': 'Ç1'}, {'uuid': 'j2'}], f)
+
+        self.assertEqual(self.store.migrate_from_json(json_path), 2)
+        self.store.delete('j2')
+        self.assertEqual(self.store.migrate_from_json(json_path), 0) # Already migrated
+        self.assertEqual([a['uuid'] for a in self.store.load_all()], ['j1'])
+        self.assertEqual(self.store.get('j1')['isletme_kupesi'], 'Ç1')
+
+    def test_migrate_from_missing_json_marks_done(self):
+        self.assertEqual(self.store.migrate_from_json(os.path.join(self.tmp_dir, 'none.json')), 0)
+        self.assertIsNotNone(self.store.get_meta('json_migrated'))
+
+    def test_migrate_from_corrupt_json_raises(self):
+        json_path = os.path.join(self.tmp_dir, 'bad.json')
+        with open(json_path, 'w', encoding='utf-8') as f:
+            f.write('{not json')
+        with self.assertRaises(LocalStoreError):
+            self.store.migrate_from_json(json_path)
+        self.assertEqual(self.store.count(), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import json
+import unittest
+from datetime import datetime
+from src.models import Animal, Insemination, as_animal
+from src.data_processor import process_animal_records, get_display_name
+from src.statistics import calculate_breed_distribution, calculate_births_per_month
+
+class TestAnimalModel(unittest.TestCase):
+
+    def setUp(self):
+        self.row = {
+            'uuid': 'u1', 'isletme_kupesi': 'K1', 'irk': 'Holstein',
+            'dogum_tarihi': '2020-01-01T00:00:00',
+            'tohumlamalar': [{'tohumlama_tarihi': '2021-01-01T00:00:00', 'sperma': 'S1'}],
+            'kaynak': 'vethek',
+        }
+
+    def test_from_dict_decodes_dates_once(self):
+        animal = Animal.from_dict(self.row)
+        self.assertEqual(animal.dogum_tarihi, datetime(2020, 1, 1))
+        self.assertIsInstance(animal.tohumlamalar[0], Insemination)
+        self.assertEqual(animal.tohumlamalar[0].tohumlama_tarihi, datetime(2021, 1, 1))
+        self.assertEqual(animal.tohumlamalar[0]['sperma'], 'S1')
+        self.assertEqual(animal['kaynak'], 'vethek')
+
+    def test_uses_slots_without_instance_dict(self):
+        animal = Animal.from_dict(self.row)
+        self.assertFalse(hasattr(animal, '__dict__'))
+        self.assertFalse(hasattr(animal.tohumlamalar[0], '__dict__'))
+
+    def test_scraped_insemination_fields_use_slots(self):
+        insemination = Insemination.from_dict({
+            'tohumlama_tarihi': '2024-01-01T00:00:00', 'sperma': ''.join(['Hol', '-101']), 'belgeno': '555',
+            'gebe_mi': 'Evet', 'not': '', 'kayit_no': '7',
+        })
+        self.assertIsNone(insemination._extra)
+        self.assertIs(insemination.sperma, Insemination.from_dict({'sperma': ''.join(['Ho', 'l-101'])}).sperma)
+        self.assertEqual((insemination['not'], insemination['kayit_no']), ('', '7'))
+        insemination['veteriner'] = 'V1' # Unknown keys are kept
+        self.assertEqual(insemination.to_dict()['veteriner'], 'V1')
+
+    def test_categorical_fields_are_interned(self):
+        first = Animal.from_dict({'uuid': 'a', 'irk': ''.join(['Hol', 'stein'])})
+        second = Animal.from_dict({'uuid': 'b', 'irk': ''.join(['Holst', 'ein'])})
+        self.assertIs(first.irk, second.irk)
+
+    def test_dict_interface_compatibility(self):
+        animal = Animal.from_dict(self.row)
+        self.assertEqual(animal.get('sinif', 'N/A'), 'N/A')
+        self.assertNotIn('sinif', animal)
+        animal['sinif'] = 'Düve'
+        self.assertEqual(animal.sinif, 'Düve')
+        self.assertEqual(animal['sinif'], 'Düve')
+        with self.assertRaises(KeyError):
+            animal['son_tohumlama']
+        copied = animal.copy()
+        self.assertIsInstance(copied, dict)
+        self.assertIsInstance(copied['tohumlamalar'][0], dict)
+
+    def test_round_trip_through_json(self):
+        animal = Animal.from_dict(self.row)
+        encoded = json.dumps(animal.to_dict(), default=lambda o: o.isoformat())
+        self.assertEqual(Animal.from_dict(json.loads(encoded)), animal)
+
+    def test_pipeline_functions_accept_models(self):
+        animal = as_animal(self.row)
+        processed = process_animal_records([animal])
+        self.assertIsInstance(processed[0], Animal)
+        self.assertEqual(processed[0].sinif, 'Düve')
+        self.assertEqual(processed[0].son_tohumlama, datetime(2021, 1, 1))
+        self.assertIsNone(animal.sinif) # Türetilmiş alanlar kopyaya yazılır
+        self.assertEqual(get_display_name(animal), 'K1')
+        self.assertEqual(calculate_breed_distribution([animal, {'uuid': 'x'}]), {'Holstein': 1, 'Bilinmiyor': 1})
+        self.assertEqual(calculate_births_per_month([animal]), {'2020-01': 1})
+
+if __name__ == '__main__':
+    unittest.main()
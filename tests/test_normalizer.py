@@ -0,0 +1,85 @@
+import unittest
+from datetime import datetime
+from benchmarks.herd_generator import generate_herd, iter_vethek_rows
+from config.settings import COLUMN_HEADERS
+from src.models import Animal
+from src.normalizer import NormalizationStats, normalize_scraped_rows, split_sperm_document
+from src.utils import parse_flexible_date_string
+
+NOW = datetime(2024, 6, 1, 12, 0)
+
+def row(record_id, ear_tag, date, sperm='Holstein-101 | 555', document='555', breed='Holstein', note='', pregnant=''):
+    return dict(zip(COLUMN_HEADERS, [record_id, sperm, document, ear_tag, breed, note, date, pregnant]))
+
+
+class TestParseFlexibleDate(unittest.TestCase):
+
+    def test_formats(self):
+        self.assertEqual(parse_flexible_date_string(' 1.2.2024 10:00 '), datetime(2024, 2, 1))
+        self.assertEqual(parse_flexible_date_string('2024-02-01'), datetime(2024, 2, 1))
+        self.assertEqual(parse_flexible_date_string('12.03.2024 (5 gun once)', NOW), datetime(2024, 5, 27, 12, 0))
+        for invalid in ('', '31.02.2024', '2024-02-30', '1.2.24', 'yok'):
+            self.assertIsNone(parse_flexible_date_string(invalid))
+
+
+class TestNormalizer(unittest.TestCase):
+
+    def test_rows_are_grouped_by_ear_tag_with_sorted_inseminations(self):
+        rows = [
+            row('1', 'TR1', '10.03.2024', pregnant='Hayır'),
+            row('2', 'TR2', '01.01.2024', breed=''),
+            row('3', 'TR1', '01.02.2024', sperm='Simental-7 | 777', document='777'),
+            row('4', 'TR2', '05.01.2024', breed='Jersey', pregnant='Evet'),
+        ]
+        animals = list(normalize_scraped_rows(rows, now=NOW))
+
+        self.assertEqual([animal['devlet_kupesi'] for animal in animals], ['TR1', 'TR2'])
+        first = animals[0]
+        self.assertEqual([i['tohumlama_tarihi'] for i in first['tohumlamalar']],
+                         ['2024-02-01T00:00:00', '2024-03-10T00:00:00'])
+        self.assertEqual((first['tohumlamalar'][0]['sperma'], first['tohumlamalar'][0]['belgeno']), ('Simental-7', '777'))
+        self.assertEqual(first['gebelik_durumu_metin'], 'Hayır')
+        self.assertEqual(animals[1]['irk'], 'Jersey') # First non-empty breed
+        self.assertEqual(animals[1]['gebelik_durumu_metin'], 'Evet')
+
+    def test_split_sperm_document(self):
+        self.assertEqual(split_sperm_document('Holstein-101 | 555'), ('Holstein-101', '555'))
+        self.assertEqual(split_sperm_document('Holstein-101', ' 999 '), ('Holstein-101', '999'))
+        self.assertEqual(split_sperm_document('Angus |', '42'), ('Angus', '42'))
+
+    def test_skipped_rows_are_counted(self):
+        stats = NormalizationStats()
+        rows = [row('1', '', '01.01.2024'), row('2', 'TR1', 'bilinmiyor'), row('3', 'TR1', '02.01.2024'), ['4', 'x']]
+        animals = list(normalize_scraped_rows(rows, stats=stats))
+        self.assertEqual(len(animals[0]['tohumlamalar']), 1)
+        self.assertEqual((stats.rows, stats.skipped_rows, stats.unparsed_dates, stats.animals), (4, 2, 1, 1))
+
+    def test_grouped_input_is_streamed(self):
+        rows = [row('1', 'TR1', '01.01.2024'), row('2', 'TR1', '02.01.2024'), row('3', 'TR2', '03.01.2024')]
+        consumed = []
+
+        def source():
+            for item in rows:
+                consumed.append(item['id'])
+                yield item
+
+        animals = normalize_scraped_rows(source(), grouped=True)
+        self.assertEqual(next(animals)['devlet_kupesi'], 'TR1')
+        self.assertEqual(consumed, ['1', '2', '3']) # TR1 is emitted as soon as TR2 starts
+        self.assertEqual([animal['devlet_kupesi'] for animal in animals], ['TR2'])
+
+    def test_generated_herd_round_trips(self):
+        herd = generate_herd(30, seed=3)
+        animals = {animal['devlet_kupesi']: animal for animal in normalize_scraped_rows(iter_vethek_rows(herd))}
+        for source in herd:
+            if not source['tohumlamalar']:
+                continue
+            normalized = animals[source['devlet_kupesi']]
+            self.assertEqual(normalized['irk'], source['irk'])
+            self.assertEqual([i['tohumlama_tarihi'][:10] for i in normalized['tohumlamalar']],
+                             [i['tohumlama_tarihi'][:10] for i in source['tohumlamalar']])
+            Animal.from_dict(normalized) # Accepted by the record model
+
+
+if __name__ == '__main__':
+    unittest.main()
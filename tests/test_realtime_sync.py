@@ -0,0 +1,157 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from src.local_store import SQLiteAnimalStore
+from src.realtime_sync import RealtimeSubscription, realtime_url
+from src.repository import AnimalRepository
+from src.sync_manager import SyncManager
+from src.sync_metrics import SyncMetrics
+from tests.fake_realtime import FakeRealtimeServer
+from tests.fake_supabase import FakeSupabase
+
+USER = 'user-1'
+
+def animal(uuid, tasma_no, last_modified, user_id=USER, **fields):
+    return dict(uuid=uuid, user_id=user_id, tasma_no=tasma_no, last_modified=last_modified, **fields)
+
+async def wait_until(condition, timeout=2.0):
+    async def poll():
+        while not condition():
+            await asyncio.sleep(0.01)
+    await asyncio.wait_for(poll(), timeout)
+
+
+class TestRealtimeUrl(unittest.TestCase):
+
+    def test_websocket_url_from_project_url(self):
+        self.assertEqual(realtime_url('https://abc.supabase.co/', 'key'),
+                         'wss://abc.supabase.co/realtime/v1/websocket?apikey=key&vsn=1.0.0')
+
+
+class TestRealtimeSubscription(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = SQLiteAnimalStore(os.path.join(self.tmp_dir, 'animals.db'))
+        self.repository = AnimalRepository(self.store)
+        self.client = FakeSupabase({'animals': [animal('a1', 'TR1', '2024-01-01T10:00:00+00:00')]})
+        self.queue = []
+        patchers = [
+            patch('src.sync_manager.get_supabase_client', return_value=self.client),
+            patch('src.sync_manager.load_sync_queue', side_effect=lambda: self.queue),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.sync_manager = SyncManager(USER, repository=self.repository, metrics=SyncMetrics())
+        self.server = await FakeRealtimeServer(self.client).__aenter__()
+        self.tokens = ['token-1']
+        self.changes = []
+        self.subscription = RealtimeSubscription(
+            self.sync_manager, self.server.url, self.access_token, on_change=self.changes.append,
+            heartbeat_seconds=0.05, notify_delay=0.05, reconnect_initial=0.01, reconnect_max=0.05,
+        )
+
+    async def access_token(self):
+        return self.tokens[-1]
+
+    async def asyncTearDown(self):
+        await self.subscription.stop()
+        await self.server.__aexit__(None, None, None)
+        self.store.close()
+        shutil.rmtree(self.tmp_dir)
+
+    async def start(self):
+        self.subscription.start()
+        await asyncio.wait_for(self.subscription.connected.wait(), 2.0)
+
+    async def test_join_filters_by_user_and_catches_up(self):
+        await self.start()
+
+        config = self.server.joins[0]['config']['postgres_changes'][0]
+        self.assertEqual((config['table'], config['filter']), ('animals', f'user_id=eq.{USER}'))
+        self.assertEqual(self.server.joins[0]['access_token'], 'token-1')
+        self.assertEqual(self.repository.get('a1')['tasma_no'], 'TR1')
+
+    async def test_inserts_updates_and_deletes_are_applied(self):
+        await self.start()
+
+        await self.server.change('INSERT', animal('a2', 'TR2', '2024-01-02T10:00:00+00:00'))
+        await self.server.change('UPDATE', animal('a1', 'TR1-new', '2024-01-02T11:00:00+00:00'))
+        await wait_until(lambda: self.subscription.events_applied == 2)
+        self.assertEqual(self.repository.get('a2')['tasma_no'], 'TR2')
+        self.assertEqual(self.repository.get('a1')['tasma_no'], 'TR1-new')
+        self.assertEqual(self.repository.get_meta(self.sync_manager._watermark_key()), '2024-01-02T11:00:00+00:00')
+
+        await self.server.change('DELETE', animal('a2', 'TR2', '2024-01-02T12:00:00+00:00'))
+        await wait_until(lambda: self.subscription.events_applied == 3)
+        self.assertIsNone(self.repository.get('a2'))
+        await wait_until(lambda: len(self.changes[-1]) == 1)
+
+    async def test_a_burst_of_changes_is_notified_once(self):
+        await self.start()
+        self.subscription.notify_delay = 1.0
+        self.changes.clear()
+
+        for index in range(200):
+            await self.server.change('INSERT', animal(f'b{index}', f'TR{index}', '2024-01-02T10:00:00+00:00'))
+        await wait_until(lambda: self.subscription.events_applied == 200)
+        await wait_until(lambda: self.changes, timeout=3.0)
+        await asyncio.sleep(0.1)
+        self.assertEqual(self.subscription.notifications, 1)
+        self.assertEqual(len(self.changes), 1)
+        self.assertEqual(len(self.changes[0]), 201)
+
+    async def test_other_users_and_stale_updates_are_ignored(self):
+        await self.start()
+
+        await self.server.change('INSERT', animal('b1', 'X', '2024-01-02T10:00:00+00:00', user_id='user-2'))
+        await self.server.change('UPDATE', animal('a1', 'old', '2023-12-31T10:00:00+00:00')) # Older than local
+        await self.server.change('INSERT', animal('a3', 'TR3', '2024-01-03T10:00:00+00:00'))
+        await wait_until(lambda: self.repository.get('a3') is not None)
+        self.assertIsNone(self.repository.get('b1'))
+        self.assertEqual(self.repository.get('a1')['tasma_no'], 'TR1')
+        self.assertEqual(self.subscription.events_applied, 1)
+
+    async def test_pending_local_edit_survives_remote_update(self):
+        await self.start()
+        self.queue = [{'seq': 1, 'action': 'update', 'base': {'tasma_no': 'TR1'},
+                       'data': {'uuid': 'a1', 'user_id': USER, 'tasma_no': 'local',
+                                'last_modified': '2024-01-01T12:00:00+00:00'}}]
+
+        await self.server.change('UPDATE', animal('a1', 'TR1', '2024-01-02T10:00:00+00:00', notlar='remote'))
+        await wait_until(lambda: self.subscription.events_applied == 1)
+        self.assertEqual(self.repository.get('a1')['tasma_no'], 'local')
+        self.assertEqual(self.repository.get('a1')['notlar'], 'remote')
+
+    async def test_reconnects_and_resumes_from_watermark(self):
+        await self.start()
+        await self.server.change('INSERT', animal('a2', 'TR2', '2024-01-02T10:00:00+00:00'))
+        await wait_until(lambda: self.subscription.events_applied == 1)
+
+        self.server.paused = True # Changes made while the socket is down are never delivered
+        await self.server.drop_connections()
+        await self.server.change('UPDATE', animal('a2', 'TR2-missed', '2024-01-03T10:00:00+00:00'))
+        self.client.requests.clear()
+        self.server.paused = False
+
+        await self.server.wait_for_joins(2)
+        await wait_until(lambda: self.repository.get('a2')['tasma_no'] == 'TR2-missed')
+        self.assertEqual(self.subscription.connections, 2)
+        # The catch-up is a delta pull from the watermark, not a full download
+        pulls = [request for request in self.client.requests if request['operation'] == 'select']
+        self.assertTrue(pulls)
+        self.assertTrue(all(any(f[0] == 'gte' for f in request['filters']) for request in pulls))
+
+    async def test_heartbeats_and_refreshed_token_are_sent(self):
+        await self.start()
+        self.tokens.append('token-2')
+        await wait_until(lambda: self.server.heartbeats >= 2)
+        self.assertEqual(self.subscription._token, 'token-2')
+
+
+if __name__ == '__main__':
+    unittest.main()
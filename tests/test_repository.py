@@ -0,0 +1,91 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from src.batch_processor import process_animal_records_batch
+from src.data_processor import process_animal_records
+from src.derived_cache import DerivedFieldCache
+from src.local_store import SQLiteAnimalStore
+from src.repository import AnimalRepository
+from src.statistics import get_animal_specific_stats
+
+class TestAnimalRepository(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, 'animals.db')
+        self.store = SQLiteAnimalStore(self.db_path)
+        self.store.upsert_many([{'uuid': 'a1', 'isletme_kupesi': 'K1'}, {'uuid': 'a2', 'isletme_kupesi': 'K2'}])
+        self.repository = AnimalRepository(self.store)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_reads_hit_memory_after_first_load(self):
+        self.assertEqual(self.repository.get('a1')['isletme_kupesi'], 'K1')
+        with patch.object(self.store, 'load_all') as mock_load_all:
+            self.assertEqual(len(self.repository), 2)
+            self.assertIn('a2', self.repository)
+            self.assertEqual(sorted(a['uuid'] for a in self.repository), ['a1', 'a2'])
+            mock_load_all.assert_not_called()
+
+    def test_put_writes_through_without_reload(self):
+        self.repository.all()
+        with patch.object(self.store, 'load_all') as mock_load_all:
+            self.repository.put({'uuid': 'a3', 'isletme_kupesi': 'K3'})
+            self.assertEqual(self.repository.get('a3')['isletme_kupesi'], 'K3')
+            mock_load_all.assert_not_called()
+        self.assertEqual(self.store.get('a3')['isletme_kupesi'], 'K3')
+
+    def test_external_write_invalidates_cache(self):
+        self.repository.all()
+        other_connection = SQLiteAnimalStore(self.db_path)
+        try:
+            other_connection.upsert({'uuid': 'a1', 'isletme_kupesi': 'K1-external'})
+        finally:
+            other_connection.close()
+        # Make sure the change is visible even on coarse mtime filesystems
+        os.utime(self.db_path, ns=(0, 1))
+        self.assertEqual(self.repository.get('a1')['isletme_kupesi'], 'K1-external')
+
+    def test_delete_and_replace_all(self):
+        self.repository.delete('a1')
+        self.assertIsNone(self.repository.get('a1'))
+        self.repository.replace_all([{'uuid': 'b1'}])
+        self.assertEqual([a['uuid'] for a in self.repository], ['b1'])
+        self.assertEqual(self.store.count(), 1)
+
+    def test_delete_many_and_meta_do_not_invalidate_cache(self):
+        self.repository.all()
+        with patch.object(self.store, 'load_all', wraps=self.store.load_all) as mock_load_all:
+            self.repository.set_meta('watermark', '2024-01-01T00:00:00')
+            self.repository.delete_many(['a1', 'missing'])
+            self.assertIsNone(self.repository.get('a1'))
+            mock_load_all.assert_not_called()
+        self.assertEqual(self.repository.get_meta('watermark'), '2024-01-01T00:00:00')
+        self.assertIsNone(self.store.get('a1'))
+
+    def test_processing_does_not_modify_stored_records(self):
+        self.repository.put({'uuid': 'a3', 'isletme_kupesi': 'K3', 'dogum_tarihi': 'not-a-date',
+                             'tohumlamalar': [{'tohumlama_tarihi': '2024-01-01T00:00:00'}]})
+        before = self.repository.get('a3').to_dict()
+        cache = DerivedFieldCache(os.path.join(self.tmp_dir, 'derived.db'))
+        try:
+            for process in (process_animal_records, process_animal_records_batch, cache.process):
+                processed = {animal['uuid']: animal for animal in process(self.repository.all())}
+                self.assertEqual(processed['a3']['sinif'], 'Düve')
+                self.assertEqual(self.repository.get('a3').to_dict(), before)
+        finally:
+            cache.close()
+        self.assertEqual(self.store.get('a3')['dogum_tarihi'], 'not-a-date')
+        self.assertEqual(self.repository.aggregates().statistics()['duve_sayisi'], 1)
+
+    def test_animal_specific_stats_uses_repository_lookup(self):
+        stats = get_animal_specific_stats('a2', self.repository)
+        self.assertEqual(stats['toplam_tohumlama_sayisi'], 0)
+        self.assertEqual(get_animal_specific_stats('zz', self.repository), {"hata": "Hayvan bulunamadı."})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from src import scrape_cache, scraper
+from src.scrape_cache import ScrapeCache, ScrapeCacheError
+from src.scraper import ScrapeResult, ScraperError, fetch_table_cached
+from tests.fake_http import FakeHTTPServer, FakePage
+
+def table(*values):
+    rows = ''.join(f'<tr><td>{value}</td></tr>' for value in values)
+    return f'<html><body><table><tr><th>kupeno</th></tr>{rows}</table></body></html>'
+
+
+class TestScrapeCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'scrape_cache.db')
+        self.cache = ScrapeCache(self.path)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_rows_and_validators_survive_restart(self):
+        rows = [{'kupeno': 'TR1', 'irki': 'Şarole'}]
+        self.cache.put('http://x', '"v1"', 'Mon, 01 Jan 2024 00:00:00 GMT', 'abc', rows)
+        self.cache.close()
+        self.cache = ScrapeCache(self.path)
+
+        page = self.cache.get('http://x')
+        self.assertEqual((page.etag, page.content_hash, page.row_count), ('"v1"', 'abc', 1))
+        self.assertEqual(page.conditional_headers(), {'If-None-Match': '"v1"',
+                                                      'If-Modified-Since': 'Mon, 01 Jan 2024 00:00:00 GMT'})
+        self.assertEqual(self.cache.rows('http://x'), rows)
+
+    def test_rows_from_older_parser_are_ignored(self):
+        self.cache.put('http://x', None, None, 'abc', [])
+        with patch.object(scrape_cache, 'PARSER_VERSION', scrape_cache.PARSER_VERSION + 1):
+            self.assertIsNone(self.cache.get('http://x'))
+            with self.assertRaises(ScrapeCacheError):
+                self.cache.rows('http://x')
+
+    def test_touch_keeps_previous_validators(self):
+        self.cache.put('http://x', '"v1"', None, 'abc', [])
+        self.cache.touch('http://x', None, 'Tue, 02 Jan 2024 00:00:00 GMT')
+        page = self.cache.get('http://x')
+        self.assertEqual((page.etag, page.last_modified), ('"v1"', 'Tue, 02 Jan 2024 00:00:00 GMT'))
+        self.cache.invalidate('http://x')
+        self.assertIsNone(self.cache.get('http://x'))
+
+
+class TestFetchTableCached(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = ScrapeCache(os.path.join(self.tmp_dir, 'scrape_cache.db'))
+        self.server = FakeHTTPServer().__enter__()
+
+    def tearDown(self):
+        self.server.__exit__(None, None, None)
+        self.cache.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def fetch(self, path='/herd'):
+        with patch('src.scraper.iter_table_rows_from_chunks', wraps=scraper.iter_table_rows_from_chunks) as parse:
+            result = fetch_table_cached(self.server.url(path), self.cache, chunk_size=16)
+        return result, parse.call_count
+
+    def test_etag_revalidation_skips_download_and_parse(self):
+        self.server.pages['/herd'] = FakePage(table('TR1', 'TR2'), etag='"v1"')
+        first, parses = self.fetch()
+        self.assertEqual((first.status, parses), (ScrapeResult.CHANGED, 1))
+        self.assertEqual(first.rows, [{'kupeno': 'TR1'}, {'kupeno': 'TR2'}])
+
+        second, parses = self.fetch()
+        self.assertEqual((second.status, parses), (ScrapeResult.NOT_MODIFIED, 0))
+        self.assertEqual(second.rows, first.rows)
+        self.assertEqual(self.server.requests[-1][1].get('If-None-Match'), '"v1"')
+
+        self.server.pages['/herd'] = FakePage(table('TR1', 'TR3'), etag='"v2"')
+        third, _ = self.fetch()
+        self.assertTrue(third.changed)
+        self.assertEqual(third.rows[1], {'kupeno': 'TR3'})
+        self.assertEqual(self.cache.get(self.server.url('/herd')).etag, '"v2"')
+
+    def test_last_modified_revalidation(self):
+        stamp = 'Mon, 01 Jan 2024 00:00:00 GMT'
+        self.server.pages['/herd'] = FakePage(table('TR1'), last_modified=stamp)
+        self.fetch()
+        result, parses = self.fetch()
+        self.assertEqual((result.status, parses), (ScrapeResult.NOT_MODIFIED, 0))
+        self.assertEqual(self.server.requests[-1][1].get('If-Modified-Since'), stamp)
+
+    def test_unchanged_content_without_validators_is_not_reparsed(self):
+        self.server.pages['/herd'] = FakePage(table('TR1'))
+        self.fetch()
+        with patch('src.scraper.SCRAPER_SPOOL_MAX_BYTES', 10): # Body spills to a temporary file
+            result, parses = self.fetch()
+        self.assertEqual((result.status, parses), (ScrapeResult.UNCHANGED, 0))
+        self.assertEqual(result.rows, [{'kupeno': 'TR1'}])
+
+    def test_http_errors_raise_and_keep_cache(self):
+        self.server.pages['/herd'] = FakePage(table('TR1'), etag='"v1"')
+        self.fetch()
+        self.server.fail_next('/herd', 500)
+        with self.assertRaisesRegex(ScraperError, "ağ hatası"):
+            self.fetch()
+        self.assertEqual(self.cache.rows(self.server.url('/herd')), [{'kupeno': 'TR1'}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+from config.settings import COLUMN_HEADERS
+from src.local_store import SQLiteAnimalStore
+from src.repository import AnimalRepository
+from src.scrape_cache import ScrapeCache
+from src.scrape_diff import diff_rows, import_scraped_rows, row_hash
+from src.sync_manager import SyncManager
+from src.sync_metrics import SyncMetrics
+from tests.fake_supabase import FakeSupabase
+
+USER = 'user-1'
+SOURCE = 'http://vethek.test/herd'
+NOW = datetime(2024, 6, 1, 12, 0)
+
+def row(record_id, ear_tag, date, pregnant='', breed='Holstein'):
+    return dict(zip(COLUMN_HEADERS, [record_id, 'Holstein-101 | 555', '555', ear_tag, breed, '', date, pregnant]))
+
+def herd_rows(animals=100, per_animal=3):
+    return [row(str(a * per_animal + i), f'TR{a:04d}', f'{i + 1:02d}.01.2024')
+            for a in range(animals) for i in range(per_animal)]
+
+
+class TestDiffRows(unittest.TestCase):
+
+    def index_of(self, rows):
+        return diff_index(diff_rows(rows, {}))
+
+    def test_first_scrape_adds_every_row(self):
+        diff = diff_rows(herd_rows(3, 2), {})
+        self.assertEqual(diff.to_dict(), {'added': 6, 'changed': 0, 'removed': 0, 'unchanged': 0, 'skipped_rows': 0})
+
+    def test_added_changed_and_removed_rows(self):
+        rows = herd_rows(3, 2)
+        index = self.index_of(rows)
+        rows[1] = row('1', 'TR0000', '02.01.2024', pregnant='Evet') # Changed
+        del rows[4] # Removed (TR0002, id 4)
+        rows.append(row('99', 'TR0003', '05.01.2024')) # Added
+
+        diff = diff_rows(rows, index)
+
+        self.assertEqual([cells[0] for cells in diff.added], ['99'])
+        self.assertEqual([cells[0] for cells in diff.changed], ['1'])
+        self.assertEqual(diff.removed, [('TR0002', '4')])
+        self.assertEqual(diff.unchanged, 4)
+        self.assertEqual(diff.ear_tags(), {'TR0000', 'TR0002', 'TR0003'})
+
+    def test_rows_without_an_id_are_keyed_by_content(self):
+        rows = [row('', 'TR1', '01.01.2024'), row('', 'TR1', '02.01.2024'), row('', 'TR1', '02.01.2024')]
+        index = self.index_of(rows)
+        self.assertEqual(len(index['TR1']), 2) # Exact duplicates collapse
+        self.assertTrue(diff_rows(rows, index).empty)
+
+        rows[0] = row('', 'TR1', '03.01.2024')
+        diff = diff_rows(rows, index)
+        self.assertEqual((len(diff.added), len(diff.removed)), (1, 1))
+
+    def test_row_hash_fits_sqlite_integer(self):
+        digest = row_hash(['1', 'a', 'b'])
+        self.assertTrue(-2 ** 63 <= digest < 2 ** 63)
+        self.assertNotEqual(digest, row_hash(['1', 'ab', '']))
+
+
+def diff_index(diff):
+    index = {}
+    for row_key, ear_tag, digest in diff.index_updates:
+        index.setdefault(ear_tag, {})[row_key] = digest
+    return index
+
+
+class TestImportScrapedRows(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = SQLiteAnimalStore(os.path.join(self.tmp_dir, 'animals.db'))
+        self.repository = AnimalRepository(self.store)
+        self.cache = ScrapeCache(os.path.join(self.tmp_dir, 'scrape_cache.db'))
+        patchers = [
+            patch('src.sync_manager.get_supabase_client', return_value=FakeSupabase({'animals': []})),
+            patch('src.sync_manager.load_sync_queue', return_value=[]),
+            patch('src.sync_manager.append_to_sync_queue'),
+        ]
+        mocks = [patcher.start() for patcher in patchers]
+        for patcher in patchers:
+            self.addCleanup(patcher.stop)
+        self.append_to_sync_queue = mocks[2]
+        self.sync_manager = SyncManager(USER, repository=self.repository, metrics=SyncMetrics())
+
+    def tearDown(self):
+        self.cache.close()
+        self.store.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def queued(self):
+        return [call.args[0] for call in self.append_to_sync_queue.call_args_list]
+
+    def animal(self, ear_tag):
+        return next(animal for animal in self.repository if animal['devlet_kupesi'] == ear_tag)
+
+    async def run_import(self, rows):
+        return await import_scraped_rows(rows, self.sync_manager, source=SOURCE, cache=self.cache, now=NOW)
+
+    async def test_only_changed_animals_are_written(self):
+        rows = herd_rows(1000, 3)
+        await self.run_import(rows)
+        self.assertEqual(len(self.repository), 1000)
+        self.assertEqual(len(self.queued()), 1000)
+
+        rows[2] = row('2', 'TR0000', '03.01.2024', pregnant='Evet') # Changed (latest insemination)
+        del rows[10] # Removed: TR0003, id 10
+        rows.append(row('5000', 'TR0500', '20.01.2024')) # Added to an existing animal
+        rows.append(row('5001', 'TR9999', '21.01.2024', breed='Jersey')) # New animal
+        queued_before = len(self.queued())
+        with patch.object(self.repository, 'put', wraps=self.repository.put) as put:
+            diff = await self.run_import(rows)
+
+        self.assertEqual(diff.to_dict()['unchanged'], 2998)
+        self.assertEqual(put.call_count, 4)
+        queued = self.queued()[queued_before:]
+        self.assertEqual(sorted(entry['action'] for entry in queued), ['create', 'update', 'update', 'update'])
+        self.assertTrue(all(set(entry['data']) <= {'uuid', 'user_id', 'last_modified', 'tohumlamalar',
+                                                   'gebelik_durumu_metin'} for entry in queued if entry['action'] == 'update'))
+
+        self.assertEqual(self.animal('TR0000')['gebelik_durumu_metin'], 'Evet')
+        self.assertEqual([i['kayit_no'] for i in self.animal('TR0003').tohumlamalar], ['9', '11'])
+        self.assertEqual([i['kayit_no'] for i in self.animal('TR0500').tohumlamalar], ['1500', '1501', '1502', '5000'])
+        self.assertEqual(self.animal('TR9999')['irk'], 'Jersey')
+
+        # The index now matches the latest scrape
+        queued_before = len(self.queued())
+        self.assertTrue((await self.run_import(rows)).empty)
+        self.assertEqual(len(self.queued()), queued_before)
+
+    async def test_repeated_record_id_keeps_the_unchanged_copy(self):
+        rows = [row('7', 'TR1', '01.01.2024', pregnant='A'), row('7', 'TR1', '01.06.2024', pregnant='B')]
+        await self.run_import(rows)
+        rows[1] = row('7', 'TR1', '01.06.2024', pregnant='C')
+        await self.run_import(rows)
+        self.assertEqual([i['gebe_mi'] for i in self.animal('TR1').tohumlamalar], ['A', 'C'])
+
+        del rows[0] # The remaining copy now takes the bare record id as its key
+        await self.run_import(rows)
+        self.assertEqual([i['gebe_mi'] for i in self.animal('TR1').tohumlamalar], ['C'])
+
+    async def test_removed_rows_without_an_id_are_removed(self):
+        rows = [row('', 'TR1', '01.01.2024'), row('', 'TR1', '02.01.2024')]
+        await self.run_import(rows)
+        await self.run_import(rows[1:])
+        self.assertEqual(len(self.animal('TR1').tohumlamalar), 1)
+
+    async def test_invalidating_a_source_drops_its_row_index(self):
+        await self.run_import(herd_rows(2, 1))
+        self.cache.invalidate(SOURCE)
+        self.assertEqual(self.cache.load_row_index(SOURCE), {})
+        diff = await self.run_import(herd_rows(2, 1))
+        self.assertEqual(len(diff.added), 2)
+        self.assertEqual(len(self.repository), 2)
+
+    async def test_index_is_not_advanced_when_applying_fails(self):
+        rows = herd_rows(2, 1)
+        with patch.object(self.sync_manager, 'create_animal', side_effect=RuntimeError('disk full')):
+            with self.assertRaises(RuntimeError):
+                await self.run_import(rows)
+        self.assertEqual(self.cache.load_row_index(SOURCE), {})
+        diff = await self.run_import(rows)
+        self.assertEqual(len(diff.added), 2)
+        self.assertEqual(len(self.repository), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,13 +1,32 @@
+import os
+import shutil
+import tempfile
 import unittest
 from unittest.mock import patch, MagicMock
-from src.scraper import fetch_and_parse_table, ScraperError
+from src.scrape_cache import ScrapeCache
+from src.scraper import fetch_and_parse_table, iter_table_rows, iter_table_rows_from_chunks, ScraperError
 import requests
-from bs4 import BeautifulSoup
+
+def chunked(content, size=7):
+    return [content[i:i + size] for i in range(0, len(content), size)]
+
+def stream_response(content, content_type='text/html'):
+    """A streamed `requests` response that hands out `content` in small chunks."""
+    response = MagicMock()
+    response.raise_for_status.return_value = None
+    response.headers = {'Content-Type': content_type}
+    response.iter_content.side_effect = lambda chunk_size: iter(chunked(content))
+    return response
 
 class TestScraper(unittest.TestCase):
 
     def setUp(self):
         self.mock_url = "http://example.com"
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = ScrapeCache(os.path.join(self.tmp_dir, 'scrape_cache.db'))
+        patcher = patch('src.scraper.get_scrape_cache', return_value=self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
         self.sample_html = """
         <table>
             <thead>
@@ -33,18 +52,32 @@ class TestScraper(unittest.TestCase):
             {'Header1': 'Data2A', 'Header2': 'Data2B'}
         ]
 
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.tmp_dir)
+
     @patch('src.scraper.requests.get')
     def test_fetch_and_parse_table_success(self, mock_get):
-        mock_response = MagicMock()
-        mock_response.content = self.sample_html.encode('utf-8')
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
+        mock_response = mock_get.return_value = stream_response(self.sample_html.encode('utf-8'))
 
         result = fetch_and_parse_table(self.mock_url)
         self.assertEqual(result, self.expected_data)
-        mock_get.assert_called_once_with(self.mock_url, timeout=15)
+        mock_get.assert_called_once_with(self.mock_url, timeout=15, stream=True, headers={})
         mock_response.raise_for_status.assert_called_once()
 
+    @patch('src.scraper.requests.get')
+    def test_fetch_and_parse_table_uses_conditional_requests(self, mock_get):
+        mock_get.return_value = stream_response(self.sample_html.encode('utf-8'))
+        mock_get.return_value.headers['ETag'] = '"v1"'
+        fetch_and_parse_table(self.mock_url)
+
+        not_modified = mock_get.return_value = stream_response(b'')
+        not_modified.status_code = 304
+        result = fetch_and_parse_table(self.mock_url)
+        self.assertEqual(result, self.expected_data)
+        self.assertEqual(mock_get.call_args.kwargs['headers'], {'If-None-Match': '"v1"'})
+        not_modified.iter_content.assert_not_called()
+
     @patch('src.scraper.requests.get', side_effect=requests.exceptions.Timeout)
     def test_fetch_and_parse_table_timeout(self, mock_get):
         with self.assertRaisesRegex(ScraperError, "Web sitesine bağlanırken zaman aşımı yaşandı"):
@@ -57,10 +90,7 @@ class TestScraper(unittest.TestCase):
 
     @patch('src.scraper.requests.get')
     def test_fetch_and_parse_table_no_table_found(self, mock_get):
-        mock_response = MagicMock()
-        mock_response.content = "<html><body><p>No table here</p></body></html>".encode('utf-8')
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
+        mock_response = mock_get.return_value = stream_response("<html><body><p>No table here</p></body></html>".encode('utf-8'))
 
         with self.assertRaisesRegex(ScraperError, "HTML içeriğinde beklenen '<table>' etiketi bulunamadı."):
             fetch_and_parse_table(self.mock_url)
@@ -82,10 +112,7 @@ class TestScraper(unittest.TestCase):
             </tbody>
         </table>
         """
-        mock_response = MagicMock()
-        mock_response.content = html_with_empty_row.encode('utf-8')
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
+        mock_response = mock_get.return_value = stream_response(html_with_empty_row.encode('utf-8'))
 
         result = fetch_and_parse_table(self.mock_url)
         self.assertEqual(result, self.expected_data)
@@ -109,10 +136,56 @@ class TestScraper(unittest.TestCase):
             </tbody>
         </table>
         """
-        mock_response = MagicMock()
-        mock_response.content = html_missing_cells.encode('utf-8')
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
+        mock_response = mock_get.return_value = stream_response(html_missing_cells.encode('utf-8'))
 
         result = fetch_and_parse_table(self.mock_url)
         self.assertEqual(result, [{'Header1': 'Data1A', 'Header2': 'Data1B', 'Header3': ''}])
+
+    @patch('src.scraper.requests.get')
+    def test_rows_are_yielded_while_downloading(self, mock_get):
+        body = self.sample_html.encode('utf-8') + b'<p>' + b'x' * 10000 + b'</p>'
+        chunks_read = []
+        mock_response = mock_get.return_value = stream_response(b'')
+        mock_response.iter_content.side_effect = lambda chunk_size: (
+            chunks_read.append(chunk) or chunk for chunk in chunked(body, 50))
+
+        rows = iter_table_rows(self.mock_url)
+        self.assertEqual(next(rows), self.expected_data[0])
+        self.assertEqual(list(rows), self.expected_data[1:])
+        self.assertLess(sum(map(len, chunks_read)), 2000) # The tail is never downloaded
+        mock_response.close.assert_called_once()
+
+    @patch('src.scraper.requests.get')
+    def test_stream_error_is_wrapped(self, mock_get):
+        mock_response = mock_get.return_value = stream_response(b'')
+        mock_response.iter_content.side_effect = requests.exceptions.ChunkedEncodingError("broken")
+        with self.assertRaisesRegex(ScraperError, "ağ hatası"):
+            list(iter_table_rows(self.mock_url))
+        mock_response.close.assert_called_once()
+
+
+class TestStreamingTableParser(unittest.TestCase):
+
+    def test_charset_from_meta_tag_across_chunk_boundaries(self):
+        html = '<meta charset="windows-1254"><table><tr><th>Irk</th></tr><tr><td>Şarole Ğ</td></tr></table>'
+        rows = list(iter_table_rows_from_chunks(chunked(html.encode('cp1254'), 3)))
+        self.assertEqual(rows, [{'Irk': 'Şarole Ğ'}])
+
+    def test_charset_from_content_type_and_entities(self):
+        html = '<table><tr><th>A</th></tr><tr><td>Kır &amp; Ç</td></tr></table>'
+        rows = list(iter_table_rows_from_chunks(chunked(html.encode('iso-8859-9'), 4), 'text/html; charset=ISO-8859-9'))
+        self.assertEqual(rows, [{'A': 'Kır & Ç'}])
+
+    def test_unclosed_cells_nested_tables_and_later_tables(self):
+        html = (
+            '<table><tr><th>A<th>B'
+            '<tr><td>1<td><b>2</b>'
+            '<tr><td>3<td><table><tr><td>in</td></tr></table>'
+            '</table><table><tr><th>X</th></tr><tr><td>ignored</td></tr></table>'
+        )
+        rows = list(iter_table_rows_from_chunks([html]))
+        self.assertEqual(rows, [{'A': '1', 'B': '2'}, {'A': '3', 'B': 'in'}])
+
+    def test_truncated_page_keeps_complete_rows(self):
+        rows = list(iter_table_rows_from_chunks([b'<table><tr><th>A</th></tr><tr><td>1</td></tr><tr><td>2']))
+        self.assertEqual(rows, [{'A': '1'}, {'A': '2'}])
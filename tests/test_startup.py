@@ -0,0 +1,61 @@
+import subprocess
+import sys
+import unittest
+from unittest.mock import patch
+from src.lazy_import import lazy_module
+from src.startup_profile import StartupProfiler
+
+class TestLazyModule(unittest.TestCase):
+
+    def test_heavy_modules_are_not_imported_with_their_users(self):
+        code = (
+            "import sys\n"
+            "import src.statistics, src.data_loader\n"
+            "print('pandas' in sys.modules, 'matplotlib.pyplot' in sys.modules)\n"
+        )
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.split(), ['False', 'False'])
+
+    def test_attribute_access_imports_module(self):
+        json_proxy = lazy_module('json')
+        self.assertFalse(json_proxy.is_loaded)
+        self.assertEqual(json_proxy.dumps([1]), '[1]')
+        self.assertTrue(json_proxy.is_loaded)
+
+    def test_patch_through_proxy(self):
+        import src.data_loader
+        with patch('src.data_loader.pd.read_csv', return_value='patched'):
+            self.assertEqual(src.data_loader.pd.read_csv('x'), 'patched')
+        self.assertNotEqual(src.data_loader.pd.read_csv, 'patched')
+        self.assertTrue(callable(src.data_loader.pd.read_csv))
+
+
+class TestStartupProfiler(unittest.TestCase):
+
+    def test_records_imports_and_phases(self):
+        profiler = StartupProfiler()
+        profiler.start()
+        try:
+            with profiler.phase('build'):
+                import xml.dom.minidom # Not imported by the test suite elsewhere
+        finally:
+            profiler.stop()
+        report = profiler.report()
+        self.assertIn('build', report['phases'])
+        modules = {item['module']: item for item in report['imports']}
+        self.assertIn('xml.dom.minidom', modules)
+        timing = modules['xml.dom.minidom']
+        self.assertLessEqual(timing['self_s'], timing['cumulative_s'])
+
+    def test_disabled_profiler_records_nothing(self):
+        profiler = StartupProfiler()
+        with patch.dict('os.environ', {}, clear=True):
+            profiler.start_if_enabled()
+        with profiler.phase('build'):
+            pass
+        self.assertEqual(profiler.phases, {})
+        self.assertFalse(profiler.enabled)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import asyncio
+import threading
+import time
+import unittest
+import httpx
+from unittest.mock import patch, MagicMock
+import src.supabase_client as supabase_client
+from src.supabase_client import get_supabase_client, run_blocking, run_detached
+from config.settings import SUPABASE_MAX_CONCURRENCY
+
+class TestSharedClient(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch.object(supabase_client, '_client', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch('src.supabase_client.create_client')
+    def test_client_is_created_once(self, mock_create_client):
+        self.assertIs(get_supabase_client(), get_supabase_client())
+        mock_create_client.assert_called_once()
+        http_client = mock_create_client.call_args.kwargs['options'].httpx_client
+        self.addCleanup(http_client.close)
+        self.assertIsInstance(http_client, httpx.Client) # Pooled keep-alive connections
+
+    def test_detached_call_runs_inline_without_event_loop(self):
+        calls = []
+        run_detached(calls.append, 'audit')
+        self.assertEqual(calls, ['audit'])
+
+
+class TestRunBlocking(unittest.IsolatedAsyncioTestCase):
+
+    async def test_runs_off_the_event_loop_thread(self):
+        loop_thread = threading.get_ident()
+        worker_thread = await run_blocking(threading.get_ident)
+        self.assertNotEqual(worker_thread, loop_thread)
+
+    async def test_loop_stays_responsive_during_blocking_call(self):
+        ticks = 0
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+        task = asyncio.create_task(ticker())
+        await run_blocking(time.sleep, 0.1)
+        task.cancel()
+        self.assertGreater(ticks, 5)
+
+    async def test_concurrency_is_bounded(self):
+        active, peak = 0, 0
+        lock = threading.Lock()
+        def request():
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.02)
+            with lock:
+                active -= 1
+        await asyncio.gather(*(run_blocking(request) for _ in range(SUPABASE_MAX_CONCURRENCY * 3)))
+        self.assertEqual(peak, SUPABASE_MAX_CONCURRENCY)
+
+    async def test_errors_propagate(self):
+        execute = MagicMock(side_effect=RuntimeError("network"))
+        with self.assertRaisesRegex(RuntimeError, "network"):
+            await run_blocking(execute)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from src.local_store import SQLiteAnimalStore
+from src.repository import AnimalRepository
+from src.sync_journal import SyncJournal
+from src.sync_manager import SyncManager, SyncManagerError
+from src.sync_metrics import SyncMetrics
+from tests.fake_supabase import FakeSupabase
+
+USER = 'user-1'
+
+class TestPerItemAcknowledgement(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = SQLiteAnimalStore(os.path.join(self.tmp_dir, 'animals.db'))
+        self.journal = SyncJournal(os.path.join(self.tmp_dir, 'sync_queue.jsonl'), max_attempts=2)
+        self.client = FakeSupabase()
+        self.client.add_constraint(lambda row: 'irk is invalid' if row.get('irk') == 'BAD' else None)
+        patchers = [
+            patch('src.sync_manager.get_supabase_client', return_value=self.client),
+            patch('src.sync_manager.load_sync_queue', side_effect=self.journal.pending),
+            patch('src.sync_manager.append_to_sync_queue', side_effect=self.journal.append),
+            patch('src.sync_manager.acknowledge_sync_items', side_effect=self.journal.acknowledge_items),
+            patch('src.sync_manager.record_sync_failures', side_effect=self.journal.record_failures),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.metrics = SyncMetrics()
+        self.sync_manager = SyncManager(USER, repository=AnimalRepository(self.store), metrics=self.metrics)
+
+    def tearDown(self):
+        self.journal.close()
+        self.store.close()
+        shutil.rmtree(self.tmp_dir)
+
+    async def create(self, count, bad=()):
+        for i in range(count):
+            await self.sync_manager.create_animal({'uuid': f'u{i}', 'irk': 'BAD' if i in bad else 'Holstein'})
+
+    def pending_uuids(self):
+        return [item['data']['uuid'] for item in self.journal.pending()]
+
+    async def test_rejected_row_is_isolated_by_bisection(self):
+        await self.create(8, bad={5})
+        with self.assertRaisesRegex(SyncManagerError, "reddedildi"):
+            await self.sync_manager.process_sync_queue()
+
+        self.assertEqual(len(self.client.rows()), 7)
+        self.assertEqual(self.pending_uuids(), ['u5'])
+        counters = self.metrics.last_run()['counters']
+        self.assertEqual((counters['records_pushed'], counters['records_rejected']), (7, 1))
+        self.assertGreater(counters['chunk_bisections'], 0)
+
+    async def test_retry_sends_only_unacknowledged_items(self):
+        await self.create(6)
+        self.sync_manager.chunk_sizer.size = self.sync_manager.chunk_sizer.minimum = 2
+        def network_drop(row):
+            if row['uuid'] == 'u2' and not dropped:
+                dropped.append(row['uuid'])
+                raise ConnectionError('offline')
+        dropped = []
+        self.client.add_constraint(network_drop)
+        with self.assertRaises(SyncManagerError):
+            await self.sync_manager.process_sync_queue()
+        self.assertEqual(self.pending_uuids(), ['u2', 'u3', 'u4', 'u5'])
+        self.assertEqual(self.journal.attempts(3), 0) # Network errors do not count towards dead-lettering
+
+        self.client.requests.clear()
+        await self.sync_manager.process_sync_queue()
+        sent = [row['uuid'] for request in self.client.requests for row in request['payload']]
+        self.assertEqual(sent, ['u2', 'u3', 'u4', 'u5'])
+        self.assertEqual(self.journal.pending(), [])
+
+    async def test_item_is_dead_lettered_after_max_attempts(self):
+        await self.create(3, bad={1})
+        for _ in range(2):
+            with self.assertRaises(SyncManagerError):
+                await self.sync_manager.process_sync_queue()
+        self.assertEqual(self.journal.pending(), [])
+        letters = self.journal.dead_letters()
+        self.assertEqual([letter['entry']['data']['uuid'] for letter in letters], ['u1'])
+        self.assertTrue(letters[0]['entry']['op_id'])
+        self.assertEqual(self.metrics.last_run()['counters']['records_dead_lettered'], 1)
+
+        await self.sync_manager.process_sync_queue() # Queue is clean again
+        self.assertEqual(self.metrics.last_run()['status'], 'ok')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from src.local_store import SQLiteAnimalStore
+from src.repository import AnimalRepository
+from src.sync_batching import AdaptiveChunkSizer, collapse_queue, group_by_columns, uniform_chunks
+from src.sync_manager import SyncManager
+from src.sync_metrics import SyncMetrics
+from tests.fake_supabase import FakeSupabase
+
+class TestQueueBatching(unittest.TestCase):
+
+    def test_collapse_queue_merges_actions_per_animal(self):
+        queue = [
+            {'seq': 1, 'action': 'create', 'data': {'uuid': 'a', 'isletme_kupesi': 'A', 'irk': 'Holstein'}},
+            {'seq': 2, 'action': 'update', 'data': {'uuid': 'b', 'irk': 'Jersey'}},
+            {'seq': 3, 'action': 'update', 'data': {'uuid': 'a', 'isletme_kupesi': 'A2'}},
+        ]
+        self.assertEqual(collapse_queue(queue), [
+            {'uuid': 'a', 'isletme_kupesi': 'A2', 'irk': 'Holstein'},
+            {'uuid': 'b', 'irk': 'Jersey'},
+        ])
+
+    def test_chunks_have_uniform_columns(self):
+        rows = [{'uuid': str(i), 'irk': 'x'} for i in range(5)] + [{'uuid': 'n', 'tasma_no': '1'}]
+        self.assertEqual(len(group_by_columns(rows)), 2)
+        sizer = AdaptiveChunkSizer(2, 1, 10, 1.0)
+        chunks = list(uniform_chunks(rows, sizer))
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1, 1])
+        for chunk in chunks:
+            self.assertEqual(len({frozenset(row) for row in chunk}), 1)
+
+    def test_sizer_adapts_to_latency(self):
+        sizer = AdaptiveChunkSizer(100, 10, 400, target_seconds=2.0)
+        sizer.record(100, 0.2)
+        self.assertEqual(sizer.size, 200)
+        sizer.record(50, 0.1) # Partial chunk does not grow the size
+        self.assertEqual(sizer.size, 200)
+        sizer.record(200, 0.2)
+        sizer.record(400, 0.2)
+        self.assertEqual(sizer.size, 400) # Capped at maximum
+        sizer.record(400, 3.0)
+        self.assertEqual(sizer.size, 200)
+        for _ in range(10):
+            sizer.record_failure()
+        self.assertEqual(sizer.size, 10) # Never below minimum
+
+
+class TestBulkUpsertSync(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = SQLiteAnimalStore(os.path.join(self.tmp_dir, 'animals.db'))
+        self.client = FakeSupabase({'animals': [
+            {'uuid': f'u{i}', 'user_id': 'user-1', 'tasma_no': str(i), 'irk': 'Holstein'} for i in range(500)
+        ]})
+        self.queue = []
+        patchers = [
+            patch('src.sync_manager.get_supabase_client', return_value=self.client),
+            patch('src.sync_manager.load_sync_queue', side_effect=lambda: list(self.queue)),
+            patch('src.sync_manager.append_to_sync_queue'),
+            patch('src.sync_manager.acknowledge_sync_items'),
+            patch('src.sync_manager.record_sync_failures', return_value=[]),
+            patch('src.sync_manager.SYNC_UPSERT_BATCH_SIZE', 100),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.metrics = SyncMetrics()
+        self.sync_manager = SyncManager('user-1', repository=AnimalRepository(self.store), metrics=self.metrics)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.tmp_dir)
+
+    async def test_500_offline_edits_are_sent_in_a_few_requests(self):
+        seq = 0
+        for round_ in range(2): # Every animal edited twice while offline
+            for i in range(500):
+                seq += 1
+                self.queue.append({'seq': seq, 'action': 'update',
+                                   'data': {'uuid': f'u{i}', 'user_id': 'user-1', 'irk': f'Jersey-{round_}'}})
+
+        await self.sync_manager.process_sync_queue()
+
+        upserts = [request for request in self.client.requests if request['operation'] == 'upsert']
+        self.assertLessEqual(len(upserts), 5)
+        self.assertEqual(sum(request['rows'] for request in upserts), 500)
+        rows = self.client.rows()
+        self.assertEqual(rows['u7']['irk'], 'Jersey-1') # Last edit wins
+        self.assertEqual(rows['u7']['tasma_no'], '7') # Columns that were not sent are kept
+        run = self.metrics.last_run()
+        self.assertEqual(run['counters']['queue_items_collapsed'], 500)
+
+    async def test_failed_chunk_shrinks_size_and_keeps_queue(self):
+        self.queue.append({'seq': 1, 'action': 'create', 'data': {'uuid': 'new', 'user_id': 'user-1'}})
+        self.client.fail_next(ConnectionError('offline'))
+        with self.assertRaises(Exception):
+            await self.sync_manager.process_sync_queue()
+        self.assertEqual(self.sync_manager.chunk_sizer.size, 50)
+
+        await self.sync_manager.process_sync_queue() # Retried upsert is idempotent
+        self.assertIn('new', self.client.rows())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,189 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+from src.local_store import SQLiteAnimalStore
+from src.repository import AnimalRepository
+from src.sync_manager import SyncManager, WATERMARK_META_PREFIX
+from src.sync_merge import merge_remote_animals, parse_timestamp, utc_timestamp
+from src.sync_metrics import SyncMetrics
+from tests.fake_supabase import FakeSupabase
+
+USER = 'user-1'
+
+def remote(uuid, last_modified, **fields):
+    row = {'uuid': uuid, 'user_id': USER, 'last_modified': last_modified}
+    row.update(fields)
+    return row
+
+class TestDeltaPull(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = SQLiteAnimalStore(os.path.join(self.tmp_dir, 'animals.db'))
+        self.repository = AnimalRepository(self.store)
+        self.client = FakeSupabase({'animals': [
+            remote('a', '2024-01-01T10:00:00+00:00', isletme_kupesi='A'),
+            remote('b', '2024-01-02T10:00:00+00:00', isletme_kupesi='B'),
+            remote('other', '2024-01-03T10:00:00+00:00', user_id='someone-else'),
+        ]})
+        patchers = [
+            patch('src.sync_manager.get_supabase_client', return_value=self.client),
+            patch('src.sync_manager.load_sync_queue', return_value=[]),
+            patch('src.sync_manager.append_to_sync_queue'),
+            patch('src.sync_manager.acknowledge_sync_items'),
+            patch('src.sync_manager.record_sync_failures', return_value=[]),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.metrics = SyncMetrics()
+        self.sync_manager = SyncManager(USER, repository=self.repository, metrics=self.metrics)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def last_pull_filters(self):
+        selects = [request for request in self.client.requests if request['operation'] == 'select']
+        return selects[-1]['filters']
+
+    async def test_first_sync_is_full_pull_and_stores_watermark(self):
+        await self.sync_manager.synchronize()
+        self.assertEqual(self.last_pull_filters(), [('eq', 'user_id', USER)])
+        self.assertEqual({animal.uuid for animal in self.repository.all()}, {'a', 'b'})
+        self.assertEqual(self.repository.get_meta(WATERMARK_META_PREFIX + USER), '2024-01-02T10:00:00+00:00')
+
+    async def test_next_sync_pulls_only_changes(self):
+        await self.sync_manager.synchronize()
+        self.client.tables['animals'].append(remote('c', '2024-01-05T10:00:00+00:00', isletme_kupesi='C'))
+
+        await self.sync_manager.synchronize()
+
+        operator, column, since = self.last_pull_filters()[-1]
+        self.assertEqual((operator, column), ('gte', 'last_modified'))
+        self.assertEqual(since, '2024-01-02T09:55:00+00:00') # Watermark minus the overlap window
+        run = self.metrics.last_run()
+        self.assertEqual(run['counters']['records_pulled'], 2) # 'b' again (overlap) and 'c'
+        self.assertEqual(run['counters']['records_merged'], 1)
+        self.assertIn('c', self.repository)
+        self.assertEqual(self.repository.get_meta(WATERMARK_META_PREFIX + USER), '2024-01-05T10:00:00+00:00')
+
+    async def test_tombstones_delete_local_records(self):
+        await self.sync_manager.synchronize()
+        for row in self.client.tables['animals']:
+            if row['uuid'] == 'a':
+                row.update(is_deleted=True, last_modified='2024-01-06T10:00:00+00:00')
+
+        await self.sync_manager.synchronize()
+
+        self.assertNotIn('a', self.repository)
+        self.assertIsNone(self.store.get('a'))
+        self.assertEqual(self.metrics.last_run()['counters']['records_deleted'], 1)
+
+    async def test_invalid_watermark_falls_back_to_full_pull(self):
+        await self.sync_manager.synchronize()
+        for watermark in ('not-a-date', '2999-01-01T00:00:00'):
+            self.repository.set_meta(WATERMARK_META_PREFIX + USER, watermark)
+            await self.sync_manager.synchronize()
+            self.assertEqual(self.last_pull_filters(), [('eq', 'user_id', USER)])
+
+    async def test_empty_local_store_forces_full_pull(self):
+        await self.sync_manager.synchronize()
+        self.repository.replace_all([])
+        await self.sync_manager.synchronize()
+        self.assertEqual(self.last_pull_filters(), [('eq', 'user_id', USER)])
+        self.assertEqual(len(self.repository), 2)
+
+    async def test_failed_pull_keeps_watermark(self):
+        await self.sync_manager.synchronize()
+        self.client.fail_next()
+        await self.sync_manager.synchronize()
+        self.assertEqual(self.repository.get_meta(WATERMARK_META_PREFIX + USER), '2024-01-02T10:00:00+00:00')
+
+    async def test_reset_watermark(self):
+        await self.sync_manager.synchronize()
+        self.sync_manager.reset_watermark()
+        await self.sync_manager.synchronize()
+        self.assertEqual(self.last_pull_filters(), [('eq', 'user_id', USER)])
+
+
+class TestOfflineEditAfterWatermark(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        now = datetime.now(timezone.utc)
+        self.client = FakeSupabase({'animals': [
+            remote('a', utc_timestamp(now - timedelta(hours=5)), isletme_kupesi='A'),
+            remote('b', utc_timestamp(now - timedelta(minutes=1)), isletme_kupesi='B'),
+        ]})
+        self.edited_at = utc_timestamp(now - timedelta(hours=3)) # Offline edit on device B, before A's watermark
+        for target in ('load_sync_queue', 'append_to_sync_queue', 'acknowledge_sync_items'):
+            patcher = patch(f'src.sync_manager.{target}')
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def device(self, name):
+        store = SQLiteAnimalStore(os.path.join(self.tmp_dir, f'{name}.db'))
+        self.addCleanup(store.close)
+        return SyncManager(USER, repository=AnimalRepository(store), metrics=SyncMetrics(), supabase_client=self.client)
+
+    async def test_late_push_of_an_old_edit_reaches_other_devices(self):
+        device_a = self.device('a')
+        await device_a.synchronize()
+        self.assertEqual(device_a.repository.get('a')['isletme_kupesi'], 'A')
+
+        device_b = self.device('b')
+        queue = [{'seq': 1, 'action': 'update',
+                  'data': {'uuid': 'a', 'user_id': USER, 'last_modified': self.edited_at, 'isletme_kupesi': 'A-offline'}}]
+        with patch.object(device_b, '_get_sync_queue', return_value=queue):
+            await device_b.process_sync_queue()
+
+        pushed = next(row for row in self.client.tables['animals'] if row['uuid'] == 'a')
+        self.assertGreater(parse_timestamp(pushed['last_modified']), parse_timestamp(self.edited_at))
+        await device_a.synchronize() # Delta pull from A's watermark
+        self.assertEqual(device_a.repository.get('a')['isletme_kupesi'], 'A-offline')
+
+
+@unittest.skipUnless(hasattr(time, 'tzset'), 'needs time.tzset')
+class TestTimestamps(unittest.TestCase):
+
+    def setUp(self):
+        previous = os.environ.get('TZ')
+        os.environ['TZ'] = 'Europe/Istanbul' # UTC+3, no daylight saving
+        time.tzset()
+        self.addCleanup(self.restore_timezone, previous)
+
+    @staticmethod
+    def restore_timezone(previous):
+        if previous is None:
+            os.environ.pop('TZ', None)
+        else:
+            os.environ['TZ'] = previous
+        time.tzset()
+
+    def test_new_timestamps_are_utc(self):
+        stamp = utc_timestamp()
+        self.assertTrue(stamp.endswith('+00:00'))
+        self.assertLess(abs(parse_timestamp(stamp) - datetime.now(timezone.utc)).total_seconds(), 5)
+
+    def test_legacy_naive_values_are_local_time(self):
+        self.assertEqual(parse_timestamp('2024-01-01T12:00:00'), datetime(2024, 1, 1, 9, tzinfo=timezone.utc))
+        self.assertEqual(parse_timestamp('2024-01-01T12:00:00+03:00'), parse_timestamp('2024-01-01T09:00:00Z'))
+
+    def test_local_edit_is_compared_in_utc(self):
+        # Edited at 12:30 on a UTC+3 phone (09:30 UTC); the server copy was written at 10:00 UTC
+        local = {'uuid': 'a', 'last_modified': utc_timestamp(datetime(2024, 1, 1, 12, 30).astimezone())}
+        remote_row = remote('a', '2024-01-01T10:00:00+00:00')
+        repository = {'a': local}
+        self.assertEqual(merge_remote_animals(repository, [remote_row]), [remote_row])
+        legacy = {'uuid': 'a', 'last_modified': '2024-01-01T12:30:00'} # Same edit, written by older versions
+        self.assertEqual(merge_remote_animals({'a': legacy}, [remote_row]), [remote_row])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from src.sync_journal import SyncJournal
+
+class TestSyncJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'sync_queue.jsonl')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _open(self, **kwargs):
+        journal = SyncJournal(self.path, **kwargs)
+        self.addCleanup(journal.close)
+        return journal
+
+    def test_append_and_pending_preserve_order(self):
+        journal = self._open()
+        self.assertEqual(journal.append({"action": "create", "data": {"uuid": "a"}}), 1)
+        self.assertEqual(journal.append({"action": "update", "data": {"uuid": "a"}}), 2)
+        pending = journal.pending()
+        self.assertEqual([item['seq'] for item in pending], [1, 2])
+        self.assertEqual(pending[0]['action'], 'create')
+
+    def test_append_does_not_rewrite_existing_lines(self):
+        journal = self._open()
+        journal.append({"action": "create", "data": {"uuid": "a"}})
+        journal.flush()
+        with open(self.path, 'rb') as f:
+            before = f.read()
+        journal.append({"action": "create", "data": {"uuid": "b"}})
+        journal.flush()
+        with open(self.path, 'rb') as f:
+            self.assertTrue(f.read().startswith(before))
+
+    def test_group_commit_fsyncs_once_per_group(self):
+        journal = self._open(group_commit_size=3, group_commit_interval=60)
+        with patch('src.sync_journal.os.fsync') as mock_fsync:
+            for i in range(6):
+                journal.append({"action": "create", "data": {"uuid": str(i)}})
+            self.assertEqual(mock_fsync.call_count, 2)
+
+    def test_acknowledge_survives_reopen(self):
+        journal = self._open()
+        for i in range(3):
+            journal.append({"action": "create", "data": {"uuid": str(i)}})
+        journal.acknowledge(2)
+        journal.close()
+
+        reopened = self._open()
+        self.assertEqual([item['seq'] for item in reopened.pending()], [3])
+        self.assertEqual(reopened.append({"action": "create", "data": {}}), 4)
+
+    def test_entries_added_after_load_stay_pending(self):
+        journal = self._open()
+        journal.append({"action": "create", "data": {"uuid": "a"}})
+        loaded = journal.pending()
+        journal.append({"action": "create", "data": {"uuid": "b"}})
+        journal.acknowledge(loaded[-1]['seq'])
+        self.assertEqual([item['data']['uuid'] for item in journal.pending()], ['b'])
+
+    def test_torn_tail_is_discarded_on_open(self):
+        journal = self._open()
+        journal.append({"action": "create", "data": {"uuid": "a"}})
+        journal.close()
+        with open(self.path, 'ab') as f:
+            f.write(b'{"seq": 2, "action": "cre')
+
+        reopened = self._open()
+        self.assertEqual([item['seq'] for item in reopened.pending()], [1])
+        self.assertEqual(reopened.append({"action": "create", "data": {}}), 2)
+        self.assertEqual([item['seq'] for item in reopened.pending()], [1, 2])
+
+    def test_compaction_keeps_only_pending_entries(self):
+        journal = self._open(compact_min_bytes=0, compact_ratio=0.5)
+        for i in range(10):
+            journal.append({"action": "update", "data": {"uuid": str(i), "payload": "x" * 100}})
+        size_before = os.path.getsize(self.path)
+        journal.acknowledge(8)
+        journal.wait_for_compaction(timeout=5)
+
+        self.assertLess(os.path.getsize(self.path), size_before / 2)
+        self.assertEqual([item['seq'] for item in journal.pending()], [9, 10])
+        journal.append({"action": "update", "data": {"uuid": "new"}})
+        journal.close()
+
+        reopened = self._open()
+        self.assertEqual([item['seq'] for item in reopened.pending()], [9, 10, 11])
+
+    def test_stale_ack_offset_after_interrupted_compaction(self):
+        journal = self._open()
+        for i in range(5):
+            journal.append({"action": "update", "data": {"uuid": str(i)}})
+        journal.acknowledge(3)
+        # Sıkıştırma dosyayı değiştirdi ama onay dosyası yazılamadan çökme oldu.
+        with patch.object(SyncJournal, '_write_ack'):
+            journal.compact()
+        journal.close()
+
+        reopened = self._open()
+        self.assertEqual([item['seq'] for item in reopened.pending()], [4, 5])
+
+    def test_items_acknowledged_out_of_order(self):
+        journal = self._open()
+        for i in range(4):
+            journal.append({"action": "update", "data": {"uuid": str(i)}})
+        journal.acknowledge_items([2, 4])
+        self.assertEqual([item['seq'] for item in journal.pending()], [1, 3])
+        journal.acknowledge_items([1])
+        self.assertEqual(journal._acked_seq, 2) # Pointer advances over the contiguous prefix
+        journal.close()
+
+        reopened = self._open()
+        self.assertEqual([item['seq'] for item in reopened.pending()], [3])
+        reopened.acknowledge(3)
+        self.assertEqual(reopened._acked_seq, 4)
+        self.assertEqual(reopened.pending(), [])
+
+    def test_repeated_failures_move_item_to_dead_letters(self):
+        journal = self._open(max_attempts=3)
+        journal.append({"action": "update", "op_id": "op-1", "data": {"uuid": "bad"}})
+        journal.append({"action": "update", "op_id": "op-2", "data": {"uuid": "good"}})
+        self.assertEqual(journal.record_failures([1], "rejected"), [])
+        self.assertEqual(journal.record_failures([1], "rejected"), [])
+        journal.close()
+
+        reopened = self._open(max_attempts=3)
+        self.assertEqual(reopened.attempts(1), 2) # Attempt counts survive a restart
+        dead = reopened.record_failures([1], "rejected")
+        self.assertEqual([entry['op_id'] for entry in dead], ['op-1'])
+        self.assertEqual([item['seq'] for item in reopened.pending()], [2])
+        letters = reopened.dead_letters()
+        self.assertEqual(len(letters), 1)
+        self.assertEqual((letters[0]['entry']['op_id'], letters[0]['attempts'], letters[0]['error']), ('op-1', 3, 'rejected'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,13 @@
+import os
+import shutil
+import tempfile
 import unittest
-from unittest.mock import patch, MagicMock, AsyncMock
+from unittest.mock import patch, MagicMock, AsyncMock, ANY
 from datetime import datetime
+from src.local_store import SQLiteAnimalStore
+from src.repository import AnimalRepository
 from src.sync_manager import SyncManager, SyncManagerError
+from src.sync_metrics import SyncMetrics
 from typing import List, Dict, Any
 
 class TestSyncManager(unittest.IsolatedAsyncioTestCase):
@@ -12,34 +18,40 @@ class TestSyncManager(unittest.IsolatedAsyncioTestCase):
         self.mock_supabase_client.table.return_value.select.return_value.eq.return_value.execute.return_value = MagicMock(data=[])
         self.mock_supabase_client.table.return_value.insert.return_value.execute.return_value = MagicMock(data=[])
         self.mock_supabase_client.table.return_value.update.return_value.eq.return_value.execute.return_value = MagicMock(data=[])
+        self.mock_supabase_client.table.return_value.upsert.return_value.execute.return_value = MagicMock(data=[])
+
+        # Real repository on a throwaway SQLite store
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = SQLiteAnimalStore(os.path.join(self.tmp_dir, 'animals.db'))
+        self.repository = AnimalRepository(self.store)
 
         # Mock global functions from persistence
-        self.patcher_load_animals = patch('src.sync_manager.load_animals')
-        self.patcher_save_animals = patch('src.sync_manager.save_animals')
         self.patcher_load_sync_queue = patch('src.sync_manager.load_sync_queue')
-        self.patcher_save_sync_queue = patch('src.sync_manager.save_sync_queue')
+        self.patcher_append_to_sync_queue = patch('src.sync_manager.append_to_sync_queue')
+        self.patcher_acknowledge_sync_queue = patch('src.sync_manager.acknowledge_sync_items')
         # Removed global patch for _add_to_sync_queue.
         # It will be patched per test where needed.
 
-        self.mock_load_animals = self.patcher_load_animals.start()
-        self.mock_save_animals = self.patcher_save_animals.start()
         self.mock_load_sync_queue = self.patcher_load_sync_queue.start()
-        self.mock_save_sync_queue = self.patcher_save_sync_queue.start()
+        self.mock_append_to_sync_queue = self.patcher_append_to_sync_queue.start()
+        self.mock_acknowledge_sync_queue = self.patcher_acknowledge_sync_queue.start()
         # self.mock_add_to_sync_queue = self.patcher_add_to_sync_queue.start() # Removed this line
 
         # Mock create_client to return our mock client
-        self.patcher_create_client = patch('src.sync_manager.create_client', return_value=self.mock_supabase_client)
+        self.patcher_create_client = patch('src.sync_manager.get_supabase_client', return_value=self.mock_supabase_client)
         self.mock_create_client = self.patcher_create_client.start()
 
         self.user_id = "test_user_id"
-        self.sync_manager = SyncManager(self.user_id)
+        self.metrics = SyncMetrics()
+        self.sync_manager = SyncManager(self.user_id, repository=self.repository, metrics=self.metrics)
 
     def tearDown(self):
-        self.patcher_load_animals.stop()
-        self.patcher_save_animals.stop()
         self.patcher_load_sync_queue.stop()
-        self.patcher_save_sync_queue.stop()
+        self.patcher_append_to_sync_queue.stop()
+        self.patcher_acknowledge_sync_queue.stop()
         self.patcher_create_client.stop()
+        self.store.close()
+        shutil.rmtree(self.tmp_dir)
         # Ensure that patcher_add_to_sync_queue is stopped if it was ever started.
         # This will be handled by individual test methods now.
         if hasattr(self, 'patcher_add_to_sync_queue') and self.patcher_add_to_sync_queue.is_started:
@@ -67,81 +79,98 @@ class TestSyncManager(unittest.IsolatedAsyncioTestCase):
 
     @patch.object(SyncManager, '_add_to_sync_queue', new_callable=MagicMock)
     async def test_create_animal_offline_first(self, mock_add_to_sync_queue):
-        self.mock_load_animals.return_value = []
         mock_new_animal = {"isletme_kupesi": "A001"}
         
-        await self.sync_manager.create_animal(mock_new_animal.copy())
+        with patch.object(self.store, 'replace_all') as mock_replace_all:
+            await self.sync_manager.create_animal(mock_new_animal.copy())
+            mock_replace_all.assert_not_called() # Row-level write, the herd is not rewritten
 
-        self.mock_save_animals.assert_called_once()
-        saved_animals = self.mock_save_animals.call_args[0][0]
+        saved_animals = self.repository.all()
         self.assertEqual(len(saved_animals), 1)
-        self.assertEqual(saved_animals[0]['isletme_kupesi'], 'A001')
-        self.assertIsNotNone(saved_animals[0].get('uuid'))
-        self.assertEqual(saved_animals[0]['user_id'], self.user_id)
-        self.assertEqual(saved_animals[0]['sync_status'], 'pending_create')
-        self.assertIsNotNone(saved_animals[0].get('last_modified'))
+        saved_animal = saved_animals[0]
+        self.assertEqual(saved_animal['isletme_kupesi'], 'A001')
+        self.assertIsNotNone(saved_animal.get('uuid'))
+        self.assertEqual(saved_animal['user_id'], self.user_id)
+        self.assertEqual(saved_animal['sync_status'], 'pending_create')
+        self.assertIsNotNone(saved_animal.get('last_modified'))
+        self.assertEqual(self.store.get(saved_animal['uuid'])['isletme_kupesi'], 'A001')
 
-        mock_add_to_sync_queue.assert_called_once_with('create', saved_animals[0])
+        mock_add_to_sync_queue.assert_called_once_with('create', saved_animal)
 
     @patch.object(SyncManager, '_add_to_sync_queue', new_callable=MagicMock)
     async def test_update_animal_offline_first(self, mock_add_to_sync_queue): # Add mock to parameters
-        existing_animal = {"uuid": "123", "isletme_kupesi": "Old", "user_id": self.user_id}
-        self.mock_load_animals.return_value = [existing_animal]
+        self.repository.put({"uuid": "123", "isletme_kupesi": "Old", "user_id": self.user_id})
         updated_data = {"uuid": "123", "isletme_kupesi": "New", "user_id": self.user_id}
 
         await self.sync_manager.update_animal("123", updated_data)
 
-        self.mock_save_animals.assert_called_once()
-        saved_animals = self.mock_save_animals.call_args[0][0]
-        self.assertEqual(len(saved_animals), 1)
-        self.assertEqual(saved_animals[0]['isletme_kupesi'], 'New')
-        self.assertEqual(saved_animals[0]['sync_status'], 'pending_update')
-        self.assertIsNotNone(saved_animals[0].get('last_modified'))
+        self.assertEqual(len(self.repository), 1)
+        saved_animal = self.repository.get("123")
+        self.assertEqual(saved_animal['isletme_kupesi'], 'New')
+        self.assertEqual(saved_animal['sync_status'], 'pending_update')
+        self.assertIsNotNone(saved_animal.get('last_modified'))
+        self.assertEqual(self.store.get("123")['isletme_kupesi'], 'New')
         
-        mock_add_to_sync_queue.assert_called_once_with('update', saved_animals[0]) # Use the local mock
+        # Only the changed field is queued, with its previous value as the merge base
+        mock_add_to_sync_queue.assert_called_once_with('update', {
+            "uuid": "123", "user_id": self.user_id, "last_modified": saved_animal['last_modified'], "isletme_kupesi": "New",
+        }, {"isletme_kupesi": "Old"})
+
+    @patch.object(SyncManager, '_add_to_sync_queue', new_callable=MagicMock)
+    async def test_update_animal_without_changes_is_not_queued(self, mock_add_to_sync_queue):
+        self.repository.put({"uuid": "123", "isletme_kupesi": "Old", "tasma_no": "7", "sinif": "Düve", "user_id": self.user_id})
+        edited = self.repository.get("123").copy()
+        edited.update(tasma_no="7", sinif="İnek") # Text field round trip and a derived field
+
+        changes = await self.sync_manager.update_animal("123", edited)
+
+        self.assertEqual(changes, {})
+        mock_add_to_sync_queue.assert_not_called()
+        self.assertIsNone(self.repository.get("123").get('sync_status'))
 
     # This test no longer needs specific patching for _add_to_sync_queue as global patch is removed
     async def test_add_to_sync_queue(self):
-        self.mock_load_sync_queue.return_value = []
         test_data = {"id": "test", "action": "test_action"}
         self.sync_manager._add_to_sync_queue("test_action", test_data) # Call the actual method
-        self.mock_load_sync_queue.assert_called_once()
-        self.mock_save_sync_queue.assert_called_once_with([{"action": "test_action", "data": test_data}])
+        self.mock_load_sync_queue.assert_not_called() # Append-only, queue is never re-read
+        self.mock_append_to_sync_queue.assert_called_once_with({"action": "test_action", "op_id": ANY, "data": test_data})
 
     async def test_process_sync_queue_creates_updates(self):
         mock_queue = [
-            {"action": "create", "data": {"uuid": "create1", "user_id": self.user_id}},
-            {"action": "update", "data": {"uuid": "update1", "user_id": self.user_id}}
+            {"seq": 1, "action": "create", "data": {"uuid": "create1", "user_id": self.user_id}},
+            {"seq": 2, "action": "update", "data": {"uuid": "update1", "user_id": self.user_id}}
         ]
         self.mock_load_sync_queue.return_value = mock_queue
 
         await self.sync_manager.process_sync_queue()
 
-        self.mock_supabase_client.table.return_value.insert.assert_called_once_with([{"uuid": "create1", "user_id": self.user_id}])
-        self.mock_supabase_client.table.return_value.update.assert_called_once_with({"uuid": "update1", "user_id": self.user_id})
-        self.mock_supabase_client.table.return_value.update.return_value.eq.assert_called_once_with('uuid', 'update1')
-        self.mock_save_sync_queue.assert_called_once_with([]) # Queue should be cleared
+        # Creates and updates with the same columns go out in a single bulk upsert keyed by uuid
+        self.mock_supabase_client.table.return_value.upsert.assert_called_once_with(
+            [{"uuid": "create1", "user_id": self.user_id, "last_modified": ANY},
+             {"uuid": "update1", "user_id": self.user_id, "last_modified": ANY}], on_conflict='uuid')
+        self.mock_supabase_client.table.return_value.insert.assert_not_called()
+        self.mock_supabase_client.table.return_value.update.assert_not_called() # No per-record round-trips
+        self.mock_acknowledge_sync_queue.assert_called_once_with([1, 2]) # Both items acknowledged with their chunk
 
     async def test_process_sync_queue_empty_queue(self):
         self.mock_load_sync_queue.return_value = []
         await self.sync_manager.process_sync_queue()
-        self.mock_supabase_client.table.return_value.insert.assert_not_called()
-        self.mock_supabase_client.table.return_value.update.assert_not_called()
-        self.mock_save_sync_queue.assert_not_called()
+        self.mock_supabase_client.table.return_value.upsert.assert_not_called()
+        self.mock_acknowledge_sync_queue.assert_not_called()
 
     async def test_process_sync_queue_failure_not_cleared(self):
-        mock_queue = [{"action": "create", "data": {"uuid": "create1"}}]
+        mock_queue = [{"seq": 1, "action": "create", "data": {"uuid": "create1"}}]
         self.mock_load_sync_queue.return_value = mock_queue
-        self.mock_supabase_client.table.return_value.insert.return_value.execute.side_effect = Exception("DB error")
+        self.mock_supabase_client.table.return_value.upsert.return_value.execute.side_effect = Exception("DB error")
 
         with self.assertRaisesRegex(SyncManagerError, "Senkronizasyon kuyruğu işlenirken hata oluştu"):
             await self.sync_manager.process_sync_queue()
 
-        self.mock_save_sync_queue.assert_not_called() # Queue should not be cleared on failure
+        self.mock_acknowledge_sync_queue.assert_not_called() # Queue should not be acknowledged on failure
 
     async def test_synchronize_full_flow_success(self):
-        self.mock_load_animals.return_value = [{"uuid": "local1", "last_modified": "2023-01-01T00:00:00"}]
-        self.mock_load_sync_queue.return_value = [{"action": "create", "data": {"uuid": "new1", "user_id": self.user_id, "last_modified": datetime.now().isoformat()}}]
+        self.repository.put({"uuid": "local1", "last_modified": "2023-01-01T00:00:00"})
+        self.mock_load_sync_queue.return_value = [{"seq": 1, "action": "create", "data": {"uuid": "new1", "user_id": self.user_id, "last_modified": datetime.now().isoformat()}}]
         self.mock_supabase_client.table.return_value.select.return_value.eq.return_value.execute.return_value.data = [
             {"uuid": "remote1", "last_modified": "2023-01-02T00:00:00", "user_id": self.user_id}
         ]
@@ -149,10 +178,10 @@ class TestSyncManager(unittest.IsolatedAsyncioTestCase):
         result = await self.sync_manager.synchronize()
 
         self.mock_load_sync_queue.assert_called_once()
-        self.mock_supabase_client.table.return_value.insert.assert_called_once() # For 'new1'
+        self.mock_supabase_client.table.return_value.upsert.assert_called_once() # For 'new1'
         self.mock_supabase_client.table.return_value.select.assert_called_once() # For remote fetch
-        self.mock_save_sync_queue.assert_called_once_with([]) # Queue cleared
-        self.mock_save_animals.assert_called_once() # Final merged data saved
+        self.mock_acknowledge_sync_queue.assert_called_once_with([1]) # Queue acknowledged
+        self.assertEqual(self.store.get("remote1")["user_id"], self.user_id) # Merged data saved
 
         self.assertEqual(len(result), 2) # local1 (updated by remote) + remote1 (new) + new1 (created) -> should be 3, if local1 not changed, but here it is new.
         # Let's refine the expected result based on the merge logic:
@@ -160,9 +189,40 @@ class TestSyncManager(unittest.IsolatedAsyncioTestCase):
         # remote1 is added.
         # So it should be 2.
 
+    async def test_synchronize_records_metrics(self):
+        self.repository.put({"uuid": "local1", "last_modified": "2023-01-01T00:00:00"})
+        self.mock_load_sync_queue.return_value = [{"seq": 1, "action": "create", "data": {"uuid": "new1", "user_id": self.user_id}}]
+        self.mock_supabase_client.table.return_value.select.return_value.eq.return_value.execute.return_value.data = [
+            {"uuid": "remote1", "last_modified": "2023-01-02T00:00:00", "user_id": self.user_id}
+        ]
+
+        await self.sync_manager.synchronize()
+
+        run = self.metrics.last_run()
+        self.assertEqual(run['kind'], 'synchronize')
+        self.assertEqual(run['status'], 'ok')
+        self.assertEqual(set(run['phases']), {'push', 'pull', 'merge', 'save'})
+        self.assertEqual(run['counters']['queue_depth'], 1)
+        self.assertEqual(run['counters']['records_pushed'], 1)
+        self.assertEqual(run['counters']['records_pulled'], 1)
+        self.assertEqual(run['counters']['records_merged'], 1)
+        self.assertGreater(run['counters']['bytes_pulled'], 0)
+        self.assertEqual(run['events'][-1]['event'], 'sync_finished')
+
+    async def test_failed_queue_counts_retries(self):
+        self.mock_load_sync_queue.return_value = [{"seq": 1, "action": "create", "data": {"uuid": "create1"}}]
+        self.mock_supabase_client.table.return_value.upsert.return_value.execute.side_effect = Exception("DB error")
+
+        await self.sync_manager.synchronize()
+
+        run = self.metrics.last_run()
+        self.assertEqual(run['counters']['retries'], 1)
+        self.assertIn('queue_failed', [event['event'] for event in run['events']])
+        self.assertEqual(len(self.metrics.history()), 1) # Queue processing shares the sync run
+
     async def test_synchronize_remote_only(self):
-        self.mock_load_animals.return_value = [{"uuid": "local1", "last_modified": "2023-01-01T00:00:00"}]
-        self.mock_load_sync_queue.return_value = [{"action": "create", "data": {"uuid": "new1", "user_id": self.user_id, "last_modified": datetime.now().isoformat()}}]
+        self.repository.put({"uuid": "local1", "last_modified": "2023-01-01T00:00:00"})
+        self.mock_load_sync_queue.return_value = [{"seq": 1, "action": "create", "data": {"uuid": "new1", "user_id": self.user_id, "last_modified": datetime.now().isoformat()}}]
         self.mock_supabase_client.table.return_value.select.return_value.eq.return_value.execute.return_value.data = [
             {"uuid": "remote1", "last_modified": "2023-01-02T00:00:00", "user_id": self.user_id}
         ]
@@ -170,13 +230,13 @@ class TestSyncManager(unittest.IsolatedAsyncioTestCase):
         await self.sync_manager.synchronize(remote_only=True)
 
         self.mock_load_sync_queue.assert_not_called() # Queue processing skipped
-        self.mock_supabase_client.table.return_value.insert.assert_not_called() # No inserts from queue
+        self.mock_supabase_client.table.return_value.upsert.assert_not_called() # No upserts from queue
         self.mock_supabase_client.table.return_value.select.assert_called_once() # Remote fetch still happens
 
     async def test_synchronize_merge_logic_local_newer(self):
         local_animal = {"uuid": "common_uuid", "data": "local_data", "last_modified": "2024-01-02T00:00:00", "user_id": self.user_id}
         remote_animal = {"uuid": "common_uuid", "data": "remote_data", "last_modified": "2024-01-01T00:00:00", "user_id": self.user_id}
-        self.mock_load_animals.return_value = [local_animal]
+        self.repository.put(local_animal)
         self.mock_supabase_client.table.return_value.select.return_value.eq.return_value.execute.return_value.data = [remote_animal]
         self.mock_load_sync_queue.return_value = [] # Ensure no pending changes affect merge
 
@@ -187,7 +247,7 @@ class TestSyncManager(unittest.IsolatedAsyncioTestCase):
     async def test_synchronize_merge_logic_remote_newer(self):
         local_animal = {"uuid": "common_uuid", "data": "local_data", "last_modified": "2024-01-01T00:00:00", "user_id": self.user_id}
         remote_animal = {"uuid": "common_uuid", "data": "remote_data", "last_modified": "2024-01-02T00:00:00", "user_id": self.user_id}
-        self.mock_load_animals.return_value = [local_animal]
+        self.repository.put(local_animal)
         self.mock_supabase_client.table.return_value.select.return_value.eq.return_value.execute.return_value.data = [remote_animal]
         self.mock_load_sync_queue.return_value = []
 
@@ -0,0 +1,70 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from src.sync_metrics import SyncMetrics, payload_size
+
+class TestSyncMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_run_records_phases_counters_and_events(self):
+        metrics = SyncMetrics()
+        with metrics.run('synchronize') as run:
+            with run.phase('pull'):
+                pass
+            with run.phase('pull'):
+                pass
+            run.count('records_pulled', 3)
+            run.count('records_pulled', 2)
+            run.gauge('queue_depth', 7)
+            run.event('pull_finished', records=5)
+
+        entry = metrics.last_run()
+        self.assertEqual(entry['status'], 'ok')
+        self.assertIn('pull', entry['phases'])
+        self.assertEqual(entry['counters'], {'records_pulled': 5, 'queue_depth': 7})
+        self.assertEqual(entry['events'][0]['event'], 'pull_finished')
+        self.assertEqual(entry['events'][0]['records'], 5)
+
+    def test_failed_run_is_recorded_and_reraised(self):
+        metrics = SyncMetrics()
+        with self.assertRaises(RuntimeError):
+            with metrics.run('synchronize'):
+                raise RuntimeError("boom")
+        self.assertEqual(metrics.last_run()['status'], 'error')
+        self.assertEqual(metrics.last_run()['error'], 'boom')
+        self.assertEqual(metrics.summary()['errors'], 1)
+
+    def test_history_is_bounded(self):
+        metrics = SyncMetrics(history_size=3)
+        for index in range(5):
+            with metrics.run('synchronize') as run:
+                run.count('records_pulled', index)
+        history = metrics.history()
+        self.assertEqual(len(history), 3)
+        self.assertEqual([entry['counters']['records_pulled'] for entry in history], [2, 3, 4])
+        self.assertEqual(metrics.summary()['counters']['records_pulled'], 9)
+
+    def test_runs_are_appended_to_metrics_file(self):
+        path = os.path.join(self.tmp_dir, 'metrics', 'sync.jsonl')
+        metrics = SyncMetrics(metrics_file=path)
+        for _ in range(2):
+            with metrics.run('synchronize') as run:
+                run.count('records_pushed')
+        with open(path, encoding='utf-8') as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(lines[0]['counters'], {'records_pushed': 1})
+
+    def test_payload_size(self):
+        self.assertEqual(payload_size({'a': 'ç'}), len('{"a": "ç"}'.encode('utf-8')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from src.local_store import SQLiteAnimalStore
+from src.repository import AnimalRepository
+from src.sync_manager import SyncManager
+from src.sync_merge import diff_fields, pending_patches
+from src.sync_metrics import SyncMetrics
+from tests.fake_supabase import FakeSupabase
+
+USER = 'user-1'
+
+class TestFieldDiff(unittest.TestCase):
+
+    def test_diff_ignores_derived_and_round_tripped_values(self):
+        stored = {'uuid': 'a', 'tasma_no': 7, 'dogum_tarihi': datetime(2020, 1, 1), 'sinif': 'Düve', 'irk': 'Holstein'}
+        edited = {'uuid': 'a', 'tasma_no': '7', 'dogum_tarihi': str(datetime(2020, 1, 1)),
+                  'sinif': 'İnek', 'display_name': 'x', 'irk': 'Jersey'}
+        self.assertEqual(diff_fields(stored, edited), {'irk': 'Jersey'})
+
+    def test_pending_patches_keep_first_base_and_last_value(self):
+        queue = [
+            {'action': 'update', 'data': {'uuid': 'a', 'last_modified': 't1', 'irk': 'B'}, 'base': {'irk': 'A'}},
+            {'action': 'create', 'data': {'uuid': 'b'}},
+            {'action': 'update', 'data': {'uuid': 'a', 'last_modified': 't2', 'irk': 'C'}, 'base': {'irk': 'B'}},
+        ]
+        self.assertEqual(pending_patches(queue), {'a': {'fields': {'irk': 'C'}, 'base': {'irk': 'A'}, 'last_modified': 't2'}})
+
+
+class TestFieldLevelSync(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = SQLiteAnimalStore(os.path.join(self.tmp_dir, 'animals.db'))
+        self.repository = AnimalRepository(self.store)
+        self.client = FakeSupabase({'animals': [
+            {'uuid': 'a', 'user_id': USER, 'last_modified': '2024-01-01T10:00:00', 'tasma_no': '1', 'irk': 'Holstein'},
+        ]})
+        self.queue = []
+        patchers = [
+            patch('src.sync_manager.get_supabase_client', return_value=self.client),
+            patch('src.sync_manager.load_sync_queue', side_effect=lambda: list(self.queue)),
+            patch('src.sync_manager.append_to_sync_queue', side_effect=self.append),
+            patch('src.sync_manager.acknowledge_sync_items', side_effect=self.acknowledge),
+            patch('src.sync_manager.record_sync_failures', return_value=[]),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.sync_manager = SyncManager(USER, repository=self.repository, metrics=SyncMetrics())
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def append(self, entry):
+        self.queue.append(dict(entry, seq=len(self.queue) + 1))
+
+    def acknowledge(self, seqs):
+        self.queue = [item for item in self.queue if item['seq'] not in seqs]
+
+    def remote_edit(self, **fields):
+        """Another device edits the server row after our local edit."""
+        row = self.client.tables['animals'][0]
+        row.update(fields, last_modified=(datetime.now() + timedelta(hours=1)).isoformat())
+
+    async def test_only_changed_fields_are_sent(self):
+        await self.sync_manager.synchronize()
+        edited = self.repository.get('a').copy()
+        edited['tasma_no'] = '2'
+        await self.sync_manager.update_animal('a', edited)
+        self.client.tables['animals'][0]['irk'] = 'Jersey' # Changed on the server, not by this edit
+
+        await self.sync_manager.synchronize()
+
+        upsert = [request for request in self.client.requests if request['operation'] == 'upsert'][-1]
+        self.assertEqual(set(upsert['payload'][0]), {'uuid', 'user_id', 'last_modified', 'tasma_no'})
+        row = self.client.rows()['a']
+        self.assertEqual((row['tasma_no'], row['irk']), ('2', 'Jersey'))
+
+    async def test_conflict_is_resolved_per_field(self):
+        await self.sync_manager.synchronize()
+        edited = self.repository.get('a').copy()
+        edited['tasma_no'] = '2'
+        await self.sync_manager.update_animal('a', edited)
+        self.remote_edit(irk='Jersey')
+
+        self.client.fail_next() # Push fails; the patch stays queued during the pull
+        await self.sync_manager.synchronize()
+
+        local = self.repository.get('a')
+        self.assertEqual((local['tasma_no'], local['irk']), ('2', 'Jersey'))
+        self.assertEqual(local['sync_status'], 'pending_update')
+
+        await self.sync_manager.synchronize()
+        row = self.client.rows()['a']
+        self.assertEqual((row['tasma_no'], row['irk']), ('2', 'Jersey'))
+
+    async def test_newer_remote_value_wins_for_the_same_field(self):
+        await self.sync_manager.synchronize()
+        edited = self.repository.get('a').copy()
+        edited['tasma_no'] = '2'
+        await self.sync_manager.update_animal('a', edited)
+        self.remote_edit(tasma_no='3')
+
+        self.client.fail_next()
+        await self.sync_manager.synchronize()
+
+        self.assertEqual(self.repository.get('a')['tasma_no'], '3')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+import uuid
+from unittest.mock import patch
+from src.local_store import SQLiteAnimalStore
+from src.repository import AnimalRepository
+from src.sync_manager import SyncManager
+from src.sync_metrics import SyncMetrics
+from src.sync_reconcile import BUCKET_DIGESTS_RPC, bucket_bounds, bucket_digests, digest_line, remote_bucket_digests
+from tests.fake_supabase import FakeSupabase
+
+USER = 'user-1'
+
+def server_digests(client, params):
+    """Local stand-in for the animal_bucket_digests SQL function."""
+    return remote_bucket_digests(client.tables['animals'], params['p_user_id'], params['p_prefix_length'],
+                                 params['p_prefixes'])
+
+class TestBucketDigests(unittest.TestCase):
+
+    def test_same_instant_in_any_timezone_has_the_same_line(self):
+        self.assertEqual(digest_line('a', '2024-01-01T10:00:00'), 'a|2024-01-01T10:00:00.000000')
+        self.assertEqual(digest_line('a', '2024-01-01T13:00:00+03:00'), digest_line('a', '2024-01-01T10:00:00'))
+        self.assertEqual(digest_line('a', None), 'a|')
+
+    def test_digests_ignore_order_and_tombstones(self):
+        records = [{'uuid': 'ab1', 'last_modified': '2024-01-01T00:00:00'}, {'uuid': 'ac2', 'last_modified': None},
+                   {'uuid': 'b00', 'last_modified': '2024-01-02T00:00:00'}]
+        digests = bucket_digests(records, 1)
+        self.assertEqual(digests, bucket_digests(list(reversed(records)), 1))
+        self.assertEqual(digests, bucket_digests(records + [{'uuid': 'a99', 'is_deleted': True}], 1))
+        self.assertEqual(digests['a'][0], 2)
+        self.assertEqual(set(bucket_digests(records, 2, prefixes=['a'])), {'ab', 'ac'})
+
+    def test_bucket_bounds(self):
+        self.assertEqual(bucket_bounds('3f'), ('3f000000-0000-0000-0000-000000000000', '40000000-0000-0000-0000-000000000000'))
+        self.assertEqual(bucket_bounds('ff'), ('ff000000-0000-0000-0000-000000000000', None))
+
+
+class TestReconcile(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = SQLiteAnimalStore(os.path.join(self.tmp_dir, 'animals.db'))
+        self.repository = AnimalRepository(self.store)
+        rng = random.Random(7)
+        self.client = FakeSupabase({'animals': [
+            {'uuid': str(uuid.UUID(int=rng.getrandbits(128), version=4)), 'user_id': USER,
+             'last_modified': f'2024-01-01T10:{i // 60 % 60:02d}:{i % 60:02d}+00:00', 'tasma_no': str(i)}
+            for i in range(2000)
+        ]})
+        self.client.register_rpc(BUCKET_DIGESTS_RPC, server_digests)
+        patchers = [
+            patch('src.sync_manager.get_supabase_client', return_value=self.client),
+            patch('src.sync_manager.load_sync_queue', return_value=[]),
+            patch('src.sync_manager.append_to_sync_queue'),
+            patch('src.sync_manager.acknowledge_sync_items'),
+            patch('src.sync_manager.record_sync_failures', return_value=[]),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.metrics = SyncMetrics()
+        self.sync_manager = SyncManager(USER, repository=self.repository, metrics=self.metrics)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.tmp_dir)
+
+    async def test_consistent_herd_costs_one_small_request(self):
+        await self.sync_manager.synchronize()
+        self.client.requests.clear()
+
+        report = await self.sync_manager.reconcile()
+
+        self.assertTrue(report.consistent)
+        self.assertEqual([request['operation'] for request in self.client.requests], ['rpc'])
+        self.assertLess(self.metrics.last_run()['counters']['bytes_pulled'], 2048)
+
+    async def test_only_differing_buckets_are_downloaded(self):
+        await self.sync_manager.synchronize()
+        rows = self.client.tables['animals']
+        rows[10].update(tasma_no='fixed', last_modified='2024-02-01T00:00:00+00:00') # Missed by the delta pull
+        rows[20]['is_deleted'] = True
+        rows[20]['last_modified'] = '2024-02-01T00:00:00+00:00'
+        self.repository.delete(rows[30]['uuid']) # Lost locally
+        self.client.requests.clear()
+
+        report = await self.sync_manager.reconcile()
+
+        self.assertFalse(report.consistent)
+        self.assertLessEqual(len(report.downloaded_buckets), 3)
+        self.assertLess(report.records_pulled, 100)
+        self.assertEqual((report.records_updated, report.records_deleted), (2, 1))
+        self.assertEqual(self.repository.get(rows[10]['uuid'])['tasma_no'], 'fixed')
+        self.assertIsNone(self.repository.get(rows[20]['uuid']))
+        self.assertIsNotNone(self.repository.get(rows[30]['uuid']))
+        self.assertLess(self.metrics.last_run()['counters']['bytes_pulled'], 30 * 1024)
+
+        self.assertTrue((await self.sync_manager.reconcile()).consistent)
+
+    async def test_unsent_local_records_are_reported(self):
+        await self.sync_manager.synchronize()
+        local_uuid = str(uuid.uuid4())
+        self.repository.put({'uuid': local_uuid, 'user_id': USER, 'last_modified': '2024-03-01T00:00:00'})
+
+        report = await self.sync_manager.reconcile()
+
+        self.assertEqual(report.local_only, [local_uuid])
+        self.assertIsNotNone(self.repository.get(local_uuid))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import asyncio
+import unittest
+from src.sync_metrics import SyncMetrics
+from src.sync_scheduler import SyncScheduler
+
+class FakeSyncManager:
+    """Records synchronize calls; `fail_runs` runs report a failed pull like SyncManager does."""
+
+    def __init__(self, fail_runs=0, duration=0.0):
+        self.metrics = SyncMetrics()
+        self.fail_runs = fail_runs
+        self.duration = duration
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+
+    async def synchronize(self):
+        self.calls += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            with self.metrics.run('synchronize') as run:
+                await asyncio.sleep(self.duration)
+                if self.fail_runs:
+                    self.fail_runs -= 1
+                    run.event('pull_failed', error='offline')
+            return [{'uuid': str(self.calls)}]
+        finally:
+            self.active -= 1
+
+
+class TestSyncScheduler(unittest.IsolatedAsyncioTestCase):
+
+    def scheduler(self, manager, **kwargs):
+        options = dict(debounce_seconds=0.02, backoff_initial=0.05, backoff_max=0.2, jitter=0)
+        options.update(kwargs)
+        scheduler = SyncScheduler(manager, **options)
+        self.addCleanup(scheduler.stop)
+        return scheduler
+
+    async def test_requests_are_debounced(self):
+        manager = FakeSyncManager()
+        scheduler = self.scheduler(manager)
+        for reason in ('screen_enter', 'local_edit', 'screen_enter'):
+            scheduler.request(reason)
+        await asyncio.sleep(0.1)
+        self.assertEqual(manager.calls, 1)
+
+    async def test_single_flight_with_one_follow_up_run(self):
+        manager = FakeSyncManager(duration=0.05)
+        scheduler = self.scheduler(manager, debounce_seconds=0)
+        scheduler.request()
+        await asyncio.sleep(0.01)
+        self.assertTrue(scheduler.running)
+        for _ in range(5):
+            scheduler.request('local_edit')
+        await asyncio.sleep(0.2)
+        self.assertEqual(manager.calls, 2)
+        self.assertEqual(manager.max_active, 1)
+
+    async def test_listeners_receive_synced_data(self):
+        scheduler = self.scheduler(FakeSyncManager(), debounce_seconds=0)
+        received = []
+        scheduler.add_listener(lambda animals: 1 / 0) # A failing listener does not stop the others
+        scheduler.add_listener(received.append)
+        scheduler.request()
+        await asyncio.sleep(0.05)
+        self.assertEqual(received, [[{'uuid': '1'}]])
+
+    async def test_failures_back_off_exponentially(self):
+        manager = FakeSyncManager(fail_runs=2)
+        scheduler = self.scheduler(manager, debounce_seconds=0)
+        scheduler.request()
+        await asyncio.sleep(0.01)
+        self.assertEqual((manager.calls, scheduler.failures, scheduler.last_error), (1, 1, 'offline'))
+        self.assertEqual(scheduler.backoff_delay(), 0.05)
+
+        scheduler.request('screen_enter') # Does not cut the backoff short
+        await asyncio.sleep(0.02)
+        self.assertEqual(manager.calls, 1)
+
+        await asyncio.sleep(0.06)
+        self.assertEqual((manager.calls, scheduler.failures), (2, 2))
+        self.assertEqual(scheduler.backoff_delay(), 0.1)
+
+        await asyncio.sleep(0.15)
+        self.assertEqual((manager.calls, scheduler.failures), (3, 0))
+
+    async def test_backoff_is_capped(self):
+        scheduler = self.scheduler(FakeSyncManager())
+        scheduler.failures = 10
+        self.assertEqual(scheduler.backoff_delay(), 0.2)
+
+    async def test_connectivity_restored_retries_immediately(self):
+        manager = FakeSyncManager(fail_runs=1)
+        scheduler = self.scheduler(manager, debounce_seconds=0, backoff_initial=10)
+        scheduler.request()
+        await asyncio.sleep(0.01)
+        self.assertEqual(scheduler.failures, 1)
+
+        scheduler.connectivity_restored()
+        await asyncio.sleep(0.02)
+        self.assertEqual((manager.calls, scheduler.failures), (2, 0))
+
+    async def test_stop_cancels_pending_sync(self):
+        manager = FakeSyncManager()
+        scheduler = self.scheduler(manager)
+        scheduler.request()
+        scheduler.stop()
+        await asyncio.sleep(0.05)
+        self.assertEqual(manager.calls, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
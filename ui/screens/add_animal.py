@@ -41,6 +41,7 @@ class AddAnimalScreen(MDScreen):
     async def _save_animal(self, sync_manager, new_animal):
         try:
             await sync_manager.create_animal(new_animal)
+            MDApp.get_running_app().request_sync('local_edit')
             show_success("Hayvan başarıyla kaydedildi.")
             self.reset_fields()
         except Exception as e:
@@ -54,7 +54,9 @@ class AnimalDetailsScreen(MDScreen):
             return
 
         if self.edit_mode:
-            updated_animal = self.animal_data.copy()
+            # Yalnızca metin kutularındaki değerler gönderilir; `update_animal` kayıtlı sürümle
+            # karşılaştırıp sadece değişen alanları kuyruğa ekler
+            updated_animal = {}
             for i in range(0, self.ids.animal_details_list.children.__len__()):
                 if isinstance(self.ids.animal_details_list.children[i], BoxLayout):
                     # Ensure child widgets exist and are accessible
@@ -69,8 +71,12 @@ class AnimalDetailsScreen(MDScreen):
             try:
                 # Use the app's sync_manager
                 if app.sync_manager:
-                    await app.sync_manager.update_animal(self.animal_uuid, updated_animal)
-                    show_success("Değişiklikler kaydedildi.")
+                    changes = await app.sync_manager.update_animal(self.animal_uuid, updated_animal)
+                    for key, value in changes.items():
+                        self.animal_data[key] = value
+                    if changes:
+                        app.request_sync('local_edit')
+                    show_success("Değişiklikler kaydedildi." if changes else "Değişiklik yok.")
                     self.edit_mode = False
                     self.ids.edit_button.text = "Düzenle"
                     self.populate_list()
@@ -0,0 +1,55 @@
+import asyncio
+from kivy.clock import Clock
+from kivy.properties import BooleanProperty, NumericProperty, StringProperty
+from kivymd.app import MDApp
+from kivymd.uix.screen import MDScreen
+from src.file_importer import import_file
+from ui.utils.dialogs import show_error, show_success
+
+class FileUploadScreen(MDScreen):
+    # Bound to the progress bar and status label in file_upload_screen.kv
+    progress_value = NumericProperty(0)
+    status_text = StringProperty("CSV veya Excel (XLSX) dosyası seçin.")
+    importing = BooleanProperty(False)
+
+    def choose_file(self):
+        if self.importing:
+            return
+        from plyer import filechooser # Platform file picker, loaded only when needed
+        filechooser.open_file(on_selection=self._on_selection,
+                              filters=[["CSV / Excel", "*.csv", "*.xlsx", "*.xlsm"]])
+
+    def _on_selection(self, selection):
+        # The picker may call back from another thread; continue on the UI loop
+        if selection:
+            Clock.schedule_once(lambda dt: self.start_import(selection[0]))
+
+    def start_import(self, file_path):
+        app = MDApp.get_running_app()
+        if not app.sync_manager:
+            show_error("Sync manager not initialized. Please log in.")
+            return
+        self.importing = True
+        self.progress_value = 0
+        self.status_text = f"İçe aktarılıyor: {file_path}"
+        asyncio.create_task(self._import_file(app.sync_manager, file_path))
+
+    async def _import_file(self, sync_manager, file_path):
+        try:
+            progress = await import_file(file_path, sync_manager, on_progress=self._on_progress)
+            MDApp.get_running_app().request_sync('local_edit')
+            message = (f"{progress.rows} satır işlendi: {progress.created} yeni, {progress.updated} güncellenen, "
+                       f"{progress.unchanged} değişmeyen, {progress.invalid} geçersiz.")
+            if progress.errors:
+                message += "\n" + "\n".join(progress.errors[:5])
+            show_success(message)
+        except Exception as e:
+            self.status_text = "İçe aktarma başarısız oldu."
+            show_error(f"Dosya içe aktarılırken hata oluştu: {e}")
+        finally:
+            self.importing = False
+
+    def _on_progress(self, progress):
+        self.progress_value = progress.fraction * 100
+        self.status_text = (f"{progress.rows} satır okundu ({progress.created} yeni, {progress.updated} güncellenen, "
+                            f"{progress.invalid} geçersiz)")
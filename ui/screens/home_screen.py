@@ -11,8 +11,10 @@ from kivy.properties import ObjectProperty, BooleanProperty, StringProperty
 from kivy.uix.recycleview.layout import LayoutSelectionBehavior
 from kivymd.uix.list import OneLineAvatarIconListItem # Changed to OneLineAvatarIconListItem for consistency
 from kivy.clock import Clock
-from src.main import get_all_animal_data
-from src.data_processor import get_display_name
+from kivymd.app import MDApp
+from src.main import get_all_animal_data, process_synced_data
+from src.models import iter_animals
+from src.data_processor import filter_animals
 from ui.utils.dialogs import show_error, show_success # Import centralized dialogs
 
 
@@ -74,8 +76,21 @@ class HomeScreen(MDScreen):
     _all_animals = [] # Cache the full list of animals for filtering
 
     def on_enter(self):
+        # Re-render when the background sync lands new data, but only while this screen is shown
+        app = MDApp.get_running_app()
+        if app.sync_scheduler:
+            app.sync_scheduler.add_listener(self.on_synced)
         Clock.schedule_once(self.load_animal_data)
 
+    def on_leave(self):
+        app = MDApp.get_running_app()
+        if app.sync_scheduler:
+            app.sync_scheduler.remove_listener(self.on_synced)
+
+    def on_synced(self, animals):
+        self._all_animals = process_synced_data(animals)
+        self.populate_list(self._all_animals)
+
     def load_animal_data(self, dt=0): # Added dt=0 for Clock.schedule_once
         asyncio.create_task(self._load_animal_data())
 
@@ -90,28 +105,19 @@ class HomeScreen(MDScreen):
 
     def populate_list(self, animals):
         if self.ids.animal_list:
-            # Ensure 'devlet_kupesi' and 'gebelik_durumu_metin' are handled
+            # Animals come from the shared repository as src.models.Animal objects,
+            # so fields are read as attributes rather than dict lookups.
             self.ids.animal_list.data = [{
-                'isletme_kupesi': animal.get('isletme_kupesi', 'N/A'),
-                'sinif': animal.get('sinif', 'N/A'),
-                'devlet_kupesi': animal.get('devlet_kupesi', 'N/A'), # Ensure this key is passed
-                'gebelik_durumu_metin': animal.get('gebelik_durumu_metin', 'Bilinmiyor'),
-                'display_name': get_display_name(animal),
+                'isletme_kupesi': animal.isletme_kupesi or 'N/A',
+                'sinif': animal.sinif or 'N/A',
+                'devlet_kupesi': animal.devlet_kupesi or 'N/A', # Ensure this key is passed
+                'gebelik_durumu_metin': animal.gebelik_durumu_metin or 'Bilinmiyor',
+                'display_name': animal.label,
                 'data': animal, # Pass the full animal data
-            } for animal in animals]
+            } for animal in iter_animals(animals)]
 
     def filter_list(self, search_text=""):
-        search_text = search_text.lower()
-        if not search_text:
-            filtered_animals = self._all_animals
-        else:
-            filtered_animals = [
-                animal for animal in self._all_animals
-                if search_text in get_display_name(animal).lower() or \
-                   search_text in animal.get('isletme_kupesi', '').lower() or \
-                   search_text in animal.get('devlet_kupesi', '').lower()
-            ]
-        self.populate_list(filtered_animals)
+        self.populate_list(filter_animals(self._all_animals, search_text))
 
     # Removed show_dialog and show_error_dialog as they are centralized in ui/utils/dialogs.py
 
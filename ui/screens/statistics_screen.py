@@ -3,10 +3,8 @@ from kivymd.uix.screen import MDScreen
 from kivy.properties import ObjectProperty, StringProperty
 from kivy.uix.scrollview import ScrollView # Added for explicit import
 from kivymd.uix.list import OneLineListItem
-from src.statistics import calculate_statistics, get_animal_specific_stats, \
-                           calculate_breed_distribution, generate_pie_chart_base64, \
-                           calculate_births_per_month, generate_bar_chart_base64
-from src.persistence import load_animals
+from kivymd.app import MDApp
+from src.statistics import generate_pie_chart_base64, generate_bar_chart_base64
 from ui.utils.dialogs import show_error # Import centralized dialogs
 
 class StatisticsScreen(MDScreen):
@@ -20,11 +18,10 @@ class StatisticsScreen(MDScreen):
 
     async def _update_statistics_async(self):
         try:
-            # It's better to fetch animals from sync_manager or get_all_animal_data
-            # for consistency with offline-first approach, but for now using load_animals
-            # as it was previously done and doesn't require complex app/sync_manager access.
-            all_animals = load_animals()
-            if not all_animals:
+            # The shared repository keeps running herd aggregates up to date on every
+            # write, so entering this screen no longer walks the herd.
+            aggregates = MDApp.get_running_app().repository.aggregates()
+            if not len(aggregates):
                 show_error("Henüz hiç hayvan verisi yok. Lütfen hayvan ekleyin.")
                 self.populate_general_stats({}) # Clear existing stats
                 self.breed_pie_chart_src = ""
@@ -32,11 +29,11 @@ class StatisticsScreen(MDScreen):
                 return
 
             # General Statistics
-            general_stats = calculate_statistics(all_animals)
+            general_stats = aggregates.statistics()
             self.populate_general_stats(general_stats)
 
             # Breed Distribution Chart
-            breed_dist = calculate_breed_distribution(all_animals)
+            breed_dist = aggregates.breed_distribution()
             pie_chart_base64 = generate_pie_chart_base64(breed_dist, "Hayvan Irk Dağılımı")
             if pie_chart_base64:
                 self.breed_pie_chart_src = f"data:image/png;base64,{pie_chart_base64}"
@@ -44,7 +41,7 @@ class StatisticsScreen(MDScreen):
                 self.breed_pie_chart_src = "" # Clear if no data
 
             # Births per Month Chart
-            births_data = calculate_births_per_month(all_animals)
+            births_data = aggregates.births_per_month()
             bar_chart_base64 = generate_bar_chart_base64(births_data, "Aylara Göre Doğum Sayısı", "Ay-Yıl", "Doğum Sayısı")
             if bar_chart_base64:
                 self.births_bar_chart_src = f"data:image/png;base64,{bar_chart_base64}"
@@ -0,0 +1,42 @@
+import importlib
+from kivy.lang import Builder
+from kivy.uix.screenmanager import ScreenManager
+from src.startup_profile import startup_profiler
+
+# Ekran adı -> (modül, sınıf, KV dosyası)
+# Ekranların modülleri ve KV dosyaları açılışta değil, ekrana ilk gidildiğinde yüklenir.
+SCREENS = {
+    'login': ('ui.screens.login_screen', 'LoginScreen', 'ui/screens/login_screen.kv'),
+    'home': ('ui.screens.home_screen', 'HomeScreen', 'ui/screens/home_screen.kv'),
+    'animal_details': ('ui.screens.animal_details', 'AnimalDetailsScreen', 'ui/screens/animal_details.kv'),
+    'add_animal': ('ui.screens.add_animal', 'AddAnimalScreen', 'ui/screens/add_animal.kv'),
+    'statistics': ('ui.screens.statistics_screen', 'StatisticsScreen', 'ui/screens/statistics_screen.kv'),
+    'file_upload': ('ui.screens.file_upload_screen', 'FileUploadScreen', 'ui/screens/file_upload_screen.kv'),
+}
+
+_loaded_kv_files = set()
+
+def create_screen(name: str):
+    """Ekranın modülünü içe aktarır, KV dosyasını (bir kez) yükler ve ekranı oluşturur."""
+    module_name, class_name, kv_file = SCREENS[name]
+    with startup_profiler.phase(f"screen:{name}"):
+        screen_class = getattr(importlib.import_module(module_name), class_name)
+        if kv_file not in _loaded_kv_files:
+            Builder.load_file(kv_file)
+            _loaded_kv_files.add(kv_file)
+        return screen_class(name=name)
+
+
+class LazyScreenManager(ScreenManager):
+    """
+    Ekranları ilk istendiklerinde oluşturan ekran yöneticisi.
+
+    `current` değiştiğinde Kivy hedef ekranı `get_screen` ile aradığından,
+    `app.root.current = 'statistics'` veya `app.root.get_screen('animal_details')`
+    gibi mevcut kullanımlar değişmeden çalışır.
+    """
+
+    def get_screen(self, name):
+        if name in SCREENS and not self.has_screen(name):
+            self.add_widget(create_screen(name))
+        return super().get_screen(name)